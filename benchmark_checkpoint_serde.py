@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark checkpoint serializers on the test_data invoices.
+
+Runs every invoice listed in test_data/test_invoices.json through the workflow
+against a throwaway database, then replays each step's checkpoint and channel
+writes through the candidate serializers, reporting bytes written and
+serialize/deserialize time per node.
+
+Usage:
+    python benchmark_checkpoint_serde.py [--repeat N]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from src.graph.builder import build_invoice_graph, create_initial_state
+from src.storage.serializers import CompactSerializer
+
+
+ROOT = Path(__file__).parent
+TEST_DATA_DIR = ROOT / "test_data"
+
+SERIALIZERS = {
+    "default (msgpack)": JsonPlusSerializer(),
+    "msgpack+zstd": CompactSerializer(format="msgpack", compression="zstd"),
+    "orjson": CompactSerializer(format="orjson", compression=None),
+    "orjson+zstd": CompactSerializer(format="orjson", compression="zstd"),
+}
+
+
+def load_test_invoices() -> List[Dict[str, Any]]:
+    """Load invoice payloads referenced by test_data/test_invoices.json."""
+    with open(TEST_DATA_DIR / "test_invoices.json", "r") as f:
+        cases = json.load(f)
+    invoices = []
+    for case in cases:
+        with open(TEST_DATA_DIR / case["file"], "r") as f:
+            invoices.append(json.load(f))
+    return invoices
+
+
+def build_benchmark_graph(workdir: Path):
+    """Build the graph against a temporary database (default serializer)."""
+    with open(ROOT / "workflow.json", "r") as f:
+        workflow = json.load(f)
+    workflow["config"]["default_db"] = f"sqlite:///{workdir / 'bench.db'}"
+    workflow["config"]["checkpoint_serializer"] = {"format": "default"}
+    workflow["config"]["blob_store"] = {**workflow["config"].get("blob_store", {}), "path": str(workdir / "blobs")}
+
+    config_path = workdir / "workflow.json"
+    with open(config_path, "w") as f:
+        json.dump(workflow, f)
+
+    graph, checkpoint_store, _ = build_invoice_graph(str(config_path))
+    return graph, checkpoint_store.get_checkpointer(), workflow["config"]
+
+
+def collect_node_payloads(graph, checkpointer, config: Dict[str, Any], invoices: List[Dict[str, Any]]):
+    """
+    Run invoices and collect what each node step persists.
+
+    A node step persists its channel writes (stored against the checkpoint it
+    started from) and the checkpoint produced after it ran.
+
+    Returns:
+        Dict of node name -> list of payload objects
+    """
+    payloads: Dict[str, List[Any]] = {}
+
+    for invoice in invoices:
+        initial_state = create_initial_state(invoice, config)
+        thread_config = {"configurable": {"thread_id": initial_state["thread_id"]}}
+        for _ in graph.stream(initial_state, thread_config, stream_mode="updates"):
+            pass
+
+        history = list(reversed(list(graph.get_state_history(thread_config))))
+        for current, following in zip(history, history[1:]):
+            if not current.next:
+                continue
+            node = "+".join(current.next)
+            current_tuple = checkpointer.get_tuple(current.config)
+            following_tuple = checkpointer.get_tuple(following.config)
+            node_payloads = payloads.setdefault(node, [])
+            node_payloads.extend(value for _, _, value in current_tuple.pending_writes or [])
+            node_payloads.append(following_tuple.checkpoint)
+
+    return payloads
+
+
+def measure(serde, objects: List[Any], repeat: int) -> Dict[str, float]:
+    """Measure bytes and ser/de time (microseconds per step) for a list of objects."""
+    encoded = [serde.dumps_typed(obj) for obj in objects]
+    total_bytes = sum(len(data) for _, data in encoded)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for obj in objects:
+            serde.dumps_typed(obj)
+    ser_us = (time.perf_counter() - start) * 1e6 / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in encoded:
+            serde.loads_typed(item)
+    de_us = (time.perf_counter() - start) * 1e6 / repeat
+
+    # Round-trip must be lossless for the default serializer's view of the data
+    for obj, item in zip(objects, encoded):
+        assert serde.loads_typed(item) == JsonPlusSerializer().loads_typed(JsonPlusSerializer().dumps_typed(obj))
+
+    return {"bytes": total_bytes, "ser_us": ser_us, "de_us": de_us}
+
+
+def main():
+    """Run serializer benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark checkpoint serializers")
+    parser.add_argument("--repeat", type=int, default=200, help="Timing repetitions per node")
+    args = parser.parse_args()
+
+    invoices = load_test_invoices()
+    print(f"🧾 Checkpoint serializer benchmark ({len(invoices)} invoices, repeat={args.repeat})")
+    print("=" * 78)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        graph, checkpointer, config = build_benchmark_graph(Path(tmp))
+        payloads = collect_node_payloads(graph, checkpointer, config, invoices)
+
+        totals = {name: {"bytes": 0, "ser_us": 0.0, "de_us": 0.0} for name in SERIALIZERS}
+        for node, objects in payloads.items():
+            print(f"\n{node} ({len(objects)} payloads)")
+            print(f"  {'serializer':<20}{'bytes':>12}{'ser µs':>12}{'de µs':>12}")
+            for name, serde in SERIALIZERS.items():
+                result = measure(serde, objects, args.repeat)
+                for key in totals[name]:
+                    totals[name][key] += result[key]
+                print(f"  {name:<20}{result['bytes']:>12,}{result['ser_us']:>12.1f}{result['de_us']:>12.1f}")
+
+    print("\n" + "=" * 78)
+    print("TOTAL")
+    baseline = totals["default (msgpack)"]["bytes"] or 1
+    print(f"  {'serializer':<20}{'bytes':>12}{'ratio':>8}{'ser µs':>12}{'de µs':>12}")
+    for name, total in totals.items():
+        print(
+            f"  {name:<20}{total['bytes']:>12,}{total['bytes'] / baseline:>8.2f}"
+            f"{total['ser_us']:>12.1f}{total['de_us']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark API read latency under mixed read/write load.
+
+Seeds a throwaway database with workflows, then for a fixed duration runs
+writer threads (processing test_data invoices through the graph) alongside
+concurrent async readers on one event loop. Readers issue status reads (one
+thread's state) and list reads (every thread's state, like /workflow/all):
+
+- blocking: `graph.get_state` called inside the coroutine (the old handlers)
+- async:    `workflow_read_model` (read-only aiosqlite pool, decoding off the loop)
+
+A heartbeat task sleeping 1ms measures how long the event loop is stalled.
+Reports p50/p95/p99 latency per read type and for the loop lag.
+
+Usage:
+    python benchmark_read_model.py [--duration S] [--readers R] [--writers W] [--seed N] [--pool-size P]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.graph.builder import build_invoice_graph, create_initial_state, resolve_durability
+from src.storage.read_model import workflow_read_model
+
+
+ROOT = Path(__file__).parent
+TEST_DATA_DIR = ROOT / "test_data"
+
+
+def load_test_invoices() -> List[Dict[str, Any]]:
+    """Load invoice payloads referenced by test_data/test_invoices.json."""
+    with open(TEST_DATA_DIR / "test_invoices.json", "r") as f:
+        cases = json.load(f)
+    invoices = []
+    for case in cases:
+        with open(TEST_DATA_DIR / case["file"], "r") as f:
+            invoices.append(json.load(f))
+    return invoices
+
+
+def build_benchmark_graph(workdir: Path, pool_size: int):
+    """Build the graph against a temporary database."""
+    with open(ROOT / "workflow.json", "r") as f:
+        workflow = json.load(f)
+    workflow["config"]["default_db"] = f"sqlite:///{workdir / 'bench.db'}"
+    workflow["config"]["blob_store"] = {**workflow["config"].get("blob_store", {}), "path": str(workdir / "blobs")}
+    workflow["config"]["archive"] = {**workflow["config"].get("archive", {}), "path": str(workdir / "archive")}
+    workflow["config"]["read_pool"] = {**workflow["config"].get("read_pool", {}), "size": pool_size}
+    workflow["config"]["storage_shards"] = {
+        **workflow["config"].get("storage_shards", {}),
+        "path_template": str(workdir / "shards" / "bench_{shard}.db")
+    }
+
+    config_path = workdir / "workflow.json"
+    with open(config_path, "w") as f:
+        json.dump(workflow, f)
+
+    graph, checkpoint_store, _ = build_invoice_graph(str(config_path))
+    return graph, checkpoint_store, workflow["config"]
+
+
+def run_invoice(graph, checkpoint_store, config: Dict[str, Any], invoice: Dict[str, Any]) -> str:
+    """Run one invoice through the graph and return its thread ID."""
+    initial_state = create_initial_state(dict(invoice), config)
+    thread_config = {"configurable": {"thread_id": initial_state["thread_id"]}}
+    for _ in graph.stream(initial_state, thread_config, stream_mode="updates", durability=resolve_durability(config)):
+        pass
+    checkpoint_store.wait_durable(initial_state["thread_id"])
+    return initial_state["thread_id"]
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 of latencies in milliseconds."""
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return {"n": len(samples), "p50": value, "p95": value, "p99": value}
+    cuts = statistics.quantiles(samples, n=100)
+    return {"n": len(samples), "p50": cuts[49], "p95": cuts[94], "p99": cuts[98]}
+
+
+async def read_blocking(graph, thread_ids: List[str], list_read: bool):
+    """Old handler behaviour: synchronous get_state inside the coroutine."""
+    targets = thread_ids if list_read else [random.choice(thread_ids)]
+    for thread_id in targets:
+        graph.get_state({"configurable": {"thread_id": thread_id}})
+
+
+async def read_async(graph, thread_ids: List[str], list_read: bool):
+    """Async read model."""
+    if list_read:
+        await workflow_read_model.get_states(thread_ids)
+    else:
+        await workflow_read_model.get_state(random.choice(thread_ids))
+
+
+async def measure(mode: str, graph, thread_ids: List[str], args) -> Dict[str, Dict[str, float]]:
+    """Run readers and the heartbeat for `args.duration` seconds."""
+    read = read_blocking if mode == "blocking" else read_async
+    latencies = {"status": [], "list": [], "loop_lag": []}
+    deadline = time.perf_counter() + args.duration
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            list_read = random.random() < args.list_ratio
+            start = time.perf_counter()
+            await read(graph, thread_ids, list_read)
+            latencies["list" if list_read else "status"].append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0)
+
+    async def heartbeat():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            latencies["loop_lag"].append(max((time.perf_counter() - start) * 1000 - 1.0, 0.0))
+
+    await asyncio.gather(heartbeat(), *(reader() for _ in range(args.readers)))
+    return {name: percentiles(samples) for name, samples in latencies.items()}
+
+
+def main():
+    """Run read latency benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark API read latency under mixed load")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per mode")
+    parser.add_argument("--readers", type=int, default=16, help="Concurrent async readers")
+    parser.add_argument("--writers", type=int, default=2, help="Writer threads processing invoices")
+    parser.add_argument("--seed", type=int, default=200, help="Workflows created before measuring")
+    parser.add_argument("--list-ratio", type=float, default=0.05, help="Fraction of reads that list all workflows")
+    parser.add_argument("--pool-size", type=int, default=4, help="Read-only connections per shard (async mode)")
+    args = parser.parse_args()
+
+    invoices = load_test_invoices()
+    print(
+        f"⏱️  Read latency benchmark ({args.readers} readers, {args.writers} writers, "
+        f"{args.seed} seeded workflows, read pool {args.pool_size}, {args.duration:.0f}s per mode)"
+    )
+    print("=" * 78)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        graph, checkpoint_store, config = build_benchmark_graph(Path(tmp), args.pool_size)
+        thread_ids = [run_invoice(graph, checkpoint_store, config, invoices[i % len(invoices)]) for i in range(args.seed)]
+
+        for mode in ("blocking", "async"):
+            stop = threading.Event()
+            written = []
+
+            def writer():
+                index = 0
+                while not stop.is_set():
+                    written.append(run_invoice(graph, checkpoint_store, config, invoices[index % len(invoices)]))
+                    index += 1
+
+            writers = [threading.Thread(target=writer, daemon=True) for _ in range(args.writers)]
+            for thread in writers:
+                thread.start()
+            results = asyncio.run(measure(mode, graph, thread_ids, args))
+            asyncio.run(workflow_read_model.close())
+            stop.set()
+            for thread in writers:
+                thread.join()
+
+            print(f"\n{mode} ({len(written)} invoices written during the run)")
+            print(f"  {'':<10}{'n':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+            for name, result in results.items():
+                print(f"  {name:<10}{result['n']:>8}{result['p50']:>10.2f}{result['p95']:>10.2f}{result['p99']:>10.2f}")
+
+        checkpoint_store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark checkpoint write throughput with sharded SQLite storage.
+
+Starts several writer processes (like several API workers) that each store
+checkpoints for their own workflow threads, first against a single database
+and then against N shards, and reports checkpoints written per second.
+Checkpoints carry the test_data invoices as channel values so rows are of
+realistic size.
+
+Sharding can only help when writer processes run in parallel. On a single
+CPU core every run is CPU-bound and N=1 is as fast; no speedup has been
+measured on such a machine.
+
+Usage:
+    python benchmark_sharding.py [--shards N] [--workers W] [--threads T] [--steps S] [--group-commit]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.base.id import uuid6
+from src.storage.checkpoint_store import CheckpointStore
+from src.storage.sharding import shard_paths
+
+
+ROOT = Path(__file__).parent
+TEST_DATA_DIR = ROOT / "test_data"
+
+
+def load_test_invoices() -> List[Dict[str, Any]]:
+    """Load invoice payloads referenced by test_data/test_invoices.json."""
+    with open(TEST_DATA_DIR / "test_invoices.json", "r") as f:
+        cases = json.load(f)
+    invoices = []
+    for case in cases:
+        with open(TEST_DATA_DIR / case["file"], "r") as f:
+            invoices.append(json.load(f))
+    return invoices
+
+
+def writer(db_paths: List[str], group_commit: bool, threads: int, steps: int, invoices, start_event, results):
+    """Write `steps` checkpoints for each of `threads` workflow threads."""
+    store = CheckpointStore(
+        db_paths[0],
+        group_commit={"enabled": group_commit},
+        shard_paths=db_paths
+    )
+    checkpointer = store.get_checkpointer()
+    thread_ids = [str(uuid.uuid4()) for _ in range(threads)]
+    configs = {thread_id: {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}} for thread_id in thread_ids}
+
+    start_event.wait()
+    start = time.perf_counter()
+    for step in range(steps):
+        for index, thread_id in enumerate(thread_ids):
+            checkpoint = empty_checkpoint()
+            checkpoint["id"] = str(uuid6())
+            checkpoint["channel_values"] = {"invoice_payload": invoices[index % len(invoices)], "step": step}
+            configs[thread_id] = checkpointer.put(configs[thread_id], checkpoint, {"source": "loop", "step": step}, {})
+    for thread_id in thread_ids:
+        store.wait_durable(thread_id)
+    results.put(time.perf_counter() - start)
+    store.close()
+
+
+def run(db_paths: List[str], args, invoices) -> Dict[str, float]:
+    """Run all writer processes against one layout and return throughput."""
+    # Create schemas up front so workers don't race on setup
+    CheckpointStore(db_paths[0], shard_paths=db_paths).list_thread_ids()
+
+    start_event = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=writer,
+            args=(db_paths, args.group_commit, args.threads, args.steps, invoices, start_event, results)
+        )
+        for _ in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    time.sleep(0.5)
+    wall_start = time.perf_counter()
+    start_event.set()
+    elapsed = [results.get() for _ in processes]
+    wall = time.perf_counter() - wall_start
+    for process in processes:
+        process.join()
+
+    total = args.workers * args.threads * args.steps
+    return {"checkpoints": total, "wall_s": wall, "per_s": total / wall, "slowest_worker_s": max(elapsed)}
+
+
+def main():
+    """Run sharding benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark sharded checkpoint writes")
+    parser.add_argument("--shards", type=int, default=4, help="Shard count to compare against 1")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent writer processes")
+    parser.add_argument("--threads", type=int, default=20, help="Workflow threads per worker")
+    parser.add_argument("--steps", type=int, default=10, help="Checkpoints per thread")
+    parser.add_argument("--group-commit", action="store_true", help="Batch writes with group commit")
+    args = parser.parse_args()
+
+    invoices = load_test_invoices()
+    print(
+        f"🗄️  Sharding benchmark ({args.workers} workers x {args.threads} threads x {args.steps} steps, "
+        f"group_commit={args.group_commit})"
+    )
+    print("=" * 70)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in sorted({1, args.shards}):
+            primary = str(Path(tmp) / f"n{count}" / "demo.db")
+            template = str(Path(tmp) / f"n{count}" / "demo_{shard}.db")
+            db_paths = shard_paths({"count": count, "path_template": template}, primary)
+            results[count] = run(db_paths, args, invoices)
+            result = results[count]
+            print(
+                f"  N={count:<3} {result['checkpoints']:>7,} checkpoints in {result['wall_s']:.2f}s"
+                f"  -> {result['per_s']:>9,.0f} checkpoints/s"
+            )
+
+    if args.shards != 1:
+        print("=" * 70)
+        print(f"  Speedup N={args.shards} vs N=1: {results[args.shards]['per_s'] / results[1]['per_s']:.2f}x")
+        if (os.cpu_count() or 1) < 2:
+            print("  ⚠️  Single CPU core: writers cannot run in parallel, so this does not measure sharding")
+
+
+if __name__ == "__main__":
+    main()
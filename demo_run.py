@@ -3,7 +3,7 @@
 import asyncio
 import json
 from datetime import datetime, timedelta
-from src.graph.builder import build_invoice_graph, create_initial_state
+from src.graph.builder import build_invoice_graph, create_initial_state, resolve_durability
 from src.config.workflow_loader import WorkflowConfigLoader
 
 
@@ -85,7 +85,7 @@ async def run_workflow_demo(invoice_payload, description):
     print("Executing workflow stages...\n")
     
     try:
-        for state_update in graph.stream(initial_state, config_dict, stream_mode="updates"):
+        for state_update in graph.stream(initial_state, config_dict, stream_mode="updates", durability=resolve_durability(config)):
             for stage_name, stage_output in state_update.items():
                 print(f"✓ {stage_name}")
                 if isinstance(stage_output, dict):
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Switch the SQLite databases to incremental auto-vacuum.
+
+The background checkpoint compactor only releases free pages from databases
+in `auto_vacuum = INCREMENTAL` mode. Switching a database needs one full
+VACUUM, which rewrites the file and holds an exclusive lock on it, so it is
+a maintenance step: stop the backend, run this once, then start it again.
+Databases already incremental are skipped, so the script can be re-run.
+
+Usage:
+    python enable_incremental_vacuum.py [--dry-run]
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.storage.compactor import AUTO_VACUUM_INCREMENTAL, enable_incremental_vacuum
+from src.storage.sharding import shard_paths
+
+
+ROOT = Path(__file__).parent
+
+
+def load_config() -> Dict:
+    """Load the workflow config section."""
+    with open(ROOT / "workflow.json", "r") as f:
+        return json.load(f)["config"]
+
+
+def main():
+    """Convert the primary database and every shard."""
+    parser = argparse.ArgumentParser(description="Switch SQLite databases to incremental auto-vacuum")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which databases would be converted")
+    args = parser.parse_args()
+
+    config = load_config()
+    primary = config.get("default_db", "sqlite:///./demo.db").replace("sqlite:///", "")
+    db_paths = list(dict.fromkeys([primary, *shard_paths(config.get("storage_shards"), primary)]))
+
+    print(f"🧹 Enabling incremental auto-vacuum on {len(db_paths)} database(s)")
+    print("=" * 70)
+
+    converted = 0
+    for db_path in db_paths:
+        if not Path(db_path).exists():
+            continue
+        if args.dry_run:
+            conn = sqlite3.connect(db_path)
+            mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            conn.close()
+            pending = mode != AUTO_VACUUM_INCREMENTAL
+            converted += pending
+            print(f"  {db_path}: {'would convert' if pending else 'already incremental'}")
+            continue
+        size_before = Path(db_path).stat().st_size
+        if enable_incremental_vacuum(db_path):
+            converted += 1
+            print(f"  {db_path}: converted ({size_before:,} -> {Path(db_path).stat().st_size:,} bytes)")
+        else:
+            print(f"  {db_path}: already incremental")
+
+    verb = "would be converted" if args.dry_run else "converted"
+    print("=" * 70)
+    print(f"✅ {converted} database(s) {verb}")
+
+
+if __name__ == "__main__":
+    main()
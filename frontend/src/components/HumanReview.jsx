@@ -13,6 +13,8 @@ function HumanReview() {
   const [notes, setNotes] = useState('')
   const [submitting, setSubmitting] = useState(false)
   const [reviewerId, setReviewerId] = useState('')
+  const [selectedIds, setSelectedIds] = useState([])
+  const [bulkResults, setBulkResults] = useState(null)
   
   // Generate reviewer ID automatically when review is selected
   const generateReviewerId = () => {
@@ -27,6 +29,22 @@ function HumanReview() {
     return () => clearInterval(interval)
   }, [])
 
+  // Keep the lease on the open review alive; other reviewers cannot claim it meanwhile
+  useEffect(() => {
+    if (!selectedReview) return
+    const interval = setInterval(async () => {
+      try {
+        await axios.post(`${API_BASE}/human-review/${selectedReview.checkpoint_id}/heartbeat`, {
+          reviewer_id: reviewerId
+        })
+      } catch (err) {
+        alert(err.response?.data?.detail || err.message)
+        closeReview()
+      }
+    }, 60000)
+    return () => clearInterval(interval)
+  }, [selectedReview, reviewerId])
+
   const loadPendingReviews = async () => {
     try {
       const response = await axios.get(`${API_BASE}/human-review/pending`)
@@ -39,6 +57,37 @@ function HumanReview() {
     }
   }
 
+  const openReview = async (checkpointId = null) => {
+    const claimingReviewerId = reviewerId || generateReviewerId()
+    try {
+      // Lease the review (or the next one by priority) so nobody else works on it
+      const response = await axios.post(`${API_BASE}/human-review/claim`, {
+        reviewer_id: claimingReviewerId,
+        checkpoint_id: checkpointId
+      })
+      if (!response.data.item) {
+        alert('No reviews available right now')
+        return
+      }
+      setReviewerId(claimingReviewerId)
+      setSelectedReview(response.data.item)
+    } catch (err) {
+      alert(err.response?.data?.detail || err.message)
+      loadPendingReviews()
+    }
+  }
+
+  const closeReview = async (release = true) => {
+    if (release && selectedReview) {
+      await axios.post(`${API_BASE}/human-review/${selectedReview.checkpoint_id}/release`, {
+        reviewer_id: reviewerId
+      }).catch(() => {})
+    }
+    setSelectedReview(null)
+    setDecision('')
+    setNotes('')
+  }
+
   const handleDecision = async (checkpointId) => {
     if (!decision) {
       alert('Please select a decision (Accept or Reject)')
@@ -47,9 +96,7 @@ function HumanReview() {
 
     setSubmitting(true)
     try {
-      // Auto-generate reviewer ID
-      const reviewerId = generateReviewerId()
-      
+      // Decide as the reviewer holding the lease
       const response = await axios.post(`${API_BASE}/human-review/decision`, {
         checkpoint_id: checkpointId,
         decision: decision.toUpperCase(),
@@ -69,10 +116,7 @@ function HumanReview() {
         alert(`Decision submitted successfully! Reviewer ID: ${reviewerId}`)
       }
       
-      setSelectedReview(null)
-      setDecision('')
-      setNotes('')
-      setReviewerId('')
+      closeReview(false)
       loadPendingReviews()
     } catch (err) {
       alert(err.response?.data?.detail || err.message)
@@ -81,6 +125,70 @@ function HumanReview() {
     }
   }
 
+  const toggleSelected = (checkpointId) => {
+    setSelectedIds((ids) =>
+      ids.includes(checkpointId) ? ids.filter((id) => id !== checkpointId) : [...ids, checkpointId]
+    )
+  }
+
+  const toggleAll = () => {
+    setSelectedIds((ids) => (ids.length === reviews.length ? [] : reviews.map((review) => review.checkpoint_id)))
+  }
+
+  const handleBulkDecision = async (bulkDecision) => {
+    if (selectedIds.length === 0) {
+      return
+    }
+
+    setSubmitting(true)
+    const results = { QUEUED: 0, DONE: 0, REJECTED: 0, FAILED: 0, errors: [] }
+    setBulkResults({ ...results })
+    try {
+      // One request for all selected reviews; results stream back as NDJSON lines
+      const response = await fetch(`${API_BASE}/human-review/decisions/bulk`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          decisions: selectedIds.map((checkpointId) => ({
+            checkpoint_id: checkpointId,
+            decision: bulkDecision
+          })),
+          reviewer_id: reviewerId || generateReviewerId()
+        })
+      })
+      if (!response.ok) {
+        throw new Error(`Bulk decision failed: ${response.status}`)
+      }
+
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+      while (true) {
+        const { done, value } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+        const lines = buffer.split('\n')
+        buffer = lines.pop()
+        for (const line of lines.filter(Boolean)) {
+          const item = JSON.parse(line)
+          if (item.summary) continue
+          results[item.status] = (results[item.status] || 0) + 1
+          if (item.error) results.errors.push(`${item.checkpoint_id.substring(0, 8)}: ${item.error}`)
+          setBulkResults({ ...results })
+        }
+      }
+      setSelectedIds([])
+      loadPendingReviews()
+    } catch (err) {
+      alert(err.message)
+    } finally {
+      setSubmitting(false)
+    }
+  }
+
+  const isLeasedToOther = (review) =>
+    review.claimed_by && review.claimed_by !== reviewerId && review.lease_expires_at * 1000 > Date.now()
+
   const formatCurrency = (amount) => {
     return new Intl.NumberFormat('en-US', {
       style: 'currency',
@@ -103,17 +211,63 @@ function HumanReview() {
         
         {error && <div className="error">{error}</div>}
         
+        {reviews.length > 0 && (
+          <div className="review-actions" style={{ marginBottom: '15px' }}>
+            <button
+              className="button button-primary"
+              onClick={() => openReview()}
+              disabled={submitting || selectedReview !== null}
+            >
+              Claim Next
+            </button>
+            <button
+              className="button button-success"
+              onClick={() => handleBulkDecision('ACCEPT')}
+              disabled={submitting || selectedIds.length === 0}
+            >
+              Accept Selected ({selectedIds.length})
+            </button>
+            <button
+              className="button"
+              onClick={() => handleBulkDecision('REJECT')}
+              disabled={submitting || selectedIds.length === 0}
+            >
+              Reject Selected ({selectedIds.length})
+            </button>
+          </div>
+        )}
+        
+        {bulkResults && (
+          <div style={{ fontSize: '14px', marginBottom: '15px' }}>
+            Bulk decision: {bulkResults.QUEUED} queued, {bulkResults.DONE} resumed,{' '}
+            {bulkResults.REJECTED + bulkResults.FAILED} failed
+            {bulkResults.errors.length > 0 && (
+              <ul style={{ fontSize: '12px' }}>
+                {bulkResults.errors.map((message) => <li key={message}>{message}</li>)}
+              </ul>
+            )}
+          </div>
+        )}
+        
         {reviews.length === 0 ? (
           <p>No pending reviews at this time.</p>
         ) : (
           <table className="table">
             <thead>
               <tr>
+                <th>
+                  <input
+                    type="checkbox"
+                    checked={selectedIds.length === reviews.length}
+                    onChange={toggleAll}
+                  />
+                </th>
                 <th>Invoice ID</th>
                 <th>Vendor</th>
                 <th>Amount</th>
                 <th>Failed Stage</th>
                 <th>Mismatch Reason</th>
+                <th>Due Date</th>
                 <th>Created At</th>
                 <th>Actions</th>
               </tr>
@@ -121,6 +275,13 @@ function HumanReview() {
             <tbody>
               {reviews.map((review) => (
                 <tr key={review.checkpoint_id}>
+                  <td>
+                    <input
+                      type="checkbox"
+                      checked={selectedIds.includes(review.checkpoint_id)}
+                      onChange={() => toggleSelected(review.checkpoint_id)}
+                    />
+                  </td>
                   <td>{review.invoice_id}</td>
                   <td>{review.vendor_name}</td>
                   <td>{formatCurrency(review.amount)}</td>
@@ -132,17 +293,29 @@ function HumanReview() {
                       {review.mismatch_reason || review.reason_for_hold || 'N/A'}
                     </div>
                   </td>
+                  <td>
+                    {review.due_date || 'N/A'}
+                    {review.escalation_level > 0 && (
+                      <div>
+                        <span className="badge badge-danger">
+                          Escalated{review.escalated_to ? ` to ${review.escalated_to}` : ''} (x{review.escalation_level})
+                        </span>
+                      </div>
+                    )}
+                  </td>
                   <td>{formatDate(review.created_at)}</td>
                   <td>
-                    <button
-                      className="button button-primary"
-                      onClick={() => {
-                        setSelectedReview(review)
-                        setReviewerId(generateReviewerId()) // Generate ID when review is selected
-                      }}
-                    >
-                      Review
-                    </button>
+                    {isLeasedToOther(review) ? (
+                      <span className="badge">Claimed by {review.claimed_by}</span>
+                    ) : (
+                      <button
+                        className="button button-primary"
+                        onClick={() => openReview(review.checkpoint_id)}
+                        disabled={selectedReview !== null}
+                      >
+                        Review
+                      </button>
+                    )}
                   </td>
                 </tr>
               ))}
@@ -227,12 +400,7 @@ function HumanReview() {
               </button>
               <button
                 className="button"
-                onClick={() => {
-                  setSelectedReview(null)
-                  setDecision('')
-                  setNotes('')
-                  setReviewerId('')
-                }}
+                onClick={() => closeReview()}
               >
                 Cancel
               </button>
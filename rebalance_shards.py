@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Rebalance per-thread storage across SQLite shards.
+
+Moves every thread's rows in the thread-keyed tables (checkpoints, writes,
+human_review_queue, checkpoint_compaction, resume_jobs, speculative_outputs,
+hitl_timers, workflow_index, invoice_search_docs; see THREAD_TABLES) from the
+current shard layout in workflow.json to the layout for a new shard count. Rows already on their
+target shard are left alone; each source -> target move runs in one
+transaction, so an interrupted run can simply be re-run. The invoice
+search (FTS5) index of every target shard is rebuilt after the moves.
+
+Stop the backend first: a running API holds queued group-commit writes and
+routes by the old shard count.
+
+Usage:
+    python rebalance_shards.py --shards N [--update-config] [--dry-run]
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.storage.invoice_search import InvoiceSearchIndex
+from src.storage.sharding import ShardRouter, shard_paths
+
+
+ROOT = Path(__file__).parent
+
+# Tables whose rows belong to exactly one thread
+THREAD_TABLES = ("checkpoints", "writes", "human_review_queue", "checkpoint_compaction", "resume_jobs",
+                 "speculative_outputs", "hitl_timers", "workflow_index", "invoice_search_docs")
+
+
+def load_config() -> Dict:
+    """Load the workflow config section."""
+    with open(ROOT / "workflow.json", "r") as f:
+        return json.load(f)["config"]
+
+
+def existing_tables(conn: sqlite3.Connection, schema: str = "main") -> List[str]:
+    """Thread-keyed tables present in a database."""
+    cursor = conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table'")
+    names = {row[0] for row in cursor.fetchall()}
+    return [table for table in THREAD_TABLES if table in names]
+
+
+def copy_schema(conn: sqlite3.Connection, table: str):
+    """Create a table (and its indexes) in the attached target if missing."""
+    cursor = conn.execute("""
+        SELECT type, name, sql FROM main.sqlite_master
+        WHERE tbl_name = ? AND sql IS NOT NULL
+        ORDER BY type DESC
+    """, (table,))
+    for object_type, name, sql in cursor.fetchall():
+        exists = conn.execute(
+            "SELECT 1 FROM target.sqlite_master WHERE type = ? AND name = ?", (object_type, name)
+        ).fetchone()
+        if not exists:
+            # Qualify the object name so it is created in the target database
+            conn.execute(re.sub(
+                rf"^(CREATE (?:UNIQUE )?{object_type.upper()} (?:IF NOT EXISTS )?)",
+                r"\1target.",
+                sql,
+                count=1,
+                flags=re.IGNORECASE
+            ))
+
+
+def plan_moves(source_path: str, router: ShardRouter) -> Dict[str, List[str]]:
+    """Group a source shard's threads by target shard path (threads already in place are skipped)."""
+    conn = sqlite3.connect(source_path)
+    thread_ids = set()
+    for table in existing_tables(conn):
+        cursor = conn.execute(f"SELECT DISTINCT thread_id FROM {table} WHERE thread_id IS NOT NULL")
+        thread_ids.update(row[0] for row in cursor.fetchall())
+    conn.close()
+
+    moves: Dict[str, List[str]] = {}
+    for thread_id in thread_ids:
+        target_path = router.path_for(thread_id)
+        if Path(target_path).resolve() != Path(source_path).resolve():
+            moves.setdefault(target_path, []).append(thread_id)
+    return moves
+
+
+def move_threads(source_path: str, target_path: str, thread_ids: List[str]) -> Dict[str, int]:
+    """Move the rows of some threads from one shard to another in a single transaction."""
+    Path(target_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(source_path, timeout=30)
+    conn.execute("ATTACH DATABASE ? AS target", (target_path,))
+    conn.execute("CREATE TEMP TABLE move_ids (thread_id TEXT PRIMARY KEY)")
+    conn.executemany("INSERT INTO move_ids VALUES (?)", [(thread_id,) for thread_id in thread_ids])
+
+    moved = {}
+    try:
+        for table in existing_tables(conn):
+            copy_schema(conn, table)
+            columns = ", ".join(f'"{row[1]}"' for row in conn.execute(f"PRAGMA main.table_info({table})"))
+            conn.execute(f"""
+                INSERT OR REPLACE INTO target.{table} ({columns})
+                SELECT {columns} FROM main.{table}
+                WHERE thread_id IN (SELECT thread_id FROM move_ids)
+            """)
+            moved[table] = conn.execute(f"""
+                DELETE FROM main.{table}
+                WHERE thread_id IN (SELECT thread_id FROM move_ids)
+            """).rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return moved
+
+
+def update_config(count: int):
+    """Set storage_shards.count in workflow.json, keeping the file's formatting."""
+    config_path = ROOT / "workflow.json"
+    text = config_path.read_text()
+    updated, replaced = re.subn(r'("storage_shards"\s*:\s*\{[^}]*"count"\s*:\s*)\d+', rf"\g<1>{count}", text)
+    if not replaced:
+        raise SystemExit("workflow.json has no storage_shards.count to update")
+    config_path.write_text(updated)
+
+
+def main():
+    """Rebalance shards."""
+    parser = argparse.ArgumentParser(description="Rebalance thread storage across SQLite shards")
+    parser.add_argument("--shards", type=int, required=True, help="New shard count")
+    parser.add_argument("--update-config", action="store_true", help="Write the new count to workflow.json")
+    parser.add_argument("--dry-run", action="store_true", help="Only report how many threads would move")
+    args = parser.parse_args()
+
+    config = load_config()
+    primary = config.get("default_db", "sqlite:///./demo.db").replace("sqlite:///", "")
+    settings = config.get("storage_shards", {})
+    current_paths = shard_paths(settings, primary)
+    target_paths = shard_paths({**settings, "count": args.shards}, primary)
+    router = ShardRouter(target_paths)
+
+    print(f"🔀 Rebalancing {len(current_paths)} -> {len(target_paths)} shard(s)")
+    print("=" * 70)
+
+    total_threads = 0
+    for source_path in current_paths:
+        if not Path(source_path).exists():
+            continue
+        for target_path, thread_ids in plan_moves(source_path, router).items():
+            total_threads += len(thread_ids)
+            if args.dry_run:
+                print(f"  {source_path} -> {target_path}: {len(thread_ids)} thread(s)")
+                continue
+            moved = move_threads(source_path, target_path, thread_ids)
+            rows = ", ".join(f"{table}={count}" for table, count in moved.items())
+            print(f"  {source_path} -> {target_path}: {len(thread_ids)} thread(s) ({rows})")
+
+    if total_threads and not args.dry_run:
+        # Moved search documents get new rowids on their target shard: rebuild the FTS indexes
+        search_index = InvoiceSearchIndex()
+        search_index.configure(target_paths)
+        search_index.rebuild()
+        print(f"  invoice_search rebuilt on {len(target_paths)} shard(s)")
+
+    verb = "would move" if args.dry_run else "moved"
+    print("=" * 70)
+    print(f"✅ {total_threads} thread(s) {verb}")
+
+    if args.update_config and not args.dry_run:
+        update_config(args.shards)
+        print(f"✅ workflow.json storage_shards.count = {args.shards}")
+
+
+if __name__ == "__main__":
+    main()
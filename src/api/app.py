@@ -1,8 +1,12 @@
 """FastAPI application for invoice processing workflow."""
 
+import asyncio
+import time
 import uuid
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 from fastapi import FastAPI, HTTPException, BackgroundTasks, File, UploadFile, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional
@@ -10,10 +14,19 @@ import json
 import os
 import shutil
 from pathlib import Path
-from src.graph.builder import build_invoice_graph, create_initial_state
+from src.graph.builder import build_invoice_graph, create_initial_state, delete_workflow_data, resolve_durability
 from src.config.workflow_loader import WorkflowConfigLoader
 from src.storage.human_review_repo import HumanReviewRepository
-from src.logging.logger import log_resume_event
+from src.storage.blob_store import resolve_invoice_text
+from src.storage.compactor import checkpoint_compactor
+from src.storage.archiver import workflow_archiver
+from src.storage.read_model import workflow_read_model
+from src.graph.resume_worker import resume_worker_pool, resume_workflow
+from src.graph.speculation import speculative_precompute
+from src.graph.sla_scheduler import hitl_sla_scheduler
+from src.storage.workflow_metrics import workflow_metrics
+from src.storage.invoice_search import invoice_search_index
+from src.storage.decision_memo import hitl_decision_memo
 
 app = FastAPI(title="Langie - Invoice Processing Agent", version="1.0.0")
 
@@ -45,6 +58,31 @@ async def startup():
     
     # Initialize human review repo
     human_review_repo._init_db()
+    
+    # Start background checkpoint compaction
+    checkpoint_compactor.start()
+    
+    # Start background resume workers for human decisions
+    resume_worker_pool.start()
+    
+    # Rebuild the review SLA timer heap and start firing escalations
+    hitl_sla_scheduler.start()
+    
+    # Start dashboard counter reconciliation
+    workflow_metrics.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background jobs and flush pending checkpoint writes on shutdown."""
+    checkpoint_compactor.stop()
+    resume_worker_pool.stop()
+    speculative_precompute.stop()
+    hitl_sla_scheduler.stop()
+    workflow_metrics.stop()
+    await workflow_read_model.close()
+    if checkpoint_store:
+        checkpoint_store.close()
 
 
 # Pydantic models for API requests/responses
@@ -82,6 +120,13 @@ class HumanReviewItem(BaseModel):
     mismatch_reason: Optional[str] = None
     failed_stage: Optional[str] = None
     review_url: str
+    due_date: Optional[str] = None
+    risk_score: Optional[float] = None
+    claimed_by: Optional[str] = None  # Reviewer holding the lease (if any)
+    lease_expires_at: Optional[float] = None  # Epoch seconds
+    escalation_level: Optional[int] = None  # SLA / due-date escalations so far
+    escalated_at: Optional[str] = None
+    escalated_to: Optional[str] = None
 
 
 class PendingReviewsResponse(BaseModel):
@@ -97,11 +142,68 @@ class HumanDecisionRequest(BaseModel):
     reviewer_id: Optional[str] = None  # Optional - will be auto-generated if not provided
 
 
+class ReviewClaimRequest(BaseModel):
+    """Review claim request."""
+    reviewer_id: str
+    checkpoint_id: Optional[str] = None  # Claim this review instead of the next by priority
+
+
+class ReviewClaimResponse(BaseModel):
+    """Review claim response."""
+    item: Optional[HumanReviewItem] = None  # None when no review is available
+    lease_expires_at: Optional[float] = None
+
+
+class ReviewLeaseRequest(BaseModel):
+    """Review lease heartbeat/release request."""
+    reviewer_id: str
+
+
+class BulkHumanDecisionRequest(BaseModel):
+    """Bulk human decision request."""
+    decisions: list[HumanDecisionRequest]
+    reviewer_id: Optional[str] = None  # Default for items without their own reviewer_id
+    wait: bool = False  # Stream each item again once its background resume finishes
+    wait_timeout_s: float = 300.0  # With wait, stop waiting for resumes after this long
+
+
 class HumanDecisionResponse(BaseModel):
     """Human decision response."""
     resume_token: str
     next_stage: str
     message: str
+    resume_status: str = "DONE"  # QUEUED when resumed by the background workers
+    resume_latency_ms: Optional[float] = None  # update_state + stream until durable (inline resume only)
+
+
+def _run_graph(initial_state: Dict[str, Any], config: Dict[str, Any], durability: str):
+    """
+    Run a new workflow until it completes or pauses for review (blocking).
+    
+    Args:
+        initial_state: Initial workflow state
+        config: Graph config with the thread_id
+        durability: LangGraph durability mode
+        
+    Returns:
+        Final state snapshot
+    """
+    # Stream to the end of the run; a pause for review routes HITL_DECISION to END
+    for _ in graph.stream(initial_state, config, stream_mode="updates", durability=durability):
+        pass
+    
+    # Don't acknowledge the pause/completion before its checkpoint is on disk
+    checkpoint_store.wait_durable(config["configurable"]["thread_id"])
+    
+    final_state_snapshot = graph.get_state(config)
+    if final_state_snapshot and final_state_snapshot.values.get("paused"):
+        # Reference the LangGraph checkpoint holding the paused state
+        final_values = final_state_snapshot.values
+        checkpoint_id = final_values.get("checkpoint", {}).get("cp_id") or final_values.get("hitl_checkpoint_id")
+        graph_checkpoint_id = final_state_snapshot.config.get("configurable", {}).get("checkpoint_id")
+        if checkpoint_id and graph_checkpoint_id:
+            human_review_repo.set_graph_checkpoint_id(checkpoint_id, graph_checkpoint_id)
+    return final_state_snapshot
 
 
 @app.post("/workflow/run", response_model=WorkflowRunResponse)
@@ -182,35 +284,13 @@ async def run_workflow(
         
         # Run workflow
         config = {"configurable": {"thread_id": thread_id}}
+        durability = resolve_durability(workflow_config)
         
         # Execute graph using stream to handle pauses properly
         try:
-            # Stream execution and collect state updates
-            last_update = None
-            for state_update in graph.stream(initial_state, config, stream_mode="updates"):
-                last_update = state_update
-                # Check if checkpoint created (workflow paused)
-                if "checkpoint" in state_update:
-                    checkpoint_output = state_update["checkpoint"]
-                    if checkpoint_output.get("paused_reason"):
-                        checkpoint_id = checkpoint_output.get("cp_id") or final_state_dict.get("hitl_checkpoint_id") if 'final_state_dict' in locals() else None
-                        if not checkpoint_id:
-                            # Get from state
-                            state_snapshot = graph.get_state(config)
-                            if state_snapshot:
-                                checkpoint_id = state_snapshot.values.get("hitl_checkpoint_id")
-                        review_url = checkpoint_output.get("review_url")
-                        
-                        return WorkflowRunResponse(
-                            thread_id=thread_id,
-                            status="PAUSED",
-                            checkpoint_id=checkpoint_id,
-                            review_url=review_url,
-                            message="Workflow paused for human review"
-                        )
-            
-            # Get final state after streaming
-            final_state_snapshot = graph.get_state(config)
+            # The run blocks on nodes and SQLite, so it goes to the threadpool: concurrent runs
+            # overlap and their checkpoint writes can share group commits
+            final_state_snapshot = await run_in_threadpool(_run_graph, initial_state, config, durability)
             if final_state_snapshot:
                 final_values = final_state_snapshot.values
                 
@@ -267,8 +347,13 @@ async def get_pending_reviews():
         List of pending review items
     """
     try:
-        # Get all entries from repo that have no decision in DB
-        all_candidates = human_review_repo.get_pending_reviews()
+        # Get all entries that have no decision in DB
+        all_candidates = await workflow_read_model.list_reviews(pending_only=True)
+        
+        # Load their workflow states in one batch
+        states = await workflow_read_model.get_states(
+            [item["thread_id"] for item in all_candidates if item.get("thread_id")]
+        )
         
         # Filter to only include entries that are actually paused (not completed)
         truly_pending = []
@@ -280,13 +365,11 @@ async def get_pending_reviews():
                 
             try:
                 # Check workflow state to see if it's actually paused
-                config = {"configurable": {"thread_id": thread_id}}
-                state_snapshot = graph.get_state(config)
-                if not state_snapshot:
+                state_values = states.get(thread_id)
+                if not state_values:
                     # No state found, skip it
                     continue
                     
-                state_values = state_snapshot.values
                 workflow_status = state_values.get("workflow_status", "UNKNOWN")
                 is_paused = state_values.get("paused", False)
                 
@@ -322,6 +405,127 @@ async def get_pending_reviews():
         raise HTTPException(status_code=500, detail=f"{str(e)}\n{traceback.format_exc()}")
 
 
+@app.get("/human-review/auto-resolutions")
+async def get_auto_resolutions(limit: int = 100):
+    """
+    Get the audit trail of holds resolved from the decision memo.
+    
+    Args:
+        limit: Maximum number of records (newest first)
+        
+    Returns:
+        Auto-resolution settings and audit records (signature and the accept/reject
+        counts the resolution was based on)
+    """
+    try:
+        items = await run_in_threadpool(hitl_decision_memo.list_auto_resolutions, limit)
+        return {
+            "enabled": hitl_decision_memo.enabled,
+            "min_count": hitl_decision_memo.min_count,
+            "min_confidence": hitl_decision_memo.min_confidence,
+            "items": items
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/human-review/timers")
+async def get_review_timers():
+    """
+    Get review SLA scheduler state.
+    
+    Returns:
+        Heap size and next fire time in this process, timer counts by status
+        and escalation metrics
+    """
+    try:
+        return await run_in_threadpool(hitl_sla_scheduler.status)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _review_lease_s() -> float:
+    """Review lease duration from config."""
+    return float((workflow_config.get("review_lease") or {}).get("lease_s", 300))
+
+
+def _leased_to_other(review: Dict[str, Any], reviewer_id: Optional[str]) -> bool:
+    """Whether a review is held by a live lease of a different reviewer."""
+    return (
+        bool(review.get("claimed_by"))
+        and review.get("claimed_by") != reviewer_id
+        and (review.get("lease_expires_at") or 0) > time.time()
+    )
+
+
+@app.post("/human-review/claim", response_model=ReviewClaimResponse)
+async def claim_review(claim_request: ReviewClaimRequest):
+    """
+    Lease a pending review to a reviewer.
+    
+    Without a checkpoint_id the highest-priority unleased review is claimed
+    (earliest due date, then largest amount, then highest risk). The lease lasts
+    `review_lease.lease_s` seconds and is renewed with heartbeats; while it is
+    live, no other reviewer can claim or decide the review.
+    
+    Args:
+        claim_request: Reviewer and optional checkpoint to claim
+        
+    Returns:
+        Claimed review (None if nothing is available) and lease expiry
+    """
+    lease_s = _review_lease_s()
+    if claim_request.checkpoint_id:
+        review = await run_in_threadpool(
+            human_review_repo.claim, claim_request.checkpoint_id, claim_request.reviewer_id, lease_s
+        )
+        if not review:
+            raise HTTPException(status_code=409, detail="Checkpoint already processed or claimed by another reviewer")
+    else:
+        review = await run_in_threadpool(human_review_repo.claim_next, claim_request.reviewer_id, lease_s)
+        if not review:
+            return ReviewClaimResponse()
+    
+    fields = {name: review.get(name) for name in HumanReviewItem.model_fields}
+    return ReviewClaimResponse(item=HumanReviewItem(**fields), lease_expires_at=review["lease_expires_at"])
+
+
+@app.post("/human-review/{checkpoint_id}/heartbeat")
+async def heartbeat_review(checkpoint_id: str, lease_request: ReviewLeaseRequest):
+    """
+    Extend a review lease.
+    
+    Args:
+        checkpoint_id: Review checkpoint ID
+        lease_request: Reviewer holding the lease
+        
+    Returns:
+        New lease expiry
+    """
+    lease_expires_at = await run_in_threadpool(
+        human_review_repo.heartbeat, checkpoint_id, lease_request.reviewer_id, _review_lease_s()
+    )
+    if lease_expires_at is None:
+        raise HTTPException(status_code=409, detail="Lease lost: review decided or claimed by another reviewer")
+    return {"checkpoint_id": checkpoint_id, "lease_expires_at": lease_expires_at}
+
+
+@app.post("/human-review/{checkpoint_id}/release")
+async def release_review(checkpoint_id: str, lease_request: ReviewLeaseRequest):
+    """
+    Give a claimed review back to the queue.
+    
+    Args:
+        checkpoint_id: Review checkpoint ID
+        lease_request: Reviewer holding the lease
+        
+    Returns:
+        Whether the reviewer held the review
+    """
+    released = await run_in_threadpool(human_review_repo.release, checkpoint_id, lease_request.reviewer_id)
+    return {"checkpoint_id": checkpoint_id, "released": released}
+
+
 @app.post("/human-review/decision", response_model=HumanDecisionResponse)
 async def submit_human_decision(
     decision_request: HumanDecisionRequest,
@@ -330,6 +534,11 @@ async def submit_human_decision(
     """
     Submit human decision and resume workflow.
     
+    With `resume_workers` enabled the decision is recorded and queued, and the
+    response returns immediately; a background worker runs the rest of the
+    workflow (progress on `/workflow/status/{thread_id}`). Otherwise the
+    workflow is resumed before responding.
+    
     Args:
         decision_request: Human decision request
         background_tasks: Background tasks
@@ -339,9 +548,12 @@ async def submit_human_decision(
     """
     try:
         checkpoint_id = decision_request.checkpoint_id
+        decision = decision_request.decision.upper()
+        if decision not in ("ACCEPT", "REJECT"):
+            raise HTTPException(status_code=400, detail=f"Invalid decision: {decision_request.decision}")
         
         # Get checkpoint
-        checkpoint = human_review_repo.get_checkpoint(checkpoint_id)
+        checkpoint = await workflow_read_model.get_review(checkpoint_id)
         if not checkpoint:
             raise HTTPException(status_code=404, detail="Checkpoint not found")
         
@@ -352,77 +564,58 @@ async def submit_human_decision(
         if not thread_id:
             raise HTTPException(status_code=400, detail="No thread_id in checkpoint")
         
+        if _leased_to_other(checkpoint, decision_request.reviewer_id):
+            raise HTTPException(status_code=409, detail=f"Checkpoint claimed by {checkpoint['claimed_by']}")
+        
         # Auto-generate reviewer_id if not provided
         reviewer_id = decision_request.reviewer_id or f"reviewer_{uuid.uuid4().hex[:8]}"
         
-        # Update decision in repository
-        human_review_repo.update_decision(
-            checkpoint_id,
-            decision_request.decision.upper(),
-            reviewer_id,
-            decision_request.notes
-        )
-        
         # Determine next stage
-        if decision_request.decision.upper() == "ACCEPT":
+        if decision == "ACCEPT":
             next_stage = "RECONCILE"
         else:
             next_stage = "COMPLETE"
         
-        # Get current state from checkpoint
-        config = {"configurable": {"thread_id": thread_id}}
-        current_state_snapshot = graph.get_state(config)
-        if not current_state_snapshot:
-            raise HTTPException(status_code=404, detail="Workflow state not found")
-        
-        # Store human decision in runtime context for HITL_DECISION node
-        from src.graph.node_wrapper import runtime_context
-        runtime_context.set_human_decision(thread_id, {
-            "decision": decision_request.decision.upper(),
+        job = {
+            "checkpoint_id": checkpoint_id,
+            "thread_id": thread_id,
+            "decision": decision,
             "reviewer_id": reviewer_id,
+            "next_stage": next_stage,
             "notes": decision_request.notes
-        })
-        
-        # Get current state values
-        current_state = current_state_snapshot.values
-        
-        # Update state with human decision (for HITL_DECISION node)
-        # Merge with current state to preserve all data
-        state_update = {
-            **current_state,  # Preserve existing state
-            "hitl": {
-                "human_decision": decision_request.decision.upper(),
-                "reviewer_id": reviewer_id,  # Use auto-generated or provided reviewer_id
-                "resume_token": f"{thread_id}:{checkpoint_id}",
-                "next_stage": next_stage
-            },
-            "paused": False,
-            "workflow_status": "IN_PROGRESS"
         }
+        resume_token = f"{thread_id}:{checkpoint_id}"
         
-        # Update the state first
-        graph.update_state(config, state_update)
-        
-        # Continue execution - stream from current checkpoint
-        # The graph will process HITL_DECISION and continue based on the decision
-        final_values = None
-        for state_update_stream in graph.stream(None, config, stream_mode="updates"):
-            final_values = state_update_stream
-        
-        # If ACCEPT, continue to complete the workflow
-        if decision_request.decision.upper() == "ACCEPT":
-            # Continue streaming to complete remaining stages
-            for state_update_stream in graph.stream(None, config, stream_mode="updates"):
-                final_values = state_update_stream
+        if resume_worker_pool.enabled:
+            # Job and decision are written in one transaction on the thread's shard; the job
+            # row is keyed by the review, so concurrent submissions enqueue once
+            if not await run_in_threadpool(resume_worker_pool.jobs.enqueue_many, [job]):
+                raise HTTPException(status_code=409, detail=DECISION_CONFLICT)
+            resume_worker_pool.notify()
+            
+            return HumanDecisionResponse(
+                resume_token=resume_token,
+                next_stage=next_stage,
+                message=f"Decision recorded; workflow resume to {next_stage} queued",
+                resume_status="QUEUED"
+            )
         
-        log_resume_event(thread_id, "CHECKPOINT_HITL", next_stage, checkpoint_id)
+        # Record the decision unless a concurrent submission or another reviewer's lease won
+        if not await run_in_threadpool(human_review_repo.update_decisions, [job]):
+            raise HTTPException(status_code=409, detail=DECISION_CONFLICT)
         
-        resume_token = f"{thread_id}:{checkpoint_id}"
+        try:
+            resume_latency_ms = await run_in_threadpool(
+                resume_workflow, graph, checkpoint_store, resolve_durability(workflow_config), job
+            )
+        except LookupError:
+            raise HTTPException(status_code=404, detail="Workflow state not found")
         
         return HumanDecisionResponse(
             resume_token=resume_token,
             next_stage=next_stage,
-            message=f"Workflow resumed to {next_stage}"
+            message=f"Workflow resumed to {next_stage}",
+            resume_latency_ms=resume_latency_ms
         )
     except HTTPException:
         raise
@@ -430,14 +623,191 @@ async def submit_human_decision(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+DECISION_CONFLICT = "Checkpoint already decided or claimed by another reviewer"
+
+
+def _bulk_result(item: Dict[str, Any], status: str, **fields) -> str:
+    """One NDJSON line of the bulk decision response."""
+    return json.dumps({
+        "checkpoint_id": item["checkpoint_id"],
+        "status": status,
+        "ok": status not in ("REJECTED", "CONFLICT", "FAILED"),
+        **fields
+    }) + "\n"
+
+
+async def _resume_job_results(jobs: List[Dict[str, Any]], timeout_s: float) -> AsyncIterator[str]:
+    """
+    Poll queued resume jobs and yield each one's final result as it finishes.
+    
+    A job whose row disappears (its workflow was deleted) is reported as FAILED;
+    jobs still unfinished after `timeout_s` are reported as TIMEOUT.
+    """
+    remaining = {job["thread_id"]: job for job in jobs}
+    deadline = time.monotonic() + timeout_s
+    while remaining:
+        if time.monotonic() >= deadline:
+            for job in remaining.values():
+                yield _bulk_result(
+                    job,
+                    "TIMEOUT",
+                    next_stage=job["next_stage"],
+                    error=f"Resume not finished after {timeout_s}s"
+                )
+            return
+        await asyncio.sleep(resume_worker_pool.poll_interval_s / 4)
+        for thread_id, job in list(remaining.items()):
+            resume = await workflow_read_model.get_resume_job(thread_id)
+            if resume is None:
+                del remaining[thread_id]
+                yield _bulk_result(job, "FAILED", next_stage=job["next_stage"], error="Resume job no longer exists")
+            elif resume["status"] in ("DONE", "FAILED"):
+                del remaining[thread_id]
+                yield _bulk_result(
+                    job,
+                    resume["status"],
+                    next_stage=job["next_stage"],
+                    attempts=resume["attempts"],
+                    error=resume["last_error"],
+                    resume_latency_ms=resume["resume_latency_ms"]
+                )
+
+
+async def _resume_inline_results(jobs: List[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Resume workflows concurrently in the threadpool and yield results as they complete."""
+    durability = resolve_durability(workflow_config)
+    limit = asyncio.Semaphore(resume_worker_pool.workers)
+    
+    async def resume(job: Dict[str, Any]) -> str:
+        async with limit:
+            try:
+                resume_latency_ms = await run_in_threadpool(resume_workflow, graph, checkpoint_store, durability, job)
+            except Exception as e:
+                return _bulk_result(job, "FAILED", next_stage=job["next_stage"], error=str(e))
+        return _bulk_result(job, "DONE", next_stage=job["next_stage"], resume_latency_ms=resume_latency_ms)
+    
+    for result in asyncio.as_completed([resume(job) for job in jobs]):
+        yield await result
+
+
+@app.post("/human-review/decisions/bulk")
+async def submit_human_decisions_bulk(bulk_request: BulkHumanDecisionRequest):
+    """
+    Submit many human decisions at once.
+    
+    All checkpoints are validated with one review queue query (per shard) and
+    the decisions are recorded in one transaction per shard. Resumes are then
+    dispatched concurrently: queued for the background resume workers, or, with
+    `resume_workers` disabled, run in the threadpool (at most
+    `resume_workers.workers` at a time).
+    
+    The response is streamed as NDJSON, one line per item as soon as its
+    result is known (REJECTED for invalid items, CONFLICT for items another
+    request decided or another reviewer leased in the meantime, then QUEUED, or DONE/FAILED for completed resumes; TIMEOUT for queued resumes
+    still running after `wait_timeout_s`), followed by a summary line.
+    
+    Args:
+        bulk_request: Decisions, default reviewer_id and whether to wait for resumes
+        
+    Returns:
+        Streaming NDJSON response
+    """
+    reviews = await workflow_read_model.get_reviews(
+        [item.checkpoint_id for item in bulk_request.decisions]
+    )
+    
+    rejected = []
+    conflicts = []
+    jobs = []
+    seen = set()
+    for item in bulk_request.decisions:
+        decision = item.decision.upper()
+        review = reviews.get(item.checkpoint_id)
+        if item.checkpoint_id in seen:
+            error = "Duplicate checkpoint in request"
+        elif decision not in ("ACCEPT", "REJECT"):
+            error = f"Invalid decision: {item.decision}"
+        elif not review:
+            error = "Checkpoint not found"
+        elif review.get("decision"):
+            error = "Checkpoint already processed"
+        elif not review.get("thread_id"):
+            error = "No thread_id in checkpoint"
+        elif _leased_to_other(review, item.reviewer_id or bulk_request.reviewer_id):
+            error = f"Checkpoint claimed by {review['claimed_by']}"
+        else:
+            error = None
+        seen.add(item.checkpoint_id)
+        if error:
+            rejected.append(_bulk_result({"checkpoint_id": item.checkpoint_id}, "REJECTED", error=error))
+            continue
+        jobs.append({
+            "checkpoint_id": item.checkpoint_id,
+            "thread_id": review["thread_id"],
+            "decision": decision,
+            "reviewer_id": item.reviewer_id or bulk_request.reviewer_id or f"reviewer_{uuid.uuid4().hex[:8]}",
+            "next_stage": "RECONCILE" if decision == "ACCEPT" else "COMPLETE",
+            "notes": item.notes
+        })
+    
+    try:
+        if resume_worker_pool.enabled:
+            queued = set(await run_in_threadpool(resume_worker_pool.jobs.enqueue_many, jobs))
+            for job in jobs:
+                if job["checkpoint_id"] not in queued:
+                    conflicts.append(_bulk_result(job, "CONFLICT", error=DECISION_CONFLICT))
+            jobs = [job for job in jobs if job["checkpoint_id"] in queued]
+            for _ in jobs:
+                resume_worker_pool.notify()
+        else:
+            # Only reviews this request decided are resumed; a concurrent decision or lease wins
+            updated = set(await run_in_threadpool(human_review_repo.update_decisions, jobs))
+            for job in jobs:
+                if job["checkpoint_id"] not in updated:
+                    conflicts.append(_bulk_result(job, "CONFLICT", error=DECISION_CONFLICT))
+            jobs = [job for job in jobs if job["checkpoint_id"] in updated]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def results() -> AsyncIterator[str]:
+        counts = {"REJECTED": len(rejected)}
+        if conflicts:
+            counts["CONFLICT"] = len(conflicts)
+        for line in rejected + conflicts:
+            yield line
+        if resume_worker_pool.enabled:
+            for job in jobs:
+                yield _bulk_result(
+                    job,
+                    "QUEUED",
+                    next_stage=job["next_stage"],
+                    resume_token=f"{job['thread_id']}:{job['checkpoint_id']}"
+                )
+            counts["QUEUED"] = len(jobs)
+            finished = _resume_job_results(jobs, bulk_request.wait_timeout_s) if bulk_request.wait else None
+        else:
+            finished = _resume_inline_results(jobs)
+        if finished:
+            async for line in finished:
+                status = json.loads(line)["status"]
+                counts[status] = counts.get(status, 0) + 1
+                yield line
+        yield json.dumps({"summary": {"total": len(bulk_request.decisions), **counts}}) + "\n"
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
 @app.delete("/workflow/{thread_id}")
 async def delete_workflow(thread_id: str):
     """
     Delete a workflow by thread_id.
     
     This removes:
-    - Workflow state from LangGraph checkpointer
+    - Workflow state (checkpoints and writes) from LangGraph checkpointer
     - Entry from human_review_queue if present
+    - Background resume jobs of the thread
+    - The thread's dashboard counter contribution
+    - The invoice's search document
     
     Args:
         thread_id: Workflow thread ID
@@ -446,25 +816,7 @@ async def delete_workflow(thread_id: str):
         Success message
     """
     try:
-        import sqlite3
-        
-        # Delete from human_review_queue
-        conn = sqlite3.connect("./demo.db")
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            DELETE FROM human_review_queue
-            WHERE thread_id = ?
-        """, (thread_id,))
-        
-        # Delete from LangGraph checkpoints
-        cursor.execute("""
-            DELETE FROM checkpoints
-            WHERE thread_id = ? AND checkpoint_ns = ''
-        """, (thread_id,))
-        
-        conn.commit()
-        conn.close()
+        await run_in_threadpool(delete_workflow_data, thread_id, checkpoint_store, human_review_repo)
         
         return {"message": f"Workflow {thread_id} deleted successfully"}
     except Exception as e:
@@ -472,6 +824,86 @@ async def delete_workflow(thread_id: str):
         raise HTTPException(status_code=500, detail=f"{str(e)}\n{traceback.format_exc()}")
 
 
+@app.get("/storage/compaction")
+async def get_compaction_metrics():
+    """
+    Get checkpoint compaction metrics.
+    
+    Returns:
+        Cumulative compaction metrics (rows deleted, bytes reclaimed, last run)
+    """
+    return {"enabled": checkpoint_compactor.enabled, "metrics": checkpoint_compactor.metrics}
+
+
+@app.post("/storage/compaction/run")
+async def run_compaction():
+    """
+    Run checkpoint compaction, retention and vacuum now.
+    
+    Returns:
+        Metrics for this run
+    """
+    try:
+        run = await run_in_threadpool(checkpoint_compactor.run_once)
+        return {"run": run, "metrics": checkpoint_compactor.metrics}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/metrics/summary")
+async def get_metrics_summary():
+    """
+    Get workflow counts and amount sums for dashboards.
+    
+    Read from incrementally maintained counters (a few rows per shard),
+    not from the workflows themselves.
+    
+    Returns:
+        Total plus counts and amount sums by status, stage and vendor
+    """
+    try:
+        return await run_in_threadpool(workflow_metrics.summary)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/metrics/reconcile")
+async def reconcile_metrics():
+    """
+    Reconcile dashboard counters with the checkpoints now.
+    
+    Returns:
+        Metrics for this run (index rows fixed/removed, counter keys corrected)
+    """
+    try:
+        return await run_in_threadpool(workflow_metrics.reconcile)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/workflow/search")
+async def search_workflows(q: str, limit: int = 20, offset: int = 0):
+    """
+    Full-text search over invoices (invoice number, vendor, PO number, invoice text).
+    
+    Args:
+        q: Search text (all terms must match; the last one matches as a prefix)
+        limit: Page size (1-100)
+        offset: Hits to skip
+        
+    Returns:
+        Ranked hits with snippet, workflow status and stage, and whether more pages exist
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query must not be empty")
+    if not 1 <= limit <= 100 or offset < 0:
+        raise HTTPException(status_code=400, detail="limit must be 1-100 and offset >= 0")
+    try:
+        return await run_in_threadpool(invoice_search_index.search, q, limit, offset)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/workflow/status/{thread_id}")
 async def get_workflow_status(thread_id: str):
     """
@@ -484,19 +916,56 @@ async def get_workflow_status(thread_id: str):
         Workflow status
     """
     try:
-        config = {"configurable": {"thread_id": thread_id}}
-        state_snapshot = graph.get_state(config)
-        
-        if not state_snapshot:
-            raise HTTPException(status_code=404, detail="Workflow not found")
-        
-        values = state_snapshot.values
+        # Archived workflows no longer have checkpoints in the hot DB
+        values = (
+            await workflow_read_model.get_state(thread_id)
+            or await asyncio.to_thread(workflow_archiver.get_state, thread_id)
+            or {}
+        )
         return {
             "thread_id": thread_id,
             "status": values.get("workflow_status", "UNKNOWN"),
             "current_stage": values.get("current_stage"),
             "paused": values.get("paused", False),
-            "complete": values.get("complete") is not None
+            "complete": values.get("complete") is not None,
+            # Background resume after a human decision (None if never queued)
+            "resume": await workflow_read_model.get_resume_job(thread_id)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/workflow/{thread_id}/invoice-text")
+async def get_invoice_text(thread_id: str):
+    """
+    Get the full OCR text of an invoice.
+    
+    Large OCR text is kept in the blob store and only referenced from state,
+    so it is loaded here on demand.
+    
+    Args:
+        thread_id: Workflow thread ID
+        
+    Returns:
+        Invoice text and its blob reference
+    """
+    try:
+        values = (
+            await workflow_read_model.get_state(thread_id)
+            or await asyncio.to_thread(workflow_archiver.get_state, thread_id)
+        )
+        
+        if not values:
+            raise HTTPException(status_code=404, detail="Workflow not found")
+        
+        understand_output = values.get("understand") or {}
+        parsed_invoice = understand_output.get("parsed_invoice", {})
+        return {
+            "thread_id": thread_id,
+            "invoice_text_ref": parsed_invoice.get("invoice_text_ref"),
+            "invoice_text": resolve_invoice_text(parsed_invoice)
         }
     except HTTPException:
         raise
@@ -512,85 +981,56 @@ async def get_all_workflows():
     This includes:
     - Workflows that went through HITL (from human_review_queue)
     - Workflows that auto-completed (from LangGraph checkpointer only)
+    - Archived workflows (from the cold-storage archive)
     
     Returns:
         List of all workflows with their details
     """
     try:
-        import sqlite3
-        
         workflows = []
         seen_thread_ids = set()  # Track thread_ids we've already processed
         
-        # Step 1: Get workflows from human_review_queue (HITL workflows)
-        conn = sqlite3.connect("./demo.db")
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Check if table exists
-        cursor.execute("""
-            SELECT name FROM sqlite_master 
-            WHERE type='table' AND name='human_review_queue'
-        """)
-        
-        if cursor.fetchone():
-            cursor.execute("""
-                SELECT checkpoint_id, invoice_id, vendor_name, amount, 
-                       created_at, reason_for_hold, mismatch_reason, failed_stage,
-                       decision, reviewer_id, notes, updated_at, thread_id
-                FROM human_review_queue
-            """)
-            
-            checkpoints = cursor.fetchall()
+        # Review rows, thread IDs and latest states are read without blocking the event loop
+        review_rows, all_thread_ids = await asyncio.gather(
+            workflow_read_model.list_reviews(),
+            workflow_read_model.list_thread_ids()
+        )
+        states = await workflow_read_model.get_states(all_thread_ids)
+        
+        # Step 1: Get workflows from human_review_queue (HITL workflows, all shards)
+        for checkpoint in review_rows:
+            thread_id = checkpoint.get("thread_id")
             
-            # Process HITL workflows
-            for row in checkpoints:
-                checkpoint = dict(row)
-                thread_id = checkpoint.get("thread_id")
-                
-                if thread_id:
-                    seen_thread_ids.add(thread_id)
-                    workflow = await _get_workflow_from_thread_id(thread_id, checkpoint)
-                    if workflow:
-                        workflows.append(workflow)
+            if thread_id:
+                seen_thread_ids.add(thread_id)
+                workflow = await _get_workflow_from_thread_id(thread_id, checkpoint, states.get(thread_id))
+                if workflow:
+                    workflows.append(workflow)
         
         # Step 2: Get all workflows from LangGraph checkpointer
         # This includes auto-completed workflows that never hit HITL
         try:
-            # Get all checkpoints from LangGraph's SQLite checkpointer
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='checkpoints'
-            """)
-            
-            if cursor.fetchone():
-                cursor.execute("""
-                    SELECT DISTINCT thread_id, checkpoint_ns
-                    FROM checkpoints
-                    WHERE checkpoint_ns = ''
-                    ORDER BY checkpoint_ns, thread_id
-                """)
-                
-                all_thread_ids = cursor.fetchall()
+            for thread_id in all_thread_ids:
+                # Skip if we already processed this thread_id from human_review_queue
+                if thread_id in seen_thread_ids:
+                    continue
                 
-                for row in all_thread_ids:
-                    thread_id = row["thread_id"]
-                    
-                    # Skip if we already processed this thread_id from human_review_queue
-                    if thread_id in seen_thread_ids:
-                        continue
-                    
-                    # Get workflow state for this thread_id
-                    workflow = await _get_workflow_from_thread_id(thread_id, None)
-                    if workflow:
-                        workflows.append(workflow)
+                # Get workflow state for this thread_id
+                workflow = await _get_workflow_from_thread_id(thread_id, None, states.get(thread_id))
+                if workflow:
+                    workflows.append(workflow)
         except Exception as e:
             # If checkpoints table doesn't exist or query fails, continue
             import structlog
             logger = structlog.get_logger()
             logger.warning("Could not query LangGraph checkpoints", error=str(e))
         
-        conn.close()
+        # Step 3: Archived workflows (only a pointer row remains in the hot DB)
+        archived_states = await asyncio.to_thread(lambda: list(workflow_archiver.iter_states(exclude=seen_thread_ids)))
+        for state_values in archived_states:
+            workflow = await _get_workflow_from_thread_id(state_values["thread_id"], None, state_values)
+            if workflow:
+                workflows.append(workflow)
         
         return {"workflows": workflows, "total": len(workflows)}
     except Exception as e:
@@ -598,25 +1038,32 @@ async def get_all_workflows():
         raise HTTPException(status_code=500, detail=f"{str(e)}\n{traceback.format_exc()}")
 
 
-async def _get_workflow_from_thread_id(thread_id: str, checkpoint_row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+async def _get_workflow_from_thread_id(
+    thread_id: str,
+    checkpoint_row: Optional[Dict[str, Any]],
+    state_values: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
     """
     Get workflow data from a thread_id.
     
+    Falls back to the cold-storage archive when the thread has no checkpoints
+    in the hot database.
+    
     Args:
         thread_id: Workflow thread ID
         checkpoint_row: Optional row from human_review_queue table
+        state_values: Optional preloaded state (e.g. a batch read from the archive)
         
     Returns:
         Workflow dict or None
     """
     try:
-        config = {"configurable": {"thread_id": thread_id}}
-        state_snapshot = graph.get_state(config)
-        
-        if not state_snapshot:
-            return None
-        
-        state_values = state_snapshot.values
+        if state_values is None:
+            state_values = (
+                await workflow_read_model.get_state(thread_id)
+                or await asyncio.to_thread(workflow_archiver.get_state, thread_id)
+                or {}
+            )
         
         # Get invoice data from state
         invoice_payload = state_values.get("invoice_payload", {})
@@ -683,6 +1130,7 @@ async def _get_workflow_from_thread_id(thread_id: str, checkpoint_row: Optional[
             "reviewer_id": reviewer_id,
             "reason_for_hold": checkpoint_row.get("reason_for_hold") if checkpoint_row else None,
             "went_through_hitl": went_through_hitl,
+            "archived": state_values.get("archived", False),
             "notes": checkpoint_row.get("notes") if checkpoint_row else None,
             "updated_at": checkpoint_row.get("updated_at") if checkpoint_row else None,
             "stages": {
@@ -2,12 +2,32 @@
 
 import uuid
 from datetime import datetime
+from functools import partial
 from typing import Dict, Any
 from langgraph.graph import StateGraph, END
 from src.state.models import WorkflowState, WorkflowStatus
 from src.config.workflow_loader import WorkflowConfigLoader
 from src.storage.checkpoint_store import CheckpointStore
+from src.storage.serializers import build_serializer
 from src.storage.human_review_repo import HumanReviewRepository
+from src.storage.sharding import ShardRouter, ShardedHumanReviewRepository, shard_paths
+from src.storage.vendor_master import vendor_master_index
+from src.storage.vendor_stats import VendorStatsRepository
+from src.storage.blob_store import blob_store
+from src.storage.compactor import checkpoint_compactor
+from src.storage.archiver import workflow_archiver
+from src.storage.read_model import workflow_read_model
+from src.storage.resume_jobs import ResumeJobRepository
+from src.storage.decision_memo import hitl_decision_memo
+from src.graph.resume_worker import resume_worker_pool
+from src.graph.speculation import speculative_precompute
+from src.storage.speculation_cache import SpeculationCache
+from src.storage.hitl_timers import HitlTimerRepository
+from src.graph.sla_scheduler import hitl_sla_scheduler
+from src.storage.workflow_metrics import workflow_metrics
+from src.storage.invoice_search import invoice_search_index
+from src.rules.approval_policy import approval_policy_engine
+from src.rules.gl_coding import gl_coding_engine
 from src.graph.routing import route_after_match, route_after_hitl, should_checkpoint
 from src.graph.node_wrapper import runtime_context, wrap_node
 from src.nodes import (
@@ -17,6 +37,55 @@ from src.nodes import (
 )
 
 
+# workflow.json `checkpoint_durability` -> LangGraph durability mode
+DURABILITY_MODES = {
+    # Persist after every node (LangGraph default; checkpoint written in the background)
+    "every_step": "async",
+    # Like every_step, but each checkpoint is durable before the next node starts
+    "every_step_sync": "sync",
+    # Run stages in memory; persist only when the run exits (HITL pause, completion, failure)
+    "boundaries": "exit"
+}
+
+
+def resolve_durability(workflow_config: Dict[str, Any]) -> str:
+    """
+    Map the configured checkpoint durability to a LangGraph durability mode.
+
+    Args:
+        workflow_config: Workflow configuration
+
+    Returns:
+        "async", "sync" or "exit"
+    """
+    mode = workflow_config.get("checkpoint_durability", "every_step")
+    if mode not in DURABILITY_MODES:
+        raise ValueError(f"Unknown checkpoint_durability: {mode}")
+    return DURABILITY_MODES[mode]
+
+
+def delete_workflow_data(thread_id: str, checkpoint_store: CheckpointStore, human_review_repo) -> None:
+    """
+    Delete everything stored for a workflow thread.
+    
+    Used by DELETE /workflow/{thread_id} and by checkpoint retention ("delete" action).
+    
+    Args:
+        thread_id: Workflow thread ID
+        checkpoint_store: Checkpoint store holding the thread
+        human_review_repo: Review queue repository
+    """
+    human_review_repo.delete_by_thread(thread_id)
+    resume_worker_pool.jobs.delete_by_thread(thread_id)
+    speculative_precompute.discard(thread_id)
+    hitl_sla_scheduler.timers.delete_by_thread(thread_id)
+    workflow_metrics.delete_by_thread(thread_id)
+    invoice_search_index.delete_by_thread(thread_id)
+    
+    # Delete LangGraph checkpoints and their pending writes
+    checkpoint_store.delete_thread(thread_id)
+
+
 def build_invoice_graph(config_path: str = None) -> tuple[StateGraph, CheckpointStore, HumanReviewRepository]:
     """
     Build LangGraph invoice processing workflow.
@@ -31,17 +100,88 @@ def build_invoice_graph(config_path: str = None) -> tuple[StateGraph, Checkpoint
     loader = WorkflowConfigLoader(config_path)
     workflow_config = loader.get_config()
     
-    # Initialize checkpoint store
+    # Initialize checkpoint store (per-thread tables are sharded by thread_id;
+    # shared tables such as vendors, rules and archive pointers stay in default_db)
     db_path = workflow_config.get("default_db", "sqlite:///./demo.db")
-    checkpoint_store = CheckpointStore(db_path)
+    db_path_clean = db_path.replace("sqlite:///", "")
+    db_shard_paths = shard_paths(workflow_config.get("storage_shards"), db_path_clean)
+    serde = build_serializer(workflow_config.get("checkpoint_serializer"))
+    checkpoint_store = CheckpointStore(
+        db_path,
+        serde=serde,
+        group_commit=workflow_config.get("checkpoint_group_commit"),
+        shard_paths=db_shard_paths
+    )
     checkpointer = checkpoint_store.get_checkpointer()
     
-    # Initialize human review repository
-    db_path_clean = db_path.replace("sqlite:///", "")
-    human_review_repo = HumanReviewRepository(db_path_clean)
+    # Initialize human review repository (rows live on the thread's shard)
+    if len(db_shard_paths) > 1:
+        human_review_repo = ShardedHumanReviewRepository(ShardRouter(db_shard_paths), checkpointer=checkpointer)
+    else:
+        human_review_repo = HumanReviewRepository(db_path_clean, checkpointer=checkpointer)
+    
+    # Decision memo for auto-resolving recurring HITL mismatch patterns (shared across
+    # shards in default_db); a new memo is seeded from already-decided reviews
+    hitl_decision_memo.configure(db_path_clean, workflow_config.get("auto_resolution"))
+    if hitl_decision_memo.is_empty():
+        hitl_decision_memo.rebuild(human_review_repo.list_all())
+    
+    # Load vendor master index into memory (used by COMMON normalize_vendor)
+    vendor_master_index.load(db_path_clean)
+    
+    # Point approval policy engine at workflow.json and the approval_rules table
+    approval_policy_engine.configure(str(loader.config_path), db_path_clean)
+    gl_coding_engine.configure(str(loader.config_path))
+    
+    # Initialize per-vendor running statistics (maintained by COMPLETE)
+    vendor_stats_repo = VendorStatsRepository(db_path_clean)
+    
+    # Configure content-addressed blob store for large state fields (OCR text)
+    blob_config = workflow_config.get("blob_store", {})
+    blob_store.configure(
+        blob_config.get("path", "./blobs"),
+        blob_config.get("compression", "zlib"),
+        blob_config.get("inline_max_bytes", 2048)
+    )
+    
+    # Configure cold-storage archive and checkpoint compaction/retention
+    # (background thread started by the API)
+    workflow_archiver.configure(db_path_clean, checkpointer, workflow_config.get("archive"))
+    checkpoint_compactor.configure(
+        db_path_clean,
+        checkpointer,
+        workflow_config.get("checkpoint_compaction"),
+        archiver=workflow_archiver,
+        shard_paths=db_shard_paths,
+        delete_thread=partial(
+            delete_workflow_data, checkpoint_store=checkpoint_store, human_review_repo=human_review_repo
+        )
+    )
+    
+    # Async read model for API query endpoints: read-only connection pools on the same
+    # shards (and serializer) as the checkpointer, which keeps its own writer connection
+    workflow_read_model.configure(db_shard_paths, checkpointer.serde, workflow_config.get("read_pool"))
+    
+    # Background precompute of RECONCILE/APPROVE for paused workflows (cached on the thread's shard)
+    speculative_precompute.configure(SpeculationCache(db_shard_paths), workflow_config.get("speculative_precompute"))
+    
+    # Review SLA / due-date timers on the thread shards (scheduler thread started by the API)
+    hitl_sla_scheduler.configure(HitlTimerRepository(db_shard_paths), workflow_config.get("hitl_timers"))
+    
+    # Dashboard counters on the thread shards, updated on node exit and decision
+    # (reconciliation thread started by the API)
+    workflow_metrics.configure(
+        db_shard_paths, checkpointer, workflow_config.get("workflow_metrics"), archiver=workflow_archiver
+    )
+    
+    # Full-text invoice search on the thread shards (written by UNDERSTAND and PREPARE);
+    # an empty index is filled from existing workflows
+    invoice_search_index.configure(db_shard_paths, workflow_config.get("invoice_search"))
+    if invoice_search_index.enabled and invoice_search_index.is_empty():
+        invoice_search_index.backfill(checkpointer)
     
     # Set runtime context for nodes
-    runtime_context.set(checkpoint_store, human_review_repo)
+    runtime_context.set(checkpoint_store, human_review_repo, vendor_stats_repo, blob_store, invoice_search_index)
     
     # Create state graph
     graph = StateGraph(WorkflowState)
@@ -105,6 +245,16 @@ def build_invoice_graph(config_path: str = None) -> tuple[StateGraph, Checkpoint
     # Compile graph with checkpointer
     compiled_graph = graph.compile(checkpointer=checkpointer)
     
+    # Background resume of decided reviews (worker threads started by the API);
+    # the job queue lives on the same shards as the threads it resumes
+    resume_worker_pool.configure(
+        compiled_graph,
+        checkpoint_store,
+        ResumeJobRepository(db_shard_paths),
+        workflow_config.get("resume_workers"),
+        resolve_durability(workflow_config)
+    )
+    
     return compiled_graph, checkpoint_store, human_review_repo
 
 
@@ -1,7 +1,9 @@
 """Node wrapper to inject runtime context."""
 
 from typing import Dict, Any, Callable
+from src.logging.logger import log_error
 from src.state.models import WorkflowState
+from src.storage.workflow_metrics import workflow_metrics
 
 
 class RuntimeContext:
@@ -10,20 +12,17 @@ class RuntimeContext:
     def __init__(self):
         self.checkpoint_store = None
         self.human_review_repo = None
-        self._human_decisions = {}  # thread_id -> decision data
+        self.vendor_stats_repo = None
+        self.blob_store = None
+        self.search_index = None
     
-    def set(self, checkpoint_store, human_review_repo):
+    def set(self, checkpoint_store, human_review_repo, vendor_stats_repo=None, blob_store=None, search_index=None):
         """Set runtime context."""
         self.checkpoint_store = checkpoint_store
         self.human_review_repo = human_review_repo
-    
-    def set_human_decision(self, thread_id: str, decision_data: dict):
-        """Store human decision for a thread."""
-        self._human_decisions[thread_id] = decision_data
-    
-    def get_human_decision(self, thread_id: str) -> dict:
-        """Get human decision for a thread."""
-        return self._human_decisions.get(thread_id, {})
+        self.vendor_stats_repo = vendor_stats_repo
+        self.blob_store = blob_store
+        self.search_index = search_index
 
 
 runtime_context = RuntimeContext()
@@ -33,6 +32,8 @@ def wrap_node(node_func: Callable, inject_runtime: bool = False) -> Callable:
     """
     Wrap a node function to inject runtime context.
     
+    The node's output is also recorded in the dashboard counters.
+    
     Args:
         node_func: Original node function
         inject_runtime: Whether to inject runtime context
@@ -48,13 +49,21 @@ def wrap_node(node_func: Callable, inject_runtime: bool = False) -> Callable:
         # Always create runtime, but only populate if needed
         runtime = {}
         if inject_runtime:
-            thread_id = state.get("thread_id")
             runtime = {
                 "checkpoint_store": runtime_context.checkpoint_store,
                 "human_review_repo": runtime_context.human_review_repo,
-                "human_decision": runtime_context.get_human_decision(thread_id) if thread_id else {}
+                "vendor_stats_repo": runtime_context.vendor_stats_repo,
+                "blob_store": runtime_context.blob_store,
+                "search_index": runtime_context.search_index
             }
-        return node_func(state, config, runtime)
+        output = node_func(state, config, runtime)
+        
+        # Move the workflow between dashboard counter keys (never fails the node)
+        try:
+            workflow_metrics.record(state, output)
+        except Exception as e:
+            log_error("WORKFLOW_METRICS", e, {"thread_id": state.get("thread_id")})
+        return output
     
     return wrapped
 
@@ -0,0 +1,256 @@
+"""Background workers that resume workflows after a human decision."""
+
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from langgraph.types import StateUpdate
+
+from src.logging.logger import log_error, log_resume_event
+from src.storage.resume_jobs import ResumeJobRepository
+from src.storage.decision_memo import hitl_decision_memo
+from src.graph.speculation import speculative_precompute
+from src.graph.sla_scheduler import hitl_sla_scheduler
+from src.storage.workflow_metrics import workflow_metrics
+
+
+def _record_metrics(state: Dict[str, Any], updates: Dict[str, Any]):
+    """Update dashboard counters (failures are logged, never raised)."""
+    try:
+        workflow_metrics.record(state, updates)
+    except Exception as e:
+        log_error("WORKFLOW_METRICS", e, {"thread_id": state.get("thread_id")})
+
+
+def resume_workflow(graph, checkpoint_store, durability: str, job: Dict[str, Any]) -> float:
+    """
+    Apply a human decision to a paused workflow and run it to the end.
+
+    Only the channels the decision changes are written, as HITL_DECISION's
+    output, so routing continues to RECONCILE (ACCEPT) or COMPLETE (REJECT).
+    Safe to re-run: if the decision is already in state (an earlier attempt
+    got that far) the graph is just streamed on from its latest checkpoint.
+    The decision is also counted in the auto-resolution memo under the
+    hold's mismatch signature (idempotent per review).
+
+    On ACCEPT, RECONCILE and APPROVE outputs precomputed during the pause
+    are committed together with the decision (one bulk state update) if
+    their inputs are unchanged, so the stream continues from POSTING.
+    The review's SLA timers are cancelled and the decision is counted in
+    the dashboard counters (the committed updates bypass the node wrapper).
+
+    Args:
+        graph: Compiled workflow graph
+        checkpoint_store: CheckpointStore holding the thread
+        durability: LangGraph durability mode for the run
+        job: Resume job (thread_id, checkpoint_id, decision, reviewer_id, next_stage)
+
+    Returns:
+        Resume latency in milliseconds (state update + stream until durable)
+    """
+    resume_start = time.perf_counter()
+    thread_id = job["thread_id"]
+    config = {"configurable": {"thread_id": thread_id}}
+
+    checkpoint_tuple = checkpoint_store.get_checkpointer().get_tuple(config)
+    if not checkpoint_tuple:
+        raise LookupError(f"Workflow state not found for thread {thread_id}")
+
+    values = checkpoint_tuple.checkpoint.get("channel_values", {})
+    if not (values.get("hitl") or {}).get("human_decision"):
+        decision_update = {
+            "hitl": {
+                "human_decision": job["decision"],
+                "reviewer_id": job["reviewer_id"],
+                "resume_token": f"{thread_id}:{job['checkpoint_id']}",
+                "next_stage": job["next_stage"]
+            },
+            "paused": False,
+            "workflow_status": "IN_PROGRESS"
+        }
+        supersteps = [[StateUpdate(decision_update, as_node="HITL_DECISION")]]
+        speculative = speculative_precompute.take(values) if job["decision"] == "ACCEPT" else None
+        if speculative:
+            supersteps += [[StateUpdate(output, as_node=node_name)] for node_name, output in speculative.items()]
+        graph.bulk_update_state(config, supersteps)
+        updates = dict(decision_update)
+        for output in (speculative or {}).values():
+            updates.update(output)
+        _record_metrics(values, updates)
+    if job["decision"] != "ACCEPT":
+        speculative_precompute.discard(thread_id)
+    hitl_sla_scheduler.cancel(thread_id)
+
+    mismatch_signature = (values.get("checkpoint") or {}).get("mismatch_signature")
+    if mismatch_signature:
+        hitl_decision_memo.record(job["checkpoint_id"], mismatch_signature, job["decision"])
+
+    # Drive the graph to the end (or the next pause) in a single pass
+    for _ in graph.stream(None, config, stream_mode="updates", durability=durability):
+        pass
+
+    checkpoint_store.wait_durable(thread_id)
+    resume_latency_ms = round((time.perf_counter() - resume_start) * 1000, 1)
+    log_resume_event(thread_id, "CHECKPOINT_HITL", job["next_stage"], job["checkpoint_id"], resume_latency_ms)
+    return resume_latency_ms
+
+
+class ResumeWorkerPool:
+    """
+    Bounded pool of threads that resume workflows from the `resume_jobs` queue.
+
+    The decision endpoint only records the decision and enqueues a job, so
+    reviewers are acknowledged without waiting for RECONCILE → COMPLETE (and
+    a slow ERP in POSTING). Jobs are durable: every API process runs a pool,
+    any of them may claim a job, and a job whose worker died is picked up
+    again once its lease expires. Failed attempts are retried with
+    exponential backoff up to `max_attempts`, then marked FAILED.
+
+    Enqueuing in this process wakes a worker immediately; jobs enqueued by
+    other processes are found by polling every `poll_interval_s`.
+    """
+
+    def __init__(self):
+        """Initialize an unconfigured pool."""
+        self.graph = None
+        self.checkpoint_store = None
+        self.durability = "exit"
+        self.jobs: Optional[ResumeJobRepository] = None
+        self.enabled = True
+        self.workers = 4
+        self.max_attempts = 3
+        self.backoff_s = 2.0
+        self.lease_s = 300.0
+        self.poll_interval_s = 1.0
+        self._wakeup = threading.Condition()
+        self._pending_wakeups = 0
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def configure(
+        self,
+        graph,
+        checkpoint_store,
+        jobs: ResumeJobRepository,
+        settings: Optional[Dict[str, Any]] = None,
+        durability: str = "exit"
+    ):
+        """
+        Configure the pool (used by build_invoice_graph).
+
+        Args:
+            graph: Compiled workflow graph
+            checkpoint_store: CheckpointStore holding the threads
+            jobs: Resume job repository
+            settings: `resume_workers` config section
+            durability: LangGraph durability mode for resumed runs
+        """
+        settings = settings or {}
+        self.graph = graph
+        self.checkpoint_store = checkpoint_store
+        self.durability = durability
+        self.jobs = jobs
+        self.enabled = settings.get("enabled", True)
+        self.workers = int(settings.get("workers", 4))
+        if self.workers < 1:
+            raise ValueError(f"resume_workers.workers must be >= 1, got {self.workers}")
+        self.max_attempts = int(settings.get("max_attempts", 3))
+        self.backoff_s = float(settings.get("backoff_s", 2))
+        self.lease_s = float(settings.get("lease_s", 300))
+        self.poll_interval_s = float(settings.get("poll_interval_s", 1))
+
+    @property
+    def running(self) -> bool:
+        """Whether worker threads are running in this process."""
+        return any(thread.is_alive() for thread in self._threads)
+
+    def notify(self):
+        """Wake one idle worker (call after enqueuing a job)."""
+        with self._wakeup:
+            self._pending_wakeups += 1
+            self._wakeup.notify()
+
+    def _wait_for_work(self):
+        """Sleep until notified or the poll interval passes."""
+        with self._wakeup:
+            if self._pending_wakeups == 0:
+                self._wakeup.wait(self.poll_interval_s)
+            self._pending_wakeups = max(self._pending_wakeups - 1, 0)
+
+    def _claim(self, worker_id: str, first_shard: int) -> Optional[Dict[str, Any]]:
+        """Claim a job from any shard, starting at `first_shard` to spread workers."""
+        count = self.jobs.router.count
+        for offset in range(count):
+            job = self.jobs.claim(worker_id, self.lease_s, (first_shard + offset) % count)
+            if job:
+                return job
+        return None
+
+    def run_job(self, job: Dict[str, Any]):
+        """
+        Run one claimed job and record its outcome.
+
+        Args:
+            job: Claimed job row
+        """
+        if job["attempts"] > self.max_attempts:
+            # Reclaimed after its worker died on the last attempt
+            self.jobs.mark_failed(job, job.get("last_error") or "Resume lease expired")
+            return
+        try:
+            resume_latency_ms = resume_workflow(self.graph, self.checkpoint_store, self.durability, job)
+        except Exception as e:
+            log_error("RESUME_WORKER", e, {"thread_id": job["thread_id"], "attempt": job["attempts"]})
+            if job["attempts"] >= self.max_attempts:
+                self.jobs.mark_failed(job, str(e))
+            else:
+                self.jobs.mark_retry(job, str(e), self.backoff_s * 2 ** (job["attempts"] - 1))
+            return
+        self.jobs.mark_done(job, resume_latency_ms)
+
+    def _loop(self, index: int):
+        """Worker loop: claim and run jobs until stopped."""
+        worker_id = f"{os.getpid()}-{index}-{uuid.uuid4().hex[:6]}"
+        while not self._stop.is_set():
+            try:
+                job = self._claim(worker_id, index)
+            except Exception as e:
+                log_error("RESUME_WORKER", e, {"worker_id": worker_id})
+                job = None
+            if job:
+                self.run_job(job)
+            else:
+                self._wait_for_work()
+
+    def start(self):
+        """Start the worker threads (no-op if disabled or running)."""
+        if not self.enabled or self.running:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._loop, args=(index,), name=f"resume-worker-{index}", daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 30.0):
+        """
+        Stop the worker threads, letting in-flight resumes finish.
+
+        Args:
+            timeout: Seconds to wait for in-flight jobs (unfinished jobs are reclaimed after their lease)
+        """
+        self._stop.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(timeout=max(deadline - time.monotonic(), 0))
+        self._threads = []
+
+
+# Global instance (configured by build_invoice_graph, started by the API)
+resume_worker_pool = ResumeWorkerPool()
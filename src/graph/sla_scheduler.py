@@ -0,0 +1,256 @@
+"""Heap-based scheduler for HITL review SLAs and due-date escalations."""
+
+import heapq
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.logging.logger import log_error, log_escalation
+from src.mcp_clients.atlas_client import ATLASClient
+from src.storage.hitl_timers import HitlTimerRepository, TimerKind, due_date_epoch
+from src.storage.human_review_repo import NO_DUE_DATE
+
+
+class HitlSlaScheduler:
+    """
+    Fires escalations for paused reviews from a min-heap of timers.
+
+    Each paused review gets a REVIEW_SLA timer (`review_sla_s` after the
+    pause) and, if the invoice has a due date, a DUE_DATE timer
+    (`due_warning_s` before it). Timers are rows in `hitl_timers`; the heap
+    holds (fire_at, timer_id, row) so adding a timer and taking the next due
+    one are O(log n), and the thread sleeps until the head is due.
+
+    When a timer fires for a review that is still undecided, the review is
+    escalated (level + 1, `escalated_to`), taken from its current claimant
+    and either returned to the queue or leased to `reassign_to`, and the
+    finance team is notified. A REVIEW_SLA escalation re-arms the next
+    level until `max_escalations`.
+
+    On start the heap is rebuilt from the pending-timer index. Timers added
+    by other API processes are picked up by a range scan on the same index
+    for timers due within the next poll interval; a timer in several heaps
+    still fires once, and only together with its escalation
+    (HitlTimerRepository.fire).
+    """
+
+    def __init__(self):
+        """Initialize an unconfigured scheduler."""
+        self.timers: Optional[HitlTimerRepository] = None
+        self.enabled = False
+        self.review_sla_s = 86400.0
+        self.due_warning_s = 86400.0
+        self.max_escalations = 3
+        self.escalate_to = "ap_supervisor"
+        self.reassign_to: Optional[str] = None
+        self.reassign_lease_s = 300.0
+        self.poll_interval_s = 5.0
+        self.metrics = {"fired": 0, "escalated": 0, "reassigned": 0, "skipped": 0}
+        self._heap: List[Tuple[float, str, Dict[str, Any]]] = []
+        self._known: Set[str] = set()
+        self._wakeup = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def configure(self, timers: HitlTimerRepository, settings: Optional[Dict[str, Any]] = None):
+        """
+        Configure scheduler (used by build_invoice_graph).
+
+        Args:
+            timers: Timer repository on the thread shards (escalations are written with the timers)
+            settings: `hitl_timers` config section
+        """
+        settings = settings or {}
+        self.timers = timers
+        self.enabled = settings.get("enabled", False)
+        self.review_sla_s = float(settings.get("review_sla_s", 86400))
+        self.due_warning_s = float(settings.get("due_warning_s", 86400))
+        self.max_escalations = int(settings.get("max_escalations", 3))
+        self.escalate_to = settings.get("escalate_to", "ap_supervisor")
+        self.reassign_to = settings.get("reassign_to")
+        self.reassign_lease_s = float(settings.get("reassign_lease_s", 300))
+        self.poll_interval_s = float(settings.get("poll_interval_s", 5))
+        with self._wakeup:
+            self._heap = []
+            self._known = set()
+
+    @property
+    def running(self) -> bool:
+        """Whether the scheduler thread is running in this process."""
+        return bool(self._thread and self._thread.is_alive())
+
+    def _push(self, timers: List[Dict[str, Any]]):
+        """Add timers to the heap and wake the thread if one is due sooner."""
+        with self._wakeup:
+            head = self._heap[0][0] if self._heap else None
+            for timer in timers:
+                if timer["timer_id"] not in self._known:
+                    self._known.add(timer["timer_id"])
+                    heapq.heappush(self._heap, (timer["fire_at"], timer["timer_id"], timer))
+            if self._heap and (head is None or self._heap[0][0] < head):
+                self._wakeup.notify()
+
+    def schedule_review(self, review: Dict[str, Any]):
+        """
+        Start the SLA timers of a paused review.
+
+        Args:
+            review: Review queue data (checkpoint_id, thread_id, due_date)
+        """
+        if not self.enabled or self.timers is None:
+            return
+        now = time.time()
+        timers = [{
+            "checkpoint_id": review["checkpoint_id"],
+            "thread_id": review["thread_id"],
+            "kind": TimerKind.REVIEW_SLA,
+            "escalation_level": 0,
+            "fire_at": now + self.review_sla_s
+        }]
+        due_date = review.get("due_date")
+        if due_date and due_date != NO_DUE_DATE:
+            try:
+                timers.append({
+                    "checkpoint_id": review["checkpoint_id"],
+                    "thread_id": review["thread_id"],
+                    "kind": TimerKind.DUE_DATE,
+                    "escalation_level": 0,
+                    "fire_at": due_date_epoch(due_date) - self.due_warning_s
+                })
+            except ValueError:
+                pass
+        self._push(self.timers.add(timers))
+
+    def cancel(self, thread_id: str):
+        """
+        Cancel a thread's pending timers (its review was decided).
+
+        Entries left in heaps are dropped when they come due.
+
+        Args:
+            thread_id: Workflow thread ID
+        """
+        if self.timers is not None:
+            self.timers.cancel_by_thread(thread_id)
+
+    def load(self, horizon_s: Optional[float] = None):
+        """
+        Load pending timers into the heap.
+
+        Args:
+            horizon_s: Only timers due within this many seconds (None loads all, used on start)
+        """
+        before = time.time() + horizon_s if horizon_s is not None else float("inf")
+        self._push(self.timers.pending(before))
+
+    def fire(self, timer: Dict[str, Any]):
+        """
+        Fire a due timer (no-op if another process fired it or it was cancelled).
+
+        Args:
+            timer: Timer row
+        """
+        fired = self.timers.fire(timer, self.escalate_to, self.reassign_to, self.reassign_lease_s)
+        if fired is None:
+            self.metrics["skipped"] += 1
+            return
+        self.metrics["fired"] += 1
+
+        review = fired["review"]
+        if not review:
+            # Decided (or deleted) since the timer was set
+            return
+        self.metrics["escalated"] += 1
+        if fired["previous_claimant"] or self.reassign_to:
+            self.metrics["reassigned"] += 1
+
+        if timer["kind"] == TimerKind.REVIEW_SLA and review["escalation_level"] < self.max_escalations:
+            self._push(self.timers.add([{
+                "checkpoint_id": timer["checkpoint_id"],
+                "thread_id": timer["thread_id"],
+                "kind": TimerKind.REVIEW_SLA,
+                "escalation_level": review["escalation_level"],
+                "fire_at": time.time() + self.review_sla_s
+            }]))
+
+        log_escalation(
+            timer["thread_id"], timer["checkpoint_id"], timer["kind"], review["escalation_level"],
+            self.escalate_to, fired["previous_claimant"], self.reassign_to
+        )
+        amount = f"{review['amount']:,.2f}" if review.get("amount") is not None else "amount unknown"
+        try:
+            ATLASClient().notify_finance_team(
+                f"Invoice {review['invoice_id']} ({review['vendor_name']}, {amount}) escalated to "
+                f"{self.escalate_to}: {timer['kind']} level {review['escalation_level']}"
+            )
+        except Exception as e:
+            # The escalation is committed; a lost notification does not re-fire it
+            log_error("SLA_SCHEDULER", e, {"checkpoint_id": timer["checkpoint_id"]})
+
+    def _next_due(self) -> Optional[Dict[str, Any]]:
+        """Pop the head timer if it is due, else sleep until it is (or the poll interval passes)."""
+        with self._wakeup:
+            now = time.time()
+            if self._heap and self._heap[0][0] <= now:
+                _, timer_id, timer = heapq.heappop(self._heap)
+                self._known.discard(timer_id)
+                return timer
+            wait_s = min(self._heap[0][0] - now, self.poll_interval_s) if self._heap else self.poll_interval_s
+            self._wakeup.wait(wait_s)
+            return None
+
+    def _loop(self):
+        """Scheduler loop: fire due timers, poll for timers added elsewhere."""
+        next_poll = time.monotonic() + self.poll_interval_s
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() >= next_poll:
+                    self.load(2 * self.poll_interval_s)
+                    next_poll = time.monotonic() + self.poll_interval_s
+                timer = self._next_due()
+                if timer:
+                    self.fire(timer)
+            except Exception as e:
+                log_error("SLA_SCHEDULER", e)
+                self._stop.wait(self.poll_interval_s)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Scheduler state for the API.
+
+        Returns:
+            Heap size, next fire time, timer counts by status and fire metrics
+        """
+        with self._wakeup:
+            heap_size = len(self._heap)
+            next_fire_at = self._heap[0][0] if self._heap else None
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "heap_size": heap_size,
+            "next_fire_at": next_fire_at,
+            "timers": self.timers.count_by_status() if self.timers else {},
+            "metrics": dict(self.metrics)
+        }
+
+    def start(self):
+        """Rebuild the heap from pending timers and start the thread (no-op if disabled or running)."""
+        if not self.enabled or self.running:
+            return
+        self.load()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="hitl-sla-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread."""
+        self._stop.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Global instance (configured by build_invoice_graph, started by the API)
+hitl_sla_scheduler = HitlSlaScheduler()
@@ -0,0 +1,172 @@
+"""Speculative precomputation of the ACCEPT path while a workflow is paused for review."""
+
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from src.logging.logger import log_error, log_speculation
+from src.nodes.approve import approve_node
+from src.nodes.reconcile import reconcile_node
+from src.rules.approval_policy import approval_policy_engine
+from src.rules.gl_coding import gl_coding_engine
+from src.storage.speculation_cache import SpeculationCache
+
+
+# Stages run after an ACCEPT, in order, that only read state and rule tables
+SPECULATIVE_STAGES = (("RECONCILE", reconcile_node), ("APPROVE", approve_node))
+
+
+def input_digest(state: Dict[str, Any]) -> str:
+    """
+    Version of everything RECONCILE and APPROVE read.
+
+    Covers the state channels they use (invoice payload, PREPARE and
+    RETRIEVE outputs) and the GL coding / approval rule sources, so an edit
+    to any of them invalidates precomputed outputs.
+
+    Args:
+        state: Workflow state (values)
+
+    Returns:
+        Digest (hex)
+    """
+    inputs = {
+        "invoice_payload": state.get("invoice_payload"),
+        "prepare": state.get("prepare"),
+        "retrieve": state.get("retrieve"),
+        "rules": [approval_policy_engine.source_version(), gl_coding_engine.source_version()]
+    }
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class SpeculativePrecompute:
+    """
+    Runs RECONCILE and APPROVE in the background when a workflow pauses at
+    CHECKPOINT_HITL, so an ACCEPT can commit their outputs instead of
+    computing them.
+
+    Outputs are cached in `speculative_outputs` with the input digest of the
+    paused state. On ACCEPT the resume takes the cached row and commits it
+    only if the digest still matches the current state and rules; otherwise
+    (or if the precompute has not finished yet) the stages run as usual.
+    REJECT discards the row.
+    """
+
+    def __init__(self):
+        """Initialize a disabled precompute."""
+        self.cache: Optional[SpeculationCache] = None
+        self.enabled = False
+        self.workers = 1
+        self.metrics = {"computed": 0, "failed": 0, "hits": 0, "misses": 0, "invalidated": 0}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def configure(self, cache: SpeculationCache, settings: Optional[Dict[str, Any]] = None):
+        """
+        Configure precompute (used by build_invoice_graph).
+
+        Args:
+            cache: Speculation cache on the thread shards
+            settings: `speculative_precompute` config section
+        """
+        settings = settings or {}
+        self.cache = cache
+        self.enabled = settings.get("enabled", False)
+        self.workers = int(settings.get("workers", 1))
+
+    def _count(self, metric: str):
+        """Increment a metric."""
+        with self._lock:
+            self.metrics[metric] += 1
+
+    def submit(self, state: Dict[str, Any]):
+        """
+        Precompute the ACCEPT path of a paused workflow in the background.
+
+        Args:
+            state: Workflow state at the pause
+        """
+        if not self.enabled or self.cache is None:
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="speculate")
+            self._executor.submit(self.precompute, dict(state))
+
+    def precompute(self, state: Dict[str, Any]):
+        """
+        Run the speculative stages on a paused state and cache their outputs.
+
+        Args:
+            state: Workflow state at the pause
+        """
+        thread_id = state.get("thread_id")
+        start_time = time.perf_counter()
+        try:
+            digest = input_digest(state)
+            outputs = {}
+            for node_name, node_func in SPECULATIVE_STAGES:
+                output = node_func(state, {}, {})
+                if output.get("error"):
+                    # The real run will hit (and report) the same failure
+                    self._count("failed")
+                    return
+                outputs[node_name] = output
+                state = {**state, **output}
+            compute_ms = round((time.perf_counter() - start_time) * 1000, 1)
+            self.cache.put(thread_id, digest, outputs, compute_ms)
+            self._count("computed")
+            log_speculation(thread_id, "computed", compute_ms)
+        except Exception as e:
+            self._count("failed")
+            log_error("SPECULATIVE_PRECOMPUTE", e, {"thread_id": thread_id})
+
+    def take(self, state: Dict[str, Any]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Consume the precomputed outputs of a thread being accepted.
+
+        Args:
+            state: Current workflow state (values) of the paused thread
+
+        Returns:
+            Node name -> output for SPECULATIVE_STAGES, or None on a miss or stale entry
+        """
+        if not self.enabled or self.cache is None:
+            return None
+        thread_id = state.get("thread_id")
+        entry = self.cache.take(thread_id)
+        if not entry:
+            self._count("misses")
+            log_speculation(thread_id, "miss")
+            return None
+        if entry["input_digest"] != input_digest(state):
+            self._count("invalidated")
+            log_speculation(thread_id, "invalidated")
+            return None
+        self._count("hits")
+        log_speculation(thread_id, "hit", entry["compute_ms"])
+        return entry["outputs"]
+
+    def discard(self, thread_id: str):
+        """
+        Drop precomputed outputs that will not be used (REJECT, deleted workflow).
+
+        Args:
+            thread_id: Workflow thread ID
+        """
+        if self.cache is not None:
+            self.cache.delete_by_thread(thread_id)
+
+    def stop(self):
+        """Finish running precomputes and drop queued ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Global instance (configured by build_invoice_graph)
+speculative_precompute = SpeculativePrecompute()
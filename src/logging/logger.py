@@ -102,7 +102,13 @@ def log_human_decision(checkpoint_id: str, decision: str, reviewer_id: str):
     )
 
 
-def log_resume_event(thread_id: str, from_stage: str, to_stage: str, checkpoint_id: str):
+def log_resume_event(
+    thread_id: str,
+    from_stage: str,
+    to_stage: str,
+    checkpoint_id: str,
+    resume_latency_ms: Optional[float] = None
+):
     """Log workflow resume."""
     logger.info(
         "resume_event",
@@ -110,6 +116,41 @@ def log_resume_event(thread_id: str, from_stage: str, to_stage: str, checkpoint_
         from_stage=from_stage,
         to_stage=to_stage,
         checkpoint_id=checkpoint_id,
+        resume_latency_ms=resume_latency_ms,
+        timestamp=datetime.utcnow().isoformat()
+    )
+
+
+def log_escalation(
+    thread_id: str,
+    checkpoint_id: str,
+    timer_kind: str,
+    escalation_level: int,
+    escalated_to: Optional[str],
+    previous_reviewer: Optional[str] = None,
+    reassigned_to: Optional[str] = None
+):
+    """Log HITL review escalation (SLA or due-date timer fired)."""
+    logger.warning(
+        "hitl_escalation",
+        thread_id=thread_id,
+        checkpoint_id=checkpoint_id,
+        timer_kind=timer_kind,
+        escalation_level=escalation_level,
+        escalated_to=escalated_to,
+        previous_reviewer=previous_reviewer,
+        reassigned_to=reassigned_to,
+        timestamp=datetime.utcnow().isoformat()
+    )
+
+
+def log_speculation(thread_id: Optional[str], outcome: str, compute_ms: Optional[float] = None):
+    """Log speculative precompute of the ACCEPT path (computed, hit, miss, invalidated)."""
+    logger.info(
+        "speculative_precompute",
+        thread_id=thread_id,
+        outcome=outcome,
+        compute_ms=compute_ms,
         timestamp=datetime.utcnow().isoformat()
     )
 
@@ -136,3 +177,13 @@ def log_error(stage_id: str, error: Exception, context: Optional[Dict[str, Any]]
         exc_info=True
     )
 
+
+
+def log_storage_maintenance(job: str, metrics: Dict[str, Any]):
+    """Log a storage maintenance run (compaction, vacuum, archival)."""
+    logger.info(
+        "storage_maintenance",
+        job=job,
+        **metrics,
+        timestamp=datetime.utcnow().isoformat()
+    )
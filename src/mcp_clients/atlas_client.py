@@ -286,12 +286,12 @@ Total: $6000.00""")
             log_mcp_call("ATLAS", "fetch_po", False, duration_ms, str(e))
             raise
     
-    def fetch_grn(self, po_ids: List[str], erp_connector: str = "mock_erp") -> List[Dict[str, Any]]:
+    def fetch_grn(self, purchase_orders: List[Dict[str, Any]], erp_connector: str = "mock_erp") -> List[Dict[str, Any]]:
         """
-        Fetch Goods Received Notes from ERP.
+        Fetch Goods Received Notes for purchase orders from ERP.
         
         Args:
-            po_ids: List of PO IDs
+            purchase_orders: POs returned by fetch_po (po_id and line_items)
             erp_connector: ERP connector name
             
         Returns:
@@ -299,14 +299,24 @@ Total: $6000.00""")
         """
         start_time = time.time()
         try:
-            # Mock GRN fetch
+            # Mock GRN fetch: each PO's own lines, received in full (a PO line may set
+            # `qty_received` to simulate a partial or missing receipt)
             grns = []
-            for po_id in po_ids:
+            for po in purchase_orders:
+                po_id = po.get("po_id")
                 grns.append({
                     "grn_id": f"GRN-{po_id}",
                     "po_id": po_id,
                     "received_date": "2024-01-10",
-                    "status": "RECEIVED"
+                    "status": "RECEIVED",
+                    "line_items": [
+                        {
+                            "desc": line.get("desc"),
+                            "qty_received": line.get("qty_received", line.get("qty", 0)),
+                            "po_id": line.get("po_id", po_id)
+                        }
+                        for line in po.get("line_items", [])
+                    ]
                 })
             
             duration_ms = (time.time() - start_time) * 1000
@@ -1,9 +1,13 @@
 """COMMON MCP client - abilities requiring no external data."""
 
 from typing import Dict, Any, List, Optional
+from datetime import datetime
+import math
 import time
 from src.logging.logger import log_mcp_call
 from src.state.models import VendorProfile, InvoicePayload, Flags
+from src.storage.vendor_master import vendor_master_index
+from src.rules.gl_coding import gl_coding_engine
 
 
 class COMMONClient:
@@ -25,47 +29,75 @@ class COMMONClient:
     
     def normalize_vendor(self, vendor_name: str, tax_id: Optional[str] = None) -> str:
         """
-        Normalize vendor name (remove extra spaces, standardize format).
+        Normalize vendor name to its canonical name in the vendor master.
         
         Args:
             vendor_name: Raw vendor name
             tax_id: Optional tax ID for disambiguation
             
         Returns:
-            Normalized vendor name
+            Canonical vendor name (the raw name if the vendor cannot be resolved)
+        """
+        record = self.resolve_vendor(vendor_name, tax_id)
+        return record["canonical_name"] if record else (vendor_name or "").strip()
+    
+    def resolve_vendor(self, vendor_name: str, tax_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Resolve vendor to its canonical vendor master record.
+        
+        "ACME Corp", "Acme Corporation" and "acme corp." resolve to the same
+        vendor_id. Unknown vendors are registered in the index on first sight.
+        
+        Args:
+            vendor_name: Raw vendor name
+            tax_id: Optional tax ID for disambiguation
+            
+        Returns:
+            Dict with vendor_id, canonical_name and tax_id, or None if the name
+            is blank and the tax ID unknown
         """
         start_time = time.time()
         try:
-            # Simple normalization: strip, title case, remove extra spaces
-            normalized = " ".join(vendor_name.strip().title().split())
+            record = vendor_master_index.resolve_or_register(vendor_name, tax_id)
             
-            # In production, this might use fuzzy matching against vendor DB
             duration_ms = (time.time() - start_time) * 1000
             log_mcp_call("COMMON", "normalize_vendor", True, duration_ms)
             
-            return normalized
+            return record
         except Exception as e:
             duration_ms = (time.time() - start_time) * 1000
             log_mcp_call("COMMON", "normalize_vendor", False, duration_ms, str(e))
             raise
     
-    def compute_flags(self, vendor_profile: VendorProfile, invoice: InvoicePayload) -> Flags:
+    def compute_flags(
+        self,
+        vendor_profile: VendorProfile,
+        invoice: InvoicePayload,
+        vendor_stats: Optional[Dict[str, Any]] = None,
+        min_samples: int = 3
+    ) -> Flags:
         """
-        Compute validation flags (risk, missing info).
+        Compute validation flags (risk, missing info, amount anomalies).
         
         Args:
             vendor_profile: Vendor profile data
             invoice: Invoice payload
+            vendor_stats: Optional running statistics for the vendor
+            min_samples: Minimum invoices before amount anomalies are scored
             
         Returns:
-            Flags dict with missing_info and risk_score
+            Flags dict with missing_info, risk_score, anomalies and amount_zscore
         """
         start_time = time.time()
         try:
             missing_info = []
+            anomalies = []
+            amount_zscore = None
             risk_score = 0.0
             
             # Check for missing information
+            if not vendor_profile.get("vendor_id"):
+                missing_info.append("vendor_name")
             if not invoice.get("vendor_tax_id"):
                 missing_info.append("vendor_tax_id")
             if not invoice.get("line_items") or len(invoice.get("line_items", [])) == 0:
@@ -74,21 +106,62 @@ class COMMONClient:
                 missing_info.append("invoice_date")
             
             # Compute risk score (0-1, higher = riskier)
-            # Factors: missing info, amount, vendor risk
+            # Factors: missing info, amount, vendor risk, deviation from vendor history
             base_risk = len(missing_info) * 0.1
             
+            # Name matches a known vendor registered under another tax ID
+            if vendor_profile.get("tax_id_conflict"):
+                anomalies.append("vendor_tax_id_conflict")
+                base_risk += 0.2
+            
             amount = invoice.get("amount", 0)
             if amount > 100000:
                 base_risk += 0.2
             elif amount > 50000:
                 base_risk += 0.1
             
+            # Amount anomaly against the vendor's running statistics (O(1), no history fetch)
+            if vendor_stats and vendor_stats.get("invoice_count", 0) >= min_samples:
+                stddev = vendor_stats.get("amount_stddev", 0.0)
+                mean = vendor_stats.get("amount_mean", 0.0)
+                if stddev > 0:
+                    amount_zscore = (amount - mean) / stddev
+                elif amount != mean:
+                    amount_zscore = float("inf") if amount > mean else float("-inf")
+                else:
+                    amount_zscore = 0.0
+                
+                if abs(amount_zscore) > 3:
+                    anomalies.append("amount_outlier")
+                    base_risk += 0.2
+                elif abs(amount_zscore) > 2:
+                    anomalies.append("amount_unusual")
+                    base_risk += 0.1
+                
+                # Cadence: invoice arriving far sooner than the vendor's usual interval
+                interval_mean = vendor_stats.get("interval_mean_days", 0.0)
+                last_date = vendor_stats.get("last_invoice_date")
+                if interval_mean > 0 and last_date and invoice.get("invoice_date"):
+                    try:
+                        gap_days = abs((datetime.fromisoformat(invoice["invoice_date"][:10]) -
+                                        datetime.fromisoformat(last_date[:10])).days)
+                        if gap_days < interval_mean * 0.25:
+                            anomalies.append("unusual_cadence")
+                            base_risk += 0.05
+                    except ValueError:
+                        pass
+                
+                if not math.isfinite(amount_zscore):
+                    amount_zscore = None
+            
             vendor_risk = vendor_profile.get("risk_score", 0.5)
             risk_score = min(1.0, base_risk + (vendor_risk * 0.5))
             
             flags = Flags(
                 missing_info=missing_info,
-                risk_score=risk_score
+                risk_score=risk_score,
+                anomalies=anomalies,
+                amount_zscore=amount_zscore
             )
             
             duration_ms = (time.time() - start_time) * 1000
@@ -143,8 +216,10 @@ class COMMONClient:
             invoice_total = sum(item.get("total", 0) for item in invoice_line_items)
             po_total = sum(item.get("total", 0) for item in po_line_items)
             
-            amount_diff = abs(invoice_total - po_total)
+            amount_variance = invoice_total - po_total  # positive when the invoice is over the PO
+            amount_diff = abs(amount_variance)
             amount_diff_pct = (amount_diff / po_total * 100) if po_total > 0 else 100.0
+            amount_variance_pct = math.copysign(amount_diff_pct, amount_variance)
             
             tolerance_exceeded = amount_diff_pct > tolerance_pct
             
@@ -181,7 +256,8 @@ class COMMONClient:
                     "line_item_matches": line_item_matches,
                     "amount_diff": amount_diff,
                     "tolerance_exceeded": tolerance_exceeded,
-                    "amount_diff_pct": amount_diff_pct
+                    "amount_diff_pct": amount_diff_pct,
+                    "amount_variance_pct": amount_variance_pct
                 }
             }
             
@@ -194,37 +270,116 @@ class COMMONClient:
             log_mcp_call("COMMON", "compute_match_score", False, duration_ms, str(e))
             raise
     
+    def build_received_index(self, grns: List[Dict[str, Any]]) -> Dict[tuple, float]:
+        """
+        Precompute received quantity totals per PO line from GRNs.
+        
+        Built once per RETRIEVE result so three-way matching does
+        constant-time lookups per invoice line.
+        
+        Args:
+            grns: Goods Received Notes with line_items (desc, qty_received, po_id)
+            
+        Returns:
+            Dict mapping (po_id, normalized desc) to total received quantity
+        """
+        received_index: Dict[tuple, float] = {}
+        for grn in grns:
+            if grn.get("status", "RECEIVED") != "RECEIVED":
+                continue
+            for line in grn.get("line_items", []):
+                key = (line.get("po_id") or grn.get("po_id"), line.get("desc", "").strip().lower())
+                received_index[key] = received_index.get(key, 0.0) + float(line.get("qty_received", 0) or 0)
+        return received_index
+    
+    def compute_three_way_match(
+        self,
+        invoice_line_items: List[Dict[str, Any]],
+        po_line_items: List[Dict[str, Any]],
+        received_index: Dict[tuple, float],
+        tolerance_pct: float = 5.0,
+        qty_tolerance_pct: float = 0.0
+    ) -> Dict[str, Any]:
+        """
+        Compute 3-way match score between invoice, PO and goods received.
+        
+        The score is the 2-way score. The receipt check is a hard gate, not
+        part of the score: each invoice line matched to a PO line must not
+        invoice more than was received against it (within
+        `qty_tolerance_pct`). Any line over its receipt sets
+        `receipt_exceeded`, and MATCH_TWO_WAY then fails the match whatever
+        the score, so goods never received are not paid without review.
+        
+        Args:
+            invoice_line_items: Invoice line items
+            po_line_items: PO line items, each with the po_id of its PO
+            received_index: Output of build_received_index
+            tolerance_pct: Tolerance percentage for amount matching
+            qty_tolerance_pct: Tolerance percentage for invoiced vs received quantity
+            
+        Returns:
+            Dict with match_score (0-1) and evidence (incl. receipt_matches, receipt_exceeded)
+        """
+        two_way = self.compute_match_score(invoice_line_items, po_line_items, tolerance_pct)
+        start_time = time.time()
+        try:
+            evidence = dict(two_way.get("evidence", {}))
+            if not po_line_items:
+                evidence["receipt_matches"] = []
+                return {"match_score": 0.0, "evidence": evidence}
+            
+            receipt_matches = []
+            for inv_item in invoice_line_items:
+                inv_desc = inv_item.get("desc", "").lower()
+                po_item = next((po for po in po_line_items if inv_desc in po.get("desc", "").lower()), None)
+                if po_item is None:
+                    continue
+                
+                key = (po_item.get("po_id"), po_item.get("desc", "").strip().lower())
+                qty_received = received_index.get(key, 0.0)
+                qty_invoiced = float(inv_item.get("qty", 0) or 0)
+                within_receipt = qty_invoiced <= qty_received * (1 + qty_tolerance_pct / 100.0) + 1e-9
+                
+                receipt_matches.append({
+                    "invoice_desc": inv_item.get("desc"),
+                    "po_id": po_item.get("po_id"),
+                    "qty_invoiced": qty_invoiced,
+                    "qty_received": qty_received,
+                    "within_receipt": within_receipt
+                })
+            
+            evidence["receipt_matches"] = receipt_matches
+            evidence["receipt_exceeded"] = any(not match["within_receipt"] for match in receipt_matches)
+            
+            duration_ms = (time.time() - start_time) * 1000
+            log_mcp_call("COMMON", "compute_three_way_match", True, duration_ms)
+            
+            return {"match_score": two_way.get("match_score", 0.0), "evidence": evidence}
+        except Exception as e:
+            duration_ms = (time.time() - start_time) * 1000
+            log_mcp_call("COMMON", "compute_three_way_match", False, duration_ms, str(e))
+            raise
+    
     def build_accounting_entries(
         self,
         invoice: InvoicePayload,
-        po_data: Optional[Dict[str, Any]] = None
+        po_data: Optional[Dict[str, Any]] = None,
+        vendor_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Build accounting entries (debits/credits).
+        Build accounting entries (debits/credits) with line-level GL coding.
         
         Args:
             invoice: Invoice payload
-            po_data: Optional PO data
+            po_data: Optional PO data (PO lines may carry gl_account)
+            vendor_id: Optional canonical vendor ID for vendor GL defaults
             
         Returns:
-            List of accounting entries
+            List of accounting entries (AP credit plus debits per GL account)
         """
         start_time = time.time()
         try:
-            entries = [
-                {
-                    "account": "Accounts Payable",
-                    "debit": 0,
-                    "credit": invoice.get("amount", 0),
-                    "description": f"Invoice {invoice.get('invoice_id')} - AP"
-                },
-                {
-                    "account": "Expense Account",
-                    "debit": invoice.get("amount", 0),
-                    "credit": 0,
-                    "description": f"Invoice {invoice.get('invoice_id')} - Expense"
-                }
-            ]
+            entries = gl_coding_engine.build_entries(invoice, vendor_id, po_data)
             
             duration_ms = (time.time() - start_time) * 1000
             log_mcp_call("COMMON", "build_accounting_entries", True, duration_ms)
@@ -234,4 +389,3 @@ class COMMONClient:
             duration_ms = (time.time() - start_time) * 1000
             log_mcp_call("COMMON", "build_accounting_entries", False, duration_ms, str(e))
             raise
-
@@ -4,6 +4,7 @@ import time
 from typing import Dict, Any, Optional
 from src.state.models import WorkflowState, ApproveOutput
 from src.logging.logger import log_node_entry, log_node_exit, log_error, log_state_update
+from src.rules.approval_policy import approval_policy_engine
 
 
 def approve_node(state: WorkflowState, config: Dict[str, Any], runtime: Dict[str, Any]) -> Dict[str, Any]:
@@ -25,21 +26,29 @@ def approve_node(state: WorkflowState, config: Dict[str, Any], runtime: Dict[str
         log_node_entry("APPROVE", thread_id, state)
         
         invoice_payload = state.get("invoice_payload", {})
-        amount = invoice_payload.get("amount", 0)
+        prepare_output = state.get("prepare", {})
+        vendor_profile = prepare_output.get("vendor_profile", {})
+        flags = prepare_output.get("flags", {})
         
-        # Approval policy: auto-approve if amount < 10000, else escalate
-        approval_threshold = 10000.0
+        # Primary GL account: the largest debit line from RECONCILE
+        accounting_entries = state.get("reconcile", {}).get("accounting_entries", [])
+        debit_entries = [entry for entry in accounting_entries if entry.get("debit", 0) > 0]
+        gl_account = max(debit_entries, key=lambda entry: entry["debit"])["account"] if debit_entries else None
         
-        if amount < approval_threshold:
-            approval_status = "AUTO_APPROVED"
-            approver_id = None
-        else:
-            approval_status = "REQUIRES_APPROVAL"
-            approver_id = "approver_001"  # In production, assign to approver
+        # Evaluate compiled approval policy (rules from workflow.json / approval_rules table)
+        decision = approval_policy_engine.evaluate({
+            "amount": invoice_payload.get("amount", 0),
+            "currency": invoice_payload.get("currency"),
+            "entity": invoice_payload.get("entity"),
+            "vendor_id": vendor_profile.get("vendor_id"),
+            "gl_account": gl_account,
+            "risk_score": flags.get("risk_score")
+        })
         
         output = ApproveOutput(
-            approval_status=approval_status,
-            approver_id=approver_id
+            approval_status=decision["approval_status"],
+            approver_id=decision["approver_id"],
+            policy_rule_id=decision["rule_id"]
         )
         
         duration_ms = (time.time() - start_time) * 1000
@@ -2,19 +2,24 @@
 
 import uuid
 import time
-import json
 from datetime import datetime
 from typing import Dict, Any
 from src.state.models import WorkflowState, CheckpointHitlOutput
 from src.logging.logger import log_node_entry, log_node_exit, log_error, log_checkpoint_created, log_state_update
 from src.tools.bigtool_picker import bigtool_picker
+from src.storage.decision_memo import hitl_decision_memo, AUTO_REVIEWER_ID
+from src.graph.speculation import speculative_precompute
+from src.graph.sla_scheduler import hitl_sla_scheduler
 
 
 def checkpoint_hitl_node(state: WorkflowState, config: Dict[str, Any], runtime: Dict[str, Any]) -> Dict[str, Any]:
     """
     CHECKPOINT_HITL node: Create checkpoint and pause workflow.
     
-    This node is only executed if match_result == "FAILED".
+    This node is only executed if match_result == "FAILED". If reviewers have
+    consistently accepted holds with the same mismatch signature (see
+    HitlDecisionMemo), the hold is recorded as auto-accepted and the workflow
+    continues to HITL_DECISION without pausing.
     
     Args:
         state: Current workflow state
@@ -43,6 +48,11 @@ def checkpoint_hitl_node(state: WorkflowState, config: Dict[str, Any], runtime:
         vendor_name = invoice_payload.get("vendor_name", "unknown")
         amount = invoice_payload.get("amount", 0)
         
+        # Review queue priority inputs (due date, then amount, then vendor risk)
+        parsed_dates = state.get("understand", {}).get("parsed_invoice", {}).get("parsed_dates", {})
+        due_date = parsed_dates.get("due_date") or invoice_payload.get("due_date")
+        risk_score = state.get("prepare", {}).get("flags", {}).get("risk_score", 0.0)
+        
         # Extract detailed mismatch information from match_two_way stage
         mismatch_reason = "Match failed - insufficient score"
         failed_stage = "MATCH_TWO_WAY"
@@ -72,6 +82,13 @@ def checkpoint_hitl_node(state: WorkflowState, config: Dict[str, Any], runtime:
                     if match_rate < 100:
                         reasons.append(f"Line item mismatch: {matched_items}/{total_invoice_items} items matched ({match_rate:.1f}%)")
                 
+                # Receipt mismatch (three-way match)
+                receipt_shortfalls = [
+                    m for m in match_evidence.get("receipt_matches", []) if not m.get("within_receipt")
+                ]
+                if receipt_shortfalls:
+                    reasons.append(f"Receipt mismatch: {len(receipt_shortfalls)} line(s) invoiced above received quantity")
+                
                 # Match score
                 match_score = match_output.get("match_score", 0.0)
                 reasons.append(f"Match score: {match_score:.2%} (threshold: {state.get('config', {}).get('match_threshold', 0.90):.0%})")
@@ -90,18 +107,16 @@ def checkpoint_hitl_node(state: WorkflowState, config: Dict[str, Any], runtime:
             pool_hint=["postgres", "sqlite", "dynamodb"]
         )
         
-        # Serialize state for storage
-        state_blob = json.dumps({
-            "workflow_state": state,
-            "timestamp": datetime.utcnow().isoformat()
-        })
-        
-        # In production, persist to DB using the selected tool
-        # For demo, this will be handled by the checkpoint store
+        # Full state is persisted by the LangGraph checkpointer; the review queue
+        # only references the thread (graph checkpoint id is recorded once the pause is saved)
         
         # Generate review URL
         review_url = f"/human-review/{checkpoint_id}"
         
+        # Recurring mismatch patterns that reviewers always accept are resolved from the memo
+        mismatch_signature = hitl_decision_memo.signature(state)
+        memo = hitl_decision_memo.match(mismatch_signature)
+        
         # Prepare checkpoint data for human review queue
         checkpoint_data = {
             "checkpoint_id": checkpoint_id,
@@ -113,9 +128,20 @@ def checkpoint_hitl_node(state: WorkflowState, config: Dict[str, Any], runtime:
             "mismatch_reason": mismatch_reason,
             "failed_stage": failed_stage,
             "review_url": review_url,
-            "state_blob": state_blob,
-            "thread_id": thread_id
+            "thread_id": thread_id,
+            "due_date": due_date,
+            "risk_score": risk_score,
+            "mismatch_signature": mismatch_signature
         }
+        if memo:
+            checkpoint_data.update({
+                "decision": "ACCEPT",
+                "reviewer_id": AUTO_REVIEWER_ID,
+                "notes": (
+                    f"Auto-accepted: pattern accepted {memo['accept_count']}x, "
+                    f"rejected {memo['reject_count']}x ({memo['confidence']:.0%})"
+                )
+            })
         
         # Store checkpoint in human review repository
         if "human_review_repo" in runtime:
@@ -124,11 +150,31 @@ def checkpoint_hitl_node(state: WorkflowState, config: Dict[str, Any], runtime:
         output = CheckpointHitlOutput(
             cp_id=checkpoint_id,
             review_url=review_url,
-            paused_reason="MATCH_FAILED_HITL"
+            paused_reason="MATCH_FAILED_HITL",
+            mismatch_signature=mismatch_signature,
+            auto_resolved=bool(memo)
         )
         
+        if memo:
+            # HITL_DECISION picks the decision up from the review queue row
+            hitl_decision_memo.record_auto_resolution(checkpoint_id, thread_id, invoice_id, memo)
+            duration_ms = (time.time() - start_time) * 1000
+            log_node_exit("CHECKPOINT_HITL", thread_id, ["checkpoint", "paused"], duration_ms)
+            log_state_update("CHECKPOINT_HITL", {"checkpoint": output})
+            return {
+                "checkpoint": output,
+                "paused": False,
+                "hitl_checkpoint_id": checkpoint_id,
+                "workflow_status": "IN_PROGRESS"
+            }
+        
         log_checkpoint_created(checkpoint_id, invoice_id, "MATCH_FAILED_HITL", thread_id or "unknown")
         
+        # Review SLA / due-date escalation timers, and the ACCEPT path (RECONCILE, APPROVE)
+        # prepared while the reviewer decides
+        hitl_sla_scheduler.schedule_review(checkpoint_data)
+        speculative_precompute.submit(state)
+        
         duration_ms = (time.time() - start_time) * 1000
         log_node_exit("CHECKPOINT_HITL", thread_id, ["checkpoint", "paused", "paused_reason"], duration_ms)
         log_state_update("CHECKPOINT_HITL", {"checkpoint": output})
@@ -91,6 +91,18 @@ def complete_node(state: WorkflowState, config: Dict[str, Any], runtime: Dict[st
         # In production, persist audit log to DB
         # For demo, just log it
         
+        # Fold completed invoice into the vendor's running statistics
+        vendor_stats_repo = runtime.get("vendor_stats_repo")
+        vendor_id = state.get("prepare", {}).get("vendor_profile", {}).get("vendor_id")
+        if status == WorkflowStatus.COMPLETED.value and vendor_stats_repo and vendor_id:
+            invoice_payload = state.get("invoice_payload", {})
+            vendor_stats_repo.record_invoice(
+                vendor_id,
+                invoice_payload.get("invoice_id") or thread_id,
+                invoice_payload.get("amount", 0),
+                invoice_payload.get("invoice_date")
+            )
+        
         output = CompleteOutput(
             final_payload=final_payload,
             audit_log=audit_log,
@@ -15,7 +15,7 @@ def hitl_decision_node(state: WorkflowState, config: Dict[str, Any], runtime: Di
     Args:
         state: Current workflow state (loaded from checkpoint)
         config: Node configuration
-        runtime: Runtime context (includes human decision data)
+        runtime: Runtime context (review queue repository for the stored decision)
         
     Returns:
         State updates with hitl decision output
@@ -26,21 +26,21 @@ def hitl_decision_node(state: WorkflowState, config: Dict[str, Any], runtime: Di
     try:
         log_node_entry("HITL_DECISION", thread_id, state)
         
-        # Get human decision from runtime context or state
-        # This is set by the API when resuming workflow
-        human_decision_data = runtime.get("human_decision", {})
+        checkpoint_id = state.get("hitl_checkpoint_id", "") or state.get("checkpoint", {}).get("cp_id", "") or state.get("checkpoint", {}).get("checkpoint_id", "")
         
-        # Check if decision already exists in state (from previous execution)
+        # The API writes the decision into state (hitl channel) before resuming; the
+        # review queue row is the durable fallback, so any API worker can resume the thread
         existing_hitl = state.get("hitl", {})
         if existing_hitl and existing_hitl.get("human_decision"):
             decision = existing_hitl.get("human_decision")
             reviewer_id = existing_hitl.get("reviewer_id", "unknown")
         else:
-            decision = human_decision_data.get("decision", "").upper()
-            reviewer_id = human_decision_data.get("reviewer_id", "unknown")
-        
-        notes = human_decision_data.get("notes", "")
-        checkpoint_id = state.get("hitl_checkpoint_id", "") or state.get("checkpoint", {}).get("cp_id", "") or state.get("checkpoint", {}).get("checkpoint_id", "")
+            review_row = {}
+            human_review_repo = runtime.get("human_review_repo")
+            if human_review_repo and checkpoint_id:
+                review_row = human_review_repo.get_checkpoint(checkpoint_id) or {}
+            decision = (review_row.get("decision") or "").upper()
+            reviewer_id = review_row.get("reviewer_id") or "unknown"
         
         # If no decision yet, return empty (workflow will pause/wait)
         if not decision or decision not in [HumanDecision.ACCEPT.value, HumanDecision.REJECT.value]:
@@ -29,6 +29,7 @@ def match_two_way_node(state: WorkflowState, config: Dict[str, Any], runtime: Di
         workflow_config = state.get("config", {})
         match_threshold = workflow_config.get("match_threshold", 0.90)
         tolerance_pct = workflow_config.get("two_way_tolerance_pct", 5.0)
+        match_mode = workflow_config.get("match_mode", "two_way")
         
         prepare_output = state.get("prepare", {})
         normalized_invoice = prepare_output.get("normalized_invoice", {})
@@ -42,18 +43,35 @@ def match_two_way_node(state: WorkflowState, config: Dict[str, Any], runtime: Di
         for po in matched_pos:
             po_line_items.extend(po.get("line_items", []))
         
-        # Compute match score via COMMON
-        match_result_data = common_client.compute_match_score(
-            invoice_line_items,
-            po_line_items,
-            tolerance_pct
-        )
+        # Compute match score via COMMON (three-way adds the GRN receipt check)
+        if match_mode == "three_way":
+            received_index = common_client.build_received_index(retrieve_output.get("matched_grns", []))
+            # Receipts are keyed by PO: lines without their own po_id take their PO's
+            # (as GRN lines take their GRN's in build_received_index)
+            po_line_items = [
+                {**line, "po_id": line.get("po_id") or po.get("po_id")}
+                for po in matched_pos
+                for line in po.get("line_items", [])
+            ]
+            match_result_data = common_client.compute_three_way_match(
+                invoice_line_items,
+                po_line_items,
+                received_index,
+                tolerance_pct,
+                workflow_config.get("three_way_qty_tolerance_pct", 0.0)
+            )
+        else:
+            match_result_data = common_client.compute_match_score(
+                invoice_line_items,
+                po_line_items,
+                tolerance_pct
+            )
         
         match_score = match_result_data.get("match_score", 0.0)
         match_evidence = match_result_data.get("evidence", {})
         
-        # Determine match result
-        if match_score >= match_threshold:
+        # Determine match result (invoicing more than was received always fails)
+        if match_score >= match_threshold and not match_evidence.get("receipt_exceeded"):
             match_result = MatchResult.MATCHED.value
         else:
             match_result = MatchResult.FAILED.value
@@ -62,7 +80,8 @@ def match_two_way_node(state: WorkflowState, config: Dict[str, Any], runtime: Di
             match_score=match_score,
             match_result=match_result,
             tolerance_pct=tolerance_pct,
-            match_evidence=match_evidence
+            match_evidence=match_evidence,
+            match_mode=match_mode
         )
         
         duration_ms = (time.time() - start_time) * 1000
@@ -36,8 +36,14 @@ def prepare_node(state: WorkflowState, config: Dict[str, Any], runtime: Dict[str
         vendor_name = invoice_payload.get("vendor_name", "")
         vendor_tax_id = invoice_payload.get("vendor_tax_id", "")
         
-        # Normalize vendor via COMMON
-        normalized_name = common_client.normalize_vendor(vendor_name, vendor_tax_id)
+        # Resolve vendor to its canonical vendor master record via COMMON; a blank name
+        # with an unknown tax ID stays unresolved and is flagged as missing info
+        vendor_record = common_client.resolve_vendor(vendor_name, vendor_tax_id) or {
+            "vendor_id": None,
+            "canonical_name": (vendor_name or "").strip(),
+            "tax_id": None
+        }
+        normalized_name = vendor_record["canonical_name"]
         
         # Select enrichment tool via Bigtool
         enrichment_tool = bigtool_picker.select(
@@ -53,15 +59,24 @@ def prepare_node(state: WorkflowState, config: Dict[str, Any], runtime: Dict[str
         )
         
         vendor_profile = VendorProfile(
+            vendor_id=vendor_record["vendor_id"],
             normalized_name=enriched_data.get("normalized_name", normalized_name),
-            tax_id=enriched_data.get("tax_id", vendor_tax_id),
+            tax_id=vendor_record.get("tax_id") or enriched_data.get("tax_id", vendor_tax_id),
             enrichment_meta=enriched_data.get("enrichment_meta", {}),
             credit_score=enriched_data.get("enrichment_meta", {}).get("credit_score"),
-            risk_score=enriched_data.get("enrichment_meta", {}).get("risk_score")
+            risk_score=enriched_data.get("enrichment_meta", {}).get("risk_score"),
+            tax_id_conflict=vendor_record.get("tax_id_conflict")
         )
         
+        # Look up the vendor's running statistics (single-row read, no ERP history fetch)
+        vendor_stats = None
+        vendor_stats_repo = runtime.get("vendor_stats_repo")
+        if vendor_stats_repo and vendor_record["vendor_id"]:
+            vendor_stats = vendor_stats_repo.get(vendor_record["vendor_id"])
+        
         # Compute flags via COMMON
-        flags = common_client.compute_flags(vendor_profile, invoice_payload)
+        min_samples = state.get("config", {}).get("vendor_stats_min_samples", 3)
+        flags = common_client.compute_flags(vendor_profile, invoice_payload, vendor_stats, min_samples)
         
         # Normalize invoice
         normalized_invoice = {
@@ -76,6 +91,11 @@ def prepare_node(state: WorkflowState, config: Dict[str, Any], runtime: Dict[str
             flags=flags
         )
         
+        # Add the normalized vendor to the invoice's search document
+        search_index = runtime.get("search_index")
+        if search_index:
+            search_index.index_state("PREPARE", {**state, "prepare": output})
+        
         duration_ms = (time.time() - start_time) * 1000
         log_node_exit("PREPARE", thread_id, ["prepare"], duration_ms)
         log_state_update("PREPARE", {"prepare": output})
@@ -33,8 +33,10 @@ def reconcile_node(state: WorkflowState, config: Dict[str, Any], runtime: Dict[s
         # Get first PO as reference (in production, use best match)
         po_data = matched_pos[0] if matched_pos else None
         
-        # Build accounting entries via COMMON
-        accounting_entries = common_client.build_accounting_entries(invoice_payload, po_data)
+        vendor_id = state.get("prepare", {}).get("vendor_profile", {}).get("vendor_id")
+        
+        # Build line-level GL coded accounting entries via COMMON
+        accounting_entries = common_client.build_accounting_entries(invoice_payload, po_data, vendor_id)
         
         # Build reconciliation report
         reconciliation_report = {
@@ -42,6 +44,7 @@ def reconcile_node(state: WorkflowState, config: Dict[str, Any], runtime: Dict[s
             "invoice_amount": invoice_payload.get("amount"),
             "matched_pos": [po.get("po_id") for po in matched_pos],
             "accounting_entries_count": len(accounting_entries),
+            "gl_accounts": [entry["account"] for entry in accounting_entries if entry.get("debit", 0) > 0],
             "reconciled_at": time.strftime("%Y-%m-%dT%H:%M:%SZ")
         }
         
@@ -44,19 +44,29 @@ def retrieve_node(state: WorkflowState, config: Dict[str, Any], runtime: Dict[st
         # Fetch POs via ATLAS
         matched_pos = atlas_client.fetch_po(po_references, erp_connector=erp_tool.name)
         
-        # Extract PO IDs for GRN lookup
-        po_ids = [po.get("po_id") for po in matched_pos if po.get("po_id")]
+        # Fetch GRNs for the matched POs via ATLAS
+        matched_grns = atlas_client.fetch_grn(
+            [po for po in matched_pos if po.get("po_id")], erp_connector=erp_tool.name
+        )
         
-        # Fetch GRNs via ATLAS
-        matched_grns = atlas_client.fetch_grn(po_ids, erp_connector=erp_tool.name)
+        # Use running vendor statistics when warm; only cold vendors pull history from ERP
+        history = []
+        history_summary = None
+        vendor_stats_repo = runtime.get("vendor_stats_repo")
+        vendor_id = vendor_profile.get("vendor_id")
+        min_samples = state.get("config", {}).get("vendor_stats_min_samples", 3)
+        if vendor_stats_repo and vendor_id:
+            history_summary = vendor_stats_repo.get(vendor_id)
         
-        # Fetch history via ATLAS
-        history = atlas_client.fetch_history(normalized_vendor_name, erp_connector=erp_tool.name)
+        if not history_summary or history_summary.get("invoice_count", 0) < min_samples:
+            # Fetch history via ATLAS
+            history = atlas_client.fetch_history(normalized_vendor_name, erp_connector=erp_tool.name)
         
         output = RetrieveOutput(
             matched_pos=matched_pos,
             matched_grns=matched_grns,
-            history=history
+            history=history,
+            history_summary=history_summary
         )
         
         duration_ms = (time.time() - start_time) * 1000
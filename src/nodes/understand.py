@@ -8,6 +8,9 @@ from src.logging.logger import log_node_entry, log_node_exit, log_error, log_sta
 from src.tools.bigtool_picker import bigtool_picker
 from src.mcp_clients.atlas_client import ATLASClient
 
+# Characters of OCR text kept inline in state when the full text is offloaded
+TEXT_PREVIEW_CHARS = 200
+
 
 def understand_node(state: WorkflowState, config: Dict[str, Any], runtime: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -49,6 +52,12 @@ def understand_node(state: WorkflowState, config: Dict[str, Any], runtime: Dict[
                 }
             )
             output = UnderstandOutput(parsed_invoice=parsed_invoice)
+            
+            # Index for search: only the line item descriptions are text here
+            search_index = runtime.get("search_index")
+            if search_index:
+                search_index.index_state("UNDERSTAND", {**state, "understand": output}, "")
+            
             duration_ms = (time.time() - start_time) * 1000
             log_node_exit("UNDERSTAND", thread_id, ["understand"], duration_ms)
             return {"understand": output}
@@ -104,6 +113,19 @@ def understand_node(state: WorkflowState, config: Dict[str, Any], runtime: Dict[
             parsed_dates=parsed_dates
         )
         
+        # Index for search while the full OCR text is at hand
+        search_index = runtime.get("search_index")
+        if search_index:
+            search_index.index_state("UNDERSTAND", {**state, "understand": {"parsed_invoice": parsed_invoice}}, invoice_text)
+        
+        # Move large OCR text out of state (every later checkpoint would copy it);
+        # state keeps a short preview plus the content hash
+        blob_store = runtime.get("blob_store")
+        if blob_store and blob_store.should_offload(invoice_text):
+            parsed_invoice["invoice_text_ref"] = blob_store.put(invoice_text)
+            parsed_invoice["invoice_text_bytes"] = len(invoice_text.encode("utf-8"))
+            parsed_invoice["invoice_text"] = invoice_text[:TEXT_PREVIEW_CHARS]
+        
         output = UnderstandOutput(parsed_invoice=parsed_invoice)
         
         duration_ms = (time.time() - start_time) * 1000
@@ -0,0 +1 @@
+"""Rules module."""
@@ -0,0 +1,287 @@
+"""Compiled approval policy engine."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+
+# Exact-match dimensions a rule may constrain (in addition to the amount interval)
+POLICY_DIMENSIONS = ("vendor_id", "entity", "gl_account", "currency", "risk_band")
+
+DEFAULT_RISK_BANDS = {"low": 0.0, "medium": 0.4, "high": 0.7}
+
+DEFAULT_OUTCOME = {
+    "approval_status": "REQUIRES_APPROVAL",
+    "approver_id": "approver_001",
+    "rule_id": "default"
+}
+
+
+class CompiledPolicy:
+    """
+    Approval rules compiled into per-dimension decision tables.
+
+    Each rule is one bit in an integer bitmask (bit order == priority order).
+    Every exact-match dimension maps a value to the mask of rules requiring it,
+    plus a wildcard mask of rules that don't constrain the dimension. The amount
+    dimension is split into elementary intervals at every rule boundary, each
+    holding the mask of rules covering it. Evaluation ANDs one mask per dimension
+    and takes the lowest set bit, independent of the number of rules.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], default: Dict[str, Any], risk_bands: Dict[str, float]):
+        """
+        Compile rules.
+
+        Args:
+            rules: Rule dicts (id, priority, match, approval_status, approver_id)
+            default: Outcome used when no rule matches
+            risk_bands: Band name -> lower bound of risk_score
+        """
+        self.rules = sorted(
+            [rule for rule in rules if rule.get("enabled", True)],
+            key=lambda rule: rule.get("priority", 1000)
+        )
+        self.default = {**DEFAULT_OUTCOME, **(default or {})}
+        self.risk_bands = sorted((risk_bands or DEFAULT_RISK_BANDS).items(), key=lambda item: item[1])
+        self._band_bounds = [bound for _, bound in self.risk_bands]
+
+        all_mask = (1 << len(self.rules)) - 1
+        self.tables: Dict[str, Dict[Any, int]] = {dimension: {} for dimension in POLICY_DIMENSIONS}
+        self.wildcards: Dict[str, int] = {dimension: 0 for dimension in POLICY_DIMENSIONS}
+
+        boundaries = set()
+        for bit, rule in enumerate(self.rules):
+            match = rule.get("match", {})
+            for dimension in POLICY_DIMENSIONS:
+                values = match.get(dimension)
+                if values is None:
+                    self.wildcards[dimension] |= 1 << bit
+                    continue
+                for value in values if isinstance(values, list) else [values]:
+                    self.tables[dimension][value] = self.tables[dimension].get(value, 0) | (1 << bit)
+            if match.get("amount_min") is not None:
+                boundaries.add(float(match["amount_min"]))
+            if match.get("amount_max") is not None:
+                boundaries.add(float(match["amount_max"]))
+
+        # Elementary amount intervals: (-inf, b0), [b0, b1), ..., [bn, +inf)
+        self.amount_bounds = sorted(boundaries)
+        self.amount_masks = []
+        for index in range(len(self.amount_bounds) + 1):
+            low = self.amount_bounds[index - 1] if index > 0 else float("-inf")
+            mask = 0
+            for bit, rule in enumerate(self.rules):
+                match = rule.get("match", {})
+                rule_min = match.get("amount_min")
+                rule_max = match.get("amount_max")
+                if (rule_min is None or low >= float(rule_min)) and (rule_max is None or low < float(rule_max)):
+                    mask |= 1 << bit
+            self.amount_masks.append(mask & all_mask)
+
+    def risk_band(self, risk_score: Optional[float]) -> Optional[str]:
+        """Map a risk score to its configured band name."""
+        if risk_score is None or not self.risk_bands:
+            return None
+        index = bisect_right(self._band_bounds, risk_score) - 1
+        return self.risk_bands[max(index, 0)][0]
+
+    def evaluate(self, facts: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Evaluate an invoice's facts against the compiled rules.
+
+        Args:
+            facts: Dict with amount, risk_score and any of POLICY_DIMENSIONS
+
+        Returns:
+            Outcome dict with approval_status, approver_id and rule_id
+        """
+        facts = dict(facts)
+        if facts.get("risk_band") is None:
+            facts["risk_band"] = self.risk_band(facts.get("risk_score"))
+
+        mask = self.amount_masks[bisect_right(self.amount_bounds, float(facts.get("amount") or 0))]
+        for dimension in POLICY_DIMENSIONS:
+            if not mask:
+                break
+            mask &= self.tables[dimension].get(facts.get(dimension), 0) | self.wildcards[dimension]
+
+        if not mask:
+            return dict(self.default)
+
+        rule = self.rules[(mask & -mask).bit_length() - 1]
+        return {
+            "approval_status": rule.get("approval_status", self.default["approval_status"]),
+            "approver_id": rule.get("approver_id"),
+            "rule_id": rule.get("id")
+        }
+
+
+class ApprovalPolicyEngine:
+    """
+    Approval policy engine with hot reload.
+
+    Rules come from the `approval_policy` section of workflow.json and from the
+    optional `approval_rules` table. Sources are checked for changes at most
+    every `reload_interval_s` seconds and recompiled without a restart. Table
+    changes are detected by a version counter that triggers bump on every
+    insert, update and delete of `approval_rules`.
+    """
+
+    def __init__(self, config_path: Optional[str] = None, db_path: Optional[str] = None, reload_interval_s: float = 2.0):
+        """
+        Initialize engine.
+
+        Args:
+            config_path: Path to workflow.json (optional)
+            db_path: SQLite database path holding `approval_rules` (optional)
+            reload_interval_s: Minimum seconds between change checks
+        """
+        self.config_path = Path(config_path) if config_path else Path(__file__).parent.parent.parent / "workflow.json"
+        self.db_path = db_path
+        self.reload_interval_s = reload_interval_s
+        self._policy: Optional[CompiledPolicy] = None
+        self._source_version: Optional[Tuple[Any, ...]] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, config_path: Optional[str] = None, db_path: Optional[str] = None):
+        """
+        Point the engine at its rule sources and force a reload.
+
+        Args:
+            config_path: Path to workflow.json (optional)
+            db_path: SQLite database path holding `approval_rules` (optional)
+        """
+        if config_path:
+            self.config_path = Path(config_path)
+        self.db_path = db_path
+        if self.db_path:
+            self._init_db()
+        self._policy = None
+        self._source_version = None
+
+    def _init_db(self):
+        """Initialize approval rules table."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS approval_rules (
+                rule_id TEXT PRIMARY KEY,
+                priority INTEGER NOT NULL DEFAULT 1000,
+                match_json TEXT NOT NULL DEFAULT '{}',
+                approval_status TEXT NOT NULL,
+                approver_id TEXT,
+                enabled INTEGER NOT NULL DEFAULT 1,
+                updated_at TEXT
+            )
+        """)
+
+        # Change counter for hot reload, bumped by triggers on every write to approval_rules
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS approval_rules_version (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("INSERT OR IGNORE INTO approval_rules_version (id, version) VALUES (1, 0)")
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS approval_rules_version_{event.lower()}
+                AFTER {event} ON approval_rules
+                BEGIN
+                    UPDATE approval_rules_version SET version = version + 1 WHERE id = 1;
+                END
+            """)
+
+        conn.commit()
+        conn.close()
+
+    def _read_source_version(self) -> Tuple[Any, ...]:
+        """Cheap fingerprint of the rule sources (file mtime, table version counter)."""
+        try:
+            file_version = os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            file_version = None
+
+        table_version = None
+        if self.db_path:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute("SELECT version FROM approval_rules_version WHERE id = 1")
+            table_version = cursor.fetchone()[0]
+            conn.close()
+
+        return (file_version, table_version)
+
+    def _load_rules(self) -> CompiledPolicy:
+        """Load rules from all sources and compile them."""
+        section = {}
+        if self.config_path.exists():
+            with open(self.config_path, "r") as f:
+                section = json.load(f).get("approval_policy", {})
+
+        rules = list(section.get("rules", []))
+
+        if self.db_path:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT rule_id, priority, match_json, approval_status, approver_id, enabled
+                FROM approval_rules
+            """)
+            for row in cursor.fetchall():
+                rules.append({
+                    "id": row["rule_id"],
+                    "priority": row["priority"],
+                    "match": json.loads(row["match_json"] or "{}"),
+                    "approval_status": row["approval_status"],
+                    "approver_id": row["approver_id"],
+                    "enabled": bool(row["enabled"])
+                })
+            conn.close()
+
+        return CompiledPolicy(rules, section.get("default", {}), section.get("risk_bands", DEFAULT_RISK_BANDS))
+
+    def get_policy(self) -> CompiledPolicy:
+        """Get the compiled policy, recompiling if the sources changed."""
+        now = time.monotonic()
+        if self._policy is not None and now - self._last_check < self.reload_interval_s:
+            return self._policy
+
+        with self._lock:
+            self._last_check = now
+            version = self._read_source_version()
+            if self._policy is None or version != self._source_version:
+                self._policy = self._load_rules()
+                self._source_version = version
+
+        return self._policy
+
+    def source_version(self) -> Tuple[Any, ...]:
+        """Fingerprint of the rule sources the current policy was compiled from."""
+        self.get_policy()
+        return self._source_version
+
+    def evaluate(self, facts: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Evaluate approval policy for an invoice.
+
+        Args:
+            facts: Dict with amount, risk_score and any of POLICY_DIMENSIONS
+
+        Returns:
+            Outcome dict with approval_status, approver_id and rule_id
+        """
+        return self.get_policy().evaluate(facts)
+
+
+# Global instance (configured by build_invoice_graph)
+approval_policy_engine = ApprovalPolicyEngine()
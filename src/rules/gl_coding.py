@@ -0,0 +1,254 @@
+"""Rule-driven GL coding engine for accounting entries."""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def normalize_description(description: Optional[str]) -> str:
+    """Normalize a line description for lookup (lowercase tokens joined by spaces)."""
+    return " ".join(_TOKEN_PATTERN.findall((description or "").lower()))
+
+
+class CompiledGLTables:
+    """
+    GL mapping tables precompiled into hash lookups.
+
+    Lookup precedence for each invoice line:
+    1. GL account carried on the matching PO line (or `po_line_accounts`)
+    2. Exact normalized description (`description_exact`)
+    3. First description token found in `description_keywords`
+    4. Vendor default (`vendor_defaults`, keyed by vendor_id or vendor name)
+    5. `default_expense_account`
+    """
+
+    def __init__(self, section: Dict[str, Any]):
+        """
+        Compile GL coding tables.
+
+        Args:
+            section: `gl_coding` section of workflow.json
+        """
+        self.ap_account = section.get("ap_account", "Accounts Payable")
+        self.default_account = section.get("default_expense_account", "Expense Account")
+        self.description_exact = {
+            normalize_description(desc): account
+            for desc, account in section.get("description_exact", {}).items()
+        }
+        self.keywords = {
+            keyword.lower(): account
+            for keyword, account in section.get("description_keywords", {}).items()
+        }
+        self.vendor_defaults = {
+            key if key.startswith("VND-") else normalize_description(key): account
+            for key, account in section.get("vendor_defaults", {}).items()
+        }
+        self.po_line_accounts: Dict[Tuple[str, str], str] = {}
+        for po_id, lines in section.get("po_line_accounts", {}).items():
+            for desc, account in lines.items():
+                self.po_line_accounts[(po_id, normalize_description(desc))] = account
+
+
+class GLCodingEngine:
+    """GL coding engine reading `gl_coding` from workflow.json, recompiled on change."""
+
+    def __init__(self, config_path: Optional[str] = None, reload_interval_s: float = 2.0):
+        """
+        Initialize engine.
+
+        Args:
+            config_path: Path to workflow.json (optional)
+            reload_interval_s: Minimum seconds between change checks
+        """
+        self.config_path = Path(config_path) if config_path else Path(__file__).parent.parent.parent / "workflow.json"
+        self.reload_interval_s = reload_interval_s
+        self._tables: Optional[CompiledGLTables] = None
+        self._source_version = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, config_path: Optional[str] = None):
+        """Point the engine at a workflow.json and force a reload."""
+        if config_path:
+            self.config_path = Path(config_path)
+        self._tables = None
+        self._source_version = None
+
+    def get_tables(self) -> CompiledGLTables:
+        """Get compiled tables, recompiling if workflow.json changed."""
+        now = time.monotonic()
+        if self._tables is not None and now - self._last_check < self.reload_interval_s:
+            return self._tables
+
+        with self._lock:
+            self._last_check = now
+            try:
+                version = os.stat(self.config_path).st_mtime_ns
+            except OSError:
+                version = None
+            if self._tables is None or version != self._source_version:
+                section = {}
+                if version is not None:
+                    with open(self.config_path, "r") as f:
+                        section = json.load(f).get("gl_coding", {})
+                self._tables = CompiledGLTables(section)
+                self._source_version = version
+
+        return self._tables
+
+    def source_version(self) -> Optional[int]:
+        """Fingerprint (workflow.json mtime) of the tables currently in use."""
+        self.get_tables()
+        return self._source_version
+
+    def code_lines(
+        self,
+        line_items: List[Dict[str, Any]],
+        vendor_id: Optional[str] = None,
+        vendor_name: Optional[str] = None,
+        po_data: Optional[Dict[str, Any]] = None
+    ) -> List[str]:
+        """
+        Assign a GL account to every invoice line in one pass.
+
+        Args:
+            line_items: Invoice line items
+            vendor_id: Canonical vendor ID (optional)
+            vendor_name: Vendor name (optional, used if no vendor_id rule exists)
+            po_data: Matched PO (optional), whose lines may carry `gl_account`
+
+        Returns:
+            GL account per line, in line order
+        """
+        tables = self.get_tables()
+        keywords = tables.keywords
+        description_exact = tables.description_exact
+
+        # Per-invoice lookups resolved once, not per line
+        vendor_account = (
+            tables.vendor_defaults.get(vendor_id or "")
+            or tables.vendor_defaults.get(normalize_description(vendor_name))
+            or tables.default_account
+        )
+        po_accounts: Dict[str, str] = {}
+        if po_data:
+            po_id = po_data.get("po_id", "")
+            for po_line in po_data.get("line_items", []):
+                desc = normalize_description(po_line.get("desc"))
+                account = po_line.get("gl_account") or tables.po_line_accounts.get((po_id, desc))
+                if account:
+                    po_accounts.setdefault(desc, account)
+
+        accounts = []
+        for line in line_items:
+            desc = normalize_description(line.get("desc"))
+            account = po_accounts.get(desc) or description_exact.get(desc)
+            if account is None:
+                account = next((keywords[token] for token in desc.split() if token in keywords), vendor_account)
+            accounts.append(account)
+
+        return accounts
+
+    def build_entries(
+        self,
+        invoice: Dict[str, Any],
+        vendor_id: Optional[str] = None,
+        po_data: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Build balanced accounting entries with line-level GL coding.
+
+        Debits are aggregated per GL account (so invoices with thousands of lines
+        post a handful of entries) and rounded to cents per account. Negative
+        lines (discounts, credits) are aggregated the same way on the credit
+        side, as positive amounts. The difference between the invoice amount
+        and the net of those lines (tax, freight, rounding) goes to the default
+        account on one entry: a debit when the invoice is larger than its lines,
+        a credit when the lines exceed it. Amounts are summed in integer cents,
+        so debits equal credits exactly.
+
+        Args:
+            invoice: Invoice payload
+            vendor_id: Canonical vendor ID (optional)
+            po_data: Matched PO (optional)
+
+        Returns:
+            List of entries with account, debit, credit, description and line_count
+        """
+        tables = self.get_tables()
+        invoice_id = invoice.get("invoice_id")
+        amount = float(invoice.get("amount", 0) or 0)
+        line_items = invoice.get("line_items", []) or []
+
+        accounts = self.code_lines(line_items, vendor_id, invoice.get("vendor_name"), po_data)
+
+        # Per account and side: "debit" for charges, "credit" for negative lines
+        line_sums: Dict[Tuple[str, str], float] = {}
+        line_counts: Dict[Tuple[str, str], int] = {}
+        for line, account in zip(line_items, accounts):
+            line_total = line.get("total")
+            if line_total is None:
+                line_total = (line.get("qty", 0) or 0) * (line.get("unit_price", 0) or 0)
+            line_total = float(line_total)
+            key = (account, "credit" if line_total < 0 else "debit")
+            line_sums[key] = line_sums.get(key, 0.0) + abs(line_total)
+            line_counts[key] = line_counts.get(key, 0) + 1
+
+        amount_cents = round(amount * 100)
+        postings = {key: round(total * 100) for key, total in line_sums.items()}
+        net_lines = sum(cents if side == "debit" else -cents for (_, side), cents in postings.items())
+        unallocated = amount_cents - net_lines
+        if unallocated > 0 or not postings:
+            # Invoice exceeds its lines (tax, freight): debit the difference
+            key = (tables.default_account, "debit")
+            postings[key] = postings.get(key, 0) + unallocated
+            line_counts.setdefault(key, 0)
+
+        entries = [
+            {
+                "account": tables.ap_account,
+                "debit": 0,
+                "credit": amount_cents / 100,
+                "description": f"Invoice {invoice_id} - AP",
+                "line_count": len(line_items)
+            }
+        ]
+        for (account, side), cents in postings.items():
+            if side == "debit":
+                entries.append({
+                    "account": account,
+                    "debit": cents / 100,
+                    "credit": 0,
+                    "description": f"Invoice {invoice_id} - {account}",
+                    "line_count": line_counts[(account, side)]
+                })
+            else:
+                entries.append({
+                    "account": account,
+                    "debit": 0,
+                    "credit": cents / 100,
+                    "description": f"Invoice {invoice_id} - {account} (discounts and credits)",
+                    "line_count": line_counts[(account, side)]
+                })
+        if unallocated < 0:
+            # Lines exceed the invoice (over-itemized): credit the excess
+            entries.append({
+                "account": tables.default_account,
+                "debit": 0,
+                "credit": -unallocated / 100,
+                "description": f"Invoice {invoice_id} - {tables.default_account} (lines exceed invoice)",
+                "line_count": 0
+            })
+
+        return entries
+
+
+# Global instance (configured by build_invoice_graph)
+gl_coding_engine = GLCodingEngine()
@@ -34,6 +34,24 @@ class WorkflowConfig(TypedDict, total=False):
     human_review_queue: str
     checkpoint_table: str
     default_db: str
+    vendor_stats_min_samples: int
+    match_mode: str
+    three_way_qty_tolerance_pct: float
+    blob_store: Dict[str, Any]
+    checkpoint_serializer: Dict[str, Any]
+    checkpoint_durability: str
+    checkpoint_group_commit: Dict[str, Any]
+    checkpoint_compaction: Dict[str, Any]
+    archive: Dict[str, Any]
+    storage_shards: Dict[str, Any]
+    read_pool: Dict[str, Any]
+    resume_workers: Dict[str, Any]
+    review_lease: Dict[str, Any]
+    auto_resolution: Dict[str, Any]
+    speculative_precompute: Dict[str, Any]
+    hitl_timers: Dict[str, Any]
+    workflow_metrics: Dict[str, Any]
+    invoice_search: Dict[str, Any]
 
 
 class InvoicePayload(TypedDict, total=False):
@@ -58,7 +76,9 @@ class IntakeOutput(TypedDict, total=False):
 
 class ParsedInvoice(TypedDict, total=False):
     """Parsed invoice data."""
-    invoice_text: str
+    invoice_text: str  # Full text, or a preview when offloaded to the blob store
+    invoice_text_ref: Optional[str]  # "sha256:<hex>" blob reference for the full text
+    invoice_text_bytes: Optional[int]
     parsed_line_items: List[Dict[str, Any]]
     detected_pos: List[str]
     currency: str
@@ -72,17 +92,21 @@ class UnderstandOutput(TypedDict, total=False):
 
 class VendorProfile(TypedDict, total=False):
     """Vendor profile."""
+    vendor_id: Optional[str]  # None when the invoice has no usable vendor name
     normalized_name: str
     tax_id: str
     enrichment_meta: Dict[str, Any]
     credit_score: Optional[float]
     risk_score: Optional[float]
+    tax_id_conflict: Optional[str]  # vendor_id with the same name but a different tax ID
 
 
 class Flags(TypedDict, total=False):
     """Validation flags."""
     missing_info: List[str]
     risk_score: float
+    anomalies: List[str]
+    amount_zscore: Optional[float]
 
 
 class PrepareOutput(TypedDict, total=False):
@@ -97,6 +121,7 @@ class RetrieveOutput(TypedDict, total=False):
     matched_pos: List[Dict[str, Any]]
     matched_grns: List[Dict[str, Any]]
     history: List[Dict[str, Any]]
+    history_summary: Optional[Dict[str, Any]]
 
 
 class MatchEvidence(TypedDict, total=False):
@@ -105,6 +130,8 @@ class MatchEvidence(TypedDict, total=False):
     line_item_matches: List[Dict[str, Any]]
     amount_diff: float
     tolerance_exceeded: bool
+    receipt_matches: List[Dict[str, Any]]
+    receipt_exceeded: bool
 
 
 class MatchTwoWayOutput(TypedDict, total=False):
@@ -113,6 +140,7 @@ class MatchTwoWayOutput(TypedDict, total=False):
     match_result: str
     tolerance_pct: float
     match_evidence: MatchEvidence
+    match_mode: str
 
 
 class CheckpointHitlOutput(TypedDict, total=False):
@@ -120,6 +148,8 @@ class CheckpointHitlOutput(TypedDict, total=False):
     cp_id: str  # Renamed from checkpoint_id to avoid LangGraph reserved name conflict
     review_url: str
     paused_reason: str
+    mismatch_signature: str
+    auto_resolved: bool
 
 
 class HitlDecisionOutput(TypedDict, total=False):
@@ -140,6 +170,7 @@ class ApproveOutput(TypedDict, total=False):
     """APPROVE stage output."""
     approval_status: str
     approver_id: Optional[str]
+    policy_rule_id: Optional[str]
 
 
 class PostingOutput(TypedDict, total=False):
@@ -0,0 +1,311 @@
+"""Cold-storage archival of finished workflows to columnar files."""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
+
+from src.logging.logger import log_storage_maintenance
+
+# Optional columnar file support
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+    pc = None
+    pa_ipc = None
+    pq = None
+
+
+# Stage outputs stored as JSON columns (one per stage)
+ARCHIVED_STAGES = (
+    "intake", "understand", "prepare", "retrieve", "match_two_way", "checkpoint",
+    "hitl", "reconcile", "approve", "posting", "notify", "complete"
+)
+
+# State fields restored alongside the stages
+ARCHIVED_FIELDS = ("invoice_payload", "current_stage", "paused", "workflow_status", "hitl_checkpoint_id", "error")
+
+_SUFFIXES = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def _json_default(value: Any) -> str:
+    """Serialize values JSON doesn't know (datetimes, enums) as strings."""
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+class WorkflowArchiver:
+    """
+    Moves finished workflows out of the hot SQLite database.
+
+    Each archived workflow becomes one row (summary columns plus one JSON column
+    per stage output) in a date-partitioned Parquet or Arrow IPC file:
+    `<root>/finished_date=YYYY-MM-DD/part-<uuid>.parquet`. Only a pointer row in
+    `workflow_archive` stays in SQLite; checkpoints and writes are deleted.
+    """
+
+    def __init__(self, root: str = "./archive", format: str = "parquet"):
+        """
+        Initialize archiver.
+
+        Args:
+            root: Root directory for archive files
+            format: "parquet" or "arrow"
+        """
+        self.root = Path(root)
+        self.format = format
+        self.db_path: Optional[str] = None
+        self.checkpointer = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        """Whether archival can run (configured and pyarrow installed)."""
+        return PYARROW_AVAILABLE and self.db_path is not None
+
+    def configure(self, db_path: str, checkpointer, settings: Optional[Dict[str, Any]] = None):
+        """
+        Configure archiver (used by build_invoice_graph).
+
+        Args:
+            db_path: SQLite database path
+            checkpointer: LangGraph checkpointer holding final states
+            settings: `archive` config section (path, format)
+        """
+        settings = settings or {}
+        if settings.get("format", "parquet") not in _SUFFIXES:
+            raise ValueError(f"Unknown archive format: {settings.get('format')}")
+        self.root = Path(settings.get("path", "./archive"))
+        self.format = settings.get("format", "parquet")
+        self.db_path = db_path
+        self.checkpointer = checkpointer
+        self._init_db()
+
+    def _init_db(self):
+        """Initialize archive pointer table."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS workflow_archive (
+                thread_id TEXT PRIMARY KEY,
+                invoice_id TEXT,
+                vendor_name TEXT,
+                amount REAL,
+                workflow_status TEXT,
+                finished_at TEXT,
+                archived_at TEXT NOT NULL,
+                file_path TEXT NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_workflow_archive_file
+            ON workflow_archive (file_path)
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def _build_record(self, thread_id: str, checkpoint: Dict[str, Any], finished_at: Optional[str]) -> Dict[str, Any]:
+        """Flatten a final checkpoint into one archive row."""
+        values = checkpoint.get("channel_values", {})
+        invoice = values.get("invoice_payload") or {}
+        prepare = values.get("prepare") or {}
+        vendor_profile = prepare.get("vendor_profile") or {}
+        hitl = values.get("hitl") or {}
+
+        record = {
+            "thread_id": thread_id,
+            "invoice_id": invoice.get("invoice_id"),
+            "vendor_id": vendor_profile.get("vendor_id"),
+            "vendor_name": invoice.get("vendor_name"),
+            "amount": float(invoice["amount"]) if invoice.get("amount") is not None else None,
+            "currency": invoice.get("currency"),
+            "workflow_status": values.get("workflow_status"),
+            "human_decision": hitl.get("human_decision"),
+            "went_through_hitl": bool((values.get("checkpoint") or {}).get("cp_id")),
+            "created_at": (values.get("intake") or {}).get("ingest_ts"),
+            "finished_at": finished_at or checkpoint.get("ts"),
+        }
+        for field in ARCHIVED_FIELDS:
+            record[f"{field}_json"] = json.dumps(values.get(field), default=_json_default)
+        for stage in ARCHIVED_STAGES:
+            record[f"{stage}_json"] = json.dumps(values.get(stage), default=_json_default)
+        return record
+
+    def _write_partition(self, partition_date: str, records: List[Dict[str, Any]]) -> str:
+        """Write one immutable file for a date partition and return its path."""
+        directory = self.root / f"finished_date={partition_date}"
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"part-{uuid.uuid4().hex}{_SUFFIXES[self.format]}"
+        tmp_path = path.with_name(path.name + ".tmp")
+
+        table = pa.Table.from_pylist(records)
+        if self.format == "parquet":
+            pq.write_table(table, tmp_path, compression="zstd")
+        else:
+            with pa_ipc.new_file(str(tmp_path), table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+        return str(path)
+
+    def archive_threads(self, thread_ids: List[str], finished_at: Optional[Dict[str, str]] = None) -> List[str]:
+        """
+        Archive finished workflows and remove their checkpoints from the hot DB.
+
+        Args:
+            thread_ids: Workflow thread IDs (should be finished)
+            finished_at: Optional thread_id -> finish timestamp (used for partitioning)
+
+        Returns:
+            Thread IDs that were archived
+        """
+        if not self.available:
+            raise RuntimeError("Workflow archiver requires pyarrow and a configured database")
+
+        finished_at = finished_at or {}
+        partitions: Dict[str, List[Dict[str, Any]]] = {}
+        for thread_id in thread_ids:
+            checkpoint_tuple = self.checkpointer.get_tuple({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}})
+            if not checkpoint_tuple:
+                continue
+            record = self._build_record(thread_id, checkpoint_tuple.checkpoint, finished_at.get(thread_id))
+            partitions.setdefault((record["finished_at"] or "")[:10] or "unknown", []).append(record)
+
+        archived = []
+        with self._lock:
+            for partition_date, records in partitions.items():
+                file_path = self._write_partition(partition_date, records)
+
+                # Pointers are committed before the hot rows go, so a crash never loses a workflow
+                conn = sqlite3.connect(self.db_path, timeout=30)
+                cursor = conn.cursor()
+                archived_at = datetime.utcnow().isoformat()
+                cursor.executemany("""
+                    INSERT OR REPLACE INTO workflow_archive
+                    (thread_id, invoice_id, vendor_name, amount, workflow_status, finished_at, archived_at, file_path)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (
+                        record["thread_id"], record["invoice_id"], record["vendor_name"], record["amount"],
+                        record["workflow_status"], record["finished_at"], archived_at, file_path
+                    )
+                    for record in records
+                ])
+                conn.commit()
+                conn.close()
+
+                for record in records:
+                    self.checkpointer.delete_thread(record["thread_id"])
+                    archived.append(record["thread_id"])
+
+        if archived:
+            log_storage_maintenance("workflow_archive", {"threads_archived": len(archived), "partitions": len(partitions)})
+        return archived
+
+    def _read_rows(self, file_path: str, thread_ids: List[str]) -> List[Dict[str, Any]]:
+        """Read the rows for some threads from one archive file."""
+        if file_path.endswith(_SUFFIXES["parquet"]):
+            table = pq.read_table(file_path, filters=[("thread_id", "in", thread_ids)])
+        else:
+            with pa.memory_map(file_path) as source:
+                table = pa_ipc.open_file(source).read_all()
+            table = table.filter(pc.is_in(table["thread_id"], value_set=pa.array(thread_ids)))
+        return table.to_pylist()
+
+    @staticmethod
+    def _to_state(record: Dict[str, Any]) -> Dict[str, Any]:
+        """Rebuild a workflow state dict from an archive row."""
+        state = {"thread_id": record["thread_id"], "archived": True}
+        for field in ARCHIVED_FIELDS + ARCHIVED_STAGES:
+            state[field] = json.loads(record[f"{field}_json"]) if record.get(f"{field}_json") else None
+        return state
+
+    def get_state(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load an archived workflow's final state.
+
+        Args:
+            thread_id: Workflow thread ID
+
+        Returns:
+            State dict (stage outputs, invoice_payload, status) or None if not archived
+        """
+        states = self.get_states([thread_id])
+        return states.get(thread_id)
+
+    def get_states(self, thread_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Load several archived states, reading each archive file once.
+
+        Args:
+            thread_ids: Workflow thread IDs
+
+        Returns:
+            Dict of thread_id -> state dict (missing threads are omitted)
+        """
+        if not self.available or not thread_ids:
+            return {}
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        placeholders = ",".join("?" for _ in thread_ids)
+        cursor.execute(f"""
+            SELECT thread_id, file_path FROM workflow_archive
+            WHERE thread_id IN ({placeholders})
+        """, list(thread_ids))
+        by_file: Dict[str, List[str]] = {}
+        for thread_id, file_path in cursor.fetchall():
+            by_file.setdefault(file_path, []).append(thread_id)
+        conn.close()
+
+        states = {}
+        for file_path, file_thread_ids in by_file.items():
+            if not os.path.exists(file_path):
+                continue
+            for record in self._read_rows(file_path, file_thread_ids):
+                states[record["thread_id"]] = self._to_state(record)
+        return states
+
+    def list_thread_ids(self) -> List[str]:
+        """List archived thread IDs (from the pointer table)."""
+        if not self.db_path:
+            return []
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT thread_id FROM workflow_archive ORDER BY finished_at")
+        thread_ids = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return thread_ids
+
+    def iter_states(self, exclude: Optional[set] = None, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate archived states in batches.
+
+        Args:
+            exclude: Thread IDs to skip
+            batch_size: Threads loaded per batch
+
+        Yields:
+            State dicts
+        """
+        thread_ids = [thread_id for thread_id in self.list_thread_ids() if not exclude or thread_id not in exclude]
+        for index in range(0, len(thread_ids), batch_size):
+            batch = thread_ids[index:index + batch_size]
+            states = self.get_states(batch)
+            for thread_id in batch:
+                if thread_id in states:
+                    yield states[thread_id]
+
+
+# Global instance (configured by build_invoice_graph)
+workflow_archiver = WorkflowArchiver()
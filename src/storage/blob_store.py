@@ -0,0 +1,157 @@
+"""Content-addressed blob store for large state fields."""
+
+import hashlib
+import os
+import uuid
+import zlib
+from pathlib import Path
+from typing import Optional, Union
+
+# Optional zstd compression
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    zstandard = None
+
+
+BLOB_REF_PREFIX = "sha256:"
+
+_SUFFIXES = {"zstd": ".zst", "zlib": ".z", None: ""}
+
+
+class BlobStore:
+    """
+    Local-filesystem, content-addressed blob store.
+
+    Blobs are keyed by the SHA-256 of their uncompressed content, so identical
+    OCR text is stored once no matter how many invoices reference it. State
+    keeps only the `sha256:<hex>` reference; content is read lazily on demand.
+    """
+
+    def __init__(self, root: str = "./blobs", compression: Optional[str] = "zlib", inline_max_bytes: int = 2048):
+        """
+        Initialize blob store.
+
+        Args:
+            root: Root directory for blob files
+            compression: "zstd", "zlib" or None
+            inline_max_bytes: Values up to this size stay inline in state
+        """
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            compression = "zlib"
+        self.root = Path(root)
+        self.compression = compression
+        self.inline_max_bytes = inline_max_bytes
+
+    def configure(self, root: str, compression: Optional[str] = "zlib", inline_max_bytes: int = 2048):
+        """Reconfigure the store (used by build_invoice_graph)."""
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            compression = "zlib"
+        self.root = Path(root)
+        self.compression = compression
+        self.inline_max_bytes = inline_max_bytes
+
+    def _path(self, digest: str, compression: Optional[str]) -> Path:
+        """Sharded path for a digest: root/ab/cd/<digest><suffix>."""
+        return self.root / digest[:2] / digest[2:4] / f"{digest}{_SUFFIXES[compression]}"
+
+    def should_offload(self, value: Union[str, bytes, None]) -> bool:
+        """Whether a value is large enough to move out of state."""
+        if value is None:
+            return False
+        size = len(value.encode("utf-8")) if isinstance(value, str) else len(value)
+        return size > self.inline_max_bytes
+
+    def put(self, value: Union[str, bytes]) -> str:
+        """
+        Store a value and return its content reference.
+
+        Args:
+            value: Text or bytes
+
+        Returns:
+            Reference of the form "sha256:<hex>"
+        """
+        data = value.encode("utf-8") if isinstance(value, str) else value
+        digest = hashlib.sha256(data).hexdigest()
+
+        if self._find(digest) is None:
+            if self.compression == "zstd":
+                payload = zstandard.ZstdCompressor(level=3).compress(data)
+            elif self.compression == "zlib":
+                payload = zlib.compress(data, 6)
+            else:
+                payload = data
+
+            path = self._path(digest, self.compression)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename so concurrent writers never expose partial blobs
+            tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+
+        return f"{BLOB_REF_PREFIX}{digest}"
+
+    def _find(self, digest: str) -> Optional[Path]:
+        """Locate an existing blob file for a digest (any compression)."""
+        for compression in ("zstd", "zlib", None):
+            path = self._path(digest, compression)
+            if path.exists():
+                return path
+        return None
+
+    def get(self, ref: str) -> Optional[bytes]:
+        """
+        Read a blob by reference.
+
+        Args:
+            ref: Reference returned by put()
+
+        Returns:
+            Blob bytes or None if missing
+        """
+        if not ref or not ref.startswith(BLOB_REF_PREFIX):
+            return None
+
+        path = self._find(ref[len(BLOB_REF_PREFIX):])
+        if path is None:
+            return None
+
+        with open(path, "rb") as f:
+            payload = f.read()
+
+        if path.suffix == ".zst":
+            return zstandard.ZstdDecompressor().decompress(payload)
+        if path.suffix == ".z":
+            return zlib.decompress(payload)
+        return payload
+
+    def get_text(self, ref: str) -> Optional[str]:
+        """Read a text blob by reference."""
+        data = self.get(ref)
+        return data.decode("utf-8") if data is not None else None
+
+
+def resolve_invoice_text(parsed_invoice: dict) -> str:
+    """
+    Get the full OCR text of a parsed invoice, loading it from the blob store if offloaded.
+
+    Args:
+        parsed_invoice: ParsedInvoice dict
+
+    Returns:
+        Full invoice text
+    """
+    ref = parsed_invoice.get("invoice_text_ref")
+    if ref:
+        text = blob_store.get_text(ref)
+        if text is not None:
+            return text
+    return parsed_invoice.get("invoice_text", "")
+
+
+# Global instance (configured by build_invoice_graph)
+blob_store = BlobStore()
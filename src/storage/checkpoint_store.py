@@ -1,7 +1,10 @@
 """Checkpoint store using LangGraph SqliteSaver."""
 
 from langgraph.checkpoint.sqlite import SqliteSaver
-from typing import Optional
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from src.storage.group_commit import GroupCommitSqliteSaver
+from src.storage.sharding import ShardRouter, ShardedCheckpointSaver
+from typing import Any, Dict, List, Optional
 import os
 import sqlite3
 
@@ -9,28 +12,115 @@ import sqlite3
 class CheckpointStore:
     """Wrapper around LangGraph SqliteSaver for checkpoint management."""
     
-    def __init__(self, db_path: str = "sqlite:///./demo.db"):
+    def __init__(
+        self,
+        db_path: str = "sqlite:///./demo.db",
+        serde: Optional[SerializerProtocol] = None,
+        group_commit: Optional[Dict[str, Any]] = None,
+        shard_paths: Optional[List[str]] = None
+    ):
         """
         Initialize checkpoint store.
         
         Args:
             db_path: SQLite database path
+            serde: Checkpoint serializer (optional, LangGraph default if None)
+            group_commit: `checkpoint_group_commit` settings (optional); when
+                enabled, writes are batched by GroupCommitSqliteSaver
+            shard_paths: Shard database paths (optional); with more than one,
+                threads are routed across them by ShardedCheckpointSaver
         """
         # Extract path from sqlite:/// URL
         if db_path.startswith("sqlite:///"):
             db_path = db_path.replace("sqlite:///", "")
         
+        self.db_path = db_path
+        self.shard_paths = list(shard_paths) if shard_paths else [db_path]
+        self.conns = []
+        self.savers = [self._build_saver(path, serde, group_commit) for path in self.shard_paths]
+        for saver in self.savers:
+            # Create tables (and switch to WAL) now, so read-only readers and the compactor
+            # can query shards that have not been written to yet
+            saver.setup()
+        
+        if len(self.savers) > 1:
+            self.checkpointer = ShardedCheckpointSaver(ShardRouter(self.shard_paths), self.savers)
+        else:
+            self.checkpointer = self.savers[0]
+        self.conn = self.conns[0]  # Keep connection alive
+    
+    def _build_saver(
+        self,
+        db_path: str,
+        serde: Optional[SerializerProtocol],
+        group_commit: Optional[Dict[str, Any]]
+    ) -> SqliteSaver:
+        """Open one database file and create its checkpointer."""
         # Ensure directory exists
         os.makedirs(os.path.dirname(db_path) if os.path.dirname(db_path) else ".", exist_ok=True)
         
         # Create checkpointer using direct initialization
         # SqliteSaver.from_conn_string returns a context manager, so we use SqliteSaver directly
-        conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.checkpointer = SqliteSaver(conn)
-        self.db_path = db_path
-        self.conn = conn  # Keep connection alive
+        conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.conns.append(conn)
+        if group_commit and group_commit.get("enabled"):
+            return GroupCommitSqliteSaver(
+                conn,
+                serde=serde,
+                max_latency_ms=group_commit.get("max_latency_ms", 5),
+                max_batch=group_commit.get("max_batch", 256),
+                failure_retention_s=group_commit.get("failure_retention_s", 300.0)
+            )
+        return SqliteSaver(conn, serde=serde)
     
     def get_checkpointer(self):
         """Get LangGraph checkpointer instance."""
         return self.checkpointer
-
+    
+    def wait_durable(self, thread_id: str, timeout: Optional[float] = None):
+        """
+        Block until the thread's checkpoint writes are committed.
+        
+        No-op for the plain SqliteSaver, which commits every write inline.
+        
+        Args:
+            thread_id: Workflow thread ID
+            timeout: Seconds to wait (None waits indefinitely)
+        """
+        if isinstance(self.checkpointer, (GroupCommitSqliteSaver, ShardedCheckpointSaver)):
+            self.checkpointer.wait_durable(thread_id, timeout)
+    
+    def list_thread_ids(self) -> List[str]:
+        """
+        List workflow thread IDs that have checkpoints.
+        
+        Returns:
+            Thread IDs (root namespace) across all shards, sorted
+        """
+        thread_ids = []
+        for saver in self.savers:
+            with saver.cursor(transaction=False) as cur:
+                cur.execute("""
+                    SELECT DISTINCT thread_id
+                    FROM checkpoints
+                    WHERE checkpoint_ns = ''
+                """)
+                thread_ids.extend(row[0] for row in cur.fetchall())
+        return sorted(thread_ids)
+    
+    def delete_thread(self, thread_id: str):
+        """
+        Delete all checkpoints and writes of a workflow thread.
+        
+        Args:
+            thread_id: Workflow thread ID
+        """
+        self.checkpointer.delete_thread(thread_id)
+    
+    def close(self):
+        """Flush pending writes and close the connections."""
+        for saver in self.savers:
+            if isinstance(saver, GroupCommitSqliteSaver):
+                saver.close()
+        for conn in self.conns:
+            conn.close()
@@ -0,0 +1,479 @@
+"""Background compaction and retention for LangGraph checkpoints."""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Any, List, Optional
+
+from src.logging.logger import log_storage_maintenance, log_error
+from src.state.models import WorkflowStatus
+
+
+TERMINAL_STATUSES = {
+    WorkflowStatus.COMPLETED.value,
+    WorkflowStatus.REQUIRES_MANUAL_HANDLING.value,
+    WorkflowStatus.FAILED.value
+}
+
+# SQLite PRAGMA auto_vacuum value for INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def enable_incremental_vacuum(db_path: str) -> bool:
+    """
+    Switch a database to `auto_vacuum = INCREMENTAL` (a maintenance step).
+
+    The switch needs one full VACUUM, which rewrites the file under an
+    exclusive lock, so it runs from `enable_incremental_vacuum.py` while the
+    backend is stopped, never from the background compactor.
+
+    Args:
+        db_path: SQLite database path
+
+    Returns:
+        True if the database was converted, False if it already was incremental
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.isolation_level = None
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+            return False
+        conn.execute(f"PRAGMA auto_vacuum = {AUTO_VACUUM_INCREMENTAL}")
+        conn.execute("VACUUM")
+        return True
+    finally:
+        conn.close()
+
+
+def _parse_ts(value: Optional[str]) -> Optional[datetime]:
+    """Parse a checkpoint timestamp (ISO format, UTC)."""
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+class CheckpointCompactor:
+    """
+    Compacts the checkpointer tables on a schedule.
+
+    Each run:
+    - collapses finished threads (terminal status, not paused, idle for
+      `min_idle_s`) to their final checkpoint and drops their older writes
+    - purges writes whose checkpoint no longer exists
+    - expires finished threads older than `retention_days` (deleted with all
+      their per-thread rows, or moved to the cold-storage archive with
+      `retention_action` "archive")
+    - runs `PRAGMA incremental_vacuum` (databases already switched to
+      incremental auto-vacuum, see enable_incremental_vacuum) and `ANALYZE`
+
+    Finished threads are recorded in `checkpoint_compaction` so later runs
+    only inspect threads that changed. With sharded storage every pass runs
+    per shard file (each shard keeps its own `checkpoint_compaction` table).
+    """
+
+    def __init__(self):
+        """Initialize an unconfigured compactor."""
+        self.db_path: Optional[str] = None
+        self.db_paths: List[str] = []
+        self.checkpointer = None
+        self.interval_s = 3600.0
+        self.min_idle_s = 60.0
+        self.retention_days: Optional[float] = None
+        self.retention_action = "delete"
+        self.archiver = None
+        self.delete_thread: Optional[Callable[[str], None]] = None
+        self.vacuum_pages = 0
+        self.enabled = False
+        self.metrics: Dict[str, Any] = {
+            "runs": 0,
+            "threads_compacted": 0,
+            "checkpoints_deleted": 0,
+            "writes_deleted": 0,
+            "threads_expired": 0,
+            "threads_archived": 0,
+            "bytes_reclaimed": 0,
+            "last_run_at": None,
+            "last_run_ms": None,
+            "db_size_bytes": None
+        }
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def configure(
+        self,
+        db_path: str,
+        checkpointer,
+        settings: Optional[Dict[str, Any]] = None,
+        archiver=None,
+        shard_paths: Optional[List[str]] = None,
+        delete_thread: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Configure the compactor (used by build_invoice_graph).
+
+        Args:
+            db_path: SQLite database path
+            checkpointer: LangGraph checkpointer used to read final states
+            settings: `checkpoint_compaction` config section
+            archiver: WorkflowArchiver used when `retention_action` is "archive"
+            shard_paths: Shard database paths holding checkpoints (default: db_path only)
+            delete_thread: Removes every row of an expired thread (review queue, resume
+                jobs, timers, counters, search documents, checkpoints); without it
+                only checkpoints and writes are deleted
+        """
+        settings = settings or {}
+        self.db_path = db_path
+        self.db_paths = list(shard_paths) if shard_paths else [db_path]
+        self.checkpointer = checkpointer
+        self.enabled = settings.get("enabled", True)
+        self.interval_s = float(settings.get("interval_s", 3600))
+        self.min_idle_s = float(settings.get("min_idle_s", 60))
+        self.retention_days = settings.get("retention_days")
+        self.retention_action = settings.get("retention_action", "delete")
+        if self.retention_action not in ("delete", "archive"):
+            raise ValueError(f"Unknown retention_action: {self.retention_action}")
+        self.archiver = archiver
+        self.delete_thread = delete_thread
+        self.vacuum_pages = int(settings.get("vacuum_pages", 0))
+        self._init_db()
+
+    def _connect(self, db_path: str) -> sqlite3.Connection:
+        """Open a connection that waits on concurrent writers."""
+        conn = sqlite3.connect(db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        """Initialize compaction bookkeeping table on every shard."""
+        for db_path in self.db_paths:
+            self._init_shard(db_path)
+
+    def _init_shard(self, db_path: str):
+        """Initialize compaction bookkeeping table in one database."""
+        conn = self._connect(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS checkpoint_compaction (
+                thread_id TEXT PRIMARY KEY,
+                final_checkpoint_id TEXT NOT NULL,
+                workflow_status TEXT,
+                finished_at TEXT,
+                compacted_at TEXT NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_checkpoint_compaction_finished
+            ON checkpoint_compaction (finished_at)
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def _db_size(self, cursor: sqlite3.Cursor) -> int:
+        """Allocated database size in bytes (excluding free pages)."""
+        page_size = cursor.execute("PRAGMA page_size").fetchone()[0]
+        page_count = cursor.execute("PRAGMA page_count").fetchone()[0]
+        return page_size * page_count
+
+    def db_size_bytes(self) -> int:
+        """Allocated database size in bytes (summed over shards), including pages still in the WAL."""
+        size = 0
+        for db_path in self.db_paths:
+            conn = self._connect(db_path)
+            size += self._db_size(conn.cursor())
+            conn.close()
+        return size
+
+    def _candidate_threads(self, cursor: sqlite3.Cursor) -> List[sqlite3.Row]:
+        """Threads whose latest checkpoint has not been recorded as compacted."""
+        cursor.execute("""
+            SELECT c.thread_id, MAX(c.checkpoint_id) AS latest_id, COUNT(*) AS checkpoint_count
+            FROM checkpoints c
+            WHERE c.checkpoint_ns = ''
+            GROUP BY c.thread_id
+        """)
+        rows = cursor.fetchall()
+
+        cursor.execute("SELECT thread_id, final_checkpoint_id FROM checkpoint_compaction")
+        compacted = {row["thread_id"]: row["final_checkpoint_id"] for row in cursor.fetchall()}
+
+        return [row for row in rows if compacted.get(row["thread_id"]) != row["latest_id"]]
+
+    def _finished_state(self, thread_id: str, checkpoint_id: str) -> Optional[Dict[str, Any]]:
+        """Return status and finish time if the thread's final checkpoint is terminal and idle."""
+        checkpoint_tuple = self.checkpointer.get_tuple({
+            "configurable": {"thread_id": thread_id, "checkpoint_ns": "", "checkpoint_id": checkpoint_id}
+        })
+        if not checkpoint_tuple:
+            return None
+
+        values = checkpoint_tuple.checkpoint.get("channel_values", {})
+        status = values.get("workflow_status")
+        if status not in TERMINAL_STATUSES or values.get("paused"):
+            return None
+
+        finished_at = _parse_ts(checkpoint_tuple.checkpoint.get("ts"))
+        if finished_at and (datetime.now(timezone.utc) - finished_at).total_seconds() < self.min_idle_s:
+            return None
+
+        return {"workflow_status": status, "finished_at": finished_at.isoformat() if finished_at else None}
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Collapse finished threads to their final checkpoint.
+
+        Returns:
+            Counts of threads compacted and rows deleted
+        """
+        result = {"threads_compacted": 0, "checkpoints_deleted": 0, "writes_deleted": 0}
+        # Scan committed state, not what is still queued by a group-commit writer
+        if hasattr(self.checkpointer, "flush"):
+            self.checkpointer.flush()
+        for db_path in self.db_paths:
+            for key, value in self._compact_shard(db_path).items():
+                result[key] += value
+        return result
+
+    def _compact_shard(self, db_path: str) -> Dict[str, int]:
+        """Collapse finished threads stored in one database."""
+        result = {"threads_compacted": 0, "checkpoints_deleted": 0, "writes_deleted": 0}
+        conn = self._connect(db_path)
+        cursor = conn.cursor()
+
+        # Checkpoint IDs are time-ordered; only rows older than the final one are removed,
+        # so a checkpoint committed after the candidate scan is never lost
+        for row in self._candidate_threads(cursor):
+            thread_id = row["thread_id"]
+            latest_id = row["latest_id"]
+            finished = self._finished_state(thread_id, latest_id)
+            if finished is None:
+                continue
+
+            cursor.execute("""
+                DELETE FROM checkpoints
+                WHERE thread_id = ? AND checkpoint_ns = '' AND checkpoint_id < ?
+            """, (thread_id, latest_id))
+            result["checkpoints_deleted"] += cursor.rowcount
+            cursor.execute("""
+                UPDATE checkpoints SET parent_checkpoint_id = NULL
+                WHERE thread_id = ? AND checkpoint_ns = '' AND checkpoint_id = ?
+            """, (thread_id, latest_id))
+            cursor.execute("""
+                DELETE FROM writes
+                WHERE thread_id = ? AND checkpoint_ns = '' AND checkpoint_id < ?
+            """, (thread_id, latest_id))
+            result["writes_deleted"] += cursor.rowcount
+            cursor.execute("""
+                INSERT OR REPLACE INTO checkpoint_compaction
+                (thread_id, final_checkpoint_id, workflow_status, finished_at, compacted_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (
+                thread_id,
+                latest_id,
+                finished["workflow_status"],
+                finished["finished_at"],
+                datetime.utcnow().isoformat()
+            ))
+            # One short transaction per thread keeps writers from waiting on a long compaction
+            conn.commit()
+            result["threads_compacted"] += 1
+
+        conn.close()
+        return result
+
+    def purge_orphaned_writes(self) -> int:
+        """
+        Delete writes whose checkpoint no longer exists, and stale compaction records.
+
+        Returns:
+            Number of writes deleted
+        """
+        return sum(self._purge_shard(db_path) for db_path in self.db_paths)
+
+    def _purge_shard(self, db_path: str) -> int:
+        """Delete orphaned writes and stale compaction records in one database."""
+        conn = self._connect(db_path)
+        cursor = conn.cursor()
+
+        # Only finished or deleted threads: a running thread's writes may land just before their checkpoint
+        cursor.execute("""
+            DELETE FROM writes
+            WHERE NOT EXISTS (
+                SELECT 1 FROM checkpoints c
+                WHERE c.thread_id = writes.thread_id
+                  AND c.checkpoint_ns = writes.checkpoint_ns
+                  AND c.checkpoint_id = writes.checkpoint_id
+            )
+            AND (
+                thread_id IN (SELECT thread_id FROM checkpoint_compaction)
+                OR NOT EXISTS (SELECT 1 FROM checkpoints c WHERE c.thread_id = writes.thread_id)
+            )
+        """)
+        deleted = cursor.rowcount
+        cursor.execute("""
+            DELETE FROM checkpoint_compaction
+            WHERE thread_id NOT IN (SELECT thread_id FROM checkpoints)
+        """)
+
+        conn.commit()
+        conn.close()
+        return deleted
+
+    def expire_threads(self) -> List[str]:
+        """
+        Remove finished threads older than `retention_days`.
+
+        With `retention_action` "archive", threads are first written to the
+        cold-storage archive (which removes their checkpoints); otherwise they
+        are deleted through `delete_thread`, like DELETE /workflow/{thread_id}.
+
+        Returns:
+            Expired thread IDs
+        """
+        if self.retention_days is None:
+            return []
+
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=float(self.retention_days))).isoformat()
+        expired = []
+        for db_path in self.db_paths:
+            expired.extend(self._expire_shard(db_path, cutoff))
+        return expired
+
+    def _expire_shard(self, db_path: str, cutoff: str) -> List[str]:
+        """Expire finished threads stored in one database."""
+        conn = self._connect(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT thread_id, finished_at FROM checkpoint_compaction
+            WHERE finished_at IS NOT NULL AND finished_at < ?
+        """, (cutoff,))
+        rows = cursor.fetchall()
+        thread_ids = [row["thread_id"] for row in rows]
+
+        if self.retention_action == "archive" and thread_ids:
+            if self.archiver is None or not self.archiver.available:
+                # Without pyarrow nothing is archived; expired threads stay hot rather than being lost
+                conn.close()
+                return []
+            thread_ids = self.archiver.archive_threads(
+                thread_ids,
+                {row["thread_id"]: row["finished_at"] for row in rows}
+            )
+
+        for thread_id in thread_ids:
+            if self.retention_action == "delete" and self.delete_thread is not None:
+                self.delete_thread(thread_id)
+            else:
+                cursor.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                cursor.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+            cursor.execute("DELETE FROM checkpoint_compaction WHERE thread_id = ?", (thread_id,))
+            conn.commit()
+
+        conn.close()
+        return thread_ids
+
+    def vacuum(self) -> int:
+        """
+        Return free pages to the filesystem and refresh planner statistics.
+
+        Free pages are only released from databases already in incremental
+        auto-vacuum mode; others are left as they are (no full VACUUM on a
+        live database) and only analyzed.
+
+        Returns:
+            Bytes reclaimed
+        """
+        return sum(self._vacuum_shard(db_path) for db_path in self.db_paths)
+
+    def _vacuum_shard(self, db_path: str) -> int:
+        """Vacuum and analyze one database, returning bytes reclaimed."""
+        conn = self._connect(db_path)
+        conn.isolation_level = None
+        cursor = conn.cursor()
+
+        before = self._db_size(cursor)
+        if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+            if self.vacuum_pages > 0:
+                cursor.execute(f"PRAGMA incremental_vacuum({self.vacuum_pages})")
+            else:
+                cursor.execute("PRAGMA incremental_vacuum")
+        cursor.execute("ANALYZE")
+        after = self._db_size(cursor)
+
+        conn.close()
+        return max(before - after, 0)
+
+    def run_once(self) -> Dict[str, Any]:
+        """
+        Run one full maintenance pass.
+
+        Returns:
+            Metrics for this run
+        """
+        if not self.db_path or self.checkpointer is None:
+            raise RuntimeError("CheckpointCompactor is not configured")
+
+        with self._run_lock:
+            start_time = time.time()
+            compacted = self.compact()
+            orphaned_writes = self.purge_orphaned_writes()
+            expired = self.expire_threads()
+            bytes_reclaimed = self.vacuum()
+
+            run = {
+                **compacted,
+                "writes_deleted": compacted["writes_deleted"] + orphaned_writes,
+                "threads_expired": len(expired),
+                "threads_archived": len(expired) if self.retention_action == "archive" else 0,
+                "bytes_reclaimed": bytes_reclaimed,
+                "last_run_ms": round((time.time() - start_time) * 1000, 1),
+                "db_size_bytes": self.db_size_bytes()
+            }
+
+            for key in (
+                "threads_compacted", "checkpoints_deleted", "writes_deleted",
+                "threads_expired", "threads_archived", "bytes_reclaimed"
+            ):
+                self.metrics[key] += run[key]
+            self.metrics["runs"] += 1
+            self.metrics["last_run_at"] = datetime.utcnow().isoformat()
+            self.metrics["last_run_ms"] = run["last_run_ms"]
+            self.metrics["db_size_bytes"] = run["db_size_bytes"]
+
+        log_storage_maintenance("checkpoint_compaction", run)
+        return run
+
+    def _loop(self):
+        """Background loop: run, then sleep until the next interval or stop."""
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.run_once()
+            except Exception as e:
+                log_error("CHECKPOINT_COMPACTION", e)
+
+    def start(self):
+        """Start the background compaction thread (no-op if disabled or running)."""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="checkpoint-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background compaction thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Global instance (configured by build_invoice_graph, started by the API)
+checkpoint_compactor = CheckpointCompactor()
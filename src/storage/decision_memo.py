@@ -0,0 +1,324 @@
+"""Decision memo for recurring HITL mismatch patterns (auto-resolution)."""
+
+import hashlib
+import json
+import math
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+# reviewer_id recorded on reviews resolved from the memo
+AUTO_REVIEWER_ID = "auto_resolver"
+
+
+def amount_band(amount: Any) -> Optional[int]:
+    """
+    Order-of-magnitude band of an invoice amount (2 for $100-$999.99, 5 for $100k-$999k).
+
+    Args:
+        amount: Invoice amount
+
+    Returns:
+        Band, or None for a missing or non-positive amount
+    """
+    try:
+        amount = float(amount)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(amount) or amount <= 0:
+        return None
+    return math.floor(math.log10(amount))
+
+
+def mismatch_signature(state: Dict[str, Any], variance_bucket_pct: float = 1.0) -> str:
+    """
+    Normalized signature of why an invoice was held for review.
+
+    Two holds share a signature when they are for the same vendor and POs,
+    fall in the same invoice amount band, and failed matching the same way
+    with a signed amount variance in the same bucket, e.g. "Acme, PO-1001,
+    $1k-$10k, amount 2-3% over, all lines matched". Over- and under-billing
+    never share a bucket, and the amount band keeps a small variance on a
+    small invoice from vouching for the same percentage on a large one.
+
+    Args:
+        state: Workflow state after MATCH_TWO_WAY
+        variance_bucket_pct: Width of the amount variance buckets in percent
+
+    Returns:
+        Signature (hex digest)
+    """
+    invoice_payload = state.get("invoice_payload", {})
+    vendor_profile = state.get("prepare", {}).get("vendor_profile", {})
+    match_output = state.get("match_two_way", {})
+    evidence = match_output.get("match_evidence", {})
+
+    invoice_items = len(state.get("prepare", {}).get("normalized_invoice", {}).get("line_items", []))
+    matched_items = len(evidence.get("line_item_matches", []))
+    receipt_shortfalls = sum(1 for m in evidence.get("receipt_matches", []) if not m.get("within_receipt"))
+    variance_pct = evidence.get("amount_variance_pct")
+
+    parts = {
+        "vendor": vendor_profile.get("vendor_id") or (invoice_payload.get("vendor_name") or "").strip().lower(),
+        "pos": sorted(evidence.get("po_ids", [])),
+        "no_po": evidence.get("reason") == "No matching PO found",
+        "mode": match_output.get("match_mode"),
+        "tolerance_exceeded": bool(evidence.get("tolerance_exceeded")),
+        "amount_band": amount_band(invoice_payload.get("amount")),
+        "variance_bucket": math.floor(variance_pct / variance_bucket_pct) if variance_pct is not None else None,
+        "unmatched_lines": invoice_items - matched_items,
+        "receipt_shortfalls": receipt_shortfalls
+    }
+    return hashlib.sha1(json.dumps(parts, sort_keys=True).encode()).hexdigest()[:20]
+
+
+class HitlDecisionMemo:
+    """
+    Memo of past reviewer decisions per mismatch signature.
+
+    Every human decision is counted against the signature of its hold
+    (idempotently, keyed by review checkpoint_id). A new hold whose
+    signature was accepted at least `min_count` times with an acceptance
+    rate of at least `min_confidence` is resolved as ACCEPT by CHECKPOINT_HITL
+    without pausing; each such resolution is written to
+    `hitl_auto_resolutions` as an audit record. Auto-resolved decisions are
+    not counted, so the memo only learns from people.
+
+    Signatures span threads, so the memo lives in `default_db` like the other
+    shared tables.
+    """
+
+    def __init__(self):
+        """Initialize an unconfigured memo."""
+        self.db_path: Optional[str] = None
+        self.enabled = False
+        self.min_count = 5
+        self.min_confidence = 0.95
+        self.variance_bucket_pct = 1.0
+
+    def configure(self, db_path: str, settings: Optional[Dict[str, Any]] = None):
+        """
+        Configure memo (used by build_invoice_graph).
+
+        Args:
+            db_path: SQLite database path (default_db)
+            settings: `auto_resolution` config section
+        """
+        settings = settings or {}
+        self.db_path = db_path
+        self.enabled = settings.get("enabled", False)
+        self.min_count = int(settings.get("min_count", 5))
+        self.min_confidence = float(settings.get("min_confidence", 0.95))
+        self.variance_bucket_pct = float(settings.get("variance_bucket_pct", 1.0))
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection that waits on concurrent writers."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        """Initialize memo and audit tables."""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS hitl_decision_memo (
+                signature TEXT PRIMARY KEY,
+                accept_count INTEGER NOT NULL DEFAULT 0,
+                reject_count INTEGER NOT NULL DEFAULT 0,
+                last_decision TEXT,
+                last_decided_at TEXT
+            )
+        """)
+        # One row per counted review, so replays and rebuilds never count a decision twice
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS hitl_decision_memo_entries (
+                checkpoint_id TEXT PRIMARY KEY,
+                signature TEXT NOT NULL,
+                decision TEXT NOT NULL,
+                decided_at TEXT NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS hitl_auto_resolutions (
+                checkpoint_id TEXT PRIMARY KEY,
+                thread_id TEXT,
+                invoice_id TEXT,
+                signature TEXT NOT NULL,
+                decision TEXT NOT NULL,
+                accept_count INTEGER NOT NULL,
+                reject_count INTEGER NOT NULL,
+                confidence REAL NOT NULL,
+                resolved_at TEXT NOT NULL
+            )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def signature(self, state: Dict[str, Any]) -> str:
+        """
+        Mismatch signature of a held invoice with the configured variance buckets.
+
+        Args:
+            state: Workflow state after MATCH_TWO_WAY
+
+        Returns:
+            Signature (hex digest)
+        """
+        return mismatch_signature(state, self.variance_bucket_pct)
+
+    def record(self, checkpoint_id: str, signature: str, decision: str, decided_at: Optional[str] = None):
+        """
+        Count a reviewer decision against its signature (no-op if already counted).
+
+        Args:
+            checkpoint_id: Review checkpoint ID
+            signature: Mismatch signature of the hold
+            decision: Decision (ACCEPT/REJECT)
+            decided_at: Decision time (ISO format, default now)
+        """
+        decided_at = decided_at or datetime.utcnow().isoformat()
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            INSERT OR IGNORE INTO hitl_decision_memo_entries (checkpoint_id, signature, decision, decided_at)
+            VALUES (?, ?, ?, ?)
+        """, (checkpoint_id, signature, decision, decided_at))
+        if cursor.rowcount == 1:
+            accepted = 1 if decision == "ACCEPT" else 0
+            cursor.execute("""
+                INSERT INTO hitl_decision_memo (signature, accept_count, reject_count, last_decision, last_decided_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(signature) DO UPDATE SET
+                    accept_count = accept_count + excluded.accept_count,
+                    reject_count = reject_count + excluded.reject_count,
+                    last_decision = excluded.last_decision,
+                    last_decided_at = excluded.last_decided_at
+            """, (signature, accepted, 1 - accepted, decision, decided_at))
+
+        conn.commit()
+        conn.close()
+
+    def get(self, signature: str) -> Optional[Dict[str, Any]]:
+        """
+        Get decision counts for a signature.
+
+        Args:
+            signature: Mismatch signature
+
+        Returns:
+            Memo row with accept/reject counts and confidence, or None if never decided
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT * FROM hitl_decision_memo WHERE signature = ?", (signature,)).fetchone()
+        conn.close()
+        if not row:
+            return None
+        memo = dict(row)
+        memo["confidence"] = memo["accept_count"] / (memo["accept_count"] + memo["reject_count"])
+        return memo
+
+    def match(self, signature: str) -> Optional[Dict[str, Any]]:
+        """
+        Check whether a hold with this signature should be auto-accepted.
+
+        Args:
+            signature: Mismatch signature
+
+        Returns:
+            Memo row if auto-resolution is enabled and the pattern qualifies, else None
+        """
+        if not self.enabled:
+            return None
+        memo = self.get(signature)
+        if memo and memo["accept_count"] >= self.min_count and memo["confidence"] >= self.min_confidence:
+            return memo
+        return None
+
+    def record_auto_resolution(
+        self,
+        checkpoint_id: str,
+        thread_id: Optional[str],
+        invoice_id: Optional[str],
+        memo: Dict[str, Any]
+    ):
+        """
+        Write the audit record of an auto-resolved hold.
+
+        Args:
+            checkpoint_id: Review checkpoint ID
+            thread_id: Workflow thread ID
+            invoice_id: Invoice ID
+            memo: Memo row the resolution was based on
+        """
+        conn = self._connect()
+        conn.execute("""
+            INSERT OR REPLACE INTO hitl_auto_resolutions
+            (checkpoint_id, thread_id, invoice_id, signature, decision,
+             accept_count, reject_count, confidence, resolved_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            checkpoint_id,
+            thread_id,
+            invoice_id,
+            memo["signature"],
+            "ACCEPT",
+            memo["accept_count"],
+            memo["reject_count"],
+            memo["confidence"],
+            datetime.utcnow().isoformat()
+        ))
+        conn.commit()
+        conn.close()
+
+    def list_auto_resolutions(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get the most recent auto-resolutions.
+
+        Args:
+            limit: Maximum number of rows
+
+        Returns:
+            Audit rows, newest first
+        """
+        conn = self._connect()
+        rows = conn.execute("""
+            SELECT * FROM hitl_auto_resolutions
+            ORDER BY resolved_at DESC
+            LIMIT ?
+        """, (limit,)).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    def is_empty(self) -> bool:
+        """Whether no decision has been counted yet."""
+        conn = self._connect()
+        row = conn.execute("SELECT 1 FROM hitl_decision_memo_entries LIMIT 1").fetchone()
+        conn.close()
+        return row is None
+
+    def rebuild(self, reviews: List[Dict[str, Any]]) -> int:
+        """
+        Count past decisions from review queue rows not yet in the memo.
+
+        Args:
+            reviews: human_review_queue rows (decision, reviewer_id, mismatch_signature, updated_at)
+
+        Returns:
+            Number of reviews with a signature and a human decision
+        """
+        counted = 0
+        for review in reviews:
+            if review.get("mismatch_signature") and review.get("decision") and review.get("reviewer_id") != AUTO_REVIEWER_ID:
+                self.record(review["checkpoint_id"], review["mismatch_signature"], review["decision"], review.get("updated_at"))
+                counted += 1
+        return counted
+
+
+# Global instance (configured by build_invoice_graph)
+hitl_decision_memo = HitlDecisionMemo()
@@ -0,0 +1,248 @@
+"""Write-behind group commit for LangGraph checkpoint writes."""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+
+class _RecordingCursor:
+    """Cursor stand-in that records statements instead of executing them."""
+
+    def __init__(self, ops: List[Tuple[str, str, Any]]):
+        self._ops = ops
+
+    def execute(self, sql: str, params: Any = ()):
+        self._ops.append(("execute", sql, params))
+        return self
+
+    def executemany(self, sql: str, params: Any):
+        self._ops.append(("executemany", sql, list(params)))
+        return self
+
+
+class GroupCommitSqliteSaver(SqliteSaver):
+    """
+    SqliteSaver whose writes are committed in batches by a background writer.
+
+    `put` and `put_writes` serialize on the caller's thread and enqueue the
+    resulting statements; a single writer thread drains the queue and commits
+    everything that arrived within `max_latency_ms` (or `max_batch` items) in
+    one transaction, so concurrent workflows share one fsync.
+
+    Reads flush the queue first, so a workflow always sees its own writes.
+    Callers that must not acknowledge work before it is on disk (API responses
+    at pause or completion) call `wait_durable(thread_id)`.
+
+    If a batch fails, its writes are retried one transaction each, so only the
+    workflows whose own write fails see the error.
+    """
+
+    def __init__(
+        self,
+        conn,
+        *,
+        serde=None,
+        max_latency_ms: float = 5.0,
+        max_batch: int = 256,
+        failure_retention_s: float = 300.0
+    ):
+        """
+        Initialize saver and start the writer thread.
+
+        Args:
+            conn: SQLite connection (check_same_thread=False)
+            serde: Checkpoint serializer (optional)
+            max_latency_ms: Longest time a write waits for others to join its batch
+            max_batch: Maximum number of queued writes per commit
+            failure_retention_s: How long a failed write is kept for `wait_durable`
+                to report before it is dropped
+        """
+        super().__init__(conn, serde=serde)
+        self.max_latency_s = max_latency_ms / 1000.0
+        self.max_batch = max_batch
+        self.failure_retention_s = failure_retention_s
+
+        self._local = threading.local()
+        self._queue: "queue.Queue[Optional[Tuple[int, str, List[Tuple[str, str, Any]]]]]" = queue.Queue()
+        self._state_lock = threading.Condition()
+        self._enqueued_seq = 0
+        self._committed_seq = 0
+        self._last_seq_by_thread: Dict[str, int] = {}
+        # thread_id -> (error, monotonic time of failure), until wait_durable reports it
+        self._failures: Dict[str, Tuple[Exception, float]] = {}
+        self._closed = False
+
+        self.stats = {"batches": 0, "writes": 0, "max_batch_size": 0, "failed_writes": 0}
+
+        self._writer = threading.Thread(target=self._writer_loop, name="checkpoint-group-commit", daemon=True)
+        self._writer.start()
+
+    @contextmanager
+    def cursor(self, transaction: bool = True) -> Iterator[Any]:
+        """Record statements while enqueuing writes; otherwise flush and use the connection."""
+        ops = getattr(self._local, "ops", None)
+        if ops is not None:
+            yield _RecordingCursor(ops)
+            return
+
+        self.flush()
+        with super().cursor(transaction) as cur:
+            yield cur
+
+    def _enqueue(self, thread_id: str, write, *args) -> Any:
+        """Run an upstream write method against a recording cursor and queue its statements."""
+        ops: List[Tuple[str, str, Any]] = []
+        self._local.ops = ops
+        try:
+            result = write(*args)
+        finally:
+            self._local.ops = None
+
+        with self._state_lock:
+            if self._closed:
+                raise RuntimeError("Checkpoint writer is closed")
+            self._enqueued_seq += 1
+            seq = self._enqueued_seq
+            self._last_seq_by_thread[thread_id] = seq
+            self._queue.put((seq, thread_id, ops))
+        return result
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        """Queue a checkpoint for the next group commit."""
+        return self._enqueue(
+            str(config["configurable"]["thread_id"]),
+            super().put, config, checkpoint, metadata, new_versions
+        )
+
+    def put_writes(self, config, writes, task_id, task_path: str = ""):
+        """Queue intermediate writes for the next group commit."""
+        self._enqueue(
+            str(config["configurable"]["thread_id"]),
+            super().put_writes, config, writes, task_id, task_path
+        )
+
+    def _next_batch(self) -> List[Tuple[int, str, List[Tuple[str, str, Any]]]]:
+        """Block for one queued write, then gather more until the latency window closes."""
+        first = self._queue.get()
+        if first is None:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_latency_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Close requested: commit what we have, then stop
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _commit(self, ops_list: List[List[Tuple[str, str, Any]]]):
+        """Execute the statements of one or more writes in a single transaction."""
+        with self.lock:
+            try:
+                self.setup()
+                cur = self.conn.cursor()
+                for ops in ops_list:
+                    for method, sql, params in ops:
+                        getattr(cur, method)(sql, params)
+                self.conn.commit()
+                cur.close()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def _writer_loop(self):
+        """Drain the queue, committing each batch in a single transaction."""
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+
+            errors: Dict[int, Exception] = {}
+            try:
+                self._commit([ops for _, _, ops in batch])
+            except Exception:
+                # Isolate the failing write: retry each one in its own transaction
+                for seq, _, ops in batch:
+                    try:
+                        self._commit([ops])
+                    except Exception as e:
+                        errors[seq] = e
+
+            now = time.monotonic()
+            with self._state_lock:
+                for seq, thread_id, _ in batch:
+                    if seq in errors:
+                        self._failures[thread_id] = (errors[seq], now)
+                    if self._last_seq_by_thread.get(thread_id) == seq:
+                        del self._last_seq_by_thread[thread_id]
+                # Drop failures no caller has asked about
+                for thread_id in [
+                    thread_id for thread_id, (_, failed_at) in self._failures.items()
+                    if now - failed_at > self.failure_retention_s
+                ]:
+                    del self._failures[thread_id]
+                self._committed_seq = max(self._committed_seq, batch[-1][0])
+                self.stats["batches"] += 1
+                self.stats["writes"] += len(batch)
+                self.stats["failed_writes"] += len(errors)
+                self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(batch))
+                self._state_lock.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every write queued so far is committed.
+
+        Args:
+            timeout: Seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the queue was flushed within the timeout
+        """
+        if threading.current_thread() is self._writer:
+            return True
+        with self._state_lock:
+            target = self._enqueued_seq
+            return self._state_lock.wait_for(lambda: self._committed_seq >= target, timeout)
+
+    def wait_durable(self, thread_id: str, timeout: Optional[float] = None):
+        """
+        Block until all queued writes for a workflow thread are committed.
+
+        Args:
+            thread_id: Workflow thread ID
+            timeout: Seconds to wait (None waits indefinitely)
+
+        Raises:
+            TimeoutError: If the writes are not committed in time
+            RuntimeError: If the group commit holding the writes failed
+        """
+        thread_id = str(thread_id)
+        with self._state_lock:
+            target = self._last_seq_by_thread.get(thread_id, 0)
+            if not self._state_lock.wait_for(lambda: self._committed_seq >= target, timeout):
+                raise TimeoutError(f"Checkpoint writes for thread {thread_id} not durable after {timeout}s")
+            error, _ = self._failures.pop(thread_id, (None, None))
+        if error is not None:
+            raise RuntimeError(f"Checkpoint commit failed for thread {thread_id}: {error}") from error
+
+    def close(self):
+        """Commit outstanding writes and stop the writer thread."""
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._writer.join()
@@ -0,0 +1,264 @@
+"""Durable SLA timers for paused HITL reviews."""
+
+import calendar
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.storage.human_review_repo import ESCALATE_SQL
+from src.storage.sharding import ShardRouter
+
+
+class TimerKind:
+    """What a timer tracks."""
+    REVIEW_SLA = "REVIEW_SLA"  # time allowed for a review (re-armed after each escalation)
+    DUE_DATE = "DUE_DATE"      # invoice due date approaching
+
+
+class TimerStatus:
+    """Timer lifecycle states."""
+    PENDING = "PENDING"
+    FIRED = "FIRED"
+    CANCELLED = "CANCELLED"
+
+
+class HitlTimerRepository:
+    """
+    Repository for the `hitl_timers` table.
+
+    Rows live on the same shard as the thread they belong to. `timer_id` is
+    derived from the review, timer kind and escalation level, so scheduling
+    is idempotent and a timer can be fired only once (a conditional UPDATE
+    from PENDING) even when every API process has it in its heap. Timers
+    share the shard of their review, so firing a timer and escalating the
+    review commit together. Pending
+    timers are covered by a partial index on `fire_at`, which is what the
+    scheduler reads on startup instead of scanning workflows.
+    """
+
+    def __init__(self, db_paths: Sequence[str]):
+        """
+        Initialize timer repository.
+
+        Args:
+            db_paths: Shard database paths (a single path when storage is not sharded)
+        """
+        self.router = ShardRouter(db_paths)
+        self._init_db()
+
+    def _connect(self, db_path: str) -> sqlite3.Connection:
+        """Open a connection that waits on concurrent writers."""
+        conn = sqlite3.connect(db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        """Initialize the hitl_timers table on every shard."""
+        for db_path in self.router.db_paths:
+            conn = self._connect(db_path)
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS hitl_timers (
+                    timer_id TEXT PRIMARY KEY,
+                    checkpoint_id TEXT NOT NULL,
+                    thread_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    escalation_level INTEGER NOT NULL DEFAULT 0,
+                    fire_at REAL NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    fired_at TEXT
+                )
+            """)
+            cursor.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_hitl_timers_pending
+                ON hitl_timers (fire_at)
+                WHERE status = '{TimerStatus.PENDING}'
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_hitl_timers_thread
+                ON hitl_timers (thread_id)
+            """)
+
+            conn.commit()
+            conn.close()
+
+    def add(self, timers: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Schedule timers (timers that already exist are left unchanged).
+
+        Args:
+            timers: Dicts with checkpoint_id, thread_id, kind, escalation_level and fire_at
+
+        Returns:
+            Timer rows that were created
+        """
+        created = []
+        created_at = datetime.utcnow().isoformat()
+        for timer in timers:
+            conn = self._connect(self.router.path_for(timer["thread_id"]))
+            row = conn.execute("""
+                INSERT OR IGNORE INTO hitl_timers
+                (timer_id, checkpoint_id, thread_id, kind, escalation_level, fire_at, status, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                RETURNING *
+            """, (
+                f"{timer['checkpoint_id']}:{timer['kind']}:{timer['escalation_level']}",
+                timer["checkpoint_id"],
+                timer["thread_id"],
+                timer["kind"],
+                timer["escalation_level"],
+                timer["fire_at"],
+                TimerStatus.PENDING,
+                created_at
+            )).fetchone()
+            conn.commit()
+            conn.close()
+            if row:
+                created.append(dict(row))
+        return created
+
+    def pending(self, before: float = float("inf")) -> List[Dict[str, Any]]:
+        """
+        Get pending timers from all shards (partial index range scan).
+
+        Args:
+            before: Only timers firing before this time (epoch seconds)
+
+        Returns:
+            Pending timer rows
+        """
+        rows = []
+        for db_path in self.router.db_paths:
+            conn = self._connect(db_path)
+            rows.extend(dict(row) for row in conn.execute(f"""
+                SELECT * FROM hitl_timers
+                WHERE status = '{TimerStatus.PENDING}' AND fire_at < ?
+            """, (before,)))
+            conn.close()
+        return rows
+
+    def fire(
+        self,
+        timer: Dict[str, Any],
+        escalated_to: Optional[str],
+        reassign_to: Optional[str] = None,
+        lease_s: float = 0
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fire a due timer and escalate its review in one transaction.
+
+        The review is escalated and taken from its current claimant (leased
+        to `reassign_to`, or returned to the queue). If either write fails,
+        the timer stays PENDING and fires again later.
+
+        Args:
+            timer: Timer row
+            escalated_to: Escalation target recorded on the review (e.g. a team)
+            reassign_to: Reviewer the review is leased to (None puts it back in the queue)
+            lease_s: Lease duration for `reassign_to`, in seconds
+
+        Returns:
+            None if the timer was already fired or cancelled, else a dict with
+            `review` (escalated row, None if the review was decided or deleted)
+            and `previous_claimant`
+        """
+        conn = self._connect(self.router.path_for(timer["thread_id"]))
+        conn.isolation_level = None
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(f"""
+                UPDATE hitl_timers
+                SET status = '{TimerStatus.FIRED}', fired_at = ?
+                WHERE timer_id = ? AND status = '{TimerStatus.PENDING}'
+            """, (datetime.utcnow().isoformat(), timer["timer_id"]))
+            if cursor.rowcount != 1:
+                cursor.execute("ROLLBACK")
+                return None
+
+            previous = cursor.execute(
+                "SELECT claimed_by FROM human_review_queue WHERE checkpoint_id = ?", (timer["checkpoint_id"],)
+            ).fetchone()
+            review = cursor.execute(ESCALATE_SQL, (
+                datetime.utcnow().isoformat(),
+                escalated_to,
+                reassign_to,
+                time.time() + lease_s if reassign_to else None,
+                timer["checkpoint_id"]
+            )).fetchone()
+            cursor.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                cursor.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        return {
+            "review": dict(review) if review else None,
+            "previous_claimant": previous["claimed_by"] if previous else None
+        }
+
+    def cancel_by_thread(self, thread_id: str) -> int:
+        """
+        Cancel the pending timers of a workflow thread (its review was decided).
+
+        Args:
+            thread_id: Workflow thread ID
+
+        Returns:
+            Number of timers cancelled
+        """
+        conn = self._connect(self.router.path_for(thread_id))
+        cursor = conn.execute(f"""
+            UPDATE hitl_timers
+            SET status = '{TimerStatus.CANCELLED}'
+            WHERE thread_id = ? AND status = '{TimerStatus.PENDING}'
+        """, (thread_id,))
+        cancelled = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return cancelled
+
+    def count_by_status(self) -> Dict[str, int]:
+        """
+        Count timers per status across all shards.
+
+        Returns:
+            Dict of status -> timer count
+        """
+        counts: Dict[str, int] = {}
+        for db_path in self.router.db_paths:
+            conn = self._connect(db_path)
+            for row in conn.execute("SELECT status, COUNT(*) AS n FROM hitl_timers GROUP BY status"):
+                counts[row["status"]] = counts.get(row["status"], 0) + row["n"]
+            conn.close()
+        return counts
+
+    def delete_by_thread(self, thread_id: str):
+        """
+        Delete timers for a workflow thread.
+
+        Args:
+            thread_id: Workflow thread ID
+        """
+        conn = self._connect(self.router.path_for(thread_id))
+        conn.execute("DELETE FROM hitl_timers WHERE thread_id = ?", (thread_id,))
+        conn.commit()
+        conn.close()
+
+
+def due_date_epoch(due_date: str) -> float:
+    """
+    Start of an invoice due date (UTC) in epoch seconds.
+
+    Args:
+        due_date: Due date (YYYY-MM-DD)
+
+    Returns:
+        Epoch seconds
+    """
+    return float(calendar.timegm(datetime.strptime(due_date[:10], "%Y-%m-%d").timetuple()))
@@ -1,22 +1,58 @@
 """Human review queue repository."""
 
 import sqlite3
+import time
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-import json
+
+
+# Reviews without a due date sort after every dated one
+NO_DUE_DATE = "9999-12-31"
+
+# Priority order of pending reviews: earliest due date, then largest amount, then highest risk.
+# Matches idx_review_queue_priority so the next review is found by an index seek.
+PRIORITY_ORDER = "due_date, amount DESC, risk_score DESC"
+
+
+# Records a decision only if the review is undecided and not leased to another reviewer
+# (lease checked at write time, not against an earlier read).
+# Parameters: decision, reviewer_id, notes, updated_at, checkpoint_id, reviewer_id, now
+RECORD_DECISION_SQL = """
+    UPDATE human_review_queue
+    SET decision = ?, reviewer_id = ?, notes = ?, updated_at = ?
+    WHERE checkpoint_id = ? AND decision IS NULL
+      AND (claimed_by IS NULL OR claimed_by = ? OR lease_expires_at IS NULL OR lease_expires_at < ?)
+"""
+
+# Escalates a pending review and takes it from its current claimant (see HitlTimerRepository.fire).
+# Parameters: escalated_at, escalated_to, claimed_by (reassign_to), lease_expires_at, checkpoint_id
+ESCALATE_SQL = """
+    UPDATE human_review_queue
+    SET escalation_level = COALESCE(escalation_level, 0) + 1, escalated_at = ?, escalated_to = ?,
+        claimed_by = ?, lease_expires_at = ?
+    WHERE checkpoint_id = ? AND decision IS NULL
+    RETURNING *
+"""
+
+
+def priority_key(review: Dict[str, Any]) -> tuple:
+    """Sort key giving the same order as PRIORITY_ORDER."""
+    return (review.get("due_date") or NO_DUE_DATE, -(review.get("amount") or 0), -(review.get("risk_score") or 0))
 
 
 class HumanReviewRepository:
     """Repository for managing human review queue."""
     
-    def __init__(self, db_path: str = "./demo.db"):
+    def __init__(self, db_path: str = "./demo.db", checkpointer=None):
         """
         Initialize human review repository.
         
         Args:
             db_path: SQLite database path
+            checkpointer: LangGraph checkpointer used to read paused state lazily
         """
         self.db_path = db_path
+        self.checkpointer = checkpointer
         self._init_db()
     
     def _init_db(self):
@@ -38,10 +74,19 @@ class HumanReviewRepository:
                 review_url TEXT NOT NULL,
                 state_blob TEXT,
                 thread_id TEXT,
+                graph_checkpoint_id TEXT,
                 decision TEXT,
                 reviewer_id TEXT,
                 notes TEXT,
-                updated_at TEXT
+                updated_at TEXT,
+                due_date TEXT,
+                risk_score REAL,
+                claimed_by TEXT,
+                lease_expires_at REAL,
+                mismatch_signature TEXT,
+                escalation_level INTEGER DEFAULT 0,
+                escalated_at TEXT,
+                escalated_to TEXT
             )
         """)
         
@@ -53,14 +98,61 @@ class HumanReviewRepository:
             cursor.execute("ALTER TABLE human_review_queue ADD COLUMN mismatch_reason TEXT")
         if "failed_stage" not in columns:
             cursor.execute("ALTER TABLE human_review_queue ADD COLUMN failed_stage TEXT")
+        if "graph_checkpoint_id" not in columns:
+            cursor.execute("ALTER TABLE human_review_queue ADD COLUMN graph_checkpoint_id TEXT")
+        if "due_date" not in columns:
+            cursor.execute("ALTER TABLE human_review_queue ADD COLUMN due_date TEXT")
+            cursor.execute("UPDATE human_review_queue SET due_date = ?", (NO_DUE_DATE,))
+        if "risk_score" not in columns:
+            cursor.execute("ALTER TABLE human_review_queue ADD COLUMN risk_score REAL")
+            cursor.execute("UPDATE human_review_queue SET risk_score = 0")
+        if "claimed_by" not in columns:
+            cursor.execute("ALTER TABLE human_review_queue ADD COLUMN claimed_by TEXT")
+        if "lease_expires_at" not in columns:
+            cursor.execute("ALTER TABLE human_review_queue ADD COLUMN lease_expires_at REAL")
+        if "mismatch_signature" not in columns:
+            cursor.execute("ALTER TABLE human_review_queue ADD COLUMN mismatch_signature TEXT")
+        if "escalation_level" not in columns:
+            cursor.execute("ALTER TABLE human_review_queue ADD COLUMN escalation_level INTEGER DEFAULT 0")
+            cursor.execute("ALTER TABLE human_review_queue ADD COLUMN escalated_at TEXT")
+            cursor.execute("ALTER TABLE human_review_queue ADD COLUMN escalated_to TEXT")
+        
+        # Pending reviews in priority order (partial index: decided rows drop out of it)
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_review_queue_priority
+            ON human_review_queue ({PRIORITY_ORDER})
+            WHERE decision IS NULL
+        """)
+        
+        # One-time migrations, recorded per database so they never run again
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                name TEXT PRIMARY KEY,
+                applied_at TEXT NOT NULL
+            )
+        """)
+        cursor.execute(
+            "INSERT OR IGNORE INTO schema_migrations (name, applied_at) VALUES (?, ?)",
+            ("human_review_queue.strip_state_blob", datetime.utcnow().isoformat())
+        )
+        stripped = 0
+        if cursor.rowcount == 1:
+            # State now lives only in the LangGraph checkpoint, strip legacy blobs
+            cursor.execute("UPDATE human_review_queue SET state_blob = NULL WHERE state_blob IS NOT NULL")
+            stripped = cursor.rowcount
         
         conn.commit()
+        if stripped > 0:
+            conn.execute("VACUUM")
         conn.close()
     
     def save_checkpoint(self, checkpoint_data: Dict[str, Any]):
         """
         Save checkpoint to human review queue.
         
+        Auto-resolved holds are saved already decided (decision, reviewer_id
+        and notes set), so they never show up as pending.
+        
         Args:
             checkpoint_data: Checkpoint data dict
         """
@@ -70,8 +162,9 @@ class HumanReviewRepository:
         cursor.execute("""
             INSERT OR REPLACE INTO human_review_queue 
             (checkpoint_id, invoice_id, vendor_name, amount, created_at, 
-             reason_for_hold, mismatch_reason, failed_stage, review_url, state_blob, thread_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+             reason_for_hold, mismatch_reason, failed_stage, review_url, thread_id, graph_checkpoint_id,
+             due_date, risk_score, mismatch_signature, decision, reviewer_id, notes, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             checkpoint_data["checkpoint_id"],
             checkpoint_data["invoice_id"],
@@ -82,8 +175,15 @@ class HumanReviewRepository:
             checkpoint_data.get("mismatch_reason"),
             checkpoint_data.get("failed_stage"),
             checkpoint_data["review_url"],
-            checkpoint_data.get("state_blob"),
-            checkpoint_data.get("thread_id")
+            checkpoint_data.get("thread_id"),
+            checkpoint_data.get("graph_checkpoint_id"),
+            checkpoint_data.get("due_date") or NO_DUE_DATE,
+            checkpoint_data.get("risk_score") or 0,
+            checkpoint_data.get("mismatch_signature"),
+            checkpoint_data.get("decision"),
+            checkpoint_data.get("reviewer_id"),
+            checkpoint_data.get("notes"),
+            checkpoint_data["created_at"] if checkpoint_data.get("decision") else None
         ))
         
         conn.commit()
@@ -91,7 +191,7 @@ class HumanReviewRepository:
     
     def get_pending_reviews(self) -> List[Dict[str, Any]]:
         """
-        Get all pending reviews (without decision).
+        Get all pending reviews (without decision), highest priority first.
         
         Note: This method only checks the database. The API endpoint should
         filter these results based on actual workflow state to ensure only
@@ -104,13 +204,37 @@ class HumanReviewRepository:
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT checkpoint_id, invoice_id, vendor_name, amount, 
                    created_at, reason_for_hold, mismatch_reason, failed_stage, 
-                   review_url, thread_id
+                   review_url, thread_id, due_date, risk_score, claimed_by, lease_expires_at,
+                   escalation_level, escalated_at, escalated_to
             FROM human_review_queue
             WHERE decision IS NULL
-            ORDER BY created_at DESC
+            ORDER BY {PRIORITY_ORDER}
+        """)
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [dict(row) for row in rows]
+    
+    def list_all(self) -> List[Dict[str, Any]]:
+        """
+        Get all review queue entries (pending and decided).
+        
+        Returns:
+            List of review queue rows
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT checkpoint_id, invoice_id, vendor_name, amount, 
+                   created_at, reason_for_hold, mismatch_reason, failed_stage,
+                   decision, reviewer_id, notes, updated_at, thread_id, mismatch_signature
+            FROM human_review_queue
         """)
         
         rows = cursor.fetchall()
@@ -148,7 +272,7 @@ class HumanReviewRepository:
         decision: str,
         reviewer_id: str,
         notes: Optional[str] = None
-    ):
+    ) -> bool:
         """
         Update checkpoint with human decision.
         
@@ -157,28 +281,230 @@ class HumanReviewRepository:
             decision: Decision (ACCEPT/REJECT)
             reviewer_id: Reviewer ID
             notes: Optional notes
+            
+        Returns:
+            True if recorded, False if the review was already decided or is leased to another reviewer
+        """
+        return bool(self.update_decisions([{
+            "checkpoint_id": checkpoint_id,
+            "decision": decision,
+            "reviewer_id": reviewer_id,
+            "notes": notes
+        }]))
+    
+    def update_decisions(self, decisions: List[Dict[str, Any]]) -> List[str]:
+        """
+        Record several human decisions in one transaction.
+        
+        Reviews that already have a decision, or that another reviewer holds
+        a live lease on, are left unchanged (conflicts).
+        
+        Args:
+            decisions: Dicts with checkpoint_id, decision, reviewer_id and notes
+            
+        Returns:
+            Checkpoint IDs whose decision was recorded by this call
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        updated_at = datetime.utcnow().isoformat()
+        now = time.time()
+        updated = []
+        for item in decisions:
+            cursor.execute(RECORD_DECISION_SQL, (
+                item["decision"],
+                item["reviewer_id"],
+                item.get("notes"),
+                updated_at,
+                item["checkpoint_id"],
+                item["reviewer_id"],
+                now
+            ))
+            if cursor.rowcount == 1:
+                updated.append(item["checkpoint_id"])
+        
+        conn.commit()
+        conn.close()
+        return updated
+    
+    def set_graph_checkpoint_id(self, checkpoint_id: str, graph_checkpoint_id: str):
+        """
+        Record the LangGraph checkpoint that holds the paused workflow state.
+        
+        Args:
+            checkpoint_id: Review checkpoint ID
+            graph_checkpoint_id: LangGraph checkpoint ID for the pause
         """
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
             UPDATE human_review_queue
-            SET decision = ?, reviewer_id = ?, notes = ?, updated_at = ?
+            SET graph_checkpoint_id = ?
             WHERE checkpoint_id = ?
-        """, (
-            decision,
-            reviewer_id,
-            notes,
-            datetime.utcnow().isoformat(),
-            checkpoint_id
-        ))
+        """, (graph_checkpoint_id, checkpoint_id))
+        
+        conn.commit()
+        conn.close()
+    
+    def peek_next(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the highest-priority pending review that is not leased (without claiming it).
+        
+        Returns:
+            Review row or None if every pending review is leased
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # Walks idx_review_queue_priority from the front, skipping only live leases
+        cursor.execute(f"""
+            SELECT * FROM human_review_queue
+            WHERE decision IS NULL AND (lease_expires_at IS NULL OR lease_expires_at < ?)
+            ORDER BY {PRIORITY_ORDER}
+            LIMIT 1
+        """, (time.time(),))
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        return dict(row) if row else None
+    
+    def claim(self, checkpoint_id: str, reviewer_id: str, lease_s: float) -> Optional[Dict[str, Any]]:
+        """
+        Lease a pending review to a reviewer.
+        
+        Succeeds if the review is undecided and unleased, its lease has
+        expired, or the reviewer already holds it (the lease is renewed).
+        
+        Args:
+            checkpoint_id: Review checkpoint ID
+            reviewer_id: Reviewer claiming the review
+            lease_s: Lease duration in seconds
+            
+        Returns:
+            Claimed review row or None if it is decided or leased to someone else
+        """
+        now = time.time()
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            UPDATE human_review_queue
+            SET claimed_by = ?, lease_expires_at = ?
+            WHERE checkpoint_id = ? AND decision IS NULL
+              AND (lease_expires_at IS NULL OR lease_expires_at < ? OR claimed_by = ?)
+            RETURNING *
+        """, (reviewer_id, now + lease_s, checkpoint_id, now, reviewer_id))
+        
+        row = cursor.fetchone()
+        conn.commit()
+        conn.close()
+        
+        return dict(row) if row else None
+    
+    def claim_next(self, reviewer_id: str, lease_s: float) -> Optional[Dict[str, Any]]:
+        """
+        Lease the highest-priority pending review that nobody holds.
+        
+        Args:
+            reviewer_id: Reviewer claiming work
+            lease_s: Lease duration in seconds
+            
+        Returns:
+            Claimed review row or None if no review is available
+        """
+        while True:
+            candidate = self.peek_next()
+            if not candidate:
+                return None
+            claimed = self.claim(candidate["checkpoint_id"], reviewer_id, lease_s)
+            if claimed:
+                return claimed
+            # Another reviewer claimed it between peek and claim; take the next one
+    
+    def heartbeat(self, checkpoint_id: str, reviewer_id: str, lease_s: float) -> Optional[float]:
+        """
+        Extend a reviewer's lease.
+        
+        Args:
+            checkpoint_id: Review checkpoint ID
+            reviewer_id: Reviewer holding the lease
+            lease_s: New lease duration from now, in seconds
+            
+        Returns:
+            New lease expiry (epoch seconds) or None if the reviewer no longer holds the review
+        """
+        now = time.time()
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        # An expired lease can still be renewed as long as nobody else claimed the review
+        cursor.execute("""
+            UPDATE human_review_queue
+            SET lease_expires_at = ?
+            WHERE checkpoint_id = ? AND decision IS NULL AND claimed_by = ?
+        """, (now + lease_s, checkpoint_id, reviewer_id))
+        renewed = cursor.rowcount == 1
+        
+        conn.commit()
+        conn.close()
+        
+        return now + lease_s if renewed else None
+    
+    def release(self, checkpoint_id: str, reviewer_id: str) -> bool:
+        """
+        Give a leased review back to the queue.
+        
+        Args:
+            checkpoint_id: Review checkpoint ID
+            reviewer_id: Reviewer holding the lease
+            
+        Returns:
+            True if the reviewer held the review
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            UPDATE human_review_queue
+            SET claimed_by = NULL, lease_expires_at = NULL
+            WHERE checkpoint_id = ? AND claimed_by = ?
+        """, (checkpoint_id, reviewer_id))
+        released = cursor.rowcount == 1
+        
+        conn.commit()
+        conn.close()
+        
+        return released
+    
+    def delete_by_thread(self, thread_id: str):
+        """
+        Delete review queue entries for a workflow thread.
+        
+        Args:
+            thread_id: Workflow thread ID
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            DELETE FROM human_review_queue
+            WHERE thread_id = ?
+        """, (thread_id,))
         
         conn.commit()
         conn.close()
     
     def get_state_blob(self, checkpoint_id: str) -> Optional[Dict[str, Any]]:
         """
-        Get state blob from checkpoint.
+        Get paused workflow state for a checkpoint.
+        
+        The state is read lazily from the LangGraph checkpoint referenced by the
+        queue row (or the thread's latest checkpoint if no reference was recorded).
         
         Args:
             checkpoint_id: Checkpoint ID
@@ -187,12 +513,20 @@ class HumanReviewRepository:
             State dict or None
         """
         checkpoint = self.get_checkpoint(checkpoint_id)
-        if not checkpoint or not checkpoint.get("state_blob"):
+        if not checkpoint or not checkpoint.get("thread_id") or self.checkpointer is None:
             return None
         
-        try:
-            state_data = json.loads(checkpoint["state_blob"])
-            return state_data.get("workflow_state")
-        except json.JSONDecodeError:
+        configurable = {"thread_id": checkpoint["thread_id"], "checkpoint_ns": ""}
+        if checkpoint.get("graph_checkpoint_id"):
+            configurable["checkpoint_id"] = checkpoint["graph_checkpoint_id"]
+        
+        checkpoint_tuple = self.checkpointer.get_tuple({"configurable": configurable})
+        if not checkpoint_tuple and "checkpoint_id" in configurable:
+            # Compaction keeps only the final checkpoint of finished threads
+            configurable.pop("checkpoint_id")
+            checkpoint_tuple = self.checkpointer.get_tuple({"configurable": configurable})
+        if not checkpoint_tuple:
             return None
+        
+        return dict(checkpoint_tuple.checkpoint.get("channel_values", {}))
 
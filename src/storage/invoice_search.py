@@ -0,0 +1,349 @@
+"""Full-text search over invoices (SQLite FTS5)."""
+
+import re
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.logging.logger import log_error
+from src.storage.blob_store import resolve_invoice_text
+from src.storage.sharding import ShardRouter
+
+
+# Searchable columns (same order in the FTS table and its content table) and their bm25 weights
+SEARCH_COLUMNS = ("invoice_id", "vendor", "po_ids", "invoice_text")
+RANK_WEIGHTS = (10.0, 5.0, 5.0, 1.0)
+
+
+def document_fields(values: Dict[str, Any], invoice_text: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Search document fields of a workflow state.
+
+    Fields the state does not have yet are None, so indexing at UNDERSTAND
+    and again at PREPARE fills the document in without overwriting.
+
+    Args:
+        values: Workflow state values
+        invoice_text: Full OCR text (None keeps the indexed text)
+
+    Returns:
+        Dict with invoice_id, vendor_name, vendor, vendor_id, po_ids, invoice_text and amount
+    """
+    invoice_payload = values.get("invoice_payload") or {}
+    parsed_invoice = (values.get("understand") or {}).get("parsed_invoice") or {}
+    vendor_profile = (values.get("prepare") or {}).get("vendor_profile") or {}
+
+    vendor_name = invoice_payload.get("vendor_name") or ""
+    normalized_name = vendor_profile.get("normalized_name") or ""
+    vendor = vendor_name if normalized_name.lower() in ("", vendor_name.lower()) else f"{vendor_name} {normalized_name}"
+
+    if invoice_text is not None:
+        # Line item descriptions are searchable too (the only text when there is no attachment)
+        descriptions = [item.get("desc", "") for item in parsed_invoice.get("parsed_line_items") or []]
+        invoice_text = "\n".join([invoice_text] + [desc for desc in descriptions if desc])
+
+    return {
+        "invoice_id": invoice_payload.get("invoice_id"),
+        "vendor_name": vendor_name or None,
+        "vendor": vendor or None,
+        "vendor_id": vendor_profile.get("vendor_id"),
+        "po_ids": " ".join(parsed_invoice.get("detected_pos") or []) if parsed_invoice else None,
+        "invoice_text": invoice_text,
+        "amount": invoice_payload.get("amount")
+    }
+
+
+def fts_query(query: str) -> str:
+    """
+    FTS5 MATCH expression for a user query.
+
+    Every whitespace-separated term must match (as a phrase, so "INV-2024-0420"
+    matches its tokens in order) and the last term matches as a prefix, so
+    results narrow while the user types. FTS5 operators in the input are
+    treated as text.
+
+    Args:
+        query: Search text
+
+    Returns:
+        MATCH expression ("" if the query has no searchable characters)
+    """
+    terms = [term for term in query.split() if re.search(r"\w", term)]
+    phrases = ['"' + term.replace('"', '""') + '"' for term in terms]
+    if phrases:
+        phrases[-1] += "*"
+    return " ".join(phrases)
+
+
+class InvoiceSearchIndex:
+    """
+    FTS5 index of invoice ID, vendor names, detected PO numbers and OCR text.
+
+    Every shard has an `invoice_search_docs` table (one row per thread,
+    holding the searchable text and a few display fields) and an external-
+    content FTS5 table `invoice_search` over it, so the text is stored once
+    and a search is an index lookup plus a join on rowid. UNDERSTAND indexes
+    the invoice ID, raw vendor name, detected POs and full OCR text (before
+    it is offloaded to the blob store); PREPARE adds the normalized vendor.
+
+    Results are ranked by bm25 with invoice ID weighted highest, then
+    vendor and PO numbers, then OCR text, and carry the workflow's status
+    and stage from the dashboard index (`workflow_index`, same shard).
+    Searches fan out across shards and merge by rank.
+    """
+
+    def __init__(self):
+        """Initialize an unconfigured index."""
+        self.router: Optional[ShardRouter] = None
+        self.enabled = False
+        self.max_text_chars = 20000
+
+    def configure(self, db_paths: Sequence[str], settings: Optional[Dict[str, Any]] = None):
+        """
+        Configure search index (used by build_invoice_graph).
+
+        Args:
+            db_paths: Shard database paths
+            settings: `invoice_search` config section
+        """
+        settings = settings or {}
+        self.router = ShardRouter(db_paths)
+        self.enabled = settings.get("enabled", True)
+        self.max_text_chars = int(settings.get("max_text_chars", 20000))
+        self._init_db()
+
+    def _connect(self, db_path: str) -> sqlite3.Connection:
+        """Open a connection that waits on concurrent writers."""
+        conn = sqlite3.connect(db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        """Initialize document and FTS5 tables on every shard."""
+        for db_path in self.router.db_paths:
+            conn = self._connect(db_path)
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS invoice_search_docs (
+                    thread_id TEXT PRIMARY KEY,
+                    invoice_id TEXT,
+                    vendor_name TEXT,
+                    vendor TEXT,
+                    vendor_id TEXT,
+                    po_ids TEXT,
+                    invoice_text TEXT,
+                    amount REAL,
+                    indexed_at TEXT NOT NULL
+                )
+            """)
+            exists = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'invoice_search'"
+            ).fetchone()
+            if not exists:
+                cursor.execute(f"""
+                    CREATE VIRTUAL TABLE invoice_search USING fts5(
+                        {", ".join(SEARCH_COLUMNS)},
+                        content = 'invoice_search_docs',
+                        content_rowid = 'rowid',
+                        tokenize = 'unicode61 remove_diacritics 2'
+                    )
+                """)
+                # Persistent ranking, so `ORDER BY rank` uses the column weights
+                cursor.execute(
+                    "INSERT INTO invoice_search (invoice_search, rank) VALUES ('rank', ?)",
+                    (f"bm25({', '.join(str(weight) for weight in RANK_WEIGHTS)})",)
+                )
+                # Documents already present (e.g. moved here by rebalance_shards.py)
+                cursor.execute("INSERT INTO invoice_search (invoice_search) VALUES ('rebuild')")
+
+            conn.commit()
+            conn.close()
+
+    def index(self, thread_id: str, fields: Dict[str, Any]):
+        """
+        Add or update a thread's search document (None fields keep their indexed value).
+
+        Args:
+            thread_id: Workflow thread ID
+            fields: Document fields (see document_fields)
+        """
+        if not self.enabled or self.router is None or not thread_id:
+            return
+        if fields.get("invoice_text") is not None:
+            fields = {**fields, "invoice_text": fields["invoice_text"][:self.max_text_chars]}
+        columns = ("invoice_id", "vendor_name", "vendor", "vendor_id", "po_ids", "invoice_text", "amount")
+        searchable = ", ".join(SEARCH_COLUMNS)
+
+        conn = self._connect(self.router.path_for(thread_id))
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            previous = cursor.execute(
+                f"SELECT rowid, {searchable} FROM invoice_search_docs WHERE thread_id = ?", (thread_id,)
+            ).fetchone()
+            if previous is not None:
+                # External content: the old terms must be removed with the values they were indexed from
+                cursor.execute(f"""
+                    INSERT INTO invoice_search (invoice_search, rowid, {searchable})
+                    VALUES ('delete', ?, ?, ?, ?, ?)
+                """, tuple(previous))
+            row = cursor.execute(f"""
+                INSERT INTO invoice_search_docs (thread_id, {", ".join(columns)}, indexed_at)
+                VALUES (?, {", ".join("?" for _ in columns)}, ?)
+                ON CONFLICT(thread_id) DO UPDATE SET
+                    {", ".join(f"{column} = COALESCE(excluded.{column}, {column})" for column in columns)},
+                    indexed_at = excluded.indexed_at
+                RETURNING rowid, {searchable}
+            """, (thread_id, *(fields.get(column) for column in columns), datetime.utcnow().isoformat())).fetchone()
+            cursor.execute(f"""
+                INSERT INTO invoice_search (rowid, {searchable}) VALUES (?, ?, ?, ?, ?)
+            """, tuple(row))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def index_state(self, stage_id: str, values: Dict[str, Any], invoice_text: Optional[str] = None):
+        """
+        Index a workflow state from a node (failures are logged, never raised).
+
+        Args:
+            stage_id: Indexing node (for the error log)
+            values: Workflow state values including the node's output
+            invoice_text: Full OCR text (None keeps the indexed text)
+        """
+        try:
+            self.index(values.get("thread_id"), document_fields(values, invoice_text))
+        except Exception as e:
+            log_error(stage_id, e, {"thread_id": values.get("thread_id"), "job": "invoice_search"})
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """
+        Ranked full-text search across all shards.
+
+        Each shard returns its best `offset + limit` hits (an FTS5 index
+        lookup ordered by rank); the hits are merged by rank and the page is
+        cut from the merged list.
+
+        Args:
+            query: Search text (invoice number, vendor, PO number, words in the invoice)
+            limit: Page size
+            offset: Hits to skip
+
+        Returns:
+            Dict with items (thread_id, invoice_id, vendor, po_ids, amount, status, stage,
+            score, snippet), has_more and took_ms
+        """
+        start_time = time.perf_counter()
+        match = fts_query(query)
+        hits: List[Dict[str, Any]] = []
+        if match:
+            for db_path in self.router.db_paths:
+                conn = self._connect(db_path)
+                hits.extend(dict(row) for row in conn.execute("""
+                    SELECT d.thread_id, d.invoice_id, d.vendor_name, d.vendor_id, d.po_ids, d.amount,
+                           d.indexed_at, wi.status, wi.stage, invoice_search.rank AS score,
+                           snippet(invoice_search, -1, '[', ']', '…', 12) AS snippet
+                    FROM invoice_search
+                    JOIN invoice_search_docs d ON d.rowid = invoice_search.rowid
+                    LEFT JOIN workflow_index wi ON wi.thread_id = d.thread_id
+                    WHERE invoice_search MATCH ?
+                    ORDER BY invoice_search.rank
+                    LIMIT ?
+                """, (match, offset + limit + 1)))
+                conn.close()
+        hits.sort(key=lambda hit: hit["score"])
+        return {
+            "query": query,
+            "items": hits[offset:offset + limit],
+            "limit": limit,
+            "offset": offset,
+            "has_more": len(hits) > offset + limit,
+            "took_ms": round((time.perf_counter() - start_time) * 1000, 2)
+        }
+
+    def delete_by_thread(self, thread_id: str):
+        """
+        Remove a deleted workflow from the index.
+
+        Args:
+            thread_id: Workflow thread ID
+        """
+        if self.router is None:
+            return
+        searchable = ", ".join(SEARCH_COLUMNS)
+        conn = self._connect(self.router.path_for(thread_id))
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            previous = cursor.execute(
+                f"SELECT rowid, {searchable} FROM invoice_search_docs WHERE thread_id = ?", (thread_id,)
+            ).fetchone()
+            if previous is not None:
+                cursor.execute(f"""
+                    INSERT INTO invoice_search (invoice_search, rowid, {searchable})
+                    VALUES ('delete', ?, ?, ?, ?, ?)
+                """, tuple(previous))
+                cursor.execute("DELETE FROM invoice_search_docs WHERE rowid = ?", (previous["rowid"],))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def is_empty(self) -> bool:
+        """Whether no shard has a search document."""
+        for db_path in self.router.db_paths:
+            conn = self._connect(db_path)
+            row = conn.execute("SELECT 1 FROM invoice_search_docs LIMIT 1").fetchone()
+            conn.close()
+            if row:
+                return False
+        return True
+
+    def backfill(self, checkpointer) -> int:
+        """
+        Index workflows that have no search document yet, from their latest checkpoint.
+
+        Args:
+            checkpointer: Checkpointer holding the threads
+
+        Returns:
+            Number of workflows indexed
+        """
+        indexed = 0
+        for db_path in self.router.db_paths:
+            conn = self._connect(db_path)
+            thread_ids = [row[0] for row in conn.execute("""
+                SELECT DISTINCT thread_id FROM checkpoints
+                WHERE thread_id NOT IN (SELECT thread_id FROM invoice_search_docs)
+            """)]
+            conn.close()
+            for thread_id in thread_ids:
+                checkpoint_tuple = checkpointer.get_tuple({"configurable": {"thread_id": thread_id}})
+                if not checkpoint_tuple:
+                    continue
+                values = checkpoint_tuple.checkpoint.get("channel_values", {})
+                parsed_invoice = (values.get("understand") or {}).get("parsed_invoice")
+                if not parsed_invoice:
+                    continue
+                self.index(thread_id, document_fields(values, resolve_invoice_text(parsed_invoice)))
+                indexed += 1
+        return indexed
+
+    def rebuild(self):
+        """Rebuild the FTS5 index of every shard from its documents (after moving threads between shards)."""
+        for db_path in self.router.db_paths:
+            conn = self._connect(db_path)
+            conn.execute("INSERT INTO invoice_search (invoice_search) VALUES ('rebuild')")
+            conn.commit()
+            conn.close()
+
+
+# Global instance (configured by build_invoice_graph, written by UNDERSTAND and PREPARE)
+invoice_search_index = InvoiceSearchIndex()
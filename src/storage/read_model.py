@@ -0,0 +1,297 @@
+"""Async read model for API query endpoints (aiosqlite)."""
+
+import asyncio
+import sqlite3
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+import aiosqlite
+
+from src.storage.human_review_repo import priority_key
+from src.storage.sharding import ShardRouter
+
+
+# Same columns HumanReviewRepository.list_all returns
+REVIEW_COLUMNS = """
+    checkpoint_id, invoice_id, vendor_name, amount,
+    created_at, reason_for_hold, mismatch_reason, failed_stage,
+    review_url, decision, reviewer_id, notes, updated_at, thread_id,
+    due_date, risk_score, claimed_by, lease_expires_at,
+    escalation_level, escalated_at, escalated_to
+"""
+
+# SQLite's default limit on bound parameters is 999 on older builds
+_MAX_PARAMS = 900
+
+
+class ReadOnlyPool:
+    """
+    Pool of read-only aiosqlite connections to one database file.
+
+    Connections are opened with `mode=ro`, so they can never take the write
+    lock; under WAL they read the last committed snapshot while the writer
+    connection keeps committing. Connections are opened on demand up to
+    `size`; further requests wait for one to be released.
+    """
+
+    def __init__(self, db_path: str, size: int = 4):
+        """
+        Initialize pool.
+
+        Args:
+            db_path: SQLite database path
+            size: Maximum number of open connections
+        """
+        if size < 1:
+            raise ValueError(f"read_pool.size must be >= 1, got {size}")
+        self.db_path = db_path
+        self.size = size
+        self._opened = 0
+        self._idle: Optional[asyncio.Queue] = None
+
+    async def _open(self) -> aiosqlite.Connection:
+        """Open one read-only connection."""
+        uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+        conn = await aiosqlite.connect(uri, uri=True, timeout=30)
+        conn.row_factory = aiosqlite.Row
+        return conn
+
+    async def acquire(self) -> aiosqlite.Connection:
+        """Take a connection, opening one if the pool is not full."""
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        if self._idle.empty() and self._opened < self.size:
+            self._opened += 1
+            try:
+                return await self._open()
+            except Exception:
+                self._opened -= 1
+                raise
+        return await self._idle.get()
+
+    def release(self, conn: aiosqlite.Connection):
+        """Return a connection to the pool."""
+        self._idle.put_nowait(conn)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a connection for the duration of a `async with` block."""
+        conn = await self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    async def close(self):
+        """Close idle connections (call once no reads are in flight)."""
+        while self._idle is not None and not self._idle.empty():
+            await self._idle.get_nowait().close()
+            self._opened -= 1
+        self._idle = None
+
+
+class AsyncWorkflowReadModel:
+    """
+    Non-blocking reads of workflow state and the review queue.
+
+    API handlers are async; reading through the sync repositories or
+    `graph.get_state` stalls the event loop (and every other request) for the
+    duration of the query. This read model queries the same tables through
+    aiosqlite, whose connections run on their own threads, and deserializes
+    checkpoint blobs off the loop. Each shard has a pool of read-only
+    connections, separate from the checkpointer's writer connection, so
+    dashboard traffic never holds a lock that checkpoint writes wait on.
+
+    A thread's state is the `channel_values` of its latest root checkpoint,
+    which is what `graph.get_state(...).values` returns once a run has exited.
+    Writes still queued by group commit become visible within
+    `max_latency_ms`; handlers that just wrote call `wait_durable` first.
+    """
+
+    def __init__(self):
+        """Initialize an unconfigured read model."""
+        self.router: Optional[ShardRouter] = None
+        self.serde = None
+        self.pools: List[ReadOnlyPool] = []
+
+    def configure(self, shard_paths: Sequence[str], serde, settings: Optional[Dict[str, Any]] = None):
+        """
+        Configure read model (used by build_invoice_graph).
+
+        Args:
+            shard_paths: Database paths holding per-thread tables (one per shard)
+            serde: Checkpoint serializer used by the checkpointer
+            settings: `read_pool` config section (size: connections per shard)
+        """
+        settings = settings or {}
+        self.router = ShardRouter(shard_paths)
+        self.serde = serde
+        self.pools = [ReadOnlyPool(db_path, int(settings.get("size", 4))) for db_path in shard_paths]
+        for db_path in shard_paths:
+            # Read-only connections cannot switch the journal mode; make sure readers never block the writer
+            conn = sqlite3.connect(db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.close()
+
+    async def _fetchall(self, shard: int, sql: str, params: Sequence[Any] = ()) -> List[aiosqlite.Row]:
+        """Run a query on one shard, treating a missing table as empty."""
+        async with self.pools[shard].connection() as conn:
+            try:
+                async with conn.execute(sql, params) as cursor:
+                    return list(await cursor.fetchall())
+            except aiosqlite.OperationalError as e:
+                if "no such table" in str(e):
+                    return []
+                raise
+
+    async def _fan_out(self, sql: str, params: Sequence[Any] = ()) -> List[aiosqlite.Row]:
+        """Run the same query on every shard concurrently and concatenate the rows."""
+        results = await asyncio.gather(*(self._fetchall(shard, sql, params) for shard in range(self.router.count)))
+        return [row for rows in results for row in rows]
+
+    async def list_reviews(self, pending_only: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get review queue entries from all shards.
+
+        Args:
+            pending_only: Only entries without a decision (highest priority first)
+
+        Returns:
+            List of review queue rows
+        """
+        where = "WHERE decision IS NULL" if pending_only else ""
+        rows = [dict(row) for row in await self._fan_out(f"SELECT {REVIEW_COLUMNS} FROM human_review_queue {where}")]
+        if pending_only:
+            rows.sort(key=priority_key)
+        return rows
+
+    async def get_review(self, checkpoint_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a review queue entry by review checkpoint ID.
+
+        Args:
+            checkpoint_id: Checkpoint ID
+
+        Returns:
+            Review row or None
+        """
+        rows = await self._fan_out("SELECT * FROM human_review_queue WHERE checkpoint_id = ?", (checkpoint_id,))
+        return dict(rows[0]) if rows else None
+
+    async def get_reviews(self, checkpoint_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get several review queue entries (one query per shard and batch).
+
+        Args:
+            checkpoint_ids: Review checkpoint IDs
+
+        Returns:
+            Dict of checkpoint_id -> review row (unknown IDs are omitted)
+        """
+        checkpoint_ids = list(checkpoint_ids)
+        queries = []
+        for index in range(0, len(checkpoint_ids), _MAX_PARAMS):
+            batch = checkpoint_ids[index:index + _MAX_PARAMS]
+            placeholders = ",".join("?" for _ in batch)
+            queries.append(self._fan_out(f"""
+                SELECT checkpoint_id, thread_id, invoice_id, decision, claimed_by, lease_expires_at
+                FROM human_review_queue
+                WHERE checkpoint_id IN ({placeholders})
+            """, batch))
+        rows = [row for result in await asyncio.gather(*queries) for row in result]
+        return {row["checkpoint_id"]: dict(row) for row in rows}
+
+    async def get_resume_job(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest background resume job of a thread.
+
+        Args:
+            thread_id: Workflow thread ID
+
+        Returns:
+            Resume job row or None
+        """
+        rows = await self._fetchall(self.router.shard_for(thread_id), """
+            SELECT checkpoint_id, decision, next_stage, status, attempts, last_error,
+                   enqueued_at, started_at, finished_at, resume_latency_ms
+            FROM resume_jobs
+            WHERE thread_id = ?
+            ORDER BY enqueued_at DESC
+            LIMIT 1
+        """, (thread_id,))
+        return dict(rows[0]) if rows else None
+
+    async def list_thread_ids(self) -> List[str]:
+        """
+        List workflow thread IDs that have checkpoints.
+
+        Returns:
+            Thread IDs (root namespace) across all shards, sorted
+        """
+        rows = await self._fan_out("SELECT DISTINCT thread_id FROM checkpoints WHERE checkpoint_ns = ''")
+        return sorted(row[0] for row in rows)
+
+    def _decode(self, rows: List[aiosqlite.Row]) -> Dict[str, Dict[str, Any]]:
+        """Deserialize latest-checkpoint rows into thread_id -> state values."""
+        return {
+            row["thread_id"]: dict(self.serde.loads_typed((row["type"], row["checkpoint"])).get("channel_values", {}))
+            for row in rows
+        }
+
+    async def get_states(self, thread_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the latest state of several threads (one query per shard and batch).
+
+        Args:
+            thread_ids: Workflow thread IDs
+
+        Returns:
+            Dict of thread_id -> state values (threads without checkpoints are omitted)
+        """
+        by_shard: Dict[int, List[str]] = {}
+        for thread_id in thread_ids:
+            by_shard.setdefault(self.router.shard_for(thread_id), []).append(thread_id)
+
+        queries = []
+        for shard, shard_thread_ids in by_shard.items():
+            for index in range(0, len(shard_thread_ids), _MAX_PARAMS):
+                batch = shard_thread_ids[index:index + _MAX_PARAMS]
+                placeholders = ",".join("?" for _ in batch)
+                queries.append(self._fetchall(shard, f"""
+                    SELECT thread_id, type, checkpoint
+                    FROM checkpoints c
+                    WHERE checkpoint_ns = '' AND thread_id IN ({placeholders})
+                      AND checkpoint_id = (
+                          SELECT MAX(checkpoint_id) FROM checkpoints
+                          WHERE thread_id = c.thread_id AND checkpoint_ns = ''
+                      )
+                """, batch))
+
+        rows = [row for result in await asyncio.gather(*queries) for row in result]
+        if not rows:
+            return {}
+        # Decompression and msgpack decoding are CPU work; keep them off the event loop
+        return await asyncio.to_thread(self._decode, rows)
+
+    async def get_state(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a thread's latest state.
+
+        Args:
+            thread_id: Workflow thread ID
+
+        Returns:
+            State values or None if the thread has no checkpoints
+        """
+        states = await self.get_states([thread_id])
+        return states.get(thread_id)
+
+    async def close(self):
+        """Close all shard connection pools."""
+        for pool in self.pools:
+            await pool.close()
+
+
+# Global instance (configured by build_invoice_graph)
+workflow_read_model = AsyncWorkflowReadModel()
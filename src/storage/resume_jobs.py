@@ -0,0 +1,268 @@
+"""Durable queue of workflow resume jobs (one per human decision)."""
+
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.storage.human_review_repo import RECORD_DECISION_SQL
+from src.storage.sharding import ShardRouter
+
+
+class ResumeJobStatus:
+    """Resume job lifecycle states."""
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class ResumeJobRepository:
+    """
+    Repository for the `resume_jobs` table.
+
+    A job is created when a reviewer's decision is accepted and is keyed by
+    the review checkpoint_id, so a decision can be enqueued only once. Rows
+    live on the same shard as the thread's checkpoints. Workers in any API
+    process claim jobs with a single UPDATE, which holds a lease; a job whose
+    lease expires (its worker died) becomes claimable again.
+    """
+
+    def __init__(self, db_paths: Sequence[str]):
+        """
+        Initialize resume job repository.
+
+        Args:
+            db_paths: Shard database paths (a single path when storage is not sharded)
+        """
+        self.router = ShardRouter(db_paths)
+        self._init_db()
+
+    def _connect(self, db_path: str) -> sqlite3.Connection:
+        """Open a connection that waits on concurrent writers."""
+        conn = sqlite3.connect(db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        """Initialize the resume_jobs table on every shard."""
+        for db_path in self.router.db_paths:
+            conn = self._connect(db_path)
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS resume_jobs (
+                    checkpoint_id TEXT PRIMARY KEY,
+                    thread_id TEXT NOT NULL,
+                    decision TEXT NOT NULL,
+                    reviewer_id TEXT,
+                    next_stage TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    available_at REAL NOT NULL,
+                    lease_expires_at REAL,
+                    worker_id TEXT,
+                    enqueued_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT,
+                    resume_latency_ms REAL
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_resume_jobs_status
+                ON resume_jobs (status, available_at)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_resume_jobs_thread
+                ON resume_jobs (thread_id)
+            """)
+
+            conn.commit()
+            conn.close()
+
+    def enqueue_many(self, jobs: Sequence[Dict[str, Any]]) -> List[str]:
+        """
+        Queue resumes for several reviews and record their decisions.
+
+        The review queue row lives on the same shard as the job, so each shard's
+        jobs and decisions are written in one transaction. A decision is recorded
+        only if the review is still undecided and not leased to another reviewer
+        (checked by the UPDATE itself), and a job is queued only with it.
+
+        Args:
+            jobs: Dicts with checkpoint_id, thread_id, decision, reviewer_id, next_stage and notes
+
+        Returns:
+            Checkpoint IDs that were queued; the others conflicted (already decided,
+            already queued, or leased to another reviewer)
+        """
+        by_shard: Dict[int, List[Dict[str, Any]]] = {}
+        for job in jobs:
+            by_shard.setdefault(self.router.shard_for(job["thread_id"]), []).append(job)
+
+        queued = []
+        now = time.time()
+        enqueued_at = datetime.utcnow().isoformat()
+        for shard, shard_jobs in by_shard.items():
+            conn = self._connect(self.router.db_paths[shard])
+            conn.isolation_level = None
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                for job in shard_jobs:
+                    cursor.execute(RECORD_DECISION_SQL, (
+                        job["decision"],
+                        job["reviewer_id"],
+                        job.get("notes"),
+                        enqueued_at,
+                        job["checkpoint_id"],
+                        job["reviewer_id"],
+                        now
+                    ))
+                    if cursor.rowcount != 1:
+                        continue
+                    cursor.execute("SAVEPOINT decided")
+                    cursor.execute("""
+                        INSERT OR IGNORE INTO resume_jobs
+                        (checkpoint_id, thread_id, decision, reviewer_id, next_stage, status, available_at, enqueued_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (
+                        job["checkpoint_id"],
+                        job["thread_id"],
+                        job["decision"],
+                        job["reviewer_id"],
+                        job["next_stage"],
+                        ResumeJobStatus.QUEUED,
+                        now,
+                        enqueued_at
+                    ))
+                    if cursor.rowcount == 1:
+                        queued.append(job["checkpoint_id"])
+                        cursor.execute("RELEASE decided")
+                    else:
+                        # A job already exists for this review: keep the review as it was
+                        cursor.execute("ROLLBACK TO decided")
+                        cursor.execute("RELEASE decided")
+                cursor.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    cursor.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+        return queued
+
+    def claim(self, worker_id: str, lease_s: float, shard: int) -> Optional[Dict[str, Any]]:
+        """
+        Claim the oldest runnable job on one shard.
+
+        Runnable jobs are QUEUED jobs whose retry backoff has passed and RUNNING
+        jobs whose lease has expired.
+
+        Args:
+            worker_id: Claiming worker
+            lease_s: Seconds the claim is held before other workers may take over
+            shard: Shard number
+
+        Returns:
+            Claimed job row (attempts already incremented) or None
+        """
+        now = time.time()
+        conn = self._connect(self.router.db_paths[shard])
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            UPDATE resume_jobs
+            SET status = ?, worker_id = ?, lease_expires_at = ?, started_at = ?, attempts = attempts + 1
+            WHERE checkpoint_id = (
+                SELECT checkpoint_id FROM resume_jobs
+                WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires_at < ?)
+                ORDER BY available_at
+                LIMIT 1
+            )
+            RETURNING *
+        """, (
+            ResumeJobStatus.RUNNING,
+            worker_id,
+            now + lease_s,
+            datetime.utcnow().isoformat(),
+            ResumeJobStatus.QUEUED,
+            now,
+            ResumeJobStatus.RUNNING,
+            now
+        ))
+        row = cursor.fetchone()
+
+        conn.commit()
+        conn.close()
+        return dict(row) if row else None
+
+    def _finish(self, job: Dict[str, Any], assignments: str, params: Sequence[Any]):
+        """Update a claimed job, unless another worker has taken it over since."""
+        conn = self._connect(self.router.path_for(job["thread_id"]))
+        cursor = conn.cursor()
+
+        cursor.execute(f"""
+            UPDATE resume_jobs
+            SET {assignments}
+            WHERE checkpoint_id = ? AND worker_id = ? AND attempts = ?
+        """, (*params, job["checkpoint_id"], job["worker_id"], job["attempts"]))
+
+        conn.commit()
+        conn.close()
+
+    def mark_done(self, job: Dict[str, Any], resume_latency_ms: float):
+        """
+        Record a completed resume.
+
+        Args:
+            job: Claimed job row
+            resume_latency_ms: Time spent resuming the graph
+        """
+        self._finish(
+            job,
+            "status = ?, finished_at = ?, resume_latency_ms = ?, last_error = NULL, lease_expires_at = NULL",
+            (ResumeJobStatus.DONE, datetime.utcnow().isoformat(), resume_latency_ms)
+        )
+
+    def mark_retry(self, job: Dict[str, Any], error: str, delay_s: float):
+        """
+        Put a failed job back in the queue after a backoff.
+
+        Args:
+            job: Claimed job row
+            error: Error message of the failed attempt
+            delay_s: Seconds before the job may be claimed again
+        """
+        self._finish(
+            job,
+            "status = ?, last_error = ?, available_at = ?, lease_expires_at = NULL",
+            (ResumeJobStatus.QUEUED, error, time.time() + delay_s)
+        )
+
+    def mark_failed(self, job: Dict[str, Any], error: str):
+        """
+        Give up on a job after its last attempt.
+
+        Args:
+            job: Claimed job row
+            error: Error message of the last attempt
+        """
+        self._finish(
+            job,
+            "status = ?, last_error = ?, finished_at = ?, lease_expires_at = NULL",
+            (ResumeJobStatus.FAILED, error, datetime.utcnow().isoformat())
+        )
+
+    def delete_by_thread(self, thread_id: str):
+        """
+        Delete resume jobs for a workflow thread.
+
+        Args:
+            thread_id: Workflow thread ID
+        """
+        conn = self._connect(self.router.path_for(thread_id))
+        conn.execute("DELETE FROM resume_jobs WHERE thread_id = ?", (thread_id,))
+        conn.commit()
+        conn.close()
@@ -0,0 +1,207 @@
+"""Compact checkpoint serializers for the LangGraph checkpointer."""
+
+import math
+import threading
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+# Optional fast JSON encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+# Optional zstd compression
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    zstandard = None
+
+
+SERIALIZER_FORMATS = ("msgpack", "orjson")
+COMPRESSION_CODECS = ("zstd", "zlib")
+
+# Type tag written for orjson payloads (distinct from LangGraph's own "json" tag)
+ORJSON_TYPE = "orjson"
+
+# Types that survive an orjson round trip unchanged (exact types: subclasses such as
+# str/int Enums would come back as their plain value)
+PLAIN_JSON_SCALARS = (str, int, bool, type(None))
+
+
+def is_plain_json(obj: Any) -> bool:
+    """
+    Check whether a value decodes from JSON to an equal value of the same types.
+
+    Only dicts with str keys, lists, str, int, bool, None and finite floats qualify.
+    Tuples, sets, bytes, datetimes, UUIDs, Enums, dataclasses and NaN/inf floats
+    do not: orjson would silently turn them into lists, strings, values or null.
+
+    Args:
+        obj: Value to check
+
+    Returns:
+        True if the value can be stored as orjson without losing type information
+    """
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        value_type = type(value)
+        if value_type in PLAIN_JSON_SCALARS:
+            continue
+        if value_type is float:
+            if not math.isfinite(value):
+                return False
+        elif value_type is list:
+            stack.extend(value)
+        elif value_type is dict:
+            if any(type(key) is not str for key in value):
+                return False
+            stack.extend(value.values())
+        else:
+            return False
+    return True
+
+
+class CompactSerializer(SerializerProtocol):
+    """
+    Checkpoint serializer with a pluggable encoding and size-triggered compression.
+
+    Payloads are encoded with msgpack (LangGraph's JsonPlusSerializer) or orjson,
+    and compressed with zstd (or zlib) once they reach `compress_min_bytes`.
+    The codec is appended to the type tag stored next to each blob
+    (e.g. "msgpack+zstd"), so untagged rows written by the default serializer
+    in existing databases are read unchanged.
+
+    orjson is only used for values made of plain JSON types (see `is_plain_json`);
+    anything else, including tuples, UUIDs, Enums and datetimes, is encoded with
+    msgpack and therefore decodes exactly as it would with LangGraph's default
+    serializer.
+    """
+
+    def __init__(
+        self,
+        format: str = "msgpack",
+        compression: Optional[str] = "zstd",
+        compress_min_bytes: int = 1024,
+        compression_level: int = 3
+    ):
+        """
+        Initialize serializer.
+
+        Args:
+            format: "msgpack" or "orjson"
+            compression: "zstd", "zlib" or None
+            compress_min_bytes: Payloads smaller than this are stored uncompressed
+            compression_level: Codec compression level
+        """
+        if format not in SERIALIZER_FORMATS:
+            raise ValueError(f"Unknown checkpoint serializer format: {format}")
+        if compression is not None and compression not in COMPRESSION_CODECS:
+            raise ValueError(f"Unknown checkpoint compression: {compression}")
+        if format == "orjson" and not ORJSON_AVAILABLE:
+            format = "msgpack"
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            compression = "zlib"
+
+        self.format = format
+        self.compression = compression
+        self.compress_min_bytes = compress_min_bytes
+        self.compression_level = compression_level
+        self.base = JsonPlusSerializer()
+        # zstd contexts are not thread-safe; keep one pair per thread
+        self._local = threading.local()
+
+    def _encode(self, obj: Any) -> Tuple[str, bytes]:
+        """Encode an object without compression."""
+        if self.format == "orjson" and obj is not None and is_plain_json(obj):
+            try:
+                return ORJSON_TYPE, orjson.dumps(obj)
+            except TypeError:
+                pass
+        return self.base.dumps_typed(obj)
+
+    def _compress(self, data: bytes) -> bytes:
+        """Compress bytes with the configured codec."""
+        if self.compression == "zstd":
+            compressor = getattr(self._local, "compressor", None)
+            if compressor is None:
+                compressor = self._local.compressor = zstandard.ZstdCompressor(level=self.compression_level)
+            return compressor.compress(data)
+        return zlib.compress(data, self.compression_level)
+
+    def _decompress(self, codec: str, data: bytes) -> bytes:
+        """Decompress bytes written with the given codec."""
+        if codec == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstandard is required to read zstd-compressed checkpoints")
+            decompressor = getattr(self._local, "decompressor", None)
+            if decompressor is None:
+                decompressor = self._local.decompressor = zstandard.ZstdDecompressor()
+            return decompressor.decompress(data)
+        if codec == "zlib":
+            return zlib.decompress(data)
+        raise ValueError(f"Unknown checkpoint compression: {codec}")
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        """
+        Serialize an object.
+
+        Args:
+            obj: Checkpoint, metadata or channel write value
+
+        Returns:
+            Tuple of (type tag, bytes)
+        """
+        type_, data = self._encode(obj)
+        if self.compression and len(data) >= self.compress_min_bytes:
+            return f"{type_}+{self.compression}", self._compress(data)
+        return type_, data
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        """
+        Deserialize an object, including rows written by the default serializer.
+
+        Args:
+            data: Tuple of (type tag, bytes)
+
+        Returns:
+            Deserialized object
+        """
+        type_, payload = data
+        if "+" in type_:
+            type_, codec = type_.split("+", 1)
+            payload = self._decompress(codec, payload)
+
+        if type_ == ORJSON_TYPE:
+            if ORJSON_AVAILABLE:
+                return orjson.loads(payload)
+            return self.base.loads_typed(("json", payload))
+        return self.base.loads_typed((type_, payload))
+
+
+def build_serializer(settings: Optional[Dict[str, Any]] = None) -> Optional[SerializerProtocol]:
+    """
+    Build the checkpoint serializer from the `checkpoint_serializer` config section.
+
+    Args:
+        settings: Dict with format, compression, compress_min_bytes (optional)
+
+    Returns:
+        Serializer, or None to keep LangGraph's default
+    """
+    if not settings or settings.get("format", "default") == "default":
+        return None
+    return CompactSerializer(
+        format=settings.get("format", "msgpack"),
+        compression=settings.get("compression", "zstd"),
+        compress_min_bytes=settings.get("compress_min_bytes", 1024),
+        compression_level=settings.get("compression_level", 3)
+    )
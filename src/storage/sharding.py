@@ -0,0 +1,396 @@
+"""Thread-sharded SQLite storage for checkpoints and the human review queue."""
+
+import hashlib
+import heapq
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+from src.storage.human_review_repo import HumanReviewRepository, priority_key
+
+
+def shard_paths(settings: Optional[Dict[str, Any]], primary_db_path: str) -> List[str]:
+    """
+    Resolve shard database paths from the `storage_shards` config section.
+
+    Args:
+        settings: Dict with count and path_template (optional)
+        primary_db_path: Primary database path (the only shard when count is 1)
+
+    Returns:
+        One database path per shard
+    """
+    count = int((settings or {}).get("count", 1))
+    if count < 1:
+        raise ValueError(f"storage_shards.count must be >= 1, got {count}")
+    if count == 1:
+        return [primary_db_path]
+    template = settings.get("path_template", "./shards/demo_{shard}.db")
+    return [template.format(shard=shard) for shard in range(count)]
+
+
+class ShardRouter:
+    """
+    Maps a workflow thread_id to a shard.
+
+    The hash is stable across processes (unlike Python's `hash`), so every API
+    worker and offline tool agrees on where a thread lives.
+    """
+
+    def __init__(self, db_paths: Sequence[str]):
+        """
+        Initialize router.
+
+        Args:
+            db_paths: Shard database paths, indexed by shard number
+        """
+        if not db_paths:
+            raise ValueError("ShardRouter needs at least one shard")
+        self.db_paths = list(db_paths)
+
+    @property
+    def count(self) -> int:
+        """Number of shards."""
+        return len(self.db_paths)
+
+    def shard_for(self, thread_id: str) -> int:
+        """
+        Get the shard number for a thread.
+
+        Args:
+            thread_id: Workflow thread ID
+
+        Returns:
+            Shard index in [0, count)
+        """
+        if self.count == 1:
+            return 0
+        digest = hashlib.sha1(str(thread_id).encode("utf-8")).hexdigest()
+        return int(digest[:8], 16) % self.count
+
+    def path_for(self, thread_id: str) -> str:
+        """Get the database path holding a thread."""
+        return self.db_paths[self.shard_for(thread_id)]
+
+
+def _thread_id(config) -> str:
+    """Extract the thread ID from a runnable config."""
+    return str(config["configurable"]["thread_id"])
+
+
+class ShardedCheckpointSaver(BaseCheckpointSaver):
+    """
+    LangGraph checkpointer that spreads threads across per-shard savers.
+
+    Every single-thread operation (reads, writes, deletes) goes to the shard
+    that owns the thread, so writers on different shards never contend for
+    the same SQLite write lock. `list` without a thread_id fans out to all
+    shards and merges newest-first.
+    """
+
+    def __init__(self, router: ShardRouter, savers: Sequence[BaseCheckpointSaver]):
+        """
+        Initialize sharded saver.
+
+        Args:
+            router: Shard router
+            savers: One checkpointer per shard (same order as router.db_paths)
+        """
+        if len(savers) != router.count:
+            raise ValueError("One checkpointer is required per shard")
+        super().__init__(serde=savers[0].serde)
+        self.router = router
+        self.savers = list(savers)
+
+    def saver_for(self, thread_id: str) -> BaseCheckpointSaver:
+        """Get the checkpointer owning a thread."""
+        return self.savers[self.router.shard_for(thread_id)]
+
+    def get_tuple(self, config):
+        """Get a checkpoint tuple from the thread's shard."""
+        return self.saver_for(_thread_id(config)).get_tuple(config)
+
+    def list(self, config, *, filter=None, before=None, limit=None) -> Iterator:
+        """List checkpoints (one shard if config names a thread, otherwise all shards)."""
+        if config and config.get("configurable", {}).get("thread_id") is not None:
+            yield from self.saver_for(_thread_id(config)).list(config, filter=filter, before=before, limit=limit)
+            return
+
+        # Each shard yields newest-first; checkpoint IDs are time-ordered, so merge on them
+        merged = heapq.merge(
+            *(saver.list(config, filter=filter, before=before, limit=limit) for saver in self.savers),
+            key=lambda item: item.config["configurable"]["checkpoint_id"],
+            reverse=True
+        )
+        for count, item in enumerate(merged):
+            if limit is not None and count >= limit:
+                return
+            yield item
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        """Store a checkpoint on the thread's shard."""
+        return self.saver_for(_thread_id(config)).put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path: str = ""):
+        """Store intermediate writes on the thread's shard."""
+        self.saver_for(_thread_id(config)).put_writes(config, writes, task_id, task_path)
+
+    def get_delta_channel_history(self, *, config, channels):
+        """Read delta channel history from the thread's shard."""
+        return self.saver_for(_thread_id(config)).get_delta_channel_history(config=config, channels=channels)
+
+    def delete_thread(self, thread_id: str):
+        """Delete a thread's checkpoints and writes from its shard."""
+        self.saver_for(thread_id).delete_thread(thread_id)
+
+    def get_next_version(self, current, channel):
+        """Channel versions are shard-independent; use the first shard's scheme."""
+        return self.savers[0].get_next_version(current, channel)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for queued group-commit writes on every shard.
+
+        Args:
+            timeout: Seconds to wait per shard (None waits indefinitely)
+
+        Returns:
+            True if every shard flushed within the timeout
+        """
+        flushed = True
+        for saver in self.savers:
+            if hasattr(saver, "flush"):
+                flushed = saver.flush(timeout) and flushed
+        return flushed
+
+    def wait_durable(self, thread_id: str, timeout: Optional[float] = None):
+        """Block until the thread's queued writes are committed on its shard."""
+        saver = self.saver_for(thread_id)
+        if hasattr(saver, "wait_durable"):
+            saver.wait_durable(thread_id, timeout)
+
+    def close(self):
+        """Stop every shard's group-commit writer."""
+        for saver in self.savers:
+            if hasattr(saver, "close"):
+                saver.close()
+
+
+class ShardedHumanReviewRepository:
+    """
+    Human review queue spread across shards by thread_id.
+
+    Rows live on the same shard as the thread's checkpoints. Lookups by review
+    checkpoint_id do not know the thread, so they probe each shard (a primary
+    key lookup, cheap for a handful of shards); queue listings fan out and
+    merge.
+    """
+
+    def __init__(self, router: ShardRouter, checkpointer=None):
+        """
+        Initialize sharded repository.
+
+        Args:
+            router: Shard router
+            checkpointer: LangGraph checkpointer used to read paused state lazily
+        """
+        self.router = router
+        self.checkpointer = checkpointer
+        self.shards = [HumanReviewRepository(db_path, checkpointer=checkpointer) for db_path in router.db_paths]
+        self.db_path = router.db_paths[0]
+
+    def _init_db(self):
+        """Initialize the review queue table on every shard."""
+        for shard in self.shards:
+            shard._init_db()
+
+    def _shard_for(self, thread_id: str) -> HumanReviewRepository:
+        """Get the repository owning a thread."""
+        return self.shards[self.router.shard_for(thread_id)]
+
+    def _find_shard(self, checkpoint_id: str) -> Optional[HumanReviewRepository]:
+        """Find the shard holding a review checkpoint."""
+        for shard in self.shards:
+            if shard.get_checkpoint(checkpoint_id):
+                return shard
+        return None
+
+    def save_checkpoint(self, checkpoint_data: Dict[str, Any]):
+        """
+        Save checkpoint to the thread's shard.
+
+        Args:
+            checkpoint_data: Checkpoint data dict (must include thread_id)
+        """
+        self._shard_for(checkpoint_data["thread_id"]).save_checkpoint(checkpoint_data)
+
+    def get_pending_reviews(self) -> List[Dict[str, Any]]:
+        """
+        Get pending reviews from all shards, highest priority first.
+
+        Returns:
+            List of pending review items (candidates - need state verification)
+        """
+        rows = [row for shard in self.shards for row in shard.get_pending_reviews()]
+        return sorted(rows, key=priority_key)
+
+    def list_all(self) -> List[Dict[str, Any]]:
+        """
+        Get all review queue entries from all shards.
+
+        Returns:
+            List of review queue rows
+        """
+        return [row for shard in self.shards for row in shard.list_all()]
+
+    def get_checkpoint(self, checkpoint_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get checkpoint by ID from whichever shard holds it.
+
+        Args:
+            checkpoint_id: Checkpoint ID
+
+        Returns:
+            Checkpoint data or None
+        """
+        for shard in self.shards:
+            checkpoint = shard.get_checkpoint(checkpoint_id)
+            if checkpoint:
+                return checkpoint
+        return None
+
+    def update_decision(self, checkpoint_id: str, decision: str, reviewer_id: str, notes: Optional[str] = None) -> bool:
+        """
+        Update checkpoint with human decision.
+
+        Args:
+            checkpoint_id: Checkpoint ID
+            decision: Decision (ACCEPT/REJECT)
+            reviewer_id: Reviewer ID
+            notes: Optional notes
+
+        Returns:
+            True if recorded, False if the review is unknown, already decided or leased to another reviewer
+        """
+        shard = self._find_shard(checkpoint_id)
+        return shard is not None and shard.update_decision(checkpoint_id, decision, reviewer_id, notes)
+
+    def update_decisions(self, decisions: List[Dict[str, Any]]) -> List[str]:
+        """
+        Record several human decisions (one transaction per shard).
+
+        Args:
+            decisions: Dicts with checkpoint_id, thread_id, decision, reviewer_id and notes
+
+        Returns:
+            Checkpoint IDs whose decision was recorded by this call
+        """
+        by_shard: Dict[int, List[Dict[str, Any]]] = {}
+        for item in decisions:
+            by_shard.setdefault(self.router.shard_for(item["thread_id"]), []).append(item)
+        updated = []
+        for shard, items in by_shard.items():
+            updated.extend(self.shards[shard].update_decisions(items))
+        return updated
+
+    def set_graph_checkpoint_id(self, checkpoint_id: str, graph_checkpoint_id: str):
+        """
+        Record the LangGraph checkpoint that holds the paused workflow state.
+
+        Args:
+            checkpoint_id: Review checkpoint ID
+            graph_checkpoint_id: LangGraph checkpoint ID for the pause
+        """
+        shard = self._find_shard(checkpoint_id)
+        if shard:
+            shard.set_graph_checkpoint_id(checkpoint_id, graph_checkpoint_id)
+
+    def delete_by_thread(self, thread_id: str):
+        """
+        Delete review queue entries for a workflow thread.
+
+        Args:
+            thread_id: Workflow thread ID
+        """
+        self._shard_for(thread_id).delete_by_thread(thread_id)
+
+    def claim(self, checkpoint_id: str, reviewer_id: str, lease_s: float) -> Optional[Dict[str, Any]]:
+        """
+        Lease a pending review to a reviewer.
+
+        Args:
+            checkpoint_id: Review checkpoint ID
+            reviewer_id: Reviewer claiming the review
+            lease_s: Lease duration in seconds
+
+        Returns:
+            Claimed review row or None if it is unknown, decided or leased to someone else
+        """
+        shard = self._find_shard(checkpoint_id)
+        return shard.claim(checkpoint_id, reviewer_id, lease_s) if shard else None
+
+    def claim_next(self, reviewer_id: str, lease_s: float) -> Optional[Dict[str, Any]]:
+        """
+        Lease the highest-priority unleased review across all shards.
+
+        Each shard's head is found by an index seek; the best of those heads is
+        claimed, retrying if another reviewer got it first.
+
+        Args:
+            reviewer_id: Reviewer claiming work
+            lease_s: Lease duration in seconds
+
+        Returns:
+            Claimed review row or None if no review is available
+        """
+        while True:
+            heads = [(head, shard) for shard in self.shards for head in [shard.peek_next()] if head]
+            if not heads:
+                return None
+            head, shard = min(heads, key=lambda pair: priority_key(pair[0]))
+            claimed = shard.claim(head["checkpoint_id"], reviewer_id, lease_s)
+            if claimed:
+                return claimed
+
+    def heartbeat(self, checkpoint_id: str, reviewer_id: str, lease_s: float) -> Optional[float]:
+        """
+        Extend a reviewer's lease.
+
+        Args:
+            checkpoint_id: Review checkpoint ID
+            reviewer_id: Reviewer holding the lease
+            lease_s: New lease duration from now, in seconds
+
+        Returns:
+            New lease expiry (epoch seconds) or None if the reviewer no longer holds the review
+        """
+        shard = self._find_shard(checkpoint_id)
+        return shard.heartbeat(checkpoint_id, reviewer_id, lease_s) if shard else None
+
+    def release(self, checkpoint_id: str, reviewer_id: str) -> bool:
+        """
+        Give a leased review back to the queue.
+
+        Args:
+            checkpoint_id: Review checkpoint ID
+            reviewer_id: Reviewer holding the lease
+
+        Returns:
+            True if the reviewer held the review
+        """
+        shard = self._find_shard(checkpoint_id)
+        return shard.release(checkpoint_id, reviewer_id) if shard else False
+
+    def get_state_blob(self, checkpoint_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get paused workflow state for a checkpoint.
+
+        Args:
+            checkpoint_id: Checkpoint ID
+
+        Returns:
+            State dict or None
+        """
+        shard = self._find_shard(checkpoint_id)
+        return shard.get_state_blob(checkpoint_id) if shard else None
+
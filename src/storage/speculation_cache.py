@@ -0,0 +1,102 @@
+"""Cache of downstream stage outputs precomputed while a workflow waits for review."""
+
+import json
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+from src.storage.sharding import ShardRouter
+
+
+class SpeculationCache:
+    """
+    Repository for the `speculative_outputs` table.
+
+    One row per paused thread, stored on the thread's shard, holding the
+    node outputs computed for the ACCEPT path and the digest of the state
+    inputs they were computed from. A row is consumed (deleted) by the
+    resume that commits it, so any API process can use it exactly once.
+    """
+
+    def __init__(self, db_paths: Sequence[str]):
+        """
+        Initialize speculation cache.
+
+        Args:
+            db_paths: Shard database paths (a single path when storage is not sharded)
+        """
+        self.router = ShardRouter(db_paths)
+        self._init_db()
+
+    def _connect(self, db_path: str) -> sqlite3.Connection:
+        """Open a connection that waits on concurrent writers."""
+        conn = sqlite3.connect(db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        """Initialize the speculative_outputs table on every shard."""
+        for db_path in self.router.db_paths:
+            conn = self._connect(db_path)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS speculative_outputs (
+                    thread_id TEXT PRIMARY KEY,
+                    input_digest TEXT NOT NULL,
+                    outputs TEXT NOT NULL,
+                    compute_ms REAL,
+                    computed_at TEXT NOT NULL
+                )
+            """)
+            conn.commit()
+            conn.close()
+
+    def put(self, thread_id: str, input_digest: str, outputs: Dict[str, Any], compute_ms: float):
+        """
+        Store precomputed outputs for a thread (replacing older ones).
+
+        Args:
+            thread_id: Workflow thread ID
+            input_digest: Digest of the state inputs the outputs were computed from
+            outputs: Node name -> node output (state update)
+            compute_ms: Time spent computing the outputs
+        """
+        conn = self._connect(self.router.path_for(thread_id))
+        conn.execute("""
+            INSERT OR REPLACE INTO speculative_outputs
+            (thread_id, input_digest, outputs, compute_ms, computed_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (thread_id, input_digest, json.dumps(outputs, default=str), compute_ms, datetime.utcnow().isoformat()))
+        conn.commit()
+        conn.close()
+
+    def take(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Remove and return the precomputed outputs of a thread.
+
+        Args:
+            thread_id: Workflow thread ID
+
+        Returns:
+            Row (input_digest, outputs decoded, compute_ms, computed_at) or None
+        """
+        conn = self._connect(self.router.path_for(thread_id))
+        row = conn.execute("DELETE FROM speculative_outputs WHERE thread_id = ? RETURNING *", (thread_id,)).fetchone()
+        conn.commit()
+        conn.close()
+        if not row:
+            return None
+        entry = dict(row)
+        entry["outputs"] = json.loads(entry["outputs"])
+        return entry
+
+    def delete_by_thread(self, thread_id: str):
+        """
+        Delete precomputed outputs for a workflow thread.
+
+        Args:
+            thread_id: Workflow thread ID
+        """
+        conn = self._connect(self.router.path_for(thread_id))
+        conn.execute("DELETE FROM speculative_outputs WHERE thread_id = ?", (thread_id,))
+        conn.commit()
+        conn.close()
@@ -0,0 +1,392 @@
+"""Vendor master index for resolving vendor names to canonical vendors."""
+
+import hashlib
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+
+# Legal-form suffixes that do not distinguish one vendor from another
+LEGAL_SUFFIXES = {
+    "co", "company", "corp", "corporation", "inc", "incorporated",
+    "llc", "llp", "lp", "ltd", "limited", "plc", "gmbh", "ag", "sa",
+    "sarl", "bv", "nv", "pty", "pvt", "private"
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def normalize_vendor_tokens(vendor_name: str) -> Tuple[str, ...]:
+    """
+    Normalize a vendor name into its identifying tokens.
+
+    Lowercases, drops punctuation, strips a leading "the" and trailing
+    legal-form suffixes, so "ACME Corp", "Acme Corporation" and
+    "acme corp." all normalize to ("acme",).
+
+    Args:
+        vendor_name: Raw vendor name
+
+    Returns:
+        Tuple of normalized tokens (empty if the name has no tokens)
+    """
+    tokens = _TOKEN_PATTERN.findall((vendor_name or "").lower().replace("&", " and "))
+    if len(tokens) > 1 and tokens[0] == "the":
+        tokens = tokens[1:]
+
+    core = list(tokens)
+    while len(core) > 1 and core[-1] in LEGAL_SUFFIXES:
+        core.pop()
+
+    return tuple(core)
+
+
+def normalize_tax_id(tax_id: Optional[str]) -> str:
+    """Normalize a tax ID for lookup (uppercase alphanumerics only)."""
+    return re.sub(r"[^A-Z0-9]", "", (tax_id or "").upper())
+
+
+class _TrieNode:
+    """Node in the normalized-token trie."""
+
+    __slots__ = ("children", "vendor_id")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.vendor_id: Optional[str] = None
+
+
+class VendorMasterIndex:
+    """
+    Memory-resident vendor master index.
+
+    Resolves raw vendor names to a canonical vendor_id using, in order:
+    - tax_id lookup (exact, normalized)
+    - alias table (normalized alias key)
+    - normalized-token trie built from canonical names
+
+    A name match is rejected when the invoice carries a tax ID and the
+    matched vendor has a different one: the invoice is from another legal
+    entity with a similar name, not a new spelling.
+
+    The index is loaded once from SQLite and kept in memory. Updates are
+    applied incrementally to both the in-memory structures and the tables.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self.db_path: Optional[str] = None
+        self._vendors: Dict[str, Dict[str, Any]] = {}
+        self._tax_ids: Dict[str, str] = {}
+        self._aliases: Dict[str, str] = {}
+        self._trie = _TrieNode()
+        self._lock = threading.Lock()
+
+    def load(self, db_path: str):
+        """
+        Load the vendor master from SQLite into memory.
+
+        Args:
+            db_path: SQLite database path
+        """
+        self.db_path = db_path
+        self._init_db()
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT vendor_id, canonical_name, tax_id FROM vendor_master")
+        vendor_rows = cursor.fetchall()
+        cursor.execute("SELECT alias_key, vendor_id FROM vendor_aliases")
+        alias_rows = cursor.fetchall()
+        conn.close()
+
+        with self._lock:
+            self._vendors = {}
+            self._tax_ids = {}
+            self._aliases = {}
+            self._trie = _TrieNode()
+            for vendor_id, canonical_name, tax_id in vendor_rows:
+                self._index_vendor(vendor_id, canonical_name, tax_id)
+            for alias_key, vendor_id in alias_rows:
+                if vendor_id in self._vendors:
+                    self._aliases[alias_key] = vendor_id
+
+    def _init_db(self):
+        """Initialize vendor master tables."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS vendor_master (
+                vendor_id TEXT PRIMARY KEY,
+                canonical_name TEXT NOT NULL,
+                tax_id TEXT,
+                created_at TEXT NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS vendor_aliases (
+                alias_key TEXT PRIMARY KEY,
+                vendor_id TEXT NOT NULL,
+                alias TEXT,
+                created_at TEXT NOT NULL
+            )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def _index_vendor(self, vendor_id: str, canonical_name: str, tax_id: Optional[str]):
+        """Add a vendor to the in-memory structures (caller holds the lock)."""
+        self._vendors[vendor_id] = {
+            "vendor_id": vendor_id,
+            "canonical_name": canonical_name,
+            "tax_id": tax_id
+        }
+        if normalize_tax_id(tax_id):
+            self._tax_ids.setdefault(normalize_tax_id(tax_id), vendor_id)
+
+        tokens = normalize_vendor_tokens(canonical_name)
+        if tokens:
+            node = self._trie
+            for token in tokens:
+                node = node.children.setdefault(token, _TrieNode())
+            if node.vendor_id is None:
+                node.vendor_id = vendor_id
+
+    def _trie_lookup(self, tokens: Tuple[str, ...]) -> Optional[str]:
+        """Exact lookup of a token sequence in the trie."""
+        node = self._trie
+        for token in tokens:
+            node = node.children.get(token)
+            if node is None:
+                return None
+        return node.vendor_id
+
+    def resolve(self, vendor_name: str, tax_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Resolve a vendor name (and optional tax ID) to a canonical vendor.
+
+        Args:
+            vendor_name: Raw vendor name
+            tax_id: Optional tax ID for disambiguation
+
+        Returns:
+            Vendor record (vendor_id, canonical_name, tax_id) or None
+        """
+        vendor_id = None
+
+        tax_key = normalize_tax_id(tax_id)
+        if tax_key:
+            vendor_id = self._tax_ids.get(tax_key)
+
+        if vendor_id is None:
+            vendor_id = self._name_lookup(vendor_name)
+            if vendor_id and tax_key and self._tax_conflict(vendor_id, tax_key):
+                vendor_id = None
+
+        return dict(self._vendors[vendor_id]) if vendor_id else None
+
+    def _name_lookup(self, vendor_name: str) -> Optional[str]:
+        """Vendor ID matching a name by alias or trie (ignores tax IDs)."""
+        tokens = normalize_vendor_tokens(vendor_name)
+        if not tokens:
+            return None
+        return self._aliases.get(" ".join(tokens)) or self._trie_lookup(tokens)
+
+    def _tax_conflict(self, vendor_id: str, tax_key: str) -> bool:
+        """Whether a vendor has a tax ID different from the normalized one given."""
+        known = normalize_tax_id(self._vendors[vendor_id].get("tax_id"))
+        return bool(known) and known != tax_key
+
+    def resolve_or_register(self, vendor_name: str, tax_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Resolve a vendor, registering it (or learning a new alias) on a miss.
+
+        When the name matches a vendor with a different tax ID, a separate
+        vendor is registered for the new tax ID and the returned record
+        carries `tax_id_conflict` (the name-matched vendor_id) so PREPARE
+        can flag the invoice for review.
+
+        A name the in-memory index does not know is looked up in
+        `vendor_aliases` before registering, since other processes may have
+        learned it. A spelling is learned as an alias only if no vendor
+        claims it yet.
+
+        Args:
+            vendor_name: Raw vendor name
+            tax_id: Optional tax ID
+
+        Returns:
+            Vendor record (vendor_id, canonical_name, tax_id[, tax_id_conflict]),
+            or None if the name is blank and the tax ID is unknown
+        """
+        tokens = normalize_vendor_tokens(vendor_name)
+        if not tokens:
+            # Nothing to match or register by name; PREPARE flags the missing name
+            return self.resolve(vendor_name, tax_id)
+
+        alias_key = " ".join(tokens)
+        if self._name_lookup(vendor_name) is None:
+            self._load_alias(alias_key)
+
+        record = self.resolve(vendor_name, tax_id)
+        if record is None:
+            conflict_id = self._name_lookup(vendor_name)
+            if conflict_id is None:
+                return self.add_vendor(vendor_name, tax_id)
+            # Same name, different legal entity: key the new vendor by name and tax ID
+            key = alias_key + "|" + normalize_tax_id(tax_id)
+            record = self.add_vendor(
+                vendor_name, tax_id, vendor_id="VND-" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:10].upper()
+            )
+            return {**record, "tax_id_conflict": conflict_id}
+
+        # Learn unseen spellings and tax IDs for known vendors
+        if self._name_lookup(vendor_name) is None:
+            self.add_alias(record["vendor_id"], vendor_name, replace=False)
+        if normalize_tax_id(tax_id) and not record.get("tax_id"):
+            record = self.set_tax_id(record["vendor_id"], tax_id)
+
+        return record
+
+    def _load_alias(self, alias_key: str) -> Optional[str]:
+        """
+        Load an alias (and its vendor) stored by another process into memory.
+
+        Args:
+            alias_key: Normalized alias key
+
+        Returns:
+            Vendor ID the alias maps to, or None if it is not stored
+        """
+        if not self.db_path:
+            return None
+
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute("""
+            SELECT v.vendor_id, v.canonical_name, v.tax_id
+            FROM vendor_aliases a JOIN vendor_master v ON v.vendor_id = a.vendor_id
+            WHERE a.alias_key = ?
+        """, (alias_key,)).fetchone()
+        conn.close()
+        if row is None:
+            return None
+
+        vendor_id, canonical_name, tax_id = row
+        with self._lock:
+            if vendor_id not in self._vendors:
+                self._index_vendor(vendor_id, canonical_name, tax_id)
+            self._aliases[alias_key] = vendor_id
+        return vendor_id
+
+    def add_vendor(
+        self,
+        canonical_name: str,
+        tax_id: Optional[str] = None,
+        aliases: Optional[List[str]] = None,
+        vendor_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Add a vendor to the index (incremental update).
+
+        Args:
+            canonical_name: Canonical display name
+            tax_id: Optional tax ID
+            aliases: Optional alternative names
+            vendor_id: Optional explicit vendor ID (derived from the name otherwise)
+
+        Returns:
+            Vendor record
+
+        Raises:
+            ValueError: If the name has no identifying tokens
+        """
+        canonical_name = " ".join((canonical_name or "").strip().title().split())
+        tokens = normalize_vendor_tokens(canonical_name)
+        if not tokens:
+            raise ValueError("Vendor name is blank")
+        if vendor_id is None:
+            # Deterministic IDs let independent processes agree on new vendors
+            key = " ".join(tokens)
+            vendor_id = "VND-" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:10].upper()
+
+        with self._lock:
+            if vendor_id not in self._vendors:
+                self._index_vendor(vendor_id, canonical_name, tax_id or None)
+            record = dict(self._vendors[vendor_id])
+
+        if self.db_path:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("""
+                INSERT OR IGNORE INTO vendor_master (vendor_id, canonical_name, tax_id, created_at)
+                VALUES (?, ?, ?, ?)
+            """, (vendor_id, record["canonical_name"], record["tax_id"], datetime.utcnow().isoformat()))
+            conn.commit()
+            conn.close()
+
+        for alias in aliases or []:
+            self.add_alias(vendor_id, alias)
+
+        return record
+
+    def add_alias(self, vendor_id: str, alias: str, replace: bool = True):
+        """
+        Map an alternative vendor name to an existing vendor.
+
+        Args:
+            vendor_id: Canonical vendor ID
+            alias: Alternative vendor name
+            replace: Whether to remap an alias already stored for another vendor
+        """
+        alias_key = " ".join(normalize_vendor_tokens(alias))
+        if not alias_key or vendor_id not in self._vendors:
+            return
+
+        if self.db_path:
+            conflict_action = "REPLACE" if replace else "IGNORE"
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.execute(f"""
+                INSERT OR {conflict_action} INTO vendor_aliases (alias_key, vendor_id, alias, created_at)
+                VALUES (?, ?, ?, ?)
+            """, (alias_key, vendor_id, alias, datetime.utcnow().isoformat()))
+            stored = cursor.rowcount == 1
+            conn.commit()
+            conn.close()
+            if not stored:
+                # Another process mapped it first; keep its mapping
+                self._load_alias(alias_key)
+                return
+
+        with self._lock:
+            self._aliases[alias_key] = vendor_id
+
+    def set_tax_id(self, vendor_id: str, tax_id: str) -> Dict[str, Any]:
+        """
+        Record the tax ID for a vendor.
+
+        Args:
+            vendor_id: Canonical vendor ID
+            tax_id: Tax ID
+
+        Returns:
+            Updated vendor record
+        """
+        with self._lock:
+            self._vendors[vendor_id]["tax_id"] = tax_id
+            self._tax_ids.setdefault(normalize_tax_id(tax_id), vendor_id)
+            record = dict(self._vendors[vendor_id])
+
+        if self.db_path:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("UPDATE vendor_master SET tax_id = ? WHERE vendor_id = ?", (tax_id, vendor_id))
+            conn.commit()
+            conn.close()
+
+        return record
+
+
+# Global instance (loaded by build_invoice_graph)
+vendor_master_index = VendorMasterIndex()
@@ -0,0 +1,208 @@
+"""Per-vendor running statistics repository."""
+
+import math
+import sqlite3
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO date/datetime string, returning None if unparseable."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value[:19])
+    except ValueError:
+        return None
+
+
+def welford_update(stats: Dict[str, Any], amount: float, invoice_date: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Apply one invoice to running vendor statistics.
+
+    Uses Welford's online algorithm for mean/variance of amounts, and a
+    running mean of the interval (in days) between consecutive invoices.
+    An invoice dated before the vendor's latest one (arriving out of order)
+    only updates the amount statistics: it is not the vendor's last invoice
+    and its gap to the latest one is not a billing interval.
+
+    Args:
+        stats: Current statistics (may be empty for a new vendor)
+        amount: Invoice amount
+        invoice_date: Invoice date (ISO format)
+
+    Returns:
+        Updated statistics dict
+    """
+    count = stats.get("invoice_count", 0) + 1
+    mean = stats.get("amount_mean", 0.0)
+    delta = amount - mean
+    mean += delta / count
+    m2 = stats.get("amount_m2", 0.0) + delta * (amount - mean)
+
+    interval_count = stats.get("interval_count", 0)
+    interval_mean = stats.get("interval_mean_days", 0.0)
+    previous_date = _parse_date(stats.get("last_invoice_date"))
+    current_date = _parse_date(invoice_date)
+    is_latest = not (previous_date and current_date and current_date < previous_date)
+    if previous_date and current_date and is_latest:
+        interval_days = (current_date - previous_date).total_seconds() / 86400.0
+        interval_count += 1
+        interval_mean += (interval_days - interval_mean) / interval_count
+
+    return {
+        "vendor_id": stats.get("vendor_id"),
+        "invoice_count": count,
+        "amount_mean": mean,
+        "amount_m2": m2,
+        "last_amount": amount if is_latest else stats.get("last_amount"),
+        "last_invoice_date": (invoice_date if is_latest else None) or stats.get("last_invoice_date"),
+        "interval_count": interval_count,
+        "interval_mean_days": interval_mean
+    }
+
+
+class VendorStatsRepository:
+    """
+    Repository for incrementally maintained per-vendor statistics.
+
+    Each invoice is folded in at most once: `vendor_stats_invoices` records
+    the (vendor, invoice) keys already counted, in the same transaction as
+    the stats row, so a COMPLETE that runs again (crash recovery, resume
+    retries) leaves the statistics unchanged.
+    """
+
+    def __init__(self, db_path: str = "./demo.db"):
+        """
+        Initialize vendor stats repository.
+
+        Args:
+            db_path: SQLite database path
+        """
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self):
+        """Initialize database tables."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        # One compact row per vendor; amount_m2 is Welford's sum of squared deviations
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS vendor_stats (
+                vendor_id TEXT PRIMARY KEY,
+                invoice_count INTEGER NOT NULL,
+                amount_mean REAL NOT NULL,
+                amount_m2 REAL NOT NULL,
+                last_amount REAL,
+                last_invoice_date TEXT,
+                interval_count INTEGER NOT NULL DEFAULT 0,
+                interval_mean_days REAL NOT NULL DEFAULT 0,
+                updated_at TEXT
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS vendor_stats_invoices (
+                vendor_id TEXT NOT NULL,
+                invoice_key TEXT NOT NULL,
+                recorded_at TEXT NOT NULL,
+                PRIMARY KEY (vendor_id, invoice_key)
+            )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def get(self, vendor_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get statistics for a vendor.
+
+        Args:
+            vendor_id: Canonical vendor ID
+
+        Returns:
+            Stats dict (with derived amount_variance and amount_stddev) or None
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT * FROM vendor_stats WHERE vendor_id = ?", (vendor_id,))
+        row = cursor.fetchone()
+        conn.close()
+
+        if not row:
+            return None
+
+        stats = dict(row)
+        count = stats["invoice_count"]
+        variance = stats["amount_m2"] / (count - 1) if count > 1 else 0.0
+        stats["amount_variance"] = variance
+        stats["amount_stddev"] = math.sqrt(variance)
+        return stats
+
+    def record_invoice(
+        self,
+        vendor_id: str,
+        invoice_key: str,
+        amount: float,
+        invoice_date: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fold a completed invoice into the vendor's running statistics (once per invoice).
+
+        Args:
+            vendor_id: Canonical vendor ID
+            invoice_key: Invoice identity (invoice ID, or thread ID when there is none)
+            amount: Invoice amount
+            invoice_date: Invoice date (ISO format)
+
+        Returns:
+            Updated stats dict, or None if the invoice was already recorded
+        """
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+
+        try:
+            # Read-modify-write under a write lock so concurrent workers don't lose updates
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("""
+                INSERT OR IGNORE INTO vendor_stats_invoices (vendor_id, invoice_key, recorded_at)
+                VALUES (?, ?, ?)
+            """, (vendor_id, invoice_key, datetime.utcnow().isoformat()))
+            if cursor.rowcount == 0:
+                cursor.execute("ROLLBACK")
+                return None
+
+            cursor.execute("SELECT * FROM vendor_stats WHERE vendor_id = ?", (vendor_id,))
+            row = cursor.fetchone()
+            current = dict(row) if row else {"vendor_id": vendor_id}
+
+            stats = welford_update(current, float(amount or 0), invoice_date)
+            stats["vendor_id"] = vendor_id
+
+            cursor.execute("""
+                INSERT OR REPLACE INTO vendor_stats
+                (vendor_id, invoice_count, amount_mean, amount_m2, last_amount,
+                 last_invoice_date, interval_count, interval_mean_days, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                vendor_id,
+                stats["invoice_count"],
+                stats["amount_mean"],
+                stats["amount_m2"],
+                stats["last_amount"],
+                stats["last_invoice_date"],
+                stats["interval_count"],
+                stats["interval_mean_days"],
+                datetime.utcnow().isoformat()
+            ))
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        return stats
@@ -0,0 +1,356 @@
+"""Incrementally maintained workflow counters for dashboards."""
+
+import threading
+import time
+from datetime import datetime, timedelta
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.logging.logger import log_error, log_storage_maintenance
+from src.storage.sharding import ShardRouter
+
+
+# Stage channels, furthest first: a workflow's stage is the last one with output
+STAGE_CHANNELS = (
+    ("COMPLETE", "complete"),
+    ("NOTIFY", "notify"),
+    ("POSTING", "posting"),
+    ("APPROVE", "approve"),
+    ("RECONCILE", "reconcile"),
+    ("HITL_DECISION", "hitl"),
+    ("CHECKPOINT_HITL", "checkpoint"),
+    ("MATCH_TWO_WAY", "match_two_way"),
+    ("RETRIEVE", "retrieve"),
+    ("PREPARE", "prepare"),
+    ("UNDERSTAND", "understand"),
+    ("INTAKE", "intake")
+)
+
+# Counter dimensions and the index column each one groups by ("total" counts every workflow)
+DIMENSIONS = (("total", "'all'"), ("status", "status"), ("stage", "stage"), ("vendor", "vendor"))
+
+
+def index_entry(values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Index row (status, stage, vendor, amount) of a workflow state.
+
+    Args:
+        values: Workflow state values
+
+    Returns:
+        Dict with invoice_id, vendor, amount, status and stage
+    """
+    invoice_payload = values.get("invoice_payload") or {}
+    vendor_profile = (values.get("prepare") or {}).get("vendor_profile") or {}
+    stage = next((name for name, channel in STAGE_CHANNELS if values.get(channel)), None)
+    return {
+        "invoice_id": invoice_payload.get("invoice_id"),
+        "vendor": vendor_profile.get("vendor_id") or invoice_payload.get("vendor_name"),
+        "amount": float(invoice_payload.get("amount") or 0),
+        "status": values.get("workflow_status") or "UNKNOWN",
+        "stage": stage or "UNKNOWN"
+    }
+
+
+class WorkflowMetrics:
+    """
+    Per-status, per-stage and per-vendor workflow counts and amount sums.
+
+    Every shard keeps `workflow_index` (one row per thread: status, stage,
+    vendor, amount) and `workflow_counters` (count and amount sum per
+    dimension key). Node exits and decisions call `record`, which moves the
+    thread between counter keys in the same transaction as its index row,
+    so `summary()` reads a handful of counter rows per shard instead of
+    every workflow.
+
+    Counters can still drift from the checkpoints (a process dying between
+    a node and its checkpoint write, threads removed by retention). The
+    reconciliation job rebuilds the index rows of idle threads from their
+    latest checkpoint, drops rows of threads that no longer exist, and
+    recomputes the counters from the index.
+    """
+
+    def __init__(self):
+        """Initialize unconfigured metrics."""
+        self.router: Optional[ShardRouter] = None
+        self.checkpointer = None
+        self.archiver = None
+        self.enabled = False
+        self.reconcile_interval_s = 3600.0
+        self.min_idle_s = 60.0
+        self.last_reconcile: Optional[Dict[str, Any]] = None
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def configure(
+        self,
+        db_paths: Sequence[str],
+        checkpointer,
+        settings: Optional[Dict[str, Any]] = None,
+        archiver=None
+    ):
+        """
+        Configure metrics (used by build_invoice_graph).
+
+        Args:
+            db_paths: Shard database paths
+            checkpointer: Checkpointer holding the threads (source of truth for reconciliation)
+            settings: `workflow_metrics` config section
+            archiver: Workflow archiver (archived threads keep their index rows)
+        """
+        settings = settings or {}
+        self.router = ShardRouter(db_paths)
+        self.checkpointer = checkpointer
+        self.archiver = archiver
+        self.enabled = settings.get("enabled", True)
+        self.reconcile_interval_s = float(settings.get("reconcile_interval_s", 3600))
+        self.min_idle_s = float(settings.get("min_idle_s", 60))
+        self._init_db()
+
+    def _connect(self, db_path: str) -> sqlite3.Connection:
+        """Open a connection that waits on concurrent writers."""
+        conn = sqlite3.connect(db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        """Initialize index and counter tables on every shard."""
+        for db_path in self.router.db_paths:
+            conn = self._connect(db_path)
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS workflow_index (
+                    thread_id TEXT PRIMARY KEY,
+                    invoice_id TEXT,
+                    vendor TEXT,
+                    amount REAL NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS workflow_counters (
+                    dimension TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    amount_sum REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (dimension, key)
+                )
+            """)
+
+            conn.commit()
+            conn.close()
+
+    @staticmethod
+    def _bump(cursor: sqlite3.Cursor, entry: Dict[str, Any], sign: int):
+        """Add (sign=1) or remove (sign=-1) one workflow from its counter keys."""
+        keys = {"total": "all", "status": entry["status"], "stage": entry["stage"], "vendor": entry["vendor"]}
+        cursor.executemany("""
+            INSERT INTO workflow_counters (dimension, key, count, amount_sum)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(dimension, key) DO UPDATE SET
+                count = count + excluded.count,
+                amount_sum = amount_sum + excluded.amount_sum
+        """, [
+            (dimension, key or "unknown", sign, sign * (entry["amount"] or 0))
+            for dimension, key in keys.items()
+        ])
+
+    def _write_entry(self, cursor: sqlite3.Cursor, thread_id: str, entry: Dict[str, Any], previous: Optional[sqlite3.Row]):
+        """Upsert a thread's index row and move it between counter keys."""
+        if previous is not None:
+            self._bump(cursor, dict(previous), -1)
+        self._bump(cursor, entry, 1)
+        cursor.execute("""
+            INSERT OR REPLACE INTO workflow_index (thread_id, invoice_id, vendor, amount, status, stage, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            thread_id, entry["invoice_id"], entry["vendor"], entry["amount"], entry["status"], entry["stage"],
+            datetime.utcnow().isoformat()
+        ))
+
+    def record(self, state: Dict[str, Any], updates: Optional[Dict[str, Any]] = None):
+        """
+        Record a workflow's state after a node exit or a decision.
+
+        Args:
+            state: Workflow state before the update
+            updates: State updates written by the node or decision
+        """
+        if not self.enabled or self.router is None:
+            return
+        thread_id = state.get("thread_id")
+        if not thread_id:
+            return
+        entry = index_entry({**state, **(updates or {})})
+
+        conn = self._connect(self.router.path_for(thread_id))
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            previous = cursor.execute("""
+                SELECT invoice_id, vendor, amount, status, stage FROM workflow_index WHERE thread_id = ?
+            """, (thread_id,)).fetchone()
+            if previous is None or any(previous[key] != entry[key] for key in entry):
+                self._write_entry(cursor, thread_id, entry, previous)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def delete_by_thread(self, thread_id: str):
+        """
+        Remove a deleted workflow from the index and counters.
+
+        Args:
+            thread_id: Workflow thread ID
+        """
+        if self.router is None:
+            return
+        conn = self._connect(self.router.path_for(thread_id))
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            previous = cursor.execute("SELECT * FROM workflow_index WHERE thread_id = ?", (thread_id,)).fetchone()
+            if previous is not None:
+                self._bump(cursor, dict(previous), -1)
+                cursor.execute("DELETE FROM workflow_index WHERE thread_id = ?", (thread_id,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Counts and amount sums by status, stage and vendor (summed over shards).
+
+        Returns:
+            Dict with total, by_status, by_stage and by_vendor ({key: {count, amount_sum}})
+        """
+        merged: Dict[str, Dict[str, Dict[str, float]]] = {dimension: {} for dimension, _ in DIMENSIONS}
+        for db_path in self.router.db_paths:
+            conn = self._connect(db_path)
+            for row in conn.execute("SELECT dimension, key, count, amount_sum FROM workflow_counters WHERE count != 0"):
+                bucket = merged[row["dimension"]].setdefault(row["key"], {"count": 0, "amount_sum": 0.0})
+                bucket["count"] += row["count"]
+                bucket["amount_sum"] = round(bucket["amount_sum"] + row["amount_sum"], 2)
+            conn.close()
+        return {
+            "total": merged["total"].get("all", {"count": 0, "amount_sum": 0.0}),
+            "by_status": merged["status"],
+            "by_stage": merged["stage"],
+            "by_vendor": dict(sorted(merged["vendor"].items(), key=lambda item: -item[1]["count"])),
+            "last_reconcile": self.last_reconcile
+        }
+
+    def _counters(self, cursor: sqlite3.Cursor) -> Dict[Tuple[str, str], Tuple[int, float]]:
+        """Non-zero counter rows of one shard."""
+        return {
+            (row["dimension"], row["key"]): (row["count"], round(row["amount_sum"], 2))
+            for row in cursor.execute("SELECT * FROM workflow_counters WHERE count != 0")
+        }
+
+    def _reconcile_shard(self, db_path: str, archived: set) -> Dict[str, int]:
+        """Rebuild one shard's index rows from checkpoints, then its counters from the index."""
+        conn = self._connect(db_path)
+        cursor = conn.cursor()
+        thread_ids = {row[0] for row in cursor.execute("SELECT DISTINCT thread_id FROM checkpoints")}
+        indexed = {row["thread_id"]: dict(row) for row in cursor.execute("SELECT * FROM workflow_index")}
+        idle_before = (datetime.utcnow() - timedelta(seconds=self.min_idle_s)).isoformat()
+
+        rows_fixed = 0
+        for thread_id in thread_ids:
+            row = indexed.get(thread_id)
+            if row and row["updated_at"] > idle_before:
+                # Still running: its checkpoint may lag behind the node exits already recorded
+                continue
+            checkpoint_tuple = self.checkpointer.get_tuple({"configurable": {"thread_id": thread_id}})
+            if not checkpoint_tuple:
+                continue
+            entry = index_entry(checkpoint_tuple.checkpoint.get("channel_values", {}))
+            if row and all(row[key] == entry[key] for key in entry):
+                continue
+            cursor.execute("BEGIN IMMEDIATE")
+            current = cursor.execute("SELECT * FROM workflow_index WHERE thread_id = ?", (thread_id,)).fetchone()
+            if current is None or current["updated_at"] == (row or {}).get("updated_at"):
+                # Skip threads recorded again since the scan started
+                self._write_entry(cursor, thread_id, entry, current)
+                rows_fixed += 1
+            conn.commit()
+
+        stale = [thread_id for thread_id in indexed if thread_id not in thread_ids and thread_id not in archived]
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.executemany("DELETE FROM workflow_index WHERE thread_id = ?", [(thread_id,) for thread_id in stale])
+
+        # Counters from the index in the same transaction, so concurrent records cannot interleave
+        before = self._counters(cursor)
+        cursor.execute("DELETE FROM workflow_counters")
+        for dimension, column in DIMENSIONS:
+            cursor.execute(f"""
+                INSERT INTO workflow_counters (dimension, key, count, amount_sum)
+                SELECT ?, COALESCE({column}, 'unknown'), COUNT(*), COALESCE(SUM(amount), 0)
+                FROM workflow_index
+                GROUP BY 2
+            """, (dimension,))
+        after = self._counters(cursor)
+        conn.commit()
+        conn.close()
+
+        counters_fixed = sum(1 for key in set(before) | set(after) if before.get(key) != after.get(key))
+        return {"index_rows_fixed": rows_fixed, "index_rows_removed": len(stale), "counters_fixed": counters_fixed}
+
+    def reconcile(self) -> Dict[str, Any]:
+        """
+        Correct index and counter drift on every shard.
+
+        Returns:
+            Metrics for this run (rows fixed/removed, counter keys corrected, duration)
+        """
+        with self._run_lock:
+            start_time = time.perf_counter()
+            archived = set(self.archiver.list_thread_ids()) if self.archiver and self.archiver.db_path else set()
+            totals = {"index_rows_fixed": 0, "index_rows_removed": 0, "counters_fixed": 0}
+            for db_path in self.router.db_paths:
+                for key, value in self._reconcile_shard(db_path, archived).items():
+                    totals[key] += value
+            totals["duration_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
+            totals["finished_at"] = datetime.utcnow().isoformat()
+            self.last_reconcile = totals
+            log_storage_maintenance("workflow_metrics_reconcile", totals)
+            return totals
+
+    def _loop(self):
+        """Background loop: reconcile once at start, then every `reconcile_interval_s`."""
+        while True:
+            try:
+                self.reconcile()
+            except Exception as e:
+                log_error("WORKFLOW_METRICS", e)
+            if self._stop.wait(self.reconcile_interval_s):
+                return
+
+    def start(self):
+        """Start the reconciliation thread (no-op if disabled or running)."""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="workflow-metrics-reconcile", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the reconciliation thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Global instance (configured by build_invoice_graph, reconciliation started by the API)
+workflow_metrics = WorkflowMetrics()
@@ -0,0 +1,175 @@
+"""Multi-worker end-to-end test for Langie invoice processing.
+
+Starts the API with `uvicorn --workers N` against a fresh working directory
+(so demo.db, blobs and archive are throwaway), pauses a batch of invoices for
+human review, submits ACCEPT/REJECT decisions concurrently and checks that
+every workflow reaches the right final status no matter which worker handled
+each request.
+
+Usage:
+    python test_multi_worker.py [--workers N] [--invoices M] [--port P]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+
+ROOT = Path(__file__).parent
+
+
+def hitl_invoice(index):
+    """Invoice that fails two-way match and pauses for review."""
+    with open(ROOT / "test_data" / "invoice_fail.json", "r") as f:
+        invoice = json.load(f)
+    invoice["invoice_id"] = f"INV-MW-{index:04d}"
+    invoice["attachments"] = []
+    return invoice
+
+
+def start_server(workers, port, workdir):
+    """Start uvicorn with several worker processes in a throwaway directory."""
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "src.api.app:app",
+            "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)
+        ],
+        cwd=workdir,
+        env=env,
+        stdout=open(Path(workdir) / "server.log", "wb"),
+        stderr=subprocess.STDOUT
+    )
+    api_base = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{api_base}/docs", timeout=1).status_code == 200:
+                # Give every worker time to finish startup
+                time.sleep(2)
+                return process, api_base
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"API did not start; see {workdir}/server.log")
+
+
+def submit_invoice(api_base, invoice):
+    """Submit an invoice (new connection per call, so workers are spread)."""
+    response = requests.post(
+        f"{api_base}/workflow/run",
+        data={"invoice": json.dumps(invoice), "file_count": "0"},
+        headers={"Connection": "close"}
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def submit_decision(api_base, checkpoint_id, decision, reviewer_id):
+    """Submit a human decision."""
+    response = requests.post(
+        f"{api_base}/human-review/decision",
+        json={"checkpoint_id": checkpoint_id, "decision": decision, "reviewer_id": reviewer_id},
+        headers={"Connection": "close"}
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def get_workflow_status(api_base, thread_id):
+    """Get workflow status."""
+    response = requests.get(f"{api_base}/workflow/status/{thread_id}", headers={"Connection": "close"})
+    response.raise_for_status()
+    return response.json()
+
+
+def wait_for_resume(api_base, thread_id, timeout=60):
+    """Poll workflow status until its background resume has finished."""
+    deadline = time.time() + timeout
+    while True:
+        status = get_workflow_status(api_base, thread_id)
+        resume = status.get("resume") or {}
+        if resume.get("status") in ("DONE", "FAILED") or time.time() > deadline:
+            return status
+        time.sleep(0.2)
+
+
+def run_multi_worker_scenario(api_base, invoice_count):
+    """Pause invoices, decide them concurrently across workers, verify final states."""
+    print(f"\n📤 Submitting {invoice_count} invoices that need review...")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        runs = list(pool.map(lambda i: submit_invoice(api_base, hitl_invoice(i)), range(invoice_count)))
+    assert all(run["status"] == "PAUSED" for run in runs), [run["status"] for run in runs]
+    print(f"✅ {len(runs)} workflows paused")
+
+    pending = requests.get(f"{api_base}/human-review/pending").json()["items"]
+    assert len(pending) == invoice_count, f"expected {invoice_count} pending, got {len(pending)}"
+    print(f"✅ {len(pending)} pending reviews visible")
+
+    decisions = {
+        run["thread_id"]: ("ACCEPT" if index % 2 == 0 else "REJECT", run["checkpoint_id"])
+        for index, run in enumerate(runs)
+    }
+
+    print("\n👤 Submitting decisions concurrently...")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(
+            lambda item: submit_decision(api_base, item[1][1], item[1][0], f"reviewer-{item[0][:8]}"),
+            decisions.items()
+        ))
+
+    expected = {"ACCEPT": "COMPLETED", "REJECT": "REQUIRES_MANUAL_HANDLING"}
+    failures = []
+    for thread_id, (decision, _) in decisions.items():
+        # Decisions are acknowledged before the workflow runs on; any worker's resume pool may pick them up
+        status = wait_for_resume(api_base, thread_id)
+        if status["status"] != expected[decision] or status["paused"] or status["resume"]["status"] != "DONE":
+            failures.append((thread_id, decision, status))
+    assert not failures, f"workflows not resumed correctly: {failures}"
+    print(f"✅ All {len(decisions)} workflows reached their final status")
+
+    # The decision travelled through state/DB, not worker memory
+    workflows = {w["thread_id"]: w for w in requests.get(f"{api_base}/workflow/all").json()["workflows"]}
+    for thread_id, (decision, _) in decisions.items():
+        hitl = workflows[thread_id]["stages"]["hitl"] or {}
+        assert hitl.get("human_decision") == decision, (thread_id, hitl)
+        assert hitl.get("reviewer_id") == f"reviewer-{thread_id[:8]}", (thread_id, hitl)
+    assert not requests.get(f"{api_base}/human-review/pending").json()["items"]
+    print("✅ Decisions and reviewers recorded for every workflow; review queue empty")
+
+
+def main():
+    """Run the multi-worker test."""
+    parser = argparse.ArgumentParser(description="Multi-worker end-to-end test")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn worker processes")
+    parser.add_argument("--invoices", type=int, default=12, help="Invoices paused for review")
+    parser.add_argument("--port", type=int, default=8011, help="Port for the test server")
+    args = parser.parse_args()
+
+    print("🧾 Langie - Multi-Worker Test")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        process, api_base = start_server(args.workers, args.port, workdir)
+        print(f"✅ API running with {args.workers} workers at {api_base}")
+        try:
+            run_multi_worker_scenario(api_base, args.invoices)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    print("\n" + "=" * 60)
+    print("✅ Multi-worker test completed!")
+
+
+if __name__ == "__main__":
+    main()
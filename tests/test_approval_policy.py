@@ -0,0 +1,86 @@
+"""Tests for the compiled approval policy and its hot reload."""
+
+import json
+import sqlite3
+
+import pytest
+
+from src.rules.approval_policy import ApprovalPolicyEngine, CompiledPolicy
+
+
+RULES = [
+    {"id": "large", "priority": 20, "match": {"amount_min": 10000}, "approval_status": "REQUIRES_APPROVAL",
+     "approver_id": "controller"},
+    {"id": "acme-large", "priority": 10, "match": {"vendor_id": "VND-ACME", "amount_min": 5000},
+     "approval_status": "REQUIRES_APPROVAL", "approver_id": "acme_owner"},
+    {"id": "small", "priority": 30, "match": {"amount_max": 10000}, "approval_status": "AUTO_APPROVED",
+     "approver_id": None},
+    {"id": "disabled", "priority": 1, "match": {}, "approval_status": "REJECTED", "enabled": False}
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Engine on a temporary workflow.json and rules table, checking for changes on every call."""
+    config_path = tmp_path / "workflow.json"
+    config_path.write_text(json.dumps({"approval_policy": {"rules": RULES}}))
+    policy_engine = ApprovalPolicyEngine(reload_interval_s=0)
+    policy_engine.configure(str(config_path), str(tmp_path / "rules.db"))
+    return policy_engine
+
+
+def add_rule(engine, rule_id, priority, approver_id, updated_at="2024-01-01T00:00:00"):
+    """Insert a catch-all rule into the approval_rules table."""
+    conn = sqlite3.connect(engine.db_path)
+    conn.execute("""
+        INSERT INTO approval_rules (rule_id, priority, match_json, approval_status, approver_id, updated_at)
+        VALUES (?, ?, '{}', 'REQUIRES_APPROVAL', ?, ?)
+    """, (rule_id, priority, approver_id, updated_at))
+    conn.commit()
+    conn.close()
+
+
+def test_lowest_priority_matching_rule_wins():
+    """Rules are tried in priority order; disabled rules never match."""
+    policy = CompiledPolicy(RULES, {}, {})
+    assert policy.evaluate({"amount": 6000, "vendor_id": "VND-ACME"})["rule_id"] == "acme-large"
+    assert policy.evaluate({"amount": 6000, "vendor_id": "VND-OTHER"})["rule_id"] == "small"
+    assert policy.evaluate({"amount": 10000, "vendor_id": "VND-OTHER"})["rule_id"] == "large"
+    assert policy.evaluate({"amount": 10000, "vendor_id": "VND-ACME"})["rule_id"] == "acme-large"
+
+
+def test_table_rules_are_hot_reloaded(engine):
+    """Inserted rules take effect without a restart."""
+    facts = {"amount": 100}
+    assert engine.evaluate(facts)["rule_id"] == "small"
+    add_rule(engine, "freeze", 5, "cfo")
+    assert engine.evaluate(facts) == {"approval_status": "REQUIRES_APPROVAL", "approver_id": "cfo", "rule_id": "freeze"}
+
+
+def test_edits_that_keep_count_and_timestamp_are_reloaded(engine):
+    """An edit that leaves the row count and updated_at unchanged still changes the version."""
+    add_rule(engine, "freeze", 5, "cfo")
+    version = engine.source_version()
+    assert engine.evaluate({"amount": 100})["approver_id"] == "cfo"
+
+    conn = sqlite3.connect(engine.db_path)
+    conn.execute("UPDATE approval_rules SET approver_id = 'treasurer' WHERE rule_id = 'freeze'")
+    conn.commit()
+    conn.close()
+
+    assert engine.source_version() != version
+    assert engine.evaluate({"amount": 100})["approver_id"] == "treasurer"
+
+    # Replacing one rule with another under the same timestamp
+    conn = sqlite3.connect(engine.db_path)
+    conn.execute("DELETE FROM approval_rules WHERE rule_id = 'freeze'")
+    conn.commit()
+    conn.close()
+    add_rule(engine, "hold", 5, "auditor")
+    assert engine.evaluate({"amount": 100})["rule_id"] == "hold"
+
+
+def test_unchanged_sources_keep_the_compiled_policy(engine):
+    """Without changes the same compiled policy is reused."""
+    policy = engine.get_policy()
+    assert engine.get_policy() is policy
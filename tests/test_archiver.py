@@ -0,0 +1,98 @@
+"""Tests for archiving finished workflows to columnar files."""
+
+import sqlite3
+from typing import TypedDict
+
+import pytest
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, StateGraph
+
+from src.storage import archiver as archiver_module
+from src.storage.archiver import WorkflowArchiver
+from src.storage.compactor import CheckpointCompactor
+
+
+class InvoiceState(TypedDict, total=False):
+    """Subset of the workflow state the archiver reads."""
+    invoice_payload: dict
+    workflow_status: str
+    complete: dict
+
+
+def build_graph(checkpointer):
+    """One-node graph that completes the invoice it is given."""
+    graph = StateGraph(InvoiceState)
+    graph.add_node("complete", lambda state: {
+        "workflow_status": "COMPLETED",
+        "complete": {"status": "COMPLETED", "invoice_id": state["invoice_payload"]["invoice_id"]}
+    })
+    graph.set_entry_point("complete")
+    graph.add_edge("complete", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+@pytest.fixture
+def checkpointer(tmp_path):
+    """Checkpointer holding two finished workflows, thread-1 and thread-2."""
+    conn = sqlite3.connect(str(tmp_path / "checkpoints.db"), check_same_thread=False)
+    saver = SqliteSaver(conn)
+    graph = build_graph(saver)
+    for number in (1, 2):
+        invoice = {"invoice_id": f"INV-{number}", "vendor_name": "Acme", "amount": 100.0 * number}
+        graph.invoke({"invoice_payload": invoice}, {"configurable": {"thread_id": f"thread-{number}"}})
+    yield saver
+    conn.close()
+
+
+def make_archiver(tmp_path, checkpointer, format):
+    """Archiver writing to tmp_path/archive in the given format."""
+    archiver = WorkflowArchiver()
+    archiver.configure(
+        str(tmp_path / "checkpoints.db"), checkpointer, {"path": str(tmp_path / "archive"), "format": format}
+    )
+    return archiver
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_archived_state_round_trips(tmp_path, checkpointer, format):
+    """Archived threads leave the hot database and read back from the archive."""
+    archiver = make_archiver(tmp_path, checkpointer, format)
+    finished_at = {"thread-1": "2024-03-01T10:00:00", "thread-2": "2024-03-02T10:00:00"}
+
+    assert archiver.archive_threads(["thread-1", "thread-2", "unknown"], finished_at) == ["thread-1", "thread-2"]
+
+    assert checkpointer.get_tuple({"configurable": {"thread_id": "thread-1"}}) is None
+    files = sorted(path.relative_to(tmp_path / "archive").parts[0] for path in (tmp_path / "archive").rglob("part-*"))
+    assert files == ["finished_date=2024-03-01", "finished_date=2024-03-02"]
+
+    state = archiver.get_state("thread-2")
+    assert state["archived"] is True
+    assert state["workflow_status"] == "COMPLETED"
+    assert state["invoice_payload"]["amount"] == 200.0
+    assert state["complete"] == {"status": "COMPLETED", "invoice_id": "INV-2"}
+    assert archiver.get_state("unknown") is None
+    assert [state["thread_id"] for state in archiver.iter_states(exclude={"thread-1"})] == ["thread-2"]
+
+
+def test_unknown_format_is_rejected(tmp_path, checkpointer):
+    """Only parquet and arrow archives can be configured."""
+    with pytest.raises(ValueError):
+        make_archiver(tmp_path, checkpointer, "csv")
+
+
+def test_without_pyarrow_threads_stay_hot(tmp_path, checkpointer, monkeypatch):
+    """Without pyarrow nothing is archived and expired threads are kept, not deleted."""
+    monkeypatch.setattr(archiver_module, "PYARROW_AVAILABLE", False)
+    archiver = make_archiver(tmp_path, checkpointer, "parquet")
+    assert not archiver.available
+    with pytest.raises(RuntimeError):
+        archiver.archive_threads(["thread-1"])
+    assert archiver.get_states(["thread-1"]) == {}
+
+    compactor = CheckpointCompactor()
+    compactor.configure(
+        str(tmp_path / "checkpoints.db"), checkpointer,
+        {"min_idle_s": 0, "retention_days": 0, "retention_action": "archive"}, archiver=archiver
+    )
+    assert compactor.run_once()["threads_expired"] == 0
+    assert checkpointer.get_tuple({"configurable": {"thread_id": "thread-1"}}) is not None
@@ -0,0 +1,67 @@
+"""Tests for the content-addressed blob store."""
+
+import hashlib
+
+import pytest
+
+from src.storage import blob_store as blob_store_module
+from src.storage.blob_store import BlobStore, resolve_invoice_text
+
+
+TEXT = "INVOICE INV-1001\n" + "Line item: consulting services\n" * 200
+
+
+@pytest.mark.parametrize("compression", ["zstd", "zlib", None])
+def test_round_trip(tmp_path, compression):
+    """Stored text reads back unchanged under every compression."""
+    store = BlobStore(str(tmp_path), compression=compression)
+    ref = store.put(TEXT)
+    assert ref == "sha256:" + hashlib.sha256(TEXT.encode("utf-8")).hexdigest()
+    assert store.get_text(ref) == TEXT
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    """Putting the same text twice yields one file under one reference."""
+    store = BlobStore(str(tmp_path))
+    assert store.put(TEXT) == store.put(TEXT.encode("utf-8"))
+    assert len([path for path in tmp_path.rglob("*") if path.is_file()]) == 1
+
+
+def test_blobs_stay_readable_after_compression_change(tmp_path):
+    """References written under one codec resolve after the store is reconfigured."""
+    store = BlobStore(str(tmp_path), compression="zlib")
+    ref = store.put(TEXT)
+    store.configure(str(tmp_path), compression=None)
+    assert store.get_text(ref) == TEXT
+    # The existing blob is reused rather than written again uncompressed
+    assert store.put(TEXT) == ref
+    assert len([path for path in tmp_path.rglob("*") if path.is_file()]) == 1
+
+
+def test_missing_and_foreign_references(tmp_path):
+    """Unknown digests and non-blob references read as None."""
+    store = BlobStore(str(tmp_path))
+    assert store.get("sha256:" + "0" * 64) is None
+    assert store.get("s3://bucket/key") is None
+    assert store.get(None) is None
+
+
+def test_only_large_values_are_offloaded(tmp_path):
+    """Values up to inline_max_bytes stay in state."""
+    store = BlobStore(str(tmp_path), inline_max_bytes=10)
+    assert not store.should_offload(None)
+    assert not store.should_offload("0123456789")
+    assert store.should_offload("01234567890")
+    # Size is counted in UTF-8 bytes, not characters
+    assert store.should_offload("é" * 6)
+
+
+def test_resolve_invoice_text(tmp_path, monkeypatch):
+    """The full text comes from the blob; the inline preview is the fallback."""
+    store = BlobStore(str(tmp_path))
+    monkeypatch.setattr(blob_store_module, "blob_store", store)
+    ref = store.put(TEXT)
+
+    assert resolve_invoice_text({"invoice_text_ref": ref, "invoice_text": TEXT[:20]}) == TEXT
+    assert resolve_invoice_text({"invoice_text_ref": "sha256:" + "0" * 64, "invoice_text": TEXT[:20]}) == TEXT[:20]
+    assert resolve_invoice_text({"invoice_text": "short"}) == "short"
@@ -0,0 +1,146 @@
+"""Tests for per-item results of the bulk human decision endpoint."""
+
+import json
+import time
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import app as app_module
+from src.graph.resume_worker import ResumeWorkerPool
+from src.storage.human_review_repo import HumanReviewRepository
+from src.storage.read_model import AsyncWorkflowReadModel
+from src.storage.resume_jobs import ResumeJobRepository
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Review queue with five pending reviews (cp-1..cp-5), served to the API through a fresh read model."""
+    path = str(tmp_path / "reviews.db")
+    review_repo = HumanReviewRepository(path)
+    for number in range(1, 6):
+        review_repo.save_checkpoint({
+            "checkpoint_id": f"cp-{number}",
+            "invoice_id": f"INV-{number}",
+            "vendor_name": "Acme",
+            "amount": 100.0 * number,
+            "created_at": datetime.utcnow().isoformat(),
+            "reason_for_hold": "Amount mismatch",
+            "review_url": f"/human-review/cp-{number}",
+            "thread_id": f"thread-{number}",
+            "due_date": "2024-02-01"
+        })
+    read_model = AsyncWorkflowReadModel()
+    read_model.configure([path], None)
+    monkeypatch.setattr(app_module, "workflow_read_model", read_model)
+    monkeypatch.setattr(app_module, "human_review_repo", review_repo)
+    monkeypatch.setattr(app_module, "workflow_config", {})
+    return review_repo
+
+
+def make_pool(repo, monkeypatch, enabled):
+    """Resume worker pool (not started) on the review database."""
+    pool = ResumeWorkerPool()
+    pool.configure(None, None, ResumeJobRepository([repo.db_path]), {"enabled": enabled, "poll_interval_s": 0.05})
+    monkeypatch.setattr(app_module, "resume_worker_pool", pool)
+    return pool
+
+
+def post_bulk(body):
+    """POST a bulk request and parse the NDJSON lines."""
+    response = TestClient(app_module.app).post("/human-review/decisions/bulk", json=body)
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    return {line["checkpoint_id"]: line for line in lines[:-1]}, lines[-1]["summary"]
+
+
+def test_invalid_items_do_not_block_the_rest(repo, monkeypatch):
+    """Every item gets its own result; valid items are queued while invalid ones are rejected."""
+    pool = make_pool(repo, monkeypatch, enabled=True)
+    repo.update_decision("cp-2", "REJECT", "bob")
+    repo.claim("cp-3", "carol", lease_s=60)
+
+    results, summary = post_bulk({"reviewer_id": "alice", "decisions": [
+        {"checkpoint_id": "cp-1", "decision": "accept"},
+        {"checkpoint_id": "cp-1", "decision": "REJECT"},
+        {"checkpoint_id": "cp-2", "decision": "ACCEPT"},
+        {"checkpoint_id": "cp-3", "decision": "ACCEPT"},
+        {"checkpoint_id": "cp-4", "decision": "MAYBE"},
+        {"checkpoint_id": "cp-unknown", "decision": "ACCEPT"},
+        {"checkpoint_id": "cp-5", "decision": "REJECT", "reviewer_id": "dave"}
+    ]})
+
+    assert results["cp-1"]["status"] == "QUEUED" and results["cp-1"]["ok"]
+    assert results["cp-5"]["next_stage"] == "COMPLETE"
+    assert {checkpoint_id: result["error"] for checkpoint_id, result in results.items() if not result["ok"]} == {
+        "cp-2": "Checkpoint already processed",
+        "cp-3": "Checkpoint claimed by carol",
+        "cp-4": "Invalid decision: MAYBE",
+        "cp-unknown": "Checkpoint not found"
+    }
+    assert summary == {"total": 7, "REJECTED": 5, "QUEUED": 2}
+    assert repo.get_checkpoint("cp-1")["reviewer_id"] == "alice"
+    assert repo.get_checkpoint("cp-5")["reviewer_id"] == "dave"
+    assert pool.jobs.claim("worker", 60, 0)["checkpoint_id"] in ("cp-1", "cp-5")
+
+
+def test_reviews_decided_meanwhile_are_conflicts(repo, monkeypatch):
+    """A review decided between validation and enqueue is reported as CONFLICT and not resumed."""
+    pool = make_pool(repo, monkeypatch, enabled=True)
+    enqueue_many = pool.jobs.enqueue_many
+
+    def enqueue_after_concurrent_decision(jobs):
+        repo.update_decision("cp-2", "REJECT", "bob")
+        return enqueue_many(jobs)
+
+    monkeypatch.setattr(pool.jobs, "enqueue_many", enqueue_after_concurrent_decision)
+
+    results, summary = post_bulk({"reviewer_id": "alice", "decisions": [
+        {"checkpoint_id": "cp-1", "decision": "ACCEPT"},
+        {"checkpoint_id": "cp-2", "decision": "ACCEPT"}
+    ]})
+
+    assert (results["cp-2"]["status"], results["cp-2"]["ok"]) == ("CONFLICT", False)
+    assert results["cp-1"]["status"] == "QUEUED"
+    assert summary == {"total": 2, "REJECTED": 0, "CONFLICT": 1, "QUEUED": 1}
+    assert repo.get_checkpoint("cp-2")["decision"] == "REJECT"
+
+
+def test_inline_resume_failures_are_reported_per_item(repo, monkeypatch):
+    """Without workers, a failing resume is FAILED while the others complete."""
+    make_pool(repo, monkeypatch, enabled=False)
+
+    def fake_resume(graph, checkpoint_store, durability, job):
+        if job["thread_id"] == "thread-2":
+            raise RuntimeError("ERP unavailable")
+        return 5.0
+
+    monkeypatch.setattr(app_module, "resume_workflow", fake_resume)
+
+    results, summary = post_bulk({"reviewer_id": "alice", "decisions": [
+        {"checkpoint_id": f"cp-{number}", "decision": "ACCEPT"} for number in (1, 2, 3)
+    ]})
+
+    assert {checkpoint_id: result["status"] for checkpoint_id, result in results.items()} == {
+        "cp-1": "DONE", "cp-2": "FAILED", "cp-3": "DONE"
+    }
+    assert results["cp-2"]["error"] == "ERP unavailable"
+    assert summary == {"total": 3, "REJECTED": 0, "DONE": 2, "FAILED": 1}
+
+
+def test_waiting_for_queued_resumes_is_bounded(repo, monkeypatch):
+    """With wait, resumes not finished in wait_timeout_s are reported as TIMEOUT."""
+    make_pool(repo, monkeypatch, enabled=True)
+    start = time.monotonic()
+
+    lines = TestClient(app_module.app).post("/human-review/decisions/bulk", json={
+        "reviewer_id": "alice",
+        "wait": True,
+        "wait_timeout_s": 0.2,
+        "decisions": [{"checkpoint_id": "cp-1", "decision": "ACCEPT"}]
+    }).text.splitlines()
+
+    assert [json.loads(line).get("status") for line in lines[:-1]] == ["QUEUED", "TIMEOUT"]
+    assert json.loads(lines[-1])["summary"] == {"total": 1, "REJECTED": 0, "QUEUED": 1, "TIMEOUT": 1}
+    assert time.monotonic() - start < 5
@@ -0,0 +1,118 @@
+"""Tests for checkpoint compaction, retention and vacuum."""
+
+import sqlite3
+from typing import TypedDict
+
+import pytest
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, StateGraph
+
+from src.storage.compactor import AUTO_VACUUM_INCREMENTAL, CheckpointCompactor, enable_incremental_vacuum
+
+
+class StepState(TypedDict, total=False):
+    """Minimal workflow state: three steps, then a final status."""
+    steps: int
+    workflow_status: str
+    paused: bool
+    padding: str
+
+
+def build_graph(checkpointer):
+    """Three-node graph that ends COMPLETED, or PAUSED when the input asks for a pause."""
+    graph = StateGraph(StepState)
+    graph.add_node("one", lambda state: {"steps": 1, "padding": "x" * 20000})
+    graph.add_node("two", lambda state: {"steps": 2})
+    graph.add_node("three", lambda state: {
+        "steps": 3, "workflow_status": "PAUSED" if state.get("paused") else "COMPLETED"
+    })
+    graph.set_entry_point("one")
+    graph.add_edge("one", "two")
+    graph.add_edge("two", "three")
+    graph.add_edge("three", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Database with a completed thread "done" and a paused thread "paused"."""
+    path = str(tmp_path / "checkpoints.db")
+    conn = sqlite3.connect(path, check_same_thread=False)
+    graph = build_graph(SqliteSaver(conn))
+    graph.invoke({"steps": 0}, {"configurable": {"thread_id": "done"}})
+    graph.invoke({"steps": 0, "paused": True}, {"configurable": {"thread_id": "paused"}})
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def compactor(db_path):
+    """Compactor on the test database with no idle time and no retention."""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    checkpoint_compactor = CheckpointCompactor()
+    checkpoint_compactor.configure(db_path, SqliteSaver(conn), {"min_idle_s": 0})
+    yield checkpoint_compactor
+    conn.close()
+
+
+def checkpoint_counts(db_path):
+    """Checkpoints per thread."""
+    conn = sqlite3.connect(db_path)
+    counts = dict(conn.execute("SELECT thread_id, COUNT(*) FROM checkpoints GROUP BY thread_id").fetchall())
+    conn.close()
+    return counts
+
+
+def auto_vacuum(db_path):
+    """The database's auto_vacuum mode."""
+    conn = sqlite3.connect(db_path)
+    mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    conn.close()
+    return mode
+
+
+def test_finished_threads_collapse_to_final_checkpoint(db_path, compactor):
+    """Only the final checkpoint of a finished thread is kept; paused threads are untouched."""
+    before = checkpoint_counts(db_path)
+    run = compactor.run_once()
+    after = checkpoint_counts(db_path)
+
+    assert run["threads_compacted"] == 1
+    assert run["checkpoints_deleted"] == before["done"] - 1
+    assert after == {"done": 1, "paused": before["paused"]}
+    state = compactor.checkpointer.get_tuple({"configurable": {"thread_id": "done"}}).checkpoint["channel_values"]
+    assert (state["steps"], state["workflow_status"]) == (3, "COMPLETED")
+    # Nothing changed since: the next run inspects nothing
+    assert compactor.run_once()["threads_compacted"] == 0
+
+
+def test_expired_threads_are_deleted_through_callback(db_path, compactor):
+    """With retention, finished threads are removed through delete_thread."""
+    deleted = []
+    compactor.retention_days = 0
+    compactor.retention_action = "delete"
+    compactor.delete_thread = deleted.append
+
+    run = compactor.run_once()
+
+    assert run["threads_expired"] == 1
+    assert deleted == ["done"]
+
+
+def test_vacuum_never_converts_a_live_database(db_path, compactor):
+    """The compactor leaves auto_vacuum alone; the maintenance step switches it once."""
+    assert auto_vacuum(db_path) != AUTO_VACUUM_INCREMENTAL
+    compactor.run_once()
+    assert auto_vacuum(db_path) != AUTO_VACUUM_INCREMENTAL
+
+    assert enable_incremental_vacuum(db_path)
+    assert not enable_incremental_vacuum(db_path)
+    assert auto_vacuum(db_path) == AUTO_VACUUM_INCREMENTAL
+
+    # Deleting the paused thread frees pages that the next run returns to the filesystem
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM checkpoints WHERE thread_id = 'paused'")
+    conn.execute("DELETE FROM writes WHERE thread_id = 'paused'")
+    conn.commit()
+    conn.close()
+    assert compactor.run_once()["bytes_reclaimed"] > 0
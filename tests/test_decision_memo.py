@@ -0,0 +1,73 @@
+"""Tests for mismatch signatures and the HITL decision memo."""
+
+import pytest
+
+from src.mcp_clients.common_client import COMMONClient
+from src.storage.decision_memo import HitlDecisionMemo, amount_band, mismatch_signature
+
+
+def held_state(po_amount, variance_pct, vendor_id="VND-1", invoice_id="INV-1"):
+    """State of an invoice for one PO line, billed `variance_pct` percent over (or under) the PO."""
+    invoice_amount = round(po_amount * (1 + variance_pct / 100), 2)
+    invoice_lines = [{"desc": "Widget", "qty": 1, "unit_price": invoice_amount, "total": invoice_amount}]
+    po_lines = [{"desc": "Widget", "qty": 1, "unit_price": po_amount, "total": po_amount, "po_id": "PO-1"}]
+    match = COMMONClient().compute_match_score(invoice_lines, po_lines, tolerance_pct=1.0)
+    return {
+        "thread_id": f"thread-{invoice_id}",
+        "invoice_payload": {"invoice_id": invoice_id, "vendor_name": "Acme", "amount": invoice_amount},
+        "prepare": {"vendor_profile": {"vendor_id": vendor_id}, "normalized_invoice": {"line_items": invoice_lines}},
+        "match_two_way": {"match_mode": "two_way", "match_evidence": match["evidence"]}
+    }
+
+
+def test_signature_is_stable_across_invoices():
+    """Same vendor, PO, band and variance bucket: same signature, whatever the invoice."""
+    first = mismatch_signature(held_state(1000.0, 2.2, invoice_id="INV-1"))
+    assert mismatch_signature(held_state(1000.0, 2.2, invoice_id="INV-1")) == first
+    assert mismatch_signature(held_state(1500.0, 2.7, invoice_id="INV-2")) == first
+
+
+def test_over_and_under_billing_differ():
+    """A signed variance keeps 2.5% over and 2.5% under apart."""
+    assert mismatch_signature(held_state(1000.0, 2.5)) != mismatch_signature(held_state(1000.0, -2.5))
+
+
+def test_amount_band_separates_small_and_large_invoices():
+    """The same percentage on a $500 and a $500k invoice is a different pattern."""
+    assert mismatch_signature(held_state(500.0, 2.5)) != mismatch_signature(held_state(500000.0, 2.5))
+    # Small invoice 2.5% over vs large invoice 2.5% under
+    assert mismatch_signature(held_state(500.0, 2.5)) != mismatch_signature(held_state(500000.0, -2.5))
+
+
+def test_other_dimensions_change_the_signature():
+    """Vendor and bucket width are part of the signature."""
+    base = held_state(1000.0, 2.5)
+    assert mismatch_signature(held_state(1000.0, 2.5, vendor_id="VND-2")) != mismatch_signature(base)
+    assert mismatch_signature(held_state(1000.0, 3.5)) != mismatch_signature(base)
+    assert mismatch_signature(held_state(1000.0, 3.5), 5.0) == mismatch_signature(base, 5.0)
+
+
+@pytest.mark.parametrize("amount, band", [(512.5, 2), (999.99, 2), (1000, 3), (487500, 5), (0, None), (None, None)])
+def test_amount_band(amount, band):
+    """Bands are orders of magnitude; missing amounts have none."""
+    assert amount_band(amount) == band
+
+
+@pytest.fixture
+def memo(tmp_path):
+    """Memo in a temporary database, configured like workflow.json ships."""
+    decision_memo = HitlDecisionMemo()
+    decision_memo.configure(str(tmp_path / "memo.db"), {"enabled": False, "min_count": 3, "min_confidence": 0.9})
+    return decision_memo
+
+
+def test_memo_counts_each_review_once_and_is_off_by_default(memo):
+    """Replayed decisions are not recounted; a disabled memo never auto-resolves."""
+    for checkpoint_id in ("cp-1", "cp-2", "cp-3", "cp-3"):
+        memo.record(checkpoint_id, "sig", "ACCEPT")
+    assert memo.get("sig")["accept_count"] == 3
+    assert memo.match("sig") is None
+    memo.enabled = True
+    assert memo.match("sig")["confidence"] == 1.0
+    memo.record("cp-4", "sig", "REJECT")
+    assert memo.match("sig") is None
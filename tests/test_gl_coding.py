@@ -0,0 +1,83 @@
+"""Tests for GL coding and accounting entry balance."""
+
+import json
+
+import pytest
+
+from src.rules.gl_coding import GLCodingEngine
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """GL coding engine on a temporary workflow.json."""
+    config_path = tmp_path / "workflow.json"
+    config_path.write_text(json.dumps({"gl_coding": {
+        "ap_account": "AP",
+        "default_expense_account": "Expense",
+        "description_keywords": {"freight": "Freight", "software": "Software"}
+    }}))
+    return GLCodingEngine(str(config_path))
+
+
+def cents(entries, side):
+    """Sum one side of the entries in cents."""
+    return sum(round(entry[side] * 100) for entry in entries)
+
+
+def invoice(amount, totals, descs=None):
+    """Invoice payload with the given line totals."""
+    descs = descs or ["Widget"] * len(totals)
+    return {"invoice_id": "INV-1", "amount": amount,
+            "line_items": [{"desc": desc, "qty": 1, "unit_price": total, "total": total}
+                           for desc, total in zip(descs, totals)]}
+
+
+def test_lines_are_coded_and_aggregated(engine):
+    """Lines are coded by keyword and aggregated per account."""
+    entries = engine.build_entries(invoice(400.0, [100.0, 50.0, 250.0], ["Widget", "Freight charge", "Software"]))
+    by_account = {entry["account"]: entry for entry in entries if entry["debit"]}
+    assert by_account["Expense"]["debit"] == 100.0
+    assert by_account["Freight"]["debit"] == 50.0
+    assert by_account["Software"]["debit"] == 250.0
+    assert cents(entries, "debit") == cents(entries, "credit") == 40000
+
+
+def test_tax_difference_is_debited_to_default_account(engine):
+    """An invoice larger than its lines debits the difference once."""
+    entries = engine.build_entries(invoice(108.0, [100.0], ["Software"]))
+    assert {entry["account"]: entry["debit"] for entry in entries if entry["debit"]} == {"Software": 100.0, "Expense": 8.0}
+    assert cents(entries, "debit") == cents(entries, "credit")
+
+
+def test_discount_line_is_credited(engine):
+    """A negative line posts to the credit side as a positive amount."""
+    entries = engine.build_entries(invoice(80.0, [100.0, -20.0], ["Software", "Early payment discount"]))
+    assert all(entry["debit"] >= 0 and entry["credit"] >= 0 for entry in entries)
+    postings = {(entry["account"], entry["debit"], entry["credit"]) for entry in entries}
+    assert postings == {("AP", 0, 80.0), ("Software", 100.0, 0), ("Expense", 0, 20.0)}
+    assert cents(entries, "debit") == cents(entries, "credit") == 10000
+
+
+def test_lines_exceeding_invoice_post_a_credit(engine):
+    """Excess line totals become a credit, never a negative debit."""
+    entries = engine.build_entries(invoice(90.0, [60.0, 40.0]))
+    assert all(entry["debit"] >= 0 and entry["credit"] >= 0 for entry in entries)
+    excess = [entry for entry in entries if entry["account"] == "Expense" and entry["credit"]]
+    assert len(excess) == 1 and excess[0]["credit"] == 10.0
+    assert cents(entries, "debit") == cents(entries, "credit") == 10000
+
+
+def test_rounding_residue_balances_exactly(engine):
+    """Sub-cent line totals across accounts still balance to the cent."""
+    totals = [0.335] * 3 + [0.105] * 3
+    descs = ["Freight"] * 3 + ["Software"] * 3
+    entries = engine.build_entries(invoice(1.32, totals, descs))
+    assert cents(entries, "debit") == cents(entries, "credit")
+    assert entries[0]["credit"] == 1.32
+    assert sum(1 for entry in entries if entry["account"] == "Expense") <= 1
+
+
+def test_invoice_without_lines_debits_default_account(engine):
+    """No lines: the whole amount goes to the default account."""
+    entries = engine.build_entries({"invoice_id": "INV-2", "amount": 75.5, "line_items": []})
+    assert [(entry["account"], entry["debit"]) for entry in entries if entry["debit"]] == [("Expense", 75.5)]
@@ -0,0 +1,66 @@
+"""Tests for the group-commit checkpoint writer."""
+
+import sqlite3
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+
+from src.storage.group_commit import GroupCommitSqliteSaver
+
+
+@pytest.fixture
+def saver(tmp_path):
+    """Group-commit saver with a latency window wide enough to batch every test write."""
+    conn = sqlite3.connect(str(tmp_path / "checkpoints.db"), check_same_thread=False)
+    group_saver = GroupCommitSqliteSaver(conn, max_latency_ms=200)
+    yield group_saver
+    group_saver.close()
+    conn.close()
+
+
+def put_checkpoint(saver, thread_id):
+    """Queue an empty checkpoint for a thread."""
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    return saver.put(config, empty_checkpoint(), {}, {})
+
+
+def put_broken(saver, thread_id):
+    """Queue a write whose statement fails at commit time."""
+    def write():
+        with saver.cursor() as cur:
+            cur.execute("INSERT INTO missing_table VALUES (1)")
+    saver._enqueue(thread_id, write)
+
+
+def test_writes_share_one_commit(saver):
+    """Writes queued together commit in one batch and are readable afterwards."""
+    put_checkpoint(saver, "t-1")
+    config = put_checkpoint(saver, "t-2")
+    saver.wait_durable("t-2")
+    assert saver.stats["batches"] == 1 and saver.stats["writes"] == 2
+    assert saver.get_tuple(config).config["configurable"]["thread_id"] == "t-2"
+
+
+def test_failing_write_only_fails_its_own_thread(saver):
+    """A bad write in a batch does not fail the other workflows committed with it."""
+    put_checkpoint(saver, "good")
+    put_broken(saver, "bad")
+    put_checkpoint(saver, "also-good")
+    with pytest.raises(RuntimeError):
+        saver.wait_durable("bad")
+    saver.wait_durable("good")
+    saver.wait_durable("also-good")
+    assert saver.stats["failed_writes"] == 1
+    assert saver.get_tuple({"configurable": {"thread_id": "good", "checkpoint_ns": ""}}) is not None
+    # The failure is reported once
+    saver.wait_durable("bad")
+
+
+def test_unreported_failures_are_evicted(saver):
+    """Failures nobody waits for do not accumulate."""
+    saver.failure_retention_s = 0
+    put_broken(saver, "bad")
+    saver.flush()
+    put_checkpoint(saver, "next")
+    saver.wait_durable("next")
+    assert saver._failures == {}
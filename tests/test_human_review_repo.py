@@ -0,0 +1,129 @@
+"""Tests for review queue leases and decisions."""
+
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from src.storage.human_review_repo import HumanReviewRepository
+from src.storage.resume_jobs import ResumeJobRepository
+
+
+def review(checkpoint_id, due_date, amount):
+    """Pending review row."""
+    return {
+        "checkpoint_id": checkpoint_id,
+        "invoice_id": f"INV-{checkpoint_id}",
+        "vendor_name": "Acme",
+        "amount": amount,
+        "created_at": datetime.utcnow().isoformat(),
+        "reason_for_hold": "Amount mismatch",
+        "review_url": f"/human-review/{checkpoint_id}",
+        "thread_id": f"thread-{checkpoint_id}",
+        "due_date": due_date
+    }
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Review queue with three pending reviews: cp-1 due first, then cp-2 (larger) and cp-3."""
+    review_repo = HumanReviewRepository(str(tmp_path / "reviews.db"))
+    review_repo.save_checkpoint(review("cp-3", "2024-02-01", 100.0))
+    review_repo.save_checkpoint(review("cp-2", "2024-02-01", 900.0))
+    review_repo.save_checkpoint(review("cp-1", "2024-01-01", 50.0))
+    return review_repo
+
+
+def test_claim_is_exclusive_until_lease_expires(repo):
+    """Only one reviewer holds a live lease; an expired lease can be taken over."""
+    assert repo.claim("cp-1", "alice", lease_s=60)["claimed_by"] == "alice"
+    assert repo.claim("cp-1", "bob", lease_s=60) is None
+    assert repo.claim("cp-1", "alice", lease_s=60) is not None  # renewal by the holder
+    assert repo.heartbeat("cp-1", "bob", lease_s=60) is None
+
+    repo.claim("cp-2", "alice", lease_s=-1)  # already expired
+    assert repo.claim("cp-2", "bob", lease_s=60)["claimed_by"] == "bob"
+    assert repo.heartbeat("cp-2", "alice", lease_s=60) is None
+
+
+def test_claim_next_follows_priority_and_skips_leases(repo):
+    """Reviewers get the earliest due, then largest, review nobody holds."""
+    assert repo.claim_next("alice", lease_s=60)["checkpoint_id"] == "cp-1"
+    assert repo.claim_next("bob", lease_s=60)["checkpoint_id"] == "cp-2"
+    assert repo.claim_next("carol", lease_s=60)["checkpoint_id"] == "cp-3"
+    assert repo.claim_next("dave", lease_s=60) is None
+
+
+def test_release_returns_review_to_queue(repo):
+    """Only the holder can release; a released review is next again."""
+    repo.claim("cp-1", "alice", lease_s=60)
+    assert repo.peek_next()["checkpoint_id"] == "cp-2"
+    assert not repo.release("cp-1", "bob")
+    assert repo.release("cp-1", "alice")
+    assert repo.peek_next()["checkpoint_id"] == "cp-1"
+
+
+def test_decided_reviews_cannot_be_claimed_or_decided_again(repo):
+    """update_decisions reports only the reviews it decided; decided reviews leave the queue."""
+    decisions = [
+        {"checkpoint_id": "cp-1", "decision": "ACCEPT", "reviewer_id": "alice"},
+        {"checkpoint_id": "cp-2", "decision": "REJECT", "reviewer_id": "alice"}
+    ]
+    assert repo.update_decisions(decisions) == ["cp-1", "cp-2"]
+    assert repo.update_decisions([{**decisions[0], "decision": "REJECT", "reviewer_id": "bob"}]) == []
+    assert repo.get_checkpoint("cp-1")["decision"] == "ACCEPT"
+    assert repo.claim("cp-1", "bob", lease_s=60) is None
+    assert [row["checkpoint_id"] for row in repo.get_pending_reviews()] == ["cp-3"]
+
+
+def test_decisions_respect_live_leases(repo):
+    """A decision from someone other than the lease holder conflicts until the lease expires."""
+    repo.claim("cp-1", "alice", lease_s=60)
+    repo.claim("cp-2", "alice", lease_s=-1)  # already expired
+    assert repo.update_decisions([
+        {"checkpoint_id": "cp-1", "decision": "ACCEPT", "reviewer_id": "bob"},
+        {"checkpoint_id": "cp-2", "decision": "ACCEPT", "reviewer_id": "bob"}
+    ]) == ["cp-2"]
+    assert not repo.update_decision("cp-1", "ACCEPT", "bob")
+    assert repo.update_decision("cp-1", "REJECT", "alice")
+    assert repo.get_checkpoint("cp-1")["reviewer_id"] == "alice"
+
+
+def test_enqueue_many_skips_conflicting_reviews(repo, tmp_path):
+    """Only reviews whose decision was recorded get a resume job."""
+    jobs = ResumeJobRepository([str(tmp_path / "reviews.db")])
+    repo.claim("cp-1", "alice", lease_s=60)
+
+    def job(checkpoint_id, reviewer_id):
+        return {
+            "checkpoint_id": checkpoint_id,
+            "thread_id": f"thread-{checkpoint_id}",
+            "decision": "ACCEPT",
+            "reviewer_id": reviewer_id,
+            "next_stage": "RECONCILE"
+        }
+
+    assert jobs.enqueue_many([job("cp-1", "bob"), job("cp-2", "bob")]) == ["cp-2"]
+    assert jobs.enqueue_many([job("cp-2", "carol")]) == []
+    assert repo.get_checkpoint("cp-1")["decision"] is None
+    assert repo.get_checkpoint("cp-2")["reviewer_id"] == "bob"
+    assert jobs.enqueue_many([job("cp-1", "alice")]) == ["cp-1"]
+
+
+def test_state_blob_migration_runs_once(tmp_path):
+    """Legacy state blobs are stripped on the first start only, not on every construction."""
+    path = str(tmp_path / "legacy.db")
+    HumanReviewRepository(path).save_checkpoint(review("cp-1", "2024-01-01", 50.0))
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE schema_migrations")  # database from before the migration
+    conn.execute("UPDATE human_review_queue SET state_blob = 'legacy'")
+    conn.commit()
+
+    HumanReviewRepository(path)
+    assert conn.execute("SELECT state_blob FROM human_review_queue").fetchone() == (None,)
+
+    conn.execute("UPDATE human_review_queue SET state_blob = 'kept'")
+    conn.commit()
+    HumanReviewRepository(path)
+    assert conn.execute("SELECT state_blob FROM human_review_queue").fetchone() == ("kept",)
+    conn.close()
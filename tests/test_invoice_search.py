@@ -0,0 +1,88 @@
+"""Tests for full-text invoice search."""
+
+import pytest
+
+from src.storage.invoice_search import InvoiceSearchIndex, document_fields, fts_query
+from src.storage.workflow_metrics import WorkflowMetrics
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("acme", '"acme"*'),
+    ("INV-2024-0420", '"INV-2024-0420"*'),
+    ("acme  widgets", '"acme" "widgets"*'),
+    ('say "hi"', '"say" """hi"""*'),
+    ("acme OR NOT bolts", '"acme" "OR" "NOT" "bolts"*'),
+    ("vendor:acme NEAR(a b)", '"vendor:acme" "NEAR(a" "b)"*'),
+    ("- * ( ) \"", ""),
+    ("", "")
+])
+def test_fts_query_quotes_every_term(query, expected):
+    """Terms become quoted phrases (operators are text), the last one a prefix."""
+    assert fts_query(query) == expected
+
+
+def state(thread_id, invoice_id, vendor, pos=(), status=None):
+    """Workflow state with the fields the index reads."""
+    return {
+        "thread_id": thread_id,
+        "invoice_payload": {"invoice_id": invoice_id, "vendor_name": vendor, "amount": 100.0},
+        "understand": {"parsed_invoice": {"detected_pos": list(pos), "parsed_line_items": [{"desc": "Steel bolts"}]}},
+        "workflow_status": status
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Index over two shards, with the dashboard index tables it joins."""
+    db_paths = [str(tmp_path / "shard_0.db"), str(tmp_path / "shard_1.db")]
+    WorkflowMetrics().configure(db_paths, checkpointer=None)
+    search_index = InvoiceSearchIndex()
+    search_index.configure(db_paths)
+    for n, (invoice_id, vendor, pos) in enumerate([
+        ("INV-2024-0420", "Acme Corp", ["PO-1001"]),
+        ("INV-2024-0421", "Globex", ["PO-1002"]),
+        ("INV-2024-0500", "Initech", ["PO-1001", "PO-2002"]),
+    ]):
+        values = state(f"t-{n}", invoice_id, vendor, pos)
+        search_index.index(values["thread_id"], document_fields(values, f"Invoice {invoice_id} from {vendor}"))
+    return search_index
+
+
+def ids(result):
+    """Invoice IDs of a search result."""
+    return [item["invoice_id"] for item in result["items"]]
+
+
+def test_search_by_invoice_vendor_po_and_text(index):
+    """Invoice numbers, vendors, PO numbers and line text are searchable across shards."""
+    assert ids(index.search("INV-2024-0420")) == ["INV-2024-0420"]
+    assert sorted(ids(index.search("INV-2024-04"))) == ["INV-2024-0420", "INV-2024-0421"]
+    assert ids(index.search("globex")) == ["INV-2024-0421"]
+    assert sorted(ids(index.search("PO-1001"))) == ["INV-2024-0420", "INV-2024-0500"]
+    assert len(index.search("bolts")["items"]) == 3
+
+
+@pytest.mark.parametrize("query", ['"', 'acme"', "AND", "OR acme", "acme*", "invoice_id:acme", "(", "NEAR(", "^acme"])
+def test_search_syntax_in_queries_never_fails(index, query):
+    """FTS5 syntax in user input is searched as text instead of raising."""
+    index.search(query)
+
+
+def test_paging_across_shards(index):
+    """Pages cut from the merged ranking neither skip nor repeat hits."""
+    first = index.search("bolts", limit=2)
+    second = index.search("bolts", limit=2, offset=2)
+    assert first["has_more"] and not second["has_more"]
+    assert sorted(ids(first) + ids(second)) == ["INV-2024-0420", "INV-2024-0421", "INV-2024-0500"]
+
+
+def test_reindex_updates_and_delete_removes(index):
+    """Re-indexing replaces old terms and keeps fields it has no value for; deletion drops the document."""
+    values = state("t-1", "INV-2024-0421", "Globex Intl")  # no POs detected any more
+    index.index("t-1", document_fields(values))  # no invoice text: the indexed text stays
+    assert ids(index.search("intl")) == ["INV-2024-0421"]
+    assert ids(index.search("PO-1002")) == []
+    assert "INV-2024-0421" in ids(index.search("bolts"))
+    index.delete_by_thread("t-1")
+    assert ids(index.search("globex")) == []
+    assert not index.is_empty()
@@ -0,0 +1,94 @@
+"""Tests for resuming a paused workflow from another process."""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.graph.builder import build_invoice_graph, create_initial_state
+from src.storage.resume_jobs import ResumeJobRepository
+from src.storage.sharding import shard_paths
+
+
+ROOT = Path(__file__).parent.parent
+
+# Second "API worker": claims the queued job from the shared shards and runs it
+WORKER_SCRIPT = """
+import sys
+from src.graph.builder import build_invoice_graph
+from src.graph.resume_worker import resume_worker_pool
+
+build_invoice_graph(sys.argv[1])
+for shard in range(resume_worker_pool.jobs.router.count):
+    job = resume_worker_pool.jobs.claim("worker-b", 60, shard)
+    if job:
+        resume_worker_pool.run_job(job)
+"""
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    """workflow.json with every database, blob and archive path in tmp_path and two shards."""
+    with open(ROOT / "workflow.json", "r") as f:
+        workflow = json.load(f)
+    config = workflow["config"]
+    config["default_db"] = f"sqlite:///{tmp_path / 'demo.db'}"
+    config["storage_shards"] = {"count": 2, "path_template": str(tmp_path / "shards" / "demo_{shard}.db")}
+    config["blob_store"]["path"] = str(tmp_path / "blobs")
+    config["archive"]["path"] = str(tmp_path / "archive")
+    config["speculative_precompute"]["enabled"] = False
+    path = tmp_path / "workflow.json"
+    path.write_text(json.dumps(workflow))
+    return path
+
+
+def test_review_paused_here_resumes_in_another_process(config_path):
+    """A decision queued by one process is resumed to completion by another."""
+    graph, checkpoint_store, human_review_repo = build_invoice_graph(str(config_path))
+    with open(ROOT / "test_data" / "invoice_fail.json", "r") as f:
+        invoice = json.load(f)
+    invoice["attachments"] = []
+
+    workflow = json.loads(config_path.read_text())
+    state = create_initial_state(invoice, workflow["config"])
+    thread_id = state["thread_id"]
+    config = {"configurable": {"thread_id": thread_id}}
+    for _ in graph.stream(state, config, stream_mode="updates"):
+        pass
+    checkpoint_store.wait_durable(thread_id)
+    assert graph.get_state(config).values.get("paused")
+
+    (review,) = human_review_repo.get_pending_reviews()
+    db_paths = shard_paths(workflow["config"]["storage_shards"], str(config_path.parent / "demo.db"))
+    jobs = ResumeJobRepository(db_paths)
+    assert jobs.enqueue_many([{
+        "checkpoint_id": review["checkpoint_id"],
+        "thread_id": thread_id,
+        "decision": "ACCEPT",
+        "reviewer_id": "alice",
+        "next_stage": "RECONCILE"
+    }]) == [review["checkpoint_id"]]
+
+    subprocess.run(
+        [sys.executable, "-c", WORKER_SCRIPT, str(config_path)],
+        cwd=config_path.parent,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+        check=True,
+        timeout=120
+    )
+
+    conn = sqlite3.connect(jobs.router.path_for(thread_id))
+    status, attempts = conn.execute(
+        "SELECT status, attempts FROM resume_jobs WHERE thread_id = ?", (thread_id,)
+    ).fetchone()
+    conn.close()
+    assert (status, attempts) == ("DONE", 1)
+
+    values = graph.get_state(config).values
+    assert values["complete"]["status"] == "COMPLETED"
+    assert values["hitl"]["human_decision"] == "ACCEPT"
+    assert values["hitl"]["reviewer_id"] == "alice"
@@ -0,0 +1,211 @@
+"""Tests for the async read model used by the API query endpoints."""
+
+import asyncio
+import sqlite3
+from datetime import datetime
+from typing import TypedDict
+
+import aiosqlite
+import pytest
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, StateGraph
+
+from src.storage.read_model import AsyncWorkflowReadModel, ReadOnlyPool
+from src.storage.serializers import CompactSerializer
+from src.storage.sharding import ShardedCheckpointSaver, ShardedHumanReviewRepository, ShardRouter
+
+
+THREAD_IDS = [f"thread-{number}" for number in range(6)]
+
+
+class InvoiceState(TypedDict, total=False):
+    """Minimal workflow state."""
+    invoice_id: str
+    steps: int
+
+
+def build_graph(checkpointer):
+    """Two-node graph counting its steps."""
+    graph = StateGraph(InvoiceState)
+    graph.add_node("one", lambda state: {"steps": 1})
+    graph.add_node("two", lambda state: {"steps": 2})
+    graph.set_entry_point("one")
+    graph.add_edge("one", "two")
+    graph.add_edge("two", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+@pytest.fixture(params=["default", "compact"])
+def shards(request, tmp_path):
+    """Two shards holding finished workflows and one review per thread, under each checkpoint serializer."""
+    router = ShardRouter([str(tmp_path / f"demo_{shard}.db") for shard in range(2)])
+    connections = [sqlite3.connect(path, check_same_thread=False) for path in router.db_paths]
+    if request.param == "compact":
+        savers = [SqliteSaver(conn, serde=CompactSerializer(compression="zlib", compress_min_bytes=0))
+                  for conn in connections]
+    else:
+        savers = [SqliteSaver(conn) for conn in connections]
+    saver = ShardedCheckpointSaver(router, savers)
+    graph = build_graph(saver)
+    repo = ShardedHumanReviewRepository(router)
+    for number, thread_id in enumerate(THREAD_IDS):
+        graph.invoke({"invoice_id": f"INV-{number}"}, {"configurable": {"thread_id": thread_id}})
+        repo.save_checkpoint({
+            "checkpoint_id": f"cp-{number}",
+            "invoice_id": f"INV-{number}",
+            "vendor_name": "Acme",
+            "amount": 100.0 * number,
+            "created_at": datetime.utcnow().isoformat(),
+            "reason_for_hold": "Amount mismatch",
+            "review_url": f"/human-review/cp-{number}",
+            "thread_id": thread_id,
+            "due_date": "2024-02-01"
+        })
+    yield router, saver, graph, repo
+    for conn in connections:
+        conn.close()
+
+
+def make_read_model(router, saver, settings=None):
+    """Read model over the test shards."""
+    read_model = AsyncWorkflowReadModel()
+    read_model.configure(router.db_paths, saver.serde, settings)
+    return read_model
+
+
+def test_states_match_the_graph(shards):
+    """Latest states read asynchronously equal graph.get_state values."""
+    router, saver, graph, repo = shards
+
+    async def read():
+        read_model = make_read_model(router, saver)
+        try:
+            return (
+                await read_model.get_states(THREAD_IDS + ["unknown"]),
+                await read_model.get_state("thread-2"),
+                await read_model.get_state("unknown"),
+                await read_model.list_thread_ids()
+            )
+        finally:
+            await read_model.close()
+
+    states, state, missing, thread_ids = asyncio.run(read())
+
+    assert states == {
+        thread_id: graph.get_state({"configurable": {"thread_id": thread_id}}).values for thread_id in THREAD_IDS
+    }
+    assert state == {"invoice_id": "INV-2", "steps": 2}
+    assert missing is None
+    assert thread_ids == sorted(THREAD_IDS)
+
+
+def test_reviews_match_the_repository(shards):
+    """Review listings and lookups agree with the sync repository across shards."""
+    router, saver, graph, repo = shards
+    repo.update_decision("cp-1", "ACCEPT", "alice")
+
+    async def read():
+        read_model = make_read_model(router, saver)
+        try:
+            return (
+                await read_model.list_reviews(),
+                await read_model.list_reviews(pending_only=True),
+                await read_model.get_review("cp-3"),
+                await read_model.get_reviews(["cp-1", "cp-4", "cp-unknown"])
+            )
+        finally:
+            await read_model.close()
+
+    reviews, pending, review, by_id = asyncio.run(read())
+
+    assert sorted(row["checkpoint_id"] for row in reviews) == sorted(row["checkpoint_id"] for row in repo.list_all())
+    assert [row["checkpoint_id"] for row in pending] == [row["checkpoint_id"] for row in repo.get_pending_reviews()]
+    assert "cp-1" not in {row["checkpoint_id"] for row in pending}
+    assert (review["thread_id"], review["invoice_id"], review["decision"]) == ("thread-3", "INV-3", None)
+    assert set(by_id) == {"cp-1", "cp-4"}
+    assert (by_id["cp-1"]["decision"], by_id["cp-1"]["thread_id"]) == ("ACCEPT", "thread-1")
+
+
+def test_missing_tables_read_as_empty(tmp_path):
+    """Shards created before a table exists return no rows instead of failing."""
+    path = str(tmp_path / "empty.db")
+    sqlite3.connect(path).close()
+
+    async def read():
+        read_model = AsyncWorkflowReadModel()
+        read_model.configure([path], None)
+        try:
+            return (
+                await read_model.list_reviews(),
+                await read_model.get_resume_job("thread-1"),
+                await read_model.get_states(["thread-1"])
+            )
+        finally:
+            await read_model.close()
+
+    assert asyncio.run(read()) == ([], None, {})
+
+
+def test_pool_connections_are_read_only(tmp_path):
+    """Pooled connections cannot write."""
+    path = str(tmp_path / "demo.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (id INTEGER)")
+    conn.close()
+
+    async def write():
+        pool = ReadOnlyPool(path)
+        try:
+            async with pool.connection() as conn:
+                await conn.execute("INSERT INTO items VALUES (1)")
+        finally:
+            await pool.close()
+
+    with pytest.raises(aiosqlite.OperationalError, match="readonly"):
+        asyncio.run(write())
+
+
+def test_pool_is_bounded_and_reuses_connections(tmp_path):
+    """No more than `size` connections are opened; further readers wait for a release."""
+    path = str(tmp_path / "demo.db")
+    sqlite3.connect(path).close()
+    with pytest.raises(ValueError):
+        ReadOnlyPool(path, size=0)
+
+    async def borrow():
+        pool = ReadOnlyPool(path, size=2)
+        first, second = await pool.acquire(), await pool.acquire()
+        waiting = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0.05)
+        blocked = not waiting.done()
+        pool.release(first)
+        third = await asyncio.wait_for(waiting, 1)
+        opened = pool._opened
+        pool.release(second)
+        pool.release(third)
+        await pool.close()
+        return blocked, third is first, opened, pool._opened
+
+    assert asyncio.run(borrow()) == (True, True, 2, 0)
+
+
+def test_readers_do_not_wait_for_an_open_write(shards):
+    """While a writer holds the write lock, readers see the last committed snapshot."""
+    router, saver, graph, repo = shards
+    path = router.path_for("thread-0")
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("UPDATE human_review_queue SET decision = 'REJECT' WHERE thread_id = 'thread-0'")
+
+    async def read():
+        read_model = make_read_model(router, saver, {"size": 1})
+        try:
+            return await asyncio.wait_for(read_model.get_review("cp-0"), 2)
+        finally:
+            await read_model.close()
+
+    try:
+        assert asyncio.run(read())["decision"] is None
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
@@ -0,0 +1,143 @@
+"""Tests for the background resume worker pool and its job queue."""
+
+import sqlite3
+import time
+from datetime import datetime
+
+import pytest
+
+from src.graph import resume_worker
+from src.graph.resume_worker import ResumeWorkerPool
+from src.storage.human_review_repo import HumanReviewRepository
+from src.storage.resume_jobs import ResumeJobRepository
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    """Job repository on a database with one undecided review (cp-1) whose resume is queued."""
+    path = str(tmp_path / "reviews.db")
+    HumanReviewRepository(path).save_checkpoint({
+        "checkpoint_id": "cp-1",
+        "invoice_id": "INV-1",
+        "vendor_name": "Acme",
+        "amount": 100.0,
+        "created_at": datetime.utcnow().isoformat(),
+        "reason_for_hold": "Amount mismatch",
+        "review_url": "/human-review/cp-1",
+        "thread_id": "thread-1",
+        "due_date": "2024-02-01"
+    })
+    repository = ResumeJobRepository([path])
+    repository.enqueue_many([{
+        "checkpoint_id": "cp-1",
+        "thread_id": "thread-1",
+        "decision": "ACCEPT",
+        "reviewer_id": "alice",
+        "next_stage": "RECONCILE"
+    }])
+    return repository
+
+
+@pytest.fixture
+def resumes(monkeypatch):
+    """Resume calls made by workers; set `fail` to make them raise."""
+    calls = {"jobs": [], "fail": 0}
+
+    def fake_resume(graph, checkpoint_store, durability, job):
+        calls["jobs"].append(job["checkpoint_id"])
+        if calls["fail"]:
+            calls["fail"] -= 1
+            raise RuntimeError("ERP unavailable")
+        return 12.5
+
+    monkeypatch.setattr(resume_worker, "resume_workflow", fake_resume)
+    return calls
+
+
+def make_pool(jobs, **settings):
+    """Pool over the test jobs with fast polling and no backoff."""
+    pool = ResumeWorkerPool()
+    pool.configure(None, None, jobs, {"workers": 2, "backoff_s": 0, "poll_interval_s": 0.05, **settings})
+    return pool
+
+
+def job_row(jobs):
+    """The resume job of cp-1."""
+    conn = sqlite3.connect(jobs.router.db_paths[0])
+    conn.row_factory = sqlite3.Row
+    row = dict(conn.execute("SELECT * FROM resume_jobs WHERE checkpoint_id = 'cp-1'").fetchone())
+    conn.close()
+    return row
+
+
+def test_failed_attempts_are_retried_then_given_up(jobs, resumes):
+    """Each failure requeues the job until max_attempts, then it is FAILED."""
+    resumes["fail"] = 5
+    pool = make_pool(jobs, max_attempts=2)
+
+    pool.run_job(jobs.claim("worker-a", 60, 0))
+    row = job_row(jobs)
+    assert (row["status"], row["attempts"], row["last_error"]) == ("QUEUED", 1, "ERP unavailable")
+
+    pool.run_job(jobs.claim("worker-a", 60, 0))
+    row = job_row(jobs)
+    assert (row["status"], row["attempts"]) == ("FAILED", 2)
+    assert jobs.claim("worker-a", 60, 0) is None
+    assert resumes["jobs"] == ["cp-1", "cp-1"]
+
+
+def test_retry_waits_for_backoff(jobs, resumes):
+    """A requeued job cannot be claimed before its backoff has passed."""
+    resumes["fail"] = 1
+    pool = make_pool(jobs, backoff_s=60)
+    pool.run_job(jobs.claim("worker-a", 60, 0))
+    assert job_row(jobs)["available_at"] > time.time() + 50
+    assert jobs.claim("worker-a", 60, 0) is None
+
+
+def test_expired_lease_is_reclaimed(jobs, resumes):
+    """A job whose worker died is taken over; the stale worker's outcome is ignored."""
+    stale = jobs.claim("worker-a", -1, 0)
+    reclaimed = jobs.claim("worker-b", 60, 0)
+    assert (reclaimed["worker_id"], reclaimed["attempts"]) == ("worker-b", 2)
+    assert jobs.claim("worker-c", 60, 0) is None
+
+    jobs.mark_done(stale, 1.0)
+    assert job_row(jobs)["status"] == "RUNNING"
+
+    make_pool(jobs).run_job(reclaimed)
+    assert (job_row(jobs)["status"], job_row(jobs)["worker_id"]) == ("DONE", "worker-b")
+
+
+def test_job_reclaimed_after_the_last_attempt_fails(jobs, resumes):
+    """A job reclaimed past max_attempts is marked FAILED without resuming again."""
+    pool = make_pool(jobs, max_attempts=1)
+    jobs.claim("worker-a", -1, 0)
+    pool.run_job(jobs.claim("worker-b", 60, 0))
+    row = job_row(jobs)
+    assert (row["status"], row["last_error"]) == ("FAILED", "Resume lease expired")
+    assert resumes["jobs"] == []
+
+
+def test_started_pool_runs_queued_jobs(jobs, resumes):
+    """Worker threads pick up queued jobs and record their outcome."""
+    pool = make_pool(jobs)
+    pool.start()
+    try:
+        pool.notify()
+        deadline = time.monotonic() + 5
+        while job_row(jobs)["status"] != "DONE" and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        pool.stop(timeout=5)
+
+    row = job_row(jobs)
+    assert (row["status"], row["attempts"], row["resume_latency_ms"]) == ("DONE", 1, 12.5)
+    assert resumes["jobs"] == ["cp-1"]
+    assert not pool.running
+
+
+def test_invalid_worker_count_is_rejected(jobs):
+    """A pool needs at least one worker."""
+    with pytest.raises(ValueError):
+        make_pool(jobs, workers=0)
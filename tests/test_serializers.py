@@ -0,0 +1,80 @@
+"""Tests for the compact checkpoint serializer."""
+
+import datetime
+import enum
+import uuid
+
+import pytest
+
+from src.storage.serializers import CompactSerializer, build_serializer, is_plain_json
+
+
+class Status(str, enum.Enum):
+    MATCHED = "MATCHED"
+
+
+TYPED_VALUE = {
+    "ids": (1, 2),
+    "thread": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "status": Status.MATCHED,
+    "at": datetime.datetime(2024, 1, 2, 3, 4, 5),
+    "nested": [{"pair": ("a", "b")}]
+}
+PLAIN_VALUE = {"invoice_id": "INV-1", "amount": 12.5, "lines": [{"qty": 2, "ok": True, "note": None}]}
+
+
+@pytest.fixture(params=[("msgpack", None), ("msgpack", "zlib"), ("orjson", None), ("orjson", "zlib")])
+def serializer(request):
+    """Serializer for each format, with and without compression."""
+    format, compression = request.param
+    return CompactSerializer(format=format, compression=compression, compress_min_bytes=0)
+
+
+@pytest.mark.parametrize("value", [PLAIN_VALUE, TYPED_VALUE, b"raw", None, [1.5, "x"]])
+def test_round_trip_matches_default_serializer(serializer, value):
+    """Every value reads back exactly as with the default serializer, types included."""
+    default = serializer.base
+    expected = default.loads_typed(default.dumps_typed(value))
+    restored = serializer.loads_typed(serializer.dumps_typed(value))
+    assert restored == expected
+    assert repr(restored) == repr(expected)
+    if value is TYPED_VALUE:
+        assert type(restored["thread"]) is uuid.UUID
+        assert type(restored["status"]) is Status
+        assert type(restored["at"]) is datetime.datetime
+
+
+def test_orjson_only_for_plain_json():
+    """orjson tags plain JSON; typed values fall back to msgpack."""
+    serializer = CompactSerializer(format="orjson", compression=None)
+    assert serializer.dumps_typed(PLAIN_VALUE)[0] == "orjson"
+    assert serializer.dumps_typed(TYPED_VALUE)[0] == "msgpack"
+    assert serializer.dumps_typed({"ids": (1, 2)})[0] == "msgpack"
+
+
+@pytest.mark.parametrize("value", [(1,), {1: "a"}, Status.MATCHED, float("nan"), {"x": [uuid.uuid4()]}])
+def test_is_plain_json_rejects_lossy_values(value):
+    """Values orjson would change are not plain JSON."""
+    assert not is_plain_json(value)
+
+
+def test_compression_applies_above_threshold():
+    """Small payloads stay uncompressed; large ones carry the codec in the tag."""
+    serializer = CompactSerializer(format="msgpack", compression="zlib", compress_min_bytes=256)
+    assert serializer.dumps_typed({"a": 1})[0] == "msgpack"
+    type_, data = serializer.dumps_typed({"text": "x" * 4096})
+    assert type_ == "msgpack+zlib" and len(data) < 4096
+
+
+def test_unknown_codec_is_rejected():
+    """A row tagged with a codec this build does not know raises ValueError."""
+    with pytest.raises(ValueError, match="Unknown checkpoint compression: lz4"):
+        CompactSerializer().loads_typed(("msgpack+lz4", b"\x00"))
+
+
+def test_reads_default_serializer_rows():
+    """Rows written by LangGraph's default serializer stay readable."""
+    assert build_serializer({"format": "default"}) is None
+    default = CompactSerializer().base
+    stored = default.dumps_typed(TYPED_VALUE)
+    assert CompactSerializer(format="orjson").loads_typed(stored) == default.loads_typed(stored)
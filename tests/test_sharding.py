@@ -0,0 +1,150 @@
+"""Tests for thread-sharded storage and shard rebalancing."""
+
+import sqlite3
+from datetime import datetime
+from typing import TypedDict
+
+import pytest
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, StateGraph
+
+from rebalance_shards import move_threads, plan_moves
+from src.storage.human_review_repo import HumanReviewRepository
+from src.storage.sharding import ShardedCheckpointSaver, ShardedHumanReviewRepository, ShardRouter, shard_paths
+
+
+THREAD_IDS = [f"thread-{number}" for number in range(12)]
+
+
+class CounterState(TypedDict, total=False):
+    """Minimal workflow state."""
+    count: int
+
+
+def build_graph(checkpointer):
+    """One-node graph that increments a counter."""
+    graph = StateGraph(CounterState)
+    graph.add_node("step", lambda state: {"count": state.get("count", 0) + 1})
+    graph.set_entry_point("step")
+    graph.add_edge("step", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def review(thread_id, amount=100.0):
+    """Pending review row for a thread."""
+    return {
+        "checkpoint_id": f"cp-{thread_id}",
+        "invoice_id": f"INV-{thread_id}",
+        "vendor_name": "Acme",
+        "amount": amount,
+        "created_at": datetime.utcnow().isoformat(),
+        "reason_for_hold": "Amount mismatch",
+        "review_url": f"/human-review/cp-{thread_id}",
+        "thread_id": thread_id,
+        "due_date": "2024-02-01"
+    }
+
+
+def thread_ids_in(db_path, table):
+    """Distinct thread IDs of a table in one database."""
+    conn = sqlite3.connect(db_path)
+    thread_ids = {row[0] for row in conn.execute(f"SELECT DISTINCT thread_id FROM {table}")}
+    conn.close()
+    return thread_ids
+
+
+@pytest.fixture
+def router(tmp_path):
+    """Router over three shard files in tmp_path."""
+    return ShardRouter(shard_paths({"count": 3, "path_template": str(tmp_path / "demo_{shard}.db")}, "unused.db"))
+
+
+def test_routing_is_stable_and_spread(router):
+    """A thread always maps to the same shard, and threads use every shard."""
+    assert [router.shard_for(thread_id) for thread_id in THREAD_IDS] == \
+        [ShardRouter(router.db_paths).shard_for(thread_id) for thread_id in THREAD_IDS]
+    assert {router.shard_for(thread_id) for thread_id in THREAD_IDS} == {0, 1, 2}
+    assert ShardRouter(["only.db"]).path_for("anything") == "only.db"
+
+
+def test_shard_paths():
+    """One shard is the primary database; more shards follow the template."""
+    assert shard_paths(None, "demo.db") == ["demo.db"]
+    assert shard_paths({"count": 2, "path_template": "s_{shard}.db"}, "demo.db") == ["s_0.db", "s_1.db"]
+    with pytest.raises(ValueError):
+        shard_paths({"count": 0}, "demo.db")
+
+
+def test_checkpoints_live_on_their_shard(router):
+    """Each thread's checkpoints are written to its own shard; listing merges all shards."""
+    connections = [sqlite3.connect(path, check_same_thread=False) for path in router.db_paths]
+    saver = ShardedCheckpointSaver(router, [SqliteSaver(conn) for conn in connections])
+    graph = build_graph(saver)
+    for thread_id in THREAD_IDS:
+        graph.invoke({"count": 0}, {"configurable": {"thread_id": thread_id}})
+
+    for shard, path in enumerate(router.db_paths):
+        expected = {thread_id for thread_id in THREAD_IDS if router.shard_for(thread_id) == shard}
+        assert thread_ids_in(path, "checkpoints") == expected
+    assert graph.get_state({"configurable": {"thread_id": "thread-5"}}).values == {"count": 1}
+
+    checkpoint_ids = [item.config["configurable"]["checkpoint_id"] for item in saver.list(None)]
+    assert checkpoint_ids == sorted(checkpoint_ids, reverse=True)
+    assert len(list(saver.list(None, limit=4))) == 4
+
+    saver.delete_thread("thread-5")
+    assert saver.get_tuple({"configurable": {"thread_id": "thread-5"}}) is None
+    for conn in connections:
+        conn.close()
+
+
+def test_review_queue_is_sharded(router):
+    """Reviews are stored with their thread and found from any shard."""
+    repo = ShardedHumanReviewRepository(router)
+    for number, thread_id in enumerate(THREAD_IDS):
+        repo.save_checkpoint(review(thread_id, amount=100.0 * number))
+
+    for shard, path in enumerate(router.db_paths):
+        expected = {thread_id for thread_id in THREAD_IDS if router.shard_for(thread_id) == shard}
+        assert thread_ids_in(path, "human_review_queue") == expected
+
+    assert len(repo.get_pending_reviews()) == len(THREAD_IDS)
+    assert repo.get_checkpoint("cp-thread-7")["thread_id"] == "thread-7"
+    assert repo.update_decision("cp-thread-7", "ACCEPT", "alice")
+    assert not repo.update_decision("cp-thread-7", "REJECT", "bob")
+    assert not repo.update_decision("cp-unknown", "ACCEPT", "alice")
+    assert len(repo.get_pending_reviews()) == len(THREAD_IDS) - 1
+
+
+def test_rebalance_moves_threads_to_their_new_shard(tmp_path, router):
+    """Moving from one database to three shards puts every row where the router expects it."""
+    source = str(tmp_path / "demo.db")
+    conn = sqlite3.connect(source, check_same_thread=False)
+    graph = build_graph(SqliteSaver(conn))
+    repo = HumanReviewRepository(source)
+    for thread_id in THREAD_IDS:
+        graph.invoke({"count": 0}, {"configurable": {"thread_id": thread_id}})
+        repo.save_checkpoint(review(thread_id))
+    conn.close()
+
+    moves = plan_moves(source, router)
+    assert sorted(thread_id for thread_ids in moves.values() for thread_id in thread_ids) == sorted(THREAD_IDS)
+    for target_path, thread_ids in moves.items():
+        moved = move_threads(source, target_path, thread_ids)
+        assert moved["human_review_queue"] == len(thread_ids)
+
+    assert thread_ids_in(source, "checkpoints") == set()
+    for shard, path in enumerate(router.db_paths):
+        expected = {thread_id for thread_id in THREAD_IDS if router.shard_for(thread_id) == shard}
+        assert thread_ids_in(path, "checkpoints") == expected
+        assert thread_ids_in(path, "human_review_queue") == expected
+    # Nothing is left to move on a second run
+    assert all(not plan_moves(path, router) for path in router.db_paths)
+
+    # Moved threads resume from their new shard
+    connections = [sqlite3.connect(path, check_same_thread=False) for path in router.db_paths]
+    sharded_graph = build_graph(ShardedCheckpointSaver(router, [SqliteSaver(conn) for conn in connections]))
+    assert sharded_graph.get_state({"configurable": {"thread_id": "thread-3"}}).values == {"count": 1}
+    assert ShardedHumanReviewRepository(router).get_checkpoint("cp-thread-3")["thread_id"] == "thread-3"
+    for conn in connections:
+        conn.close()
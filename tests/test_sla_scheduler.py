@@ -0,0 +1,91 @@
+"""Tests for review SLA timers and escalations."""
+
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from src.graph.sla_scheduler import HitlSlaScheduler
+from src.mcp_clients.atlas_client import ATLASClient
+from src.storage.hitl_timers import HitlTimerRepository
+from src.storage.human_review_repo import HumanReviewRepository
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Database with one pending review (cp-1) claimed by alice."""
+    path = str(tmp_path / "reviews.db")
+    repo = HumanReviewRepository(path)
+    repo.save_checkpoint({
+        "checkpoint_id": "cp-1",
+        "invoice_id": "INV-1",
+        "vendor_name": "Acme",
+        "amount": 1234.5,
+        "created_at": datetime.utcnow().isoformat(),
+        "reason_for_hold": "Amount mismatch",
+        "review_url": "/human-review/cp-1",
+        "thread_id": "thread-1",
+        "due_date": "2024-02-01"
+    })
+    repo.claim("cp-1", "alice", lease_s=60)
+    return path
+
+
+@pytest.fixture
+def notifications(monkeypatch):
+    """Finance team messages sent during the test."""
+    sent = []
+    monkeypatch.setattr(ATLASClient, "notify_finance_team", lambda self, message, slack_key=None: sent.append(message))
+    return sent
+
+
+def scheduler(db_path):
+    """Scheduler of one API process on the shared database, with an already expired review SLA."""
+    sla = HitlSlaScheduler()
+    sla.configure(HitlTimerRepository([db_path]), {"enabled": True, "review_sla_s": -1})
+    return sla
+
+
+def test_timer_fires_once_across_schedulers(db_path, notifications):
+    """Two processes holding the same timer escalate the review once."""
+    first, second = scheduler(db_path), scheduler(db_path)
+    first.schedule_review({"checkpoint_id": "cp-1", "thread_id": "thread-1"})
+    (timer,) = second.timers.pending()
+
+    first.fire(timer)
+    second.fire(timer)
+
+    assert (first.metrics["fired"], second.metrics["fired"]) == (1, 0)
+    assert second.metrics["skipped"] == 1
+    review = HumanReviewRepository(db_path).get_checkpoint("cp-1")
+    assert review["escalation_level"] == 1
+    assert review["claimed_by"] is None
+    assert notifications == ["Invoice INV-1 (Acme, 1,234.50) escalated to ap_supervisor: REVIEW_SLA level 1"]
+    # The next level is armed once
+    assert [timer["escalation_level"] for timer in first.timers.pending()] == [1]
+
+
+def test_failed_escalation_leaves_timer_pending(db_path, notifications):
+    """The timer is marked fired only together with the escalation."""
+    sla = scheduler(db_path)
+    sla.schedule_review({"checkpoint_id": "cp-1", "thread_id": "thread-1"})
+    (timer,) = sla.timers.pending()
+    conn = sqlite3.connect(db_path)
+    conn.execute("ALTER TABLE human_review_queue RENAME TO review_queue_offline")
+    conn.close()
+
+    with pytest.raises(sqlite3.OperationalError):
+        sla.fire(timer)
+    assert [row["timer_id"] for row in sla.timers.pending()] == [timer["timer_id"]]
+    assert notifications == []
+
+
+def test_decided_review_is_not_escalated(db_path, notifications):
+    """A timer that comes due after the decision fires without escalating."""
+    sla = scheduler(db_path)
+    sla.schedule_review({"checkpoint_id": "cp-1", "thread_id": "thread-1"})
+    HumanReviewRepository(db_path).update_decision("cp-1", "ACCEPT", "alice")
+    (timer,) = sla.timers.pending()
+    sla.fire(timer)
+    assert sla.metrics["fired"] == 1 and sla.metrics["escalated"] == 0
+    assert notifications == []
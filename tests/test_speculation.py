@@ -0,0 +1,113 @@
+"""Tests for invalidation of speculatively precomputed RECONCILE/APPROVE outputs."""
+
+import json
+import os
+import sqlite3
+
+import pytest
+
+from src.graph import speculation
+from src.graph.speculation import SpeculativePrecompute, input_digest
+from src.rules.approval_policy import ApprovalPolicyEngine
+from src.rules.gl_coding import GLCodingEngine
+from src.storage.speculation_cache import SpeculationCache
+
+
+STATE = {
+    "thread_id": "thread-1",
+    "invoice_payload": {"invoice_id": "INV-1", "amount": 1200.0},
+    "prepare": {"vendor_profile": {"vendor_id": "VND-ACME"}},
+    "retrieve": {"matched_pos": [{"po_id": "PO-1"}]},
+    "hitl": {"human_decision": None}
+}
+
+OUTPUTS = {"RECONCILE": {"reconcile": {"accounting_entries": []}}, "APPROVE": {"approve": {"approval_status": "AUTO"}}}
+
+
+@pytest.fixture
+def rules(tmp_path, monkeypatch):
+    """Rule engines on a temporary workflow.json and rules table, checking for changes on every call."""
+    config_path = tmp_path / "workflow.json"
+    config_path.write_text(json.dumps({"approval_policy": {"rules": []}, "gl_coding": {}}))
+    approval = ApprovalPolicyEngine(reload_interval_s=0)
+    approval.configure(str(config_path), str(tmp_path / "rules.db"))
+    gl_coding = GLCodingEngine(str(config_path), reload_interval_s=0)
+    monkeypatch.setattr(speculation, "approval_policy_engine", approval)
+    monkeypatch.setattr(speculation, "gl_coding_engine", gl_coding)
+    return config_path, approval
+
+
+@pytest.fixture
+def precompute(tmp_path, rules):
+    """Enabled precompute with the outputs of STATE cached under its current digest."""
+    speculative = SpeculativePrecompute()
+    speculative.configure(SpeculationCache([str(tmp_path / "shard.db")]), {"enabled": True})
+    speculative.cache.put("thread-1", input_digest(STATE), OUTPUTS, 3.0)
+    return speculative
+
+
+def touch(path):
+    """Advance a file's mtime as an edit would."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.mark.parametrize("channel, value", [
+    ("invoice_payload", {"invoice_id": "INV-1", "amount": 1300.0}),
+    ("prepare", {"vendor_profile": {"vendor_id": "VND-OTHER"}}),
+    ("retrieve", {"matched_pos": []})
+])
+def test_digest_covers_the_inputs(rules, channel, value):
+    """Changing a channel RECONCILE/APPROVE read changes the digest."""
+    assert input_digest({**STATE, channel: value}) != input_digest(STATE)
+
+
+def test_digest_ignores_other_channels(rules):
+    """Channels the speculative stages do not read leave the digest unchanged."""
+    assert input_digest({**STATE, "hitl": {"human_decision": "ACCEPT"}, "paused": False}) == input_digest(STATE)
+
+
+def test_unchanged_inputs_hit(precompute):
+    """Outputs are used once when nothing changed."""
+    assert precompute.take(STATE) == OUTPUTS
+    assert precompute.take(STATE) is None
+    assert (precompute.metrics["hits"], precompute.metrics["misses"]) == (1, 1)
+
+
+def test_state_edit_invalidates(precompute):
+    """An invoice edited during the pause is not accepted with stale outputs."""
+    edited = {**STATE, "invoice_payload": {"invoice_id": "INV-1", "amount": 1300.0}}
+    assert precompute.take(edited) is None
+    assert precompute.metrics["invalidated"] == 1
+
+
+def test_approval_rule_edit_invalidates(precompute, rules):
+    """An approval rule edit in the table, even one keeping updated_at, invalidates the outputs."""
+    config_path, approval = rules
+    conn = sqlite3.connect(approval.db_path)
+    conn.execute("""
+        INSERT INTO approval_rules (rule_id, priority, match_json, approval_status, approver_id, updated_at)
+        VALUES ('freeze', 1, '{}', 'REQUIRES_APPROVAL', 'cfo', '2024-01-01T00:00:00')
+    """)
+    conn.commit()
+    precompute.cache.put("thread-1", input_digest(STATE), OUTPUTS, 3.0)
+    conn.execute("UPDATE approval_rules SET approver_id = 'treasurer'")
+    conn.commit()
+    conn.close()
+
+    assert precompute.take(STATE) is None
+    assert precompute.metrics["invalidated"] == 1
+
+
+def test_rule_file_edit_invalidates(precompute, rules):
+    """An edit to workflow.json (GL coding or approval rules) invalidates the outputs."""
+    config_path, approval = rules
+    touch(config_path)
+    assert precompute.take(STATE) is None
+    assert precompute.metrics["invalidated"] == 1
+
+
+def test_disabled_precompute_never_serves_outputs(precompute):
+    """Turning precompute off ignores cached rows."""
+    precompute.enabled = False
+    assert precompute.take(STATE) is None
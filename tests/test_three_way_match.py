@@ -0,0 +1,91 @@
+"""Tests for three-way matching (invoice, PO, goods received)."""
+
+from src.mcp_clients.atlas_client import ATLASClient
+from src.mcp_clients.common_client import COMMONClient
+from src.nodes.match_two_way import match_two_way_node
+
+
+def lines(count, qty=10, price=10.0, po_id=None):
+    """Line items "Part 0".."Part N-1"."""
+    return [
+        {"desc": f"Part {k}", "qty": qty, "unit_price": price, "total": qty * price, **({"po_id": po_id} if po_id else {})}
+        for k in range(count)
+    ]
+
+
+def run_match(invoice_lines, po, grns, qty_tolerance_pct=0.0):
+    """Run MATCH_TWO_WAY in three-way mode on a synthetic state."""
+    state = {
+        "thread_id": "t-1",
+        "config": {"match_threshold": 0.90, "two_way_tolerance_pct": 5.0, "match_mode": "three_way",
+                   "three_way_qty_tolerance_pct": qty_tolerance_pct},
+        "prepare": {"normalized_invoice": {"line_items": invoice_lines}},
+        "retrieve": {"matched_pos": [po], "matched_grns": grns}
+    }
+    return match_two_way_node(state, {}, {})["match_two_way"]
+
+
+def po_with_receipts(received):
+    """PO-1 with one line per received quantity, and its GRNs from the mock ERP."""
+    po = {"po_id": "PO-1", "line_items": lines(len(received), po_id="PO-1")}
+    for line, qty in zip(po["line_items"], received):
+        line["qty_received"] = qty
+    return po, ATLASClient().fetch_grn([po])
+
+
+def test_fully_received_invoice_matches():
+    """Every line received: MATCHED."""
+    po, grns = po_with_receipts([10] * 10)
+    output = run_match(lines(10), po, grns)
+    assert output["match_result"] == "MATCHED"
+    assert output["match_evidence"]["receipt_exceeded"] is False
+
+
+def test_unreceived_lines_fail_despite_high_score():
+    """3 of 10 lines never received: FAILED even though the 2-way score passes."""
+    po, grns = po_with_receipts([10] * 7 + [0] * 3)
+    output = run_match(lines(10), po, grns)
+    assert output["match_score"] >= 0.90
+    assert output["match_result"] == "FAILED"
+    assert output["match_evidence"]["receipt_exceeded"] is True
+    shortfalls = [m for m in output["match_evidence"]["receipt_matches"] if not m["within_receipt"]]
+    assert len(shortfalls) == 3
+
+
+def test_single_partial_receipt_fails_unless_within_tolerance():
+    """One line invoiced over its receipt fails; a quantity tolerance covering it passes."""
+    po, grns = po_with_receipts([10] * 9 + [9])
+    assert run_match(lines(10), po, grns)["match_result"] == "FAILED"
+    assert run_match(lines(10), po, grns, qty_tolerance_pct=15.0)["match_result"] == "MATCHED"
+
+
+def test_po_lines_without_po_id_use_their_po():
+    """Receipts recorded against the PO header match PO lines that carry no po_id."""
+    po = {"po_id": "PO-1", "line_items": lines(3)}
+    grns = [{"po_id": "PO-1", "status": "RECEIVED", "line_items": [
+        {"desc": line["desc"], "qty_received": line["qty"]} for line in po["line_items"]
+    ]}]
+    output = run_match(lines(3), po, grns)
+    assert output["match_result"] == "MATCHED"
+    assert {m["po_id"] for m in output["match_evidence"]["receipt_matches"]} == {"PO-1"}
+
+
+def test_received_index_sums_grns_and_skips_unreceived():
+    """Receipts add up per PO line; GRNs not in RECEIVED status do not count."""
+    grns = [
+        {"po_id": "PO-1", "status": "RECEIVED", "line_items": [{"desc": "Part 0", "qty_received": 4}]},
+        {"po_id": "PO-1", "status": "RECEIVED", "line_items": [{"desc": "part 0 ", "qty_received": 6}]},
+        {"po_id": "PO-1", "status": "CANCELLED", "line_items": [{"desc": "Part 0", "qty_received": 99}]}
+    ]
+    assert COMMONClient().build_received_index(grns) == {("PO-1", "part 0"): 10.0}
+
+
+def test_mock_grn_follows_each_po():
+    """The mock ERP returns each PO's own lines, not a fixed receipt."""
+    grns = ATLASClient().fetch_grn([
+        {"po_id": "PO-A", "line_items": [{"desc": "Bolt", "qty": 3}]},
+        {"po_id": "PO-B", "line_items": [{"desc": "Nut", "qty": 7}]}
+    ])
+    assert [(grn["po_id"], [(line["desc"], line["qty_received"]) for line in grn["line_items"]]) for grn in grns] == [
+        ("PO-A", [("Bolt", 3)]), ("PO-B", [("Nut", 7)])
+    ]
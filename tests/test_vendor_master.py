@@ -0,0 +1,94 @@
+"""Tests for vendor master resolution."""
+
+import pytest
+
+from src.storage.vendor_master import VendorMasterIndex, normalize_vendor_tokens
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Vendor index backed by a temporary database, with Acme Corp (TAX-1) registered."""
+    vendor_index = VendorMasterIndex()
+    vendor_index.load(str(tmp_path / "vendors.db"))
+    vendor_index.add_vendor("Acme Corp", "TAX-1")
+    return vendor_index
+
+
+def test_spellings_resolve_to_one_vendor(index):
+    """Legal-form suffixes, case and punctuation do not split a vendor."""
+    vendor_ids = {index.resolve_or_register(name)["vendor_id"] for name in
+                  ("ACME Corp", "Acme Corporation", "acme corp.", "The Acme Inc")}
+    assert len(vendor_ids) == 1
+
+
+def test_holdings_and_group_are_distinct_vendors(index):
+    """"Holdings" and "Group" identify a different entity, not a legal form."""
+    acme = index.resolve("Acme Corp")["vendor_id"]
+    assert normalize_vendor_tokens("Acme Holdings") == ("acme", "holdings")
+    assert index.resolve_or_register("Acme Holdings")["vendor_id"] != acme
+    assert index.resolve_or_register("ACME Group")["vendor_id"] != acme
+
+
+def test_tax_id_resolves_any_spelling(index):
+    """A known tax ID wins over the name."""
+    assert index.resolve_or_register("Acme Widgets Ltd", "tax-1")["vendor_id"] == index.resolve("Acme")["vendor_id"]
+
+
+def test_name_match_with_different_tax_id_registers_new_vendor(index):
+    """Same name with another tax ID is a separate vendor, flagged as a conflict."""
+    acme = index.resolve("Acme Corp")
+    record = index.resolve_or_register("Acme Ltd", "TAX-2")
+    assert record["vendor_id"] != acme["vendor_id"]
+    assert record["tax_id"] == "TAX-2"
+    assert record["tax_id_conflict"] == acme["vendor_id"]
+    # The original vendor keeps its tax ID, and TAX-2 now resolves to the new vendor
+    assert index.resolve("Acme Corp")["tax_id"] == "TAX-1"
+    assert index.resolve("Acme", "TAX-2")["vendor_id"] == record["vendor_id"]
+    assert "tax_id_conflict" not in index.resolve_or_register("Acme Ltd", "TAX-2")
+
+
+def test_tax_id_learned_for_vendor_without_one(tmp_path):
+    """A vendor registered without a tax ID takes the first one seen."""
+    vendor_index = VendorMasterIndex()
+    vendor_index.load(str(tmp_path / "vendors.db"))
+    vendor_id = vendor_index.add_vendor("Globex")["vendor_id"]
+    assert vendor_index.resolve_or_register("Globex Inc", "TAX-9")["tax_id"] == "TAX-9"
+    assert vendor_index.resolve("anything", "TAX-9")["vendor_id"] == vendor_id
+
+
+@pytest.mark.parametrize("name", ["", "   ", "!!!", None])
+def test_blank_names_are_not_registered(index, name):
+    """Blank names resolve only by a known tax ID and never register a vendor."""
+    assert index.resolve_or_register(name, "TAX-3") is None
+    assert index.resolve_or_register(name, "TAX-1")["vendor_id"] == index.resolve("Acme")["vendor_id"]
+    with pytest.raises(ValueError):
+        index.add_vendor(name)
+
+
+def test_tax_id_hit_does_not_steal_another_vendors_name(index):
+    """A spelling already mapped to one vendor is not remapped by another vendor's tax ID."""
+    globex = index.add_vendor("Globex", "TAX-9")
+    index.add_alias(globex["vendor_id"], "Initech")
+    assert index.resolve_or_register("Initech", "TAX-1")["vendor_id"] == index.resolve("Acme")["vendor_id"]
+    assert index.resolve("Initech")["vendor_id"] == globex["vendor_id"]
+
+
+def test_aliases_learned_by_other_processes_are_found(index):
+    """A name missing from this process's index is looked up in vendor_aliases."""
+    other = VendorMasterIndex()
+    other.load(index.db_path)
+    other.resolve_or_register("Acme Widgets", "TAX-1")  # learned in the other process
+    record = index.resolve_or_register("Acme Widgets")
+    assert record["vendor_id"] == index.resolve("Acme")["vendor_id"]
+    # A tax ID hit in the other process does not remap a name this process assigned
+    globex = index.add_vendor("Globex", "TAX-9", aliases=["Acme Gadgets"])
+    assert other.resolve_or_register("Acme Gadgets", "TAX-1")["vendor_id"] == record["vendor_id"]
+    assert other.resolve("Acme Gadgets")["vendor_id"] == globex["vendor_id"]
+
+
+def test_index_reloads_from_database(index):
+    """Vendors and aliases survive a reload."""
+    index.resolve_or_register("Acme Widgets", "TAX-1")  # new spelling learned as an alias
+    reloaded = VendorMasterIndex()
+    reloaded.load(index.db_path)
+    assert reloaded.resolve("Acme Widgets")["vendor_id"] == index.resolve("Acme")["vendor_id"]
@@ -0,0 +1,46 @@
+"""Tests for per-vendor running statistics."""
+
+import statistics
+
+import pytest
+
+from src.storage.vendor_stats import VendorStatsRepository, welford_update
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Vendor stats repository on a temporary database."""
+    return VendorStatsRepository(str(tmp_path / "stats.db"))
+
+
+def test_running_stats_match_batch_statistics(repo):
+    """Welford mean and variance equal the batch values."""
+    amounts = [100.0, 250.0, 175.5, 90.0, 310.25]
+    for k, amount in enumerate(amounts):
+        repo.record_invoice("V1", f"INV-{k}", amount, f"2024-01-{k + 1:02d}")
+    stats = repo.get("V1")
+    assert stats["invoice_count"] == len(amounts)
+    assert stats["amount_mean"] == pytest.approx(statistics.mean(amounts))
+    assert stats["amount_variance"] == pytest.approx(statistics.variance(amounts))
+    assert stats["interval_mean_days"] == pytest.approx(1.0)
+
+
+def test_same_invoice_is_recorded_once(repo):
+    """A re-run COMPLETE does not change the statistics."""
+    first = repo.record_invoice("V1", "INV-1", 100.0, "2024-01-01")
+    assert repo.record_invoice("V1", "INV-1", 100.0, "2024-01-01") is None
+    assert repo.get("V1")["invoice_count"] == first["invoice_count"] == 1
+    # The same invoice number from another vendor is a different invoice
+    assert repo.record_invoice("V2", "INV-1", 50.0)["invoice_count"] == 1
+
+
+def test_out_of_order_invoice_keeps_latest_date():
+    """An older invoice updates amounts but not the last date or the cadence."""
+    stats = welford_update({}, 100.0, "2024-03-01")
+    stats = welford_update(stats, 120.0, "2024-03-31")
+    late = welford_update(stats, 80.0, "2024-02-01")
+    assert late["invoice_count"] == 3
+    assert late["last_invoice_date"] == "2024-03-31"
+    assert late["last_amount"] == 120.0
+    assert late["interval_count"] == stats["interval_count"] == 1
+    assert late["interval_mean_days"] == pytest.approx(30.0)
@@ -0,0 +1,132 @@
+"""Tests for the incrementally maintained dashboard counters."""
+
+import sqlite3
+from typing import TypedDict
+
+import pytest
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, StateGraph
+
+from src.storage.sharding import ShardedCheckpointSaver, ShardRouter
+from src.storage.workflow_metrics import WorkflowMetrics, index_entry
+
+
+class InvoiceState(TypedDict, total=False):
+    """Subset of the workflow state the counters read."""
+    thread_id: str
+    invoice_payload: dict
+    workflow_status: str
+    complete: dict
+
+
+def state(thread_id, vendor="Acme", amount=100.0):
+    """Workflow state right after INTAKE."""
+    return {
+        "thread_id": thread_id,
+        "invoice_payload": {"invoice_id": f"INV-{thread_id}", "vendor_name": vendor, "amount": amount},
+        "intake": {"ingest_ts": "2024-01-01T00:00:00"},
+        "workflow_status": "IN_PROGRESS"
+    }
+
+
+@pytest.fixture
+def router(tmp_path):
+    """Router over two shard files."""
+    return ShardRouter([str(tmp_path / f"demo_{shard}.db") for shard in range(2)])
+
+
+@pytest.fixture
+def metrics(router):
+    """Metrics on the shards, reconciling threads regardless of idle time."""
+    connections = [sqlite3.connect(path, check_same_thread=False) for path in router.db_paths]
+    saver = ShardedCheckpointSaver(router, [SqliteSaver(conn) for conn in connections])
+    workflow_metrics = WorkflowMetrics()
+    workflow_metrics.configure(router.db_paths, saver, {"min_idle_s": 0})
+    yield workflow_metrics
+    for conn in connections:
+        conn.close()
+
+
+def counts(summary):
+    """Counts only, per dimension."""
+    return {
+        "total": summary["total"]["count"],
+        "by_status": {key: value["count"] for key, value in summary["by_status"].items()},
+        "by_stage": {key: value["count"] for key, value in summary["by_stage"].items()},
+        "by_vendor": {key: value["count"] for key, value in summary["by_vendor"].items()}
+    }
+
+
+def test_index_entry_uses_furthest_stage():
+    """The stage is the furthest stage with output; the vendor prefers the resolved vendor_id."""
+    values = {**state("t1"), "prepare": {"vendor_profile": {"vendor_id": "VND-ACME"}}, "approve": {"ok": True}}
+    assert index_entry(values) == {
+        "invoice_id": "INV-t1", "vendor": "VND-ACME", "amount": 100.0, "status": "IN_PROGRESS", "stage": "APPROVE"
+    }
+    assert index_entry({})["stage"] == "UNKNOWN"
+
+
+def test_records_move_threads_between_counters(metrics, router):
+    """Each record moves a thread to its new keys; counters are summed across shards."""
+    thread_ids = [f"thread-{number}" for number in range(6)]
+    assert {router.shard_for(thread_id) for thread_id in thread_ids} == {0, 1}
+    for thread_id in thread_ids:
+        metrics.record(state(thread_id, vendor="Acme" if thread_id != "thread-5" else "Globex"))
+    metrics.record(state("thread-0"), {"complete": {"status": "COMPLETED"}, "workflow_status": "COMPLETED"})
+    # Recording an unchanged state is a no-op
+    metrics.record(state("thread-1"))
+
+    summary = metrics.summary()
+    assert counts(summary) == {
+        "total": 6,
+        "by_status": {"IN_PROGRESS": 5, "COMPLETED": 1},
+        "by_stage": {"INTAKE": 5, "COMPLETE": 1},
+        "by_vendor": {"Acme": 5, "Globex": 1}
+    }
+    assert summary["total"]["amount_sum"] == 600.0
+
+    metrics.delete_by_thread("thread-0")
+    metrics.delete_by_thread("unknown")
+    assert counts(metrics.summary())["by_status"] == {"IN_PROGRESS": 5}
+
+
+def test_disabled_metrics_record_nothing(metrics):
+    """With metrics disabled, records are ignored."""
+    metrics.enabled = False
+    metrics.record(state("thread-1"))
+    assert metrics.summary()["total"]["count"] == 0
+
+
+def test_reconcile_repairs_drift(metrics, router):
+    """Reconciliation rebuilds index rows from checkpoints, drops vanished threads and fixes counters."""
+    graph = StateGraph(InvoiceState)
+    graph.add_node("complete", lambda values: {"complete": {"status": "COMPLETED"}, "workflow_status": "COMPLETED"})
+    graph.set_entry_point("complete")
+    graph.add_edge("complete", END)
+    compiled = graph.compile(checkpointer=metrics.checkpointer)
+    for thread_id in ("thread-1", "thread-2"):
+        compiled.invoke(state(thread_id), {"configurable": {"thread_id": thread_id}})
+        # The process "died" before recording the COMPLETE node exit
+        metrics.record(state(thread_id))
+    metrics.record(state("thread-gone"))
+
+    # A lost update leaves a counter off by one
+    conn = sqlite3.connect(router.path_for("thread-1"))
+    conn.execute("UPDATE workflow_counters SET count = count + 1 WHERE dimension = 'vendor'")
+    conn.commit()
+    conn.close()
+
+    run = metrics.reconcile()
+
+    assert (run["index_rows_fixed"], run["index_rows_removed"]) == (2, 1)
+    assert run["counters_fixed"] > 0
+    assert counts(metrics.summary()) == {
+        "total": 2,
+        "by_status": {"COMPLETED": 2},
+        "by_stage": {"COMPLETE": 2},
+        "by_vendor": {"Acme": 2}
+    }
+    assert metrics.summary()["last_reconcile"] == run
+    # Nothing left to fix
+    assert {key: value for key, value in metrics.reconcile().items() if key.endswith("fixed")} == \
+        {"index_rows_fixed": 0, "counters_fixed": 0}